@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -9,6 +10,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Cargar variables de entorno desde .env
 load_dotenv(BASE_DIR / ".env")
 
+# `manage.py test`
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+
 # Seguridad
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", "tu-clave-secreta-aqui")
 DEBUG = os.getenv("DJANGO_DEBUG", "True").lower() in ("1", "true", "yes")
@@ -33,6 +37,95 @@ AI_CLASSIFICATION_PROMPT = os.getenv(
         "y no inventes otras nuevas. La confianza debe ser un número entre 0 y 1. Ahora analizá el siguiente contenido:\n"
     ),
 )
+# Límites de concurrencia para la clasificación con IA: descargas de artículos
+# y consultas al modelo corren en pools separados.
+IA_MAX_DESCARGAS_CONCURRENTES = int(os.getenv("IA_MAX_DESCARGAS_CONCURRENTES", "8"))
+IA_MAX_CONSULTAS_CONCURRENTES = int(os.getenv("IA_MAX_CONSULTAS_CONCURRENTES", "4"))
+# Descarga de artículos: tope de bytes leídos por nota, reintentos con backoff
+# ante 429/5xx y límites por dominio (cada DiarioDigital puede definir los
+# suyos; estos son los valores por defecto).
+IA_DESCARGA_MAX_BYTES = int(os.getenv("IA_DESCARGA_MAX_BYTES", str(2 * 1024 * 1024)))
+IA_DESCARGA_TIMEOUT = float(os.getenv("IA_DESCARGA_TIMEOUT", "15"))
+IA_DESCARGA_REINTENTOS = int(os.getenv("IA_DESCARGA_REINTENTOS", "3"))
+IA_DESCARGA_BACKOFF = float(os.getenv("IA_DESCARGA_BACKOFF", "0.5"))
+IA_DESCARGA_HOSTS_EN_POOL = int(os.getenv("IA_DESCARGA_HOSTS_EN_POOL", "32"))
+IA_DESCARGA_SIMULTANEAS_POR_DOMINIO = int(
+    os.getenv("IA_DESCARGA_SIMULTANEAS_POR_DOMINIO", "4")
+)
+IA_DESCARGA_POR_MINUTO_POR_DOMINIO = int(
+    os.getenv("IA_DESCARGA_POR_MINUTO_POR_DOMINIO", "120")
+)
+IA_DESCARGA_USER_AGENT = os.getenv(
+    "IA_DESCARGA_USER_AGENT", "Mozilla/5.0 (compatible; Minerva/1.0)"
+)
+# Consultas en lote: varios artículos comparten un mismo prompt siempre que no
+# superen IA_LOTE_MAX_TOKENS tokens estimados de contenido. Con
+# IA_LOTE_MAX_LINKS=1 se vuelve a una consulta por link.
+IA_LOTE_MAX_LINKS = int(os.getenv("IA_LOTE_MAX_LINKS", "8"))
+IA_LOTE_MAX_TOKENS = int(os.getenv("IA_LOTE_MAX_TOKENS", "12000"))
+IA_LOTE_MAX_TOKENS_RESPUESTA = int(os.getenv("IA_LOTE_MAX_TOKENS_RESPUESTA", "4000"))
+# Cola de clasificación procesada por `manage.py run_ia_worker`. Un link
+# reservado por un worker que no termina en IA_COLA_TIEMPO_RESERVA segundos
+# vuelve a quedar disponible, hasta IA_COLA_MAX_INTENTOS veces.
+IA_COLA_TAMANIO_LOTE = int(os.getenv("IA_COLA_TAMANIO_LOTE", "20"))
+IA_COLA_TIEMPO_RESERVA = int(os.getenv("IA_COLA_TIEMPO_RESERVA", "600"))
+IA_COLA_MAX_INTENTOS = int(os.getenv("IA_COLA_MAX_INTENTOS", "3"))
+# Caché persistente de la clasificación con IA: el texto de cada nota se guarda
+# por URL normalizada y cada análisis por hash de texto + prompt + categorías.
+# Al superar IA_CACHE_MAX_ENTRADAS se descarta una parte de las entradas.
+IA_CACHE_ALIAS = "ia"
+IA_CACHE_TTL_TEXTO = int(os.getenv("IA_CACHE_TTL_TEXTO", str(7 * 24 * 3600)))
+IA_CACHE_TTL_ANALISIS = int(os.getenv("IA_CACHE_TTL_ANALISIS", str(30 * 24 * 3600)))
+IA_CACHE_MAX_ENTRADAS = int(os.getenv("IA_CACHE_MAX_ENTRADAS", "20000"))
+# Caché de las estadísticas de gerencia: cada combinación de filtros se guarda
+# hasta que cambian links, actividades, artículos, hechos o informes, y como
+# máximo ESTADISTICAS_CACHE_TTL segundos.
+ESTADISTICAS_CACHE_ALIAS = "estadisticas"
+ESTADISTICAS_CACHE_TTL = int(os.getenv("ESTADISTICAS_CACHE_TTL", "300"))
+# Filas de la tabla de detalle del PDF de estadísticas (los links más recientes).
+ESTADISTICAS_PDF_MAX_FILAS = int(os.getenv("ESTADISTICAS_PDF_MAX_FILAS", "500"))
+# Exportaciones PDF con WeasyPrint: se generan en PDF_PROCESOS procesos aparte
+# (0 las genera en la misma request) y se guardan en PDF_CACHE_DIR hasta que
+# cambia el objeto exportado o pasan PDF_CACHE_TTL segundos. La request espera
+# hasta PDF_ESPERA_SEGUNDOS antes de mostrar la página de descarga diferida.
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(BASE_DIR, "cache", "pdf"))
+PDF_CACHE_TTL = int(os.getenv("PDF_CACHE_TTL", str(24 * 3600)))
+PDF_PROCESOS = int(os.getenv("PDF_PROCESOS", "2"))
+PDF_ESPERA_SEGUNDOS = float(os.getenv("PDF_ESPERA_SEGUNDOS", "3"))
+PDF_TIEMPO_MAXIMO = int(os.getenv("PDF_TIEMPO_MAXIMO", "300"))
+# Índice de dominios para asignar la fuente de cada link: cada proceso lo
+# rearma cuando cambia una fuente y, como máximo, cada FUENTES_INDICE_TTL
+# segundos (para ver los cambios hechos desde otros procesos).
+FUENTES_INDICE_TTL = int(os.getenv("FUENTES_INDICE_TTL", "300"))
+# Registro de actividades en lote: se insertan de a ACTIVIDAD_LOTE_TAMANIO o
+# cada ACTIVIDAD_LOTE_SEGUNDOS, con un respaldo en ACTIVIDAD_SPOOL_DIR por si el
+# proceso termina antes. Con ACTIVIDAD_REGISTRO_SINCRONICO se insertan en el
+# momento (los tests lo activan en sus clases base).
+ACTIVIDAD_REGISTRO_SINCRONICO = os.getenv(
+    "ACTIVIDAD_REGISTRO_SINCRONICO", "False"
+).lower() in ("1", "true", "yes")
+ACTIVIDAD_LOTE_TAMANIO = int(os.getenv("ACTIVIDAD_LOTE_TAMANIO", "50"))
+ACTIVIDAD_LOTE_SEGUNDOS = float(os.getenv("ACTIVIDAD_LOTE_SEGUNDOS", "2"))
+ACTIVIDAD_SPOOL_DIR = os.getenv("ACTIVIDAD_SPOOL_DIR", os.path.join(BASE_DIR, "cache", "actividades"))
+# `manage.py archivar_actividades` mueve a ACTIVIDAD_ARCHIVO_DIR (un archivo
+# comprimido por mes) las actividades anteriores a los últimos
+# ACTIVIDAD_RETENCION_MESES meses. Los listados y exportaciones los leen cuando
+# el rango pedido llega hasta ahí.
+ACTIVIDAD_RETENCION_MESES = int(os.getenv("ACTIVIDAD_RETENCION_MESES", "12"))
+ACTIVIDAD_ARCHIVO_DIR = os.getenv(
+    "ACTIVIDAD_ARCHIVO_DIR", os.path.join(BASE_DIR, "archivo", "actividades")
+)
+# Clics en links enviados en lote por el navegador: como máximo
+# CLICS_MAX_EVENTOS por envío; las fechas con más de CLICS_ANTIGUEDAD_MAXIMA
+# segundos (o futuras) se reemplazan por la de recepción.
+CLICS_MAX_EVENTOS = int(os.getenv("CLICS_MAX_EVENTOS", "500"))
+CLICS_ANTIGUEDAD_MAXIMA = int(os.getenv("CLICS_ANTIGUEDAD_MAXIMA", str(24 * 3600)))
+# Exportaciones a Excel/CSV: las filas se leen de la base de a
+# EXPORTACION_TAMANIO_TRAMO por vez.
+EXPORTACION_TAMANIO_TRAMO = int(os.getenv("EXPORTACION_TAMANIO_TRAMO", "2000"))
+# Máximo de actividades en el PDF del registro; por encima se ofrece la
+# exportación a Excel o CSV.
+ACTIVIDADES_PDF_MAX_FILAS = int(os.getenv("ACTIVIDADES_PDF_MAX_FILAS", "20000"))
 
 ALLOWED_HOSTS = ["*"]
 
@@ -57,6 +150,7 @@ INSTALLED_APPS = [
 # Middleware
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "app.middleware.InstrumentacionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -69,6 +163,41 @@ MIDDLEWARE.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")
 
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# Instrumentación por request (app/middleware.py): una línea JSON por request
+# en el logger "app.instrumentacion" con las consultas SQL, los tiempos y las
+# consultas que se repiten INSTRUMENTACION_REPETIDAS_MIN veces o más, y un
+# encabezado Server-Timing sólo para usuarios staff (o con DEBUG). Con
+# INSTRUMENTACION_LENTAS_DIR cada proceso guarda ahí sus
+# INSTRUMENTACION_LENTAS_CANTIDAD requests más lentas, con sus consultas, de
+# una muestra de INSTRUMENTACION_LENTAS_MUESTREO (0 a 1) de las requests.
+INSTRUMENTACION_ACTIVA = os.getenv("INSTRUMENTACION_ACTIVA", "True").lower() in ("1", "true", "yes")
+INSTRUMENTACION_REPETIDAS_MIN = int(os.getenv("INSTRUMENTACION_REPETIDAS_MIN", "3"))
+INSTRUMENTACION_LENTAS_DIR = os.getenv("INSTRUMENTACION_LENTAS_DIR", "")
+INSTRUMENTACION_LENTAS_CANTIDAD = int(os.getenv("INSTRUMENTACION_LENTAS_CANTIDAD", "20"))
+INSTRUMENTACION_LENTAS_MUESTREO = float(os.getenv("INSTRUMENTACION_LENTAS_MUESTREO", "0.1"))
+INSTRUMENTACION_LOG_NIVEL = os.getenv("INSTRUMENTACION_LOG_NIVEL", "WARNING" if TESTING else "INFO")
+# Métricas en formato Prometheus (/metrics, app/services/metricas.py): cada
+# proceso vuelca las suyas a METRICAS_DIR cada METRICAS_VOLCADO_SEGUNDOS y el
+# endpoint suma las de todos. Sin METRICAS_DIR sólo informa las del proceso que
+# atiende. Con METRICAS_TOKEN se accede con "Authorization: Bearer <token>";
+# sin él, sólo usuarios staff.
+METRICAS_DIR = os.getenv("METRICAS_DIR", "" if TESTING else os.path.join(BASE_DIR, "cache", "metricas"))
+METRICAS_VOLCADO_SEGUNDOS = float(os.getenv("METRICAS_VOLCADO_SEGUNDOS", "5"))
+METRICAS_TOKEN = os.getenv("METRICAS_TOKEN", "")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "app.instrumentacion": {
+            "handlers": ["console"],
+            "level": INSTRUMENTACION_LOG_NIVEL,
+            "propagate": False,
+        },
+    },
+}
+
 ROOT_URLCONF = "Minerva.urls"
 
 # Templates
@@ -91,12 +220,68 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "Minerva.wsgi.application"
 
-# Base de datos
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# Base de datos. Por defecto SQLite; con DB_ENGINE=postgres se usa PostgreSQL
+# con conexiones persistentes (DB_CONN_MAX_AGE segundos, verificadas antes de
+# reutilizarlas). En SQLite las escrituras esperan hasta DB_SQLITE_TIMEOUT
+# segundos a que se libere el lock y, con DB_SQLITE_WAL, los lectores no
+# bloquean a quien escribe. WAL queda apagado por defecto: cambia el modo del
+# archivo y deja -wal/-shm a su lado con cualquier comando de manage.py, y
+# db.sqlite3 está en el repositorio; se activa en el servidor.
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite").lower()
+DB_SQLITE_WAL = os.getenv("DB_SQLITE_WAL", "False").lower() in ("1", "true", "yes")
+if DB_ENGINE in ("postgres", "postgresql"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("DB_NAME", "minerva"),
+            "USER": os.getenv("DB_USER", "minerva"),
+            "PASSWORD": os.getenv("DB_PASSWORD", ""),
+            "HOST": os.getenv("DB_HOST", "localhost"),
+            "PORT": os.getenv("DB_PORT", "5432"),
+            "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "5")),
+            },
+        }
+    }
+elif DB_ENGINE == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("DB_NAME", BASE_DIR / "db.sqlite3"),
+            "OPTIONS": {
+                "timeout": float(os.getenv("DB_SQLITE_TIMEOUT", "20")),
+            },
+        }
     }
+else:
+    raise ValueError(
+        f"DB_ENGINE={DB_ENGINE!r} no es válido; usá 'sqlite' o 'postgres'."
+    )
+
+# Caché
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    IA_CACHE_ALIAS: {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("IA_CACHE_DIR", os.path.join(BASE_DIR, "cache", "ia")),
+        "TIMEOUT": IA_CACHE_TTL_ANALISIS,
+        "OPTIONS": {
+            "MAX_ENTRIES": IA_CACHE_MAX_ENTRADAS,
+            "CULL_FREQUENCY": 4,
+        },
+    },
+    ESTADISTICAS_CACHE_ALIAS: {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv(
+            "ESTADISTICAS_CACHE_DIR", os.path.join(BASE_DIR, "cache", "estadisticas")
+        ),
+        "TIMEOUT": ESTADISTICAS_CACHE_TTL,
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
 }
 
 # Validadores de contraseña
@@ -31,6 +31,8 @@ from .models import (
     RadioDigital,
     LinkRadioDigital,
     ConfiguracionSistema,
+    TrabajoIA,
+    ItemTrabajoIA,
 )
 
 # Opcional: para personalizar visualización
@@ -44,7 +46,12 @@ class UserProfileAdmin(admin.ModelAdmin):
 
 @admin.register(DiarioDigital)
 class DiarioDigitalAdmin(admin.ModelAdmin):
-    list_display = ("nombre", "url_principal")
+    list_display = (
+        "nombre",
+        "url_principal",
+        "descargas_simultaneas",
+        "descargas_por_minuto",
+    )
     search_fields = ("nombre",)
 
 
@@ -112,8 +119,8 @@ class InformeIndividualResource(resources.ModelResource):
 
 @admin.register(Actividad)
 class ActividadAdmin(ImportExportModelAdmin):
-    list_display = ("usuario", "tipo", "fecha_hora")
-    list_filter = ("tipo", "fecha_hora")
+    list_display = ("usuario", "tipo", "objeto_tipo", "objeto_id", "estado_nuevo", "fecha_hora")
+    list_filter = ("tipo", "objeto_tipo", "estado_nuevo", "fecha_hora")
     search_fields = ("usuario__username", "descripcion")
 
 class ActividadResource(resources.ModelResource):
@@ -215,6 +222,20 @@ class RadioDigitalAdmin(admin.ModelAdmin):
     search_fields = ("nombre",)
 
 
+class ItemTrabajoIAInline(admin.TabularInline):
+    model = ItemTrabajoIA
+    extra = 0
+    raw_id_fields = ("link",)
+    readonly_fields = ("estado", "mensaje", "intentos", "reservado_por", "fecha_procesado")
+
+
+@admin.register(TrabajoIA)
+class TrabajoIAAdmin(admin.ModelAdmin):
+    list_display = ("id", "estado", "creado_por", "fecha_creacion", "fecha_fin")
+    list_filter = ("estado", "fecha_creacion")
+    inlines = [ItemTrabajoIAInline]
+
+
 # El resto sin personalización
 admin.site.register(Domicilio)
 admin.site.register(Vehiculo)
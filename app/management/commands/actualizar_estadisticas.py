@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from app.services.estadisticas import actualizar_estadisticas
+
+
+class Command(BaseCommand):
+    help = (
+        "Vuelca en EstadisticaDiaria los totales de los días cerrados que "
+        "faltan o quedaron pendientes. Pensado para correr periódicamente "
+        "(por ejemplo, con cron cada pocos minutos)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--desde",
+            help="Recalcula todos los días desde esta fecha (AAAA-MM-DD).",
+        )
+        parser.add_argument(
+            "--hasta",
+            help="Último día a calcular (AAAA-MM-DD); por defecto, ayer.",
+        )
+
+    def handle(self, *args, **options):
+        fechas = {}
+        for opcion in ("desde", "hasta"):
+            if options[opcion]:
+                fechas[opcion] = parse_date(options[opcion])
+                if fechas[opcion] is None:
+                    raise CommandError(f"--{opcion} no es una fecha válida.")
+        dias, filas = actualizar_estadisticas(**fechas)
+        self.stdout.write(
+            self.style.SUCCESS(f"Se actualizaron {dias} día(s) con {filas} fila(s) de estadísticas.")
+        )
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services.archivo_actividad import archivar_actividades
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve las actividades de los meses anteriores a los últimos "
+        "ACTIVIDAD_RETENCION_MESES a archivos comprimidos por mes en "
+        "ACTIVIDAD_ARCHIVO_DIR. Pensado para correr periódicamente (por "
+        "ejemplo, con cron una vez por día)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--meses",
+            type=int,
+            help="Meses completos que quedan en la tabla además del actual "
+            f"(por defecto, {settings.ACTIVIDAD_RETENCION_MESES}).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            meses, actividades = archivar_actividades(options["meses"])
+        except ValueError as error:
+            raise CommandError(str(error))
+        self.stdout.write(
+            self.style.SUCCESS(f"Se archivaron {actividades} actividad(es) de {meses} mes(es).")
+        )
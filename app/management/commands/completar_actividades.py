@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from app.utils.actividad import completar_actividades
+
+
+class Command(BaseCommand):
+    help = (
+        "Completa el objeto afectado y los estados de las actividades sobre "
+        "links registradas antes de que Actividad guardara esos datos, "
+        "interpretando su descripción."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=2000,
+            help="Cantidad de actividades que se procesan por consulta.",
+        )
+
+    def handle(self, *args, **options):
+        total = completar_actividades(tamanio_lote=options["lote"])
+        self.stdout.write(self.style.SUCCESS(f"Se completaron {total} actividad(es)."))
@@ -0,0 +1,178 @@
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, models, transaction
+from django.db.migrations.recorder import MigrationRecorder
+
+ORIGEN = "sqlite_origen"
+
+
+def _registrar_origen(ruta):
+    configuracion = connections.configure_settings(
+        {
+            DEFAULT_DB_ALIAS: dict(connections.settings[DEFAULT_DB_ALIAS]),
+            ORIGEN: {"ENGINE": "django.db.backends.sqlite3", "NAME": str(ruta)},
+        }
+    )
+    connections.settings[ORIGEN] = configuracion[ORIGEN]
+
+
+def _quitar_origen():
+    if ORIGEN in connections.settings:
+        connections[ORIGEN].close()
+        del connections[ORIGEN]
+        del connections.settings[ORIGEN]
+
+
+def _modelos_a_copiar():
+    """
+    Modelos concretos en orden de dependencias, seguidos de las tablas
+    intermedias de los ManyToMany.
+    """
+    modelos = serializers.sort_dependencies(
+        [(app_config, None) for app_config in apps.get_app_configs()],
+        allow_cycles=True,
+    )
+    modelos = [m for m in modelos if m._meta.managed and not m._meta.proxy]
+    intermedias = []
+    for modelo in modelos:
+        for campo in modelo._meta.local_many_to_many:
+            through = campo.remote_field.through
+            if through._meta.auto_created and through not in intermedias:
+                intermedias.append(through)
+    return modelos + intermedias
+
+
+@contextmanager
+def _sin_fechas_automaticas(modelo):
+    """
+    Apaga auto_now/auto_now_add mientras se copia el modelo: bulk_create los
+    aplicaría y todas las fechas de carga y modificación quedarían con la
+    hora de la copia.
+    """
+    campos = [
+        (campo, campo.auto_now, campo.auto_now_add)
+        for campo in modelo._meta.concrete_fields
+        if isinstance(campo, models.DateField) and (campo.auto_now or campo.auto_now_add)
+    ]
+    for campo, _, _ in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in campos:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Copia todos los datos de una base SQLite (por defecto db.sqlite3) a la "
+        "base configurada en DB_ENGINE, normalmente PostgreSQL. La base destino "
+        "debe estar migrada y se vacía antes de copiar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--origen",
+            default=str(Path(settings.BASE_DIR) / "db.sqlite3"),
+            help="Archivo SQLite de origen.",
+        )
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=2000,
+            help="Cantidad de filas que se insertan por consulta.",
+        )
+        parser.add_argument(
+            "--no-input",
+            action="store_false",
+            dest="interactive",
+            help="No pide confirmación antes de vaciar la base destino.",
+        )
+
+    def handle(self, *args, **options):
+        ruta = Path(options["origen"]).resolve()
+        if not ruta.is_file():
+            raise CommandError(f"No existe la base SQLite {ruta}.")
+        destino = connections[DEFAULT_DB_ALIAS]
+        if destino.vendor == "sqlite" and Path(destino.settings_dict["NAME"]).resolve() == ruta:
+            raise CommandError(
+                "La base destino es la misma que el origen; configurá DB_ENGINE=postgres."
+            )
+
+        _registrar_origen(ruta)
+        try:
+            origen_aplicadas = set(MigrationRecorder(connections[ORIGEN]).applied_migrations())
+            destino_aplicadas = set(MigrationRecorder(destino).applied_migrations())
+            if origen_aplicadas != destino_aplicadas:
+                raise CommandError(
+                    "Las migraciones aplicadas en origen y destino no coinciden. "
+                    "Corré `manage.py migrate` sobre ambas bases antes de copiar."
+                )
+
+            if options["interactive"]:
+                respuesta = input(
+                    f"Se van a borrar todos los datos de la base "
+                    f"'{destino.settings_dict['NAME']}'. ¿Continuar? [s/N] "
+                )
+                if respuesta.strip().lower() not in ("s", "si", "sí"):
+                    raise CommandError("Copia cancelada.")
+
+            total = self._copiar(destino, options["lote"])
+        finally:
+            _quitar_origen()
+        self.stdout.write(self.style.SUCCESS(f"Se copiaron {total} fila(s) desde {ruta}."))
+
+    def _copiar(self, destino, tamanio_lote):
+        modelos = _modelos_a_copiar()
+        total = 0
+        # En PostgreSQL las claves foráneas se verifican al final de la
+        # transacción, así que el orden sólo importa para SQLite.
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            call_command(
+                "flush",
+                database=DEFAULT_DB_ALIAS,
+                interactive=False,
+                inhibit_post_migrate=True,
+                verbosity=0,
+            )
+            for modelo in modelos:
+                filas = modelo._base_manager.using(ORIGEN).order_by("pk")
+                destino_manager = modelo._base_manager.using(DEFAULT_DB_ALIAS)
+                try:
+                    with _sin_fechas_automaticas(modelo):
+                        copiadas = self._copiar_modelo(filas, destino_manager, tamanio_lote)
+                except DatabaseError as exc:
+                    raise CommandError(
+                        f"Error al copiar {modelo._meta.label}: {exc}"
+                    ) from exc
+                if copiadas:
+                    self.stdout.write(f"  {modelo._meta.label}: {copiadas}")
+                total += copiadas
+
+            # Las filas conservan sus ids; las secuencias tienen que seguir
+            # desde el máximo copiado.
+            sentencias = destino.ops.sequence_reset_sql(no_style(), modelos)
+            if sentencias:
+                with destino.cursor() as cursor:
+                    for sql in sentencias:
+                        cursor.execute(sql)
+        return total
+
+    def _copiar_modelo(self, filas, destino_manager, tamanio_lote):
+        copiadas = 0
+        lote = []
+        for objeto in filas.iterator(chunk_size=tamanio_lote):
+            lote.append(objeto)
+            if len(lote) >= tamanio_lote:
+                destino_manager.bulk_create(lote)
+                copiadas += len(lote)
+                lote = []
+        destino_manager.bulk_create(lote)
+        return copiadas + len(lote)
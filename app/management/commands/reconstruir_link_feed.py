@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from app.services.link_feed import reconstruir_feed
+
+
+class Command(BaseCommand):
+    help = (
+        "Regenera el feed unificado de links (LinkFeed) a partir de los links "
+        "de diarios, redes sociales, TV y radio."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=2000,
+            help="Cantidad de filas que se insertan por consulta.",
+        )
+
+    def handle(self, *args, **options):
+        total = reconstruir_feed(tamanio_lote=options["lote"])
+        self.stdout.write(self.style.SUCCESS(f"Feed reconstruido con {total} link(s)."))
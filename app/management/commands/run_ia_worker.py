@@ -0,0 +1,70 @@
+import os
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from app.services.cola_ia import procesar_items, reservar_items
+from app.services.ia import IAProcessingError, LinkAIProcessor
+
+
+class Command(BaseCommand):
+    help = (
+        "Procesa la cola de clasificación con IA. Se pueden levantar varios "
+        "workers en paralelo; los links que quedaron a medio procesar por un "
+        "reinicio se retoman cuando vence su reserva."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=settings.IA_COLA_TAMANIO_LOTE,
+            help="Cantidad de links que se reservan y procesan por vuelta.",
+        )
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            default=5.0,
+            help="Segundos de espera cuando la cola está vacía.",
+        )
+        parser.add_argument(
+            "--una-vez",
+            action="store_true",
+            help="Vacía la cola y termina en lugar de quedar escuchando.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            processor = LinkAIProcessor()
+        except IAProcessingError as exc:
+            raise CommandError(str(exc)) from exc
+
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._detener = False
+        signal.signal(signal.SIGTERM, self._solicitar_detencion)
+        signal.signal(signal.SIGINT, self._solicitar_detencion)
+
+        self.stdout.write(f"Worker IA {worker_id} iniciado.")
+        while not self._detener:
+            close_old_connections()
+            items = reservar_items(worker_id, options["lote"])
+            if not items:
+                if options["una_vez"]:
+                    break
+                time.sleep(options["intervalo"])
+                continue
+
+            # Las categorías pueden cambiar mientras el worker está vivo.
+            processor.categorias_prompt = processor._obtener_categorias_disponibles()
+            procesar_items(items, processor)
+            self.stdout.write(f"Procesados {len(items)} link(s).")
+
+        self.stdout.write(f"Worker IA {worker_id} detenido.")
+
+    def _solicitar_detencion(self, signum, frame):
+        # Se termina el lote en curso para no dejar reservas colgadas.
+        self._detener = True
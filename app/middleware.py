@@ -0,0 +1,211 @@
+"""
+Instrumentación por request: consultas SQL, tiempo de SQL y de plantillas.
+
+`InstrumentacionMiddleware` mide cada request y deja una línea JSON en el
+logger "app.instrumentacion" con la vista, la cantidad de consultas, los
+tiempos y las consultas repetidas. A los usuarios staff (y a todos con DEBUG)
+les agrega además un encabezado Server-Timing, visible en la pestaña de red
+del navegador; al resto no se le muestran tiempos internos. Una consulta se considera
+repetida cuando la misma sentencia, sin contar los valores, se ejecuta
+INSTRUMENTACION_REPETIDAS_MIN veces o más en la request: el síntoma típico de
+un N+1.
+
+Con INSTRUMENTACION_LENTAS_DIR cada proceso guarda en
+lentas-<pid>.json las INSTRUMENTACION_LENTAS_CANTIDAD requests más lentas
+de una muestra de INSTRUMENTACION_LENTAS_MUESTREO (entre 0 y 1) de las
+requests, con la lista de sus consultas.
+
+En las respuestas en streaming (exportaciones) sólo se mide hasta que la
+vista devuelve la respuesta, no el envío del contenido.
+
+Además, con o sin INSTRUMENTACION_ACTIVA, cada request se suma a las métricas
+de /metrics (app/services/metricas.py).
+"""
+
+import contextvars
+import heapq
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import Template
+
+from app.services.metricas import registrar_request
+
+logger = logging.getLogger("app.instrumentacion")
+
+_medicion_actual = contextvars.ContextVar("medicion_actual", default=None)
+
+# Valores literales y listas de parámetros de largo variable (IN (%s, %s, ...)):
+# así la misma consulta con otros valores tiene la misma huella.
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTAS = re.compile(r"%s(?:\s*,\s*%s)+")
+
+
+def huella_sql(sql):
+    return _LISTAS.sub("%s, ...", _LITERALES.sub("?", sql))
+
+
+class Medicion:
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = []  # (sql, segundos)
+        self.plantillas = 0.0
+        self._renderizando = 0
+
+    @property
+    def sql(self):
+        return sum(segundos for _, segundos in self.consultas)
+
+    def repetidas(self):
+        """[(huella, veces)] de las consultas que se repiten, de la más repetida a la menos."""
+        veces = Counter(huella_sql(sql) for sql, _ in self.consultas)
+        return [
+            (huella, cantidad)
+            for huella, cantidad in veces.most_common()
+            if cantidad >= settings.INSTRUMENTACION_REPETIDAS_MIN
+        ]
+
+    def registrar_consulta(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas.append((sql, time.perf_counter() - inicio))
+
+
+def _render_medido(render):
+    def envoltura(self, context=None, request=None):
+        medicion = _medicion_actual.get()
+        if medicion is None:
+            return render(self, context, request)
+        # Sólo cuenta la plantilla de más afuera: las que se renderizan dentro
+        # (render_to_string en un tag, por ejemplo) ya están en su tiempo.
+        medicion._renderizando += 1
+        inicio = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            medicion._renderizando -= 1
+            if not medicion._renderizando:
+                medicion.plantillas += time.perf_counter() - inicio
+
+    envoltura.medido = True
+    return envoltura
+
+
+def _medir_plantillas():
+    if not getattr(Template.render, "medido", False):
+        Template.render = _render_medido(Template.render)
+
+
+class _RequestsLentas:
+    """Las requests más lentas del proceso, guardadas en un archivo JSON."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap = []  # (segundos, orden, datos)
+        self._orden = 0
+
+    def considerar(self, segundos, datos_fn):
+        cantidad = settings.INSTRUMENTACION_LENTAS_CANTIDAD
+        with self._lock:
+            if len(self._heap) >= cantidad and segundos <= self._heap[0][0]:
+                return
+            self._orden += 1
+            entrada = (segundos, self._orden, datos_fn())
+            if len(self._heap) < cantidad:
+                heapq.heappush(self._heap, entrada)
+            else:
+                heapq.heapreplace(self._heap, entrada)
+            lentas = [datos for _, _, datos in sorted(self._heap, reverse=True)]
+            self._guardar(lentas)
+
+    def _guardar(self, lentas):
+        directorio = Path(settings.INSTRUMENTACION_LENTAS_DIR)
+        directorio.mkdir(parents=True, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        with os.fdopen(descriptor, "w", encoding="utf-8") as archivo:
+            json.dump(lentas, archivo, ensure_ascii=False, indent=1)
+        os.replace(temporal, directorio / f"lentas-{os.getpid()}.json")
+
+
+requests_lentas = _RequestsLentas()
+
+
+def _ve_tiempos(request):
+    if settings.DEBUG:
+        return True
+    usuario = getattr(request, "user", None)
+    return bool(usuario is not None and usuario.is_authenticated and usuario.is_staff)
+
+
+class InstrumentacionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        _medir_plantillas()
+
+    def __call__(self, request):
+        if not settings.INSTRUMENTACION_ACTIVA:
+            inicio = time.perf_counter()
+            response = self.get_response(request)
+            registrar_request(request, response, inicio)
+            return response
+
+        medicion = Medicion()
+        token = _medicion_actual.set(medicion)
+        try:
+            with ExitStack() as pila:
+                for conexion in connections.all():
+                    pila.enter_context(conexion.execute_wrapper(medicion.registrar_consulta))
+                response = self.get_response(request)
+        finally:
+            _medicion_actual.reset(token)
+        total = time.perf_counter() - medicion.inicio
+
+        sql = medicion.sql
+        if _ve_tiempos(request):
+            response["Server-Timing"] = ", ".join(
+                [
+                    f'sql;dur={sql * 1000:.1f};desc="{len(medicion.consultas)} consultas"',
+                    f"plantillas;dur={medicion.plantillas * 1000:.1f}",
+                    f"total;dur={total * 1000:.1f}",
+                ]
+            )
+        repetidas = medicion.repetidas()
+        resumen = {
+            "metodo": request.method,
+            "ruta": request.path,
+            "vista": getattr(request.resolver_match, "view_name", None),
+            "estado": response.status_code,
+            "total_ms": round(total * 1000, 1),
+            "sql_ms": round(sql * 1000, 1),
+            "consultas": len(medicion.consultas),
+            "plantillas_ms": round(medicion.plantillas * 1000, 1),
+            "repetidas": [{"sql": huella[:300], "veces": veces} for huella, veces in repetidas],
+        }
+        logger.info(json.dumps(resumen, ensure_ascii=False))
+        registrar_request(request, response, medicion.inicio, len(medicion.consultas))
+
+        if settings.INSTRUMENTACION_LENTAS_DIR and random.random() < settings.INSTRUMENTACION_LENTAS_MUESTREO:
+            requests_lentas.considerar(
+                total,
+                lambda: dict(
+                    resumen,
+                    consultas_sql=[
+                        {"sql": sql_consulta, "ms": round(segundos * 1000, 2)}
+                        for sql_consulta, segundos in medicion.consultas
+                    ],
+                ),
+            )
+        return response
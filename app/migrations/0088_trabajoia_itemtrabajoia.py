@@ -0,0 +1,120 @@
+# Generated by Django 4.2.1 on 2026-10-18 15:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("app", "0087_articulo_localidad_provincia"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrabajoIA",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("pendiente", "Pendiente"),
+                            ("en_proceso", "En proceso"),
+                            ("completado", "Completado"),
+                        ],
+                        default="pendiente",
+                        max_length=20,
+                    ),
+                ),
+                ("fecha_creacion", models.DateTimeField(auto_now_add=True)),
+                ("fecha_inicio", models.DateTimeField(blank=True, null=True)),
+                ("fecha_fin", models.DateTimeField(blank=True, null=True)),
+                (
+                    "creado_por",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="trabajos_ia",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Trabajo de clasificación IA",
+                "verbose_name_plural": "Trabajos de clasificación IA",
+                "ordering": ["-fecha_creacion"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ItemTrabajoIA",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("pendiente", "Pendiente"),
+                            ("en_proceso", "En proceso"),
+                            ("procesado", "Procesado"),
+                            ("error", "Error"),
+                        ],
+                        default="pendiente",
+                        max_length=20,
+                    ),
+                ),
+                ("mensaje", models.TextField(blank=True)),
+                ("intentos", models.PositiveSmallIntegerField(default=0)),
+                ("reservado_por", models.CharField(blank=True, max_length=64)),
+                ("fecha_reserva", models.DateTimeField(blank=True, null=True)),
+                ("fecha_procesado", models.DateTimeField(blank=True, null=True)),
+                (
+                    "link",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="items_ia",
+                        to="app.linkrelevante",
+                    ),
+                ),
+                (
+                    "trabajo",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="items",
+                        to="app.trabajoia",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Link de trabajo IA",
+                "verbose_name_plural": "Links de trabajos IA",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["estado", "fecha_reserva"],
+                        name="app_itemtra_estado_e336d9_idx",
+                    )
+                ],
+                "unique_together": {("trabajo", "link")},
+            },
+        ),
+    ]
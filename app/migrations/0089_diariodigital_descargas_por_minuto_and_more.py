@@ -0,0 +1,31 @@
+# Generated by Django 4.2.1 on 2026-10-18 15:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0088_trabajoia_itemtrabajoia"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="diariodigital",
+            name="descargas_por_minuto",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Máximo de descargas por minuto al dominio de la URL principal (0 = sin límite).",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="diariodigital",
+            name="descargas_simultaneas",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Máximo de descargas simultáneas al dominio de la URL principal.",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,132 @@
+# Generated by Django 4.2.1 on 2026-10-18 15:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+FUENTES = (
+    ("diario", "LinkRelevante", "diario_digital"),
+    ("red_social", "LinkRedSocial", "red_social"),
+    ("tv_digital", "LinkTvDigital", "tv_digital"),
+    ("radio_digital", "LinkRadioDigital", "radio_digital"),
+)
+
+
+def poblar_feed(apps, schema_editor):
+    LinkFeed = apps.get_model("app", "LinkFeed")
+    for tipo, nombre_modelo, fk in FUENTES:
+        modelo = apps.get_model("app", nombre_modelo)
+        campos = {field.name for field in modelo._meta.get_fields()}
+        lote = []
+        for link in modelo.objects.order_by("pk").iterator(chunk_size=2000):
+            lote.append(
+                LinkFeed(
+                    tipo_fuente=tipo,
+                    link_id=link.pk,
+                    url=link.url,
+                    fecha_carga=link.fecha_carga,
+                    estado=link.estado,
+                    cargado_por_id=link.cargado_por_id,
+                    origen_id=getattr(link, f"{fk}_id"),
+                    revisado_clasificador=link.revisado_clasificador,
+                    revisado_redactor=link.revisado_redactor,
+                    clasificado_por_ia=(
+                        link.clasificado_por_ia if "clasificado_por_ia" in campos else False
+                    ),
+                    confianza_clasificacion=(
+                        link.confianza_clasificacion
+                        if "confianza_clasificacion" in campos
+                        else None
+                    ),
+                )
+            )
+            if len(lote) >= 2000:
+                LinkFeed.objects.bulk_create(lote)
+                lote = []
+        LinkFeed.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("app", "0089_diariodigital_descargas_por_minuto_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LinkFeed",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tipo_fuente",
+                    models.CharField(
+                        choices=[
+                            ("diario", "Diario digital"),
+                            ("red_social", "Red social"),
+                            ("tv_digital", "TV digital"),
+                            ("radio_digital", "Radio digital"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("link_id", models.PositiveBigIntegerField()),
+                ("url", models.URLField()),
+                ("fecha_carga", models.DateTimeField()),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("pendiente", "Pendiente"),
+                            ("aprobado", "Aprobado"),
+                            ("descartado", "Descartado"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("origen_id", models.PositiveBigIntegerField(blank=True, null=True)),
+                ("revisado_clasificador", models.BooleanField(default=False)),
+                ("revisado_redactor", models.BooleanField(default=False)),
+                ("clasificado_por_ia", models.BooleanField(default=False)),
+                (
+                    "confianza_clasificacion",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=5, null=True
+                    ),
+                ),
+                (
+                    "cargado_por",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Link del feed",
+                "verbose_name_plural": "Feed de links",
+                "indexes": [
+                    models.Index(
+                        fields=["estado", "fecha_carga"],
+                        name="app_linkfee_estado_41e999_idx",
+                    ),
+                    models.Index(
+                        fields=["fecha_carga", "id"],
+                        name="app_linkfee_fecha_c_0f5ee3_idx",
+                    ),
+                ],
+                "unique_together": {("tipo_fuente", "link_id")},
+            },
+        ),
+        migrations.RunPython(poblar_feed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.1 on 2026-10-18 15:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0090_linkfeed"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="actividad",
+            index=models.Index(
+                fields=["fecha_hora"], name="app_activid_fecha_h_989e2c_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="actividad",
+            index=models.Index(
+                fields=["tipo", "fecha_hora"], name="app_activid_tipo_75e773_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="actividad",
+            index=models.Index(
+                fields=["usuario", "fecha_hora"], name="app_activid_usuario_47871a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="articulo",
+            index=models.Index(
+                fields=["fecha_creacion"], name="app_articul_fecha_c_12e258_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="articulo",
+            index=models.Index(
+                fields=["generado_por", "fecha_creacion"],
+                name="app_articul_generad_616e2b_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="articulo",
+            index=models.Index(
+                fields=["categoria", "fecha_creacion"],
+                name="app_articul_categor_372236_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="linkrelevante",
+            index=models.Index(
+                fields=["fecha_carga"], name="app_linkrel_fecha_c_ad68d6_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="linkrelevante",
+            index=models.Index(
+                fields=["estado", "fecha_carga"], name="app_linkrel_estado_10d13c_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="linkrelevante",
+            index=models.Index(
+                fields=["estado", "revisado_clasificador", "fecha_carga"],
+                name="app_linkrel_estado_1fc4c5_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="linkrelevante",
+            index=models.Index(
+                fields=["cargado_por", "fecha_carga"],
+                name="app_linkrel_cargado_0c270c_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="linkrelevante",
+            index=models.Index(
+                fields=["clasificado_por_ia", "fecha_carga"],
+                name="app_linkrel_clasifi_7e244e_idx",
+            ),
+        ),
+    ]
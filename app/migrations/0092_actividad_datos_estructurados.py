@@ -0,0 +1,47 @@
+# Generated by Django 4.2.1 on 2026-10-18 15:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0091_indices_filtros_frecuentes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="actividad",
+            name="estado_anterior",
+            field=models.CharField(blank=True, default="", max_length=20),
+        ),
+        migrations.AddField(
+            model_name="actividad",
+            name="estado_nuevo",
+            field=models.CharField(blank=True, default="", max_length=20),
+        ),
+        migrations.AddField(
+            model_name="actividad",
+            name="objeto_id",
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="actividad",
+            name="objeto_tipo",
+            field=models.CharField(blank=True, default="", max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name="actividad",
+            index=models.Index(
+                fields=["objeto_tipo", "objeto_id"],
+                name="app_activid_objeto__eb092a_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="actividad",
+            index=models.Index(
+                fields=["tipo", "objeto_tipo", "estado_nuevo", "fecha_hora"],
+                name="app_activid_tipo_aa88aa_idx",
+            ),
+        ),
+    ]
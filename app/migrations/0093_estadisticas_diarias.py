@@ -0,0 +1,106 @@
+# Generated by Django 4.2.1 on 2026-10-18 15:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("app", "0092_actividad_datos_estructurados"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DiaEstadisticas",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fecha", models.DateField(unique=True)),
+                ("pendiente", models.BooleanField(default=False)),
+                ("fecha_calculo", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Día de estadísticas",
+                "verbose_name_plural": "Días de estadísticas",
+                "ordering": ["fecha"],
+            },
+        ),
+        migrations.CreateModel(
+            name="EstadisticaDiaria",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fecha", models.DateField()),
+                (
+                    "metrica",
+                    models.CharField(
+                        choices=[
+                            ("links_diario", "Links cargados por diario"),
+                            ("links_aprobados", "Links cargados y aprobados"),
+                            ("links_rechazados", "Links cargados y rechazados"),
+                            ("links_red_social", "Links de redes sociales por red"),
+                            (
+                                "decisiones_aprobadas",
+                                "Links aprobados en clasificación",
+                            ),
+                            (
+                                "decisiones_rechazadas",
+                                "Links descartados en clasificación",
+                            ),
+                            ("links_clasificados", "Links distintos clasificados"),
+                            (
+                                "categorias_clasificadas",
+                                "Categorías de los links clasificados",
+                            ),
+                            ("articulos", "Artículos generados"),
+                            ("links_articulos", "Links incluidos en artículos"),
+                            ("demora_articulos", "Demora entre aprobación y artículo"),
+                            ("solicitudes", "Solicitudes de información"),
+                            ("hechos", "Hechos delictivos"),
+                            ("informes", "Informes individuales"),
+                            ("articulos_informes", "Artículos vinculados a informes"),
+                            ("categorias_informes", "Categorías de los informes"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("dimension_id", models.PositiveBigIntegerField(blank=True, null=True)),
+                ("cantidad", models.PositiveIntegerField(default=0)),
+                ("suma", models.FloatField(default=0)),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="estadisticas_diarias",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Estadística diaria",
+                "verbose_name_plural": "Estadísticas diarias",
+                "indexes": [
+                    models.Index(
+                        fields=["fecha", "metrica"], name="app_estadis_fecha_64ef63_idx"
+                    )
+                ],
+            },
+        ),
+    ]
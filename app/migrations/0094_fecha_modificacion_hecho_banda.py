@@ -0,0 +1,30 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0093_estadisticas_diarias"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hechodelictivo",
+            name="fecha_modificacion",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="bandacriminal",
+            name="fecha_modificacion",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.1 on 2026-10-18 17:29
+
+from urllib.parse import urlsplit
+
+from django.db import migrations, models
+
+MODELOS_FUENTE = ("DiarioDigital", "RedSocial", "TvDigital", "RadioDigital")
+
+
+def completar_dominios(apps, schema_editor):
+    for nombre in MODELOS_FUENTE:
+        modelo = apps.get_model("app", nombre)
+        for fuente in modelo.objects.only("url_principal"):
+            host = (urlsplit((fuente.url_principal or "").strip()).hostname or "").lower()
+            fuente.dominio = host[4:] if host.startswith("www.") else host
+            fuente.save(update_fields=["dominio"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0094_fecha_modificacion_hecho_banda"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="diariodigital",
+            name="dominio",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=255
+            ),
+        ),
+        migrations.AddField(
+            model_name="radiodigital",
+            name="dominio",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=255
+            ),
+        ),
+        migrations.AddField(
+            model_name="redsocial",
+            name="dominio",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=255
+            ),
+        ),
+        migrations.AddField(
+            model_name="tvdigital",
+            name="dominio",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=255
+            ),
+        ),
+        migrations.RunPython(completar_dominios, migrations.RunPython.noop),
+    ]
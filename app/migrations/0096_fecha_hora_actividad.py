@@ -0,0 +1,21 @@
+# Generated by Django 4.2.1 on 2026-10-18 17:33
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0095_dominio_fuentes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="actividad",
+            name="fecha_hora",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 4.2.1 on 2026-10-18 17:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("app", "0096_fecha_hora_actividad"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivoActividad",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("mes", models.DateField(unique=True)),
+                ("nombre", models.CharField(max_length=100)),
+                ("filas", models.PositiveIntegerField(default=0)),
+                ("bytes", models.PositiveBigIntegerField(default=0)),
+                (
+                    "fecha_archivo",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "verbose_name": "Archivo de actividades",
+                "verbose_name_plural": "Archivos de actividades",
+                "ordering": ["-mes"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ResumenArchivoActividad",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[
+                            ("login", "Inicio de sesión"),
+                            ("logout", "Cierre de sesión"),
+                            ("carga_link", "Carga de Link"),
+                            ("cambio_estado", "Cambio de Estado"),
+                            ("clic_link", "Clic en Link"),
+                            ("creacion_articulo", "Creación de Artículo"),
+                            ("clasificacion_link", "Clasificacion del Link"),
+                            ("carge_informe", "carga de informe"),
+                            ("otro", "Otro"),
+                            ("exportar_informe_banda", "Exportó informe de banda"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("cantidad", models.PositiveIntegerField(default=0)),
+                ("primera", models.DateTimeField()),
+                ("ultima", models.DateTimeField()),
+                (
+                    "archivo",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumenes",
+                        to="app.archivoactividad",
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumen de archivo de actividades",
+                "verbose_name_plural": "Resúmenes de archivos de actividades",
+                "indexes": [
+                    models.Index(
+                        fields=["tipo", "archivo"], name="app_resumen_tipo_033f88_idx"
+                    ),
+                    models.Index(
+                        fields=["usuario", "archivo"],
+                        name="app_resumen_usuario_d4a93f_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -4,6 +4,8 @@ from django.contrib.auth.models import User
 from django.db import models
 from django.utils import timezone
 
+from .utils.dominios import dominio
+
 
 # Roles definidos para los perfiles de usuario
 class Roles(models.TextChoices):
@@ -28,8 +30,28 @@ class UserProfile(models.Model):
         return f"{self.user.username} ({self.get_rol_display()})"
 
 
+class FuenteConDominio(models.Model):
+    """
+    Base de los modelos de fuente (diarios, redes, TV y radios digitales):
+    guarda el dominio normalizado de `url_principal` para asignar la fuente de
+    cada link por dominio sin volver a parsear las URLs.
+    """
+
+    dominio = models.CharField(max_length=255, blank=True, db_index=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.dominio = dominio(self.url_principal)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "url_principal" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "dominio"}
+        super().save(*args, **kwargs)
+
+
 # Modelo DiarioDigital
-class DiarioDigital(models.Model):
+class DiarioDigital(FuenteConDominio):
     nombre = models.CharField(max_length=100, unique=True)
     url_principal = models.URLField()
     # CAMPO DE IMAGEN PARA EL LOGO: Esto está correctamente definido
@@ -39,6 +61,18 @@ class DiarioDigital(models.Model):
         null=True,
         help_text="Carga la imagen del logo del diario. Se recomienda un tamaño pequeño (ej. 30x30px).",
     )
+    # Límites para la descarga de artículos de este diario al clasificar con
+    # IA; si quedan vacíos se usan los valores por defecto de settings.
+    descargas_simultaneas = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        help_text="Máximo de descargas simultáneas al dominio de la URL principal.",
+    )
+    descargas_por_minuto = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Máximo de descargas por minuto al dominio de la URL principal (0 = sin límite).",
+    )
 
     def __str__(self):
         return self.nombre
@@ -53,7 +87,7 @@ class DiarioDigital(models.Model):
         return None
 
 
-class RedSocial(models.Model):
+class RedSocial(FuenteConDominio):
     nombre = models.CharField(max_length=100, unique=True)
     url_principal = models.URLField()
     logo = models.ImageField(
@@ -78,7 +112,7 @@ class RedSocial(models.Model):
         return None
 
 
-class TvDigital(models.Model):
+class TvDigital(FuenteConDominio):
     nombre = models.CharField(max_length=100, unique=True)
     url_principal = models.URLField()
     logo = models.ImageField(
@@ -103,7 +137,7 @@ class TvDigital(models.Model):
         return None
 
 
-class RadioDigital(models.Model):
+class RadioDigital(FuenteConDominio):
     nombre = models.CharField(max_length=100, unique=True)
     url_principal = models.URLField()
     logo = models.ImageField(
@@ -198,6 +232,15 @@ class LinkRelevante(models.Model):
     class Meta:
         verbose_name_plural = "Links Relevantes"
         ordering = ["-fecha_carga"]
+        # Índices para los filtros de los paneles: siempre se combinan con un
+        # rango de fecha_carga y se ordena por ella.
+        indexes = [
+            models.Index(fields=["fecha_carga"]),
+            models.Index(fields=["estado", "fecha_carga"]),
+            models.Index(fields=["estado", "revisado_clasificador", "fecha_carga"]),
+            models.Index(fields=["cargado_por", "fecha_carga"]),
+            models.Index(fields=["clasificado_por_ia", "fecha_carga"]),
+        ]
 
     def __str__(self):
         return self.url
@@ -318,6 +361,48 @@ class LinkRadioDigital(models.Model):
         super().save(*args, **kwargs)
 
 
+class LinkFeed(models.Model):
+    """
+    Índice desnormalizado de los cuatro tipos de link (diarios, redes, TV y
+    radio) para filtrar, ordenar y paginar todas las fuentes con una sola
+    consulta. Se mantiene sincronizado desde app/signals.py y se puede
+    regenerar con `manage.py reconstruir_link_feed`.
+    """
+
+    class TipoFuente(models.TextChoices):
+        DIARIO = "diario", "Diario digital"
+        RED_SOCIAL = "red_social", "Red social"
+        TV_DIGITAL = "tv_digital", "TV digital"
+        RADIO_DIGITAL = "radio_digital", "Radio digital"
+
+    tipo_fuente = models.CharField(max_length=20, choices=TipoFuente.choices)
+    link_id = models.PositiveBigIntegerField()
+    url = models.URLField()
+    fecha_carga = models.DateTimeField()
+    estado = models.CharField(max_length=20, choices=EstadoLink.choices)
+    cargado_por = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    # ID del diario, red social, canal de TV o radio, según tipo_fuente.
+    origen_id = models.PositiveBigIntegerField(null=True, blank=True)
+    revisado_clasificador = models.BooleanField(default=False)
+    revisado_redactor = models.BooleanField(default=False)
+    clasificado_por_ia = models.BooleanField(default=False)
+    confianza_clasificacion = models.DecimalField(
+        max_digits=5, decimal_places=2, null=True, blank=True
+    )
+
+    class Meta:
+        verbose_name = "Link del feed"
+        verbose_name_plural = "Feed de links"
+        unique_together = ("tipo_fuente", "link_id")
+        indexes = [
+            models.Index(fields=["estado", "fecha_carga"]),
+            models.Index(fields=["fecha_carga", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_fuente_display()}: {self.url}"
+
+
 class Domicilio(models.Model):
     calle = models.CharField(max_length=200, blank=True)
     altura = models.IntegerField(blank=True)
@@ -448,6 +533,11 @@ class Articulo(models.Model):
     class Meta:
         verbose_name_plural = "Artículos"
         ordering = ["-fecha_creacion"]
+        indexes = [
+            models.Index(fields=["fecha_creacion"]),
+            models.Index(fields=["generado_por", "fecha_creacion"]),
+            models.Index(fields=["categoria", "fecha_creacion"]),
+        ]
 
     def __str__(self):
         return self.titulo
@@ -506,16 +596,79 @@ class Actividad(models.Model):
     usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     tipo = models.CharField(max_length=30, choices=TipoActividad.choices)
     descripcion = models.TextField()
-    fecha_hora = models.DateTimeField(auto_now_add=True)
+    # No es auto_now_add porque el registro en lote (services/registro_actividad)
+    # inserta después con la fecha en que ocurrió la actividad.
+    fecha_hora = models.DateTimeField(default=timezone.now, editable=False)
+    # Objeto afectado (nombre del modelo en minúsculas, p. ej. "linkrelevante")
+    # y, en los cambios de estado, el estado anterior y el nuevo.
+    objeto_tipo = models.CharField(max_length=50, blank=True, default="")
+    objeto_id = models.PositiveBigIntegerField(null=True, blank=True)
+    estado_anterior = models.CharField(max_length=20, blank=True, default="")
+    estado_nuevo = models.CharField(max_length=20, blank=True, default="")
 
     class Meta:
         verbose_name_plural = "Actividades"
         ordering = ["-fecha_hora"]
+        indexes = [
+            models.Index(fields=["fecha_hora"]),
+            models.Index(fields=["tipo", "fecha_hora"]),
+            models.Index(fields=["usuario", "fecha_hora"]),
+            models.Index(fields=["objeto_tipo", "objeto_id"]),
+            models.Index(fields=["tipo", "objeto_tipo", "estado_nuevo", "fecha_hora"]),
+        ]
 
     def __str__(self):
         return f"{self.usuario} - {self.get_tipo_display()} - {self.fecha_hora.strftime('%d/%m/%Y %H:%M')}"
 
 
+class ArchivoActividad(models.Model):
+    """
+    Mes de actividades movido de la tabla Actividad a un archivo comprimido
+    en ACTIVIDAD_ARCHIVO_DIR (ver services/archivo_actividad).
+    """
+
+    mes = models.DateField(unique=True)  # primer día del mes
+    nombre = models.CharField(max_length=100)
+    filas = models.PositiveIntegerField(default=0)
+    bytes = models.PositiveBigIntegerField(default=0)
+    fecha_archivo = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Archivo de actividades"
+        verbose_name_plural = "Archivos de actividades"
+        ordering = ["-mes"]
+
+    def __str__(self):
+        return f"{self.mes:%Y-%m} ({self.filas} actividades)"
+
+
+class ResumenArchivoActividad(models.Model):
+    """
+    Índice de un archivo de actividades: cuántas hay por usuario y tipo, y
+    entre qué fechas, para saber qué archivos abrir sin leerlos.
+    """
+
+    archivo = models.ForeignKey(
+        ArchivoActividad, on_delete=models.CASCADE, related_name="resumenes"
+    )
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    tipo = models.CharField(max_length=30, choices=TipoActividad.choices)
+    cantidad = models.PositiveIntegerField(default=0)
+    primera = models.DateTimeField()
+    ultima = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Resumen de archivo de actividades"
+        verbose_name_plural = "Resúmenes de archivos de actividades"
+        indexes = [
+            models.Index(fields=["tipo", "archivo"]),
+            models.Index(fields=["usuario", "archivo"]),
+        ]
+
+    def __str__(self):
+        return f"{self.archivo} {self.usuario} {self.tipo}: {self.cantidad}"
+
+
 # agregar una fecha por cada vez que se actualiza el informe, algo como un date_add_now_true.
 class InformeIndividual(models.Model):
     class Sexo(models.TextChoices):
@@ -650,6 +803,7 @@ class HechoDelictivo(models.Model):
         null=True,
         blank=True,
     )
+    fecha_modificacion = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Hecho Delictivo"
@@ -757,6 +911,8 @@ class BandaCriminal(models.Model):
         related_name="bandas_relacionadas_red",
         help_text="Links de redes sociales aprobados asociados a la banda.",
     )
+    fecha_modificacion = models.DateTimeField(auto_now=True)
+
     class Meta:
         verbose_name = "Banda Criminal"
         verbose_name_plural = "Bandas Criminales"
@@ -1001,3 +1157,130 @@ class ConfiguracionSistema(models.Model):
     def obtener(cls):
         obj, _ = cls.objects.get_or_create(pk=1, defaults={"sarcasmo_mode": False})
         return obj
+
+
+# Cola de clasificación con IA procesada por `manage.py run_ia_worker`
+class TrabajoIA(models.Model):
+    class Estado(models.TextChoices):
+        PENDIENTE = "pendiente", "Pendiente"
+        EN_PROCESO = "en_proceso", "En proceso"
+        COMPLETADO = "completado", "Completado"
+
+    creado_por = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="trabajos_ia",
+    )
+    estado = models.CharField(
+        max_length=20, choices=Estado.choices, default=Estado.PENDIENTE
+    )
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Trabajo de clasificación IA"
+        verbose_name_plural = "Trabajos de clasificación IA"
+        ordering = ["-fecha_creacion"]
+
+    def __str__(self):
+        return f"Trabajo IA #{self.pk} ({self.get_estado_display()})"
+
+
+class ItemTrabajoIA(models.Model):
+    class Estado(models.TextChoices):
+        PENDIENTE = "pendiente", "Pendiente"
+        EN_PROCESO = "en_proceso", "En proceso"
+        PROCESADO = "procesado", "Procesado"
+        ERROR = "error", "Error"
+
+    trabajo = models.ForeignKey(
+        TrabajoIA, on_delete=models.CASCADE, related_name="items"
+    )
+    link = models.ForeignKey(
+        LinkRelevante, on_delete=models.CASCADE, related_name="items_ia"
+    )
+    estado = models.CharField(
+        max_length=20, choices=Estado.choices, default=Estado.PENDIENTE
+    )
+    mensaje = models.TextField(blank=True)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    reservado_por = models.CharField(max_length=64, blank=True)
+    fecha_reserva = models.DateTimeField(null=True, blank=True)
+    fecha_procesado = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Link de trabajo IA"
+        verbose_name_plural = "Links de trabajos IA"
+        ordering = ["id"]
+        unique_together = ("trabajo", "link")
+        indexes = [models.Index(fields=["estado", "fecha_reserva"])]
+
+    def __str__(self):
+        return f"{self.link} ({self.get_estado_display()})"
+
+
+class EstadisticaDiaria(models.Model):
+    """
+    Totales de un día por usuario, métrica y dimensión (diario, red social o
+    categoría según la métrica). Los completa `manage.py actualizar_estadisticas`
+    y el panel de gerencia suma las filas del rango pedido.
+    """
+
+    class Metrica(models.TextChoices):
+        LINKS_DIARIO = "links_diario", "Links cargados por diario"
+        LINKS_APROBADOS = "links_aprobados", "Links cargados y aprobados"
+        LINKS_RECHAZADOS = "links_rechazados", "Links cargados y rechazados"
+        LINKS_RED_SOCIAL = "links_red_social", "Links de redes sociales por red"
+        DECISIONES_APROBADAS = "decisiones_aprobadas", "Links aprobados en clasificación"
+        DECISIONES_RECHAZADAS = "decisiones_rechazadas", "Links descartados en clasificación"
+        LINKS_CLASIFICADOS = "links_clasificados", "Links distintos clasificados"
+        CATEGORIAS_CLASIFICADAS = "categorias_clasificadas", "Categorías de los links clasificados"
+        ARTICULOS = "articulos", "Artículos generados"
+        LINKS_ARTICULOS = "links_articulos", "Links incluidos en artículos"
+        DEMORA_ARTICULOS = "demora_articulos", "Demora entre aprobación y artículo"
+        SOLICITUDES = "solicitudes", "Solicitudes de información"
+        HECHOS = "hechos", "Hechos delictivos"
+        INFORMES = "informes", "Informes individuales"
+        ARTICULOS_INFORMES = "articulos_informes", "Artículos vinculados a informes"
+        CATEGORIAS_INFORMES = "categorias_informes", "Categorías de los informes"
+
+    fecha = models.DateField()
+    usuario = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="estadisticas_diarias"
+    )
+    metrica = models.CharField(max_length=30, choices=Metrica.choices)
+    dimension_id = models.PositiveBigIntegerField(null=True, blank=True)
+    cantidad = models.PositiveIntegerField(default=0)
+    # Segundos acumulados en las métricas de demoras, para promediar.
+    suma = models.FloatField(default=0)
+
+    class Meta:
+        verbose_name = "Estadística diaria"
+        verbose_name_plural = "Estadísticas diarias"
+        indexes = [models.Index(fields=["fecha", "metrica"])]
+
+    def __str__(self):
+        return f"{self.fecha} {self.usuario} {self.metrica}: {self.cantidad}"
+
+
+class DiaEstadisticas(models.Model):
+    """
+    Días ya volcados en EstadisticaDiaria. Un día marcado como pendiente
+    cambió después de calcularse y se vuelve a leer de las tablas originales
+    hasta la próxima actualización.
+    """
+
+    fecha = models.DateField(unique=True)
+    pendiente = models.BooleanField(default=False)
+    fecha_calculo = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Día de estadísticas"
+        verbose_name_plural = "Días de estadísticas"
+        ordering = ["fecha"]
+
+    def __str__(self):
+        return f"{self.fecha} ({'pendiente' if self.pendiente else 'calculado'})"
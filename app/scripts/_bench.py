@@ -0,0 +1,166 @@
+"""
+Utilidades compartidas por los scripts de benchmark de app/scripts.
+
+Los benchmarks se ejecutan desde la raíz del proyecto como módulos, por
+ejemplo ``python -m app.scripts.benchmark_ia``, y no necesitan red: los
+diarios se simulan con un servidor HTTP local y la IA con un cliente falso.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+
+
+def configurar_django(base_de_datos=None):
+    """
+    Inicializa Django con la configuración del proyecto. Con `base_de_datos`
+    se usa ese archivo SQLite en lugar de db.sqlite3, para que los benchmarks
+    que cargan datos masivos no toquen la base de desarrollo.
+    """
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Minerva.settings")
+    import django
+    from django.conf import settings
+
+    if base_de_datos:
+        settings.DATABASES["default"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(base_de_datos),
+        }
+    django.setup()
+
+
+ARTICULO_HTML = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<title>Noticia {numero}</title>
+<style>body {{ font-family: sans-serif; }}</style>
+<script>window.dataLayer = window.dataLayer || [];</script>
+</head>
+<body>
+<header><nav><a href="/">Inicio</a> | <a href="/policiales">Policiales</a></nav></header>
+<main>
+<article>
+<h1>Detuvieron a un hombre por el robo número {numero}</h1>
+{parrafos}
+</article>
+</main>
+<footer>Todos los derechos reservados.</footer>
+</body>
+</html>
+"""
+
+PARRAFO = (
+    "<p>Según fuentes policiales, el hecho ocurrió en barrio Alberdi durante la "
+    "madrugada. Los investigadores identificaron al sospechoso gracias a las "
+    "cámaras de seguridad de la zona y a testimonios de vecinos.</p>"
+)
+
+
+class ServidorArticulos:
+    """
+    Servidor HTTP local que responde cualquier ruta con un artículo de prueba,
+    demorando cada respuesta ``latencia`` segundos para simular la red.
+    """
+
+    def __init__(self, latencia=0.0, parrafos=20):
+        self.latencia = latencia
+        self.parrafos = parrafos
+        self.solicitudes = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def _crear_handler(self):
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with servidor._lock:
+                    servidor.solicitudes += 1
+                    numero = servidor.solicitudes
+                if servidor.latencia:
+                    time.sleep(servidor.latencia)
+                cuerpo = ARTICULO_HTML.format(
+                    numero=numero, parrafos="\n".join([PARRAFO] * servidor.parrafos)
+                ).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def url(self, ruta=""):
+        host, puerto = self._server.server_address[:2]
+        return f"http://{host}:{puerto}/{ruta.lstrip('/')}"
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._crear_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+class ClienteOpenAIFalso:
+    """
+    Imita la interfaz ``client.chat.completions.create`` de openai devolviendo
+    siempre la misma clasificación luego de ``latencia`` segundos. Si el prompt
+    trae varios artículos responde con un resultado por ID. Los tokens de
+    entrada se estiman a razón de 4 caracteres por token.
+    """
+
+    def __init__(self, latencia=0.0, categorias=None, confianza=0.9):
+        self.latencia = latencia
+        self.categorias = categorias or ["General"]
+        self.confianza = confianza
+        self.llamadas = 0
+        self.tokens_entrada = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        if self.latencia:
+            time.sleep(self.latencia)
+        prompt = "".join(mensaje["content"] for mensaje in kwargs["messages"])
+        tokens = len(prompt) // 4
+        with self._lock:
+            self.llamadas += 1
+            self.tokens_entrada += tokens
+        analisis = {
+            "categorias": self.categorias,
+            "resumen": "Resumen generado por el cliente falso.",
+            "confianza": self.confianza,
+        }
+        ids = re.findall(r"Artículo ID (\S+)", prompt)
+        if ids:
+            respuesta = {"resultados": [dict(analisis, id=link_id) for link_id in ids]}
+        else:
+            respuesta = analisis
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(respuesta)))],
+            usage=SimpleNamespace(
+                prompt_tokens=tokens, completion_tokens=0, total_tokens=tokens
+            ),
+        )
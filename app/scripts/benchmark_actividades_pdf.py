@@ -0,0 +1,162 @@
+"""
+Benchmark del PDF del registro de actividades.
+
+Compara el camino anterior (una única Table con todas las filas pasada a
+`SimpleDocTemplate.build`) con app/utils/pdf_tablas, que consume las filas de
+un iterador y dibuja una tabla por página. Las filas son sintéticas, con
+descripciones de largo variable, así que se mide sólo el armado del PDF y no
+la consulta. Cada variante y tamaño corre en un proceso aparte para medir su
+memoria máxima (RSS).
+
+La variante anterior crece de forma más que lineal: por defecto sólo se mide
+hasta --max-anterior filas.
+
+Uso:
+    python -m app.scripts.benchmark_actividades_pdf
+    python -m app.scripts.benchmark_actividades_pdf --filas 10000 100000 1000000 --max-anterior 10000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from app.scripts._bench import BASE_DIR
+
+VARIANTES = ("anterior", "por_paginas")
+ENCABEZADOS = ["Fecha", "Usuario", "Tipo", "Descripción"]
+DESCRIPCION = "El usuario modificó el artículo y actualizó sus categorías. "
+
+
+def _filas(cantidad):
+    inicio = datetime(2025, 1, 1)
+    for i in range(cantidad):
+        yield (
+            (inicio + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            f"usuario{i % 12}",
+            "Edición de artículo",
+            DESCRIPCION * (1 + i % 4),
+        )
+
+
+def _pdf_anterior(destino, filas):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+
+    doc = SimpleDocTemplate(destino, pagesize=A4, leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm)
+    styles = getSampleStyleSheet()
+    data = [ENCABEZADOS]
+    for fecha, usuario, tipo, descripcion in filas:
+        data.append([fecha, usuario, tipo, Paragraph(descripcion, styles["Normal"])])
+    table = Table(data, colWidths=[4 * cm, 4 * cm, 3 * cm, 7.5 * cm])
+    table.setStyle(
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ]
+        )
+    )
+    doc.build([Paragraph("<b>Registro de Actividades</b>", styles["Heading1"]), table])
+    return doc.page
+
+
+def _pdf_por_paginas(destino, filas):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph
+
+    from app.utils.pdf_tablas import escribir_tabla_pdf, estilo_celda
+
+    estilo = estilo_celda()
+    return escribir_tabla_pdf(
+        destino,
+        "<b>Registro de Actividades</b>",
+        [],
+        ENCABEZADOS,
+        ([fecha, usuario, tipo, Paragraph(descripcion, estilo)] for fecha, usuario, tipo, descripcion in filas),
+        [4 * cm, 4 * cm, 3 * cm, 7.5 * cm],
+    )
+
+
+def _ejecutar_variante(variante, filas):
+    """Corre dentro del proceso hijo e imprime el resultado como JSON."""
+    generar = _pdf_anterior if variante == "anterior" else _pdf_por_paginas
+    with tempfile.TemporaryFile() as destino:
+        inicio = time.perf_counter()
+        paginas = generar(destino, _filas(filas))
+        segundos = time.perf_counter() - inicio
+        tamanio = destino.seek(0, os.SEEK_END)
+    print(json.dumps({"segundos": segundos, "paginas": paginas, "pdf": tamanio}))
+
+
+def _medir(variante, filas):
+    """Ejecuta la variante en un proceso hijo; devuelve (resultado, error)."""
+    with tempfile.TemporaryFile(mode="w+") as salida, tempfile.TemporaryFile(mode="w+") as errores:
+        proceso = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "app.scripts.benchmark_actividades_pdf",
+                "--variante",
+                variante,
+                "--filas",
+                str(filas),
+            ],
+            cwd=BASE_DIR,
+            stdout=salida,
+            stderr=errores,
+        )
+        # En Linux ru_maxrss está en KiB.
+        _, estado, uso = os.wait4(proceso.pid, 0)
+        proceso.returncode = os.waitstatus_to_exitcode(estado)
+        salida.seek(0)
+        errores.seek(0)
+        if proceso.returncode:
+            lineas = errores.read().strip().splitlines()
+            return None, lineas[-1] if lineas else "error"
+        resultado = json.loads(salida.read().strip().splitlines()[-1])
+    resultado["rss_mb"] = uso.ru_maxrss / 1024
+    return resultado, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filas", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--max-anterior", type=int, default=10000)
+    parser.add_argument("--variante", choices=VARIANTES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variante:
+        _ejecutar_variante(args.variante, args.filas[0])
+        return
+
+    for filas in args.filas:
+        print(f"{filas} filas")
+        for variante in VARIANTES:
+            if variante == "anterior" and filas > args.max_anterior:
+                print(f"  {variante:<12} omitida (más de {args.max_anterior} filas)")
+                continue
+            resultado, error = _medir(variante, filas)
+            if error:
+                print(f"  {variante:<12} error: {error}")
+                continue
+            print(
+                f"  {variante:<12} {resultado['segundos']:9.1f} s  "
+                f"{resultado['paginas']:7} páginas  "
+                f"PDF {resultado['pdf'] / 1024 / 1024:8.1f} MiB  "
+                f"RSS máx. {resultado['rss_mb']:7.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
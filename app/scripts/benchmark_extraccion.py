@@ -0,0 +1,140 @@
+"""
+Benchmark de la extracción de texto de artículos para la clasificación con IA.
+
+Compara el camino anterior (decodificar la respuesta completa y armar el árbol
+con BeautifulSoup) contra el extractor por fragmentos de
+app/utils/html_texto.py, midiendo tiempo de CPU y pico de memoria por página.
+
+Por defecto se genera un corpus sintético con los perfiles de página más
+comunes entre los diarios cargados (nota liviana, nota con muchos scripts y
+comentarios, sitio sin <article>). Con --corpus se usan en cambio los .html
+guardados en el directorio indicado.
+
+Uso:
+    python -m app.scripts.benchmark_extraccion --repeticiones 20
+    python -m app.scripts.benchmark_extraccion --corpus /ruta/a/paginas
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.scripts._bench import PARRAFO, configurar_django
+
+SCRIPT_PESADO = "<script>window.__ESTADO__ = {json};</script>\n"
+COMENTARIO = (
+    '<div class="comentario"><span class="autor">Lector {numero}</span>'
+    "<p>Opinión del lector sobre la nota, con varias líneas de texto.</p></div>\n"
+)
+
+
+def _pagina(numero, parrafos, scripts, comentarios, con_article=True):
+    cuerpo = "\n".join([PARRAFO] * parrafos)
+    if con_article:
+        cuerpo = f"<main><article><h1>Nota {numero}</h1>{cuerpo}</article></main>"
+    else:
+        cuerpo = f'<div class="nota"><h1>Nota {numero}</h1>{cuerpo}</div>'
+    menu = "".join(
+        f'<li><a href="/seccion-{i}">Sección {i}</a></li>' for i in range(120)
+    )
+    return (
+        "<!DOCTYPE html><html lang=\"es\"><head>"
+        f"<title>Nota {numero}</title>"
+        + SCRIPT_PESADO.format(json='{"clave": "' + "x" * 20000 + '"}') * scripts
+        + "<style>" + ".clase { color: red; }\n" * 500 + "</style>"
+        + "</head><body>"
+        + f"<header><nav><ul>{menu}</ul></nav></header>"
+        + cuerpo
+        + "<section class=\"comentarios\">"
+        + "".join(COMENTARIO.format(numero=i) for i in range(comentarios))
+        + "</section><noscript>Activá JavaScript.</noscript>"
+        + "<footer>" + "Todos los derechos reservados. " * 50 + "</footer>"
+        + "</body></html>"
+    )
+
+
+def generar_corpus(directorio, cantidad=10):
+    perfiles = [
+        ("liviana", dict(parrafos=15, scripts=2, comentarios=5)),
+        ("pesada", dict(parrafos=40, scripts=25, comentarios=400)),
+        ("sin_article", dict(parrafos=25, scripts=8, comentarios=50, con_article=False)),
+    ]
+    for numero in range(cantidad):
+        nombre, opciones = perfiles[numero % len(perfiles)]
+        ruta = Path(directorio) / f"{numero:03d}_{nombre}.html"
+        ruta.write_text(_pagina(numero, **opciones), encoding="utf-8")
+
+
+def _extraccion_anterior(contenido):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(contenido.decode("utf-8", errors="replace"), "html.parser")
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    return " ".join(soup.stripped_strings)[:5000]
+
+
+def _extraccion_por_fragmentos(contenido):
+    from app.utils.html_texto import extraer_texto_html
+
+    fragmentos = (
+        contenido[inicio : inicio + 16 * 1024]
+        for inicio in range(0, len(contenido), 16 * 1024)
+    )
+    return extraer_texto_html(fragmentos, max_caracteres=5000, max_bytes=2 * 1024 * 1024)
+
+
+def _medir(funcion, paginas, repeticiones):
+    inicio = time.process_time()
+    for _ in range(repeticiones):
+        for contenido in paginas:
+            funcion(contenido)
+    cpu = (time.process_time() - inicio) / (repeticiones * len(paginas))
+
+    pico = 0
+    for contenido in paginas:
+        tracemalloc.start()
+        funcion(contenido)
+        pico = max(pico, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return cpu, pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", help="Directorio con páginas .html guardadas.")
+    parser.add_argument("--paginas", type=int, default=9)
+    parser.add_argument("--repeticiones", type=int, default=10)
+    args = parser.parse_args()
+
+    configurar_django()
+    with tempfile.TemporaryDirectory() as temporal:
+        directorio = args.corpus
+        if not directorio:
+            directorio = temporal
+            generar_corpus(directorio, args.paginas)
+        paginas = [ruta.read_bytes() for ruta in sorted(Path(directorio).glob("*.html"))]
+
+    tamanio = sum(len(contenido) for contenido in paginas) / len(paginas)
+    print(f"{len(paginas)} páginas | tamaño promedio {tamanio / 1024:.0f} KiB")
+    resultados = []
+    for nombre, funcion in (
+        ("BeautifulSoup (anterior)", _extraccion_anterior),
+        ("por fragmentos", _extraccion_por_fragmentos),
+    ):
+        cpu, pico = _medir(funcion, paginas, args.repeticiones)
+        resultados.append((cpu, pico))
+        print(
+            f"  {nombre:<28} CPU {cpu * 1000:8.2f} ms/página  "
+            f"pico de memoria {pico / 1024:8.0f} KiB"
+        )
+    print(
+        f"  CPU x{resultados[0][0] / resultados[1][0]:.1f} menos, "
+        f"memoria x{resultados[0][1] / resultados[1][1]:.1f} menos"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Benchmark de los gráficos del PDF de estadísticas.
+
+Compara el camino anterior (DataFrame de pandas, figura de Plotly y PNG
+rasterizado con Kaleido, embebido en base64) con los SVG en línea de
+app/utils/graficos_svg. Cada variante corre en un proceso aparte para medir
+su tiempo y su memoria máxima (RSS, incluido el Chromium de Kaleido). Si
+WeasyPrint está instalado también se genera el PDF con los tres gráficos.
+
+La variante anterior necesita pandas, plotly y kaleido, que ya no están en
+requirements.txt; si faltan se informa y sólo se mide la nueva.
+
+Uso:
+    python -m app.scripts.benchmark_graficos
+    python -m app.scripts.benchmark_graficos --dias 365 --categorias 30 --repeticiones 5
+"""
+
+import argparse
+import base64
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from app.scripts._bench import BASE_DIR
+
+VARIANTES = ("anterior", "svg")
+ESTADOS = ("pendiente", "aprobado", "descartado", "en_revision")
+
+
+def _datos(dias, categorias):
+    azar = random.Random(42)
+    inicio = date(2025, 1, 1)
+    por_dia = [(str(inicio + timedelta(days=i)), azar.randrange(5, 200)) for i in range(dias)]
+    por_estado = [(estado, azar.randrange(50, 5000)) for estado in ESTADOS]
+    por_categoria = [(f"Categoría {i}", azar.randrange(1, 800)) for i in range(categorias)]
+    return por_dia, por_estado, por_categoria
+
+
+def _graficos_anteriores(por_dia, por_estado, por_categoria):
+    import pandas as pd
+    import plotly.express as px
+
+    def png(figura):
+        buffer = io.BytesIO()
+        figura.write_image(buffer, format="png")
+        return '<img src="data:image/png;base64,{}" style="width: 90%;">'.format(
+            base64.b64encode(buffer.getvalue()).decode("utf-8")
+        )
+
+    barras = pd.DataFrame(por_dia, columns=["day", "count"])
+    torta = pd.DataFrame(por_estado, columns=["estado", "count"])
+    categorias = pd.DataFrame(por_categoria, columns=["categoria", "cantidad"])
+    return [
+        png(px.bar(barras, x="day", y="count", labels={"day": "Fecha", "count": "Cantidad"}, title="Links por Día")),
+        png(px.pie(torta, names="estado", values="count", title="Distribución por Estado")),
+        png(px.bar(categorias, x="categoria", y="cantidad", title="Links por Categoría")),
+    ]
+
+
+def _graficos_svg(por_dia, por_estado, por_categoria):
+    from app.utils.graficos_svg import grafico_barras_svg, grafico_torta_svg
+
+    return [
+        grafico_barras_svg(*zip(*por_dia), titulo="Links por Día", etiqueta_x="Fecha", etiqueta_y="Cantidad"),
+        grafico_torta_svg(*zip(*por_estado), titulo="Distribución por Estado"),
+        grafico_barras_svg(*zip(*por_categoria), titulo="Links por Categoría"),
+    ]
+
+
+def _pdf(graficos):
+    try:
+        from weasyprint import HTML
+    except Exception:
+        return None
+    html = "<html><body>{}</body></html>".format("".join(f"<div>{g}</div>" for g in graficos))
+    return len(HTML(string=html).write_pdf())
+
+
+def _ejecutar_variante(variante, dias, categorias, repeticiones):
+    """Corre dentro del proceso hijo e imprime el resultado como JSON."""
+    generar = _graficos_anteriores if variante == "anterior" else _graficos_svg
+    datos = _datos(dias, categorias)
+    tiempos_graficos = []
+    tiempos_totales = []
+    bytes_pdf = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        graficos = generar(*datos)
+        tiempos_graficos.append(time.perf_counter() - inicio)
+        bytes_pdf = _pdf(graficos)
+        tiempos_totales.append(time.perf_counter() - inicio)
+    print(
+        json.dumps(
+            {
+                "graficos": statistics.median(tiempos_graficos),
+                "total": statistics.median(tiempos_totales),
+                "html": sum(len(g) for g in graficos),
+                "pdf": bytes_pdf,
+            }
+        )
+    )
+
+
+def _medir(variante, args):
+    """Ejecuta la variante en un proceso hijo; devuelve (resultado, error)."""
+    with tempfile.TemporaryFile(mode="w+") as salida, tempfile.TemporaryFile(mode="w+") as errores:
+        inicio = time.perf_counter()
+        proceso = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "app.scripts.benchmark_graficos",
+                "--variante",
+                variante,
+                "--dias",
+                str(args.dias),
+                "--categorias",
+                str(args.categorias),
+                "--repeticiones",
+                str(args.repeticiones),
+            ],
+            cwd=BASE_DIR,
+            stdout=salida,
+            stderr=errores,
+        )
+        # wait4 informa la memoria máxima del hijo y de sus propios hijos
+        # (el Chromium de Kaleido); en Linux ru_maxrss está en KiB.
+        _, estado, uso = os.wait4(proceso.pid, 0)
+        proceso.returncode = os.waitstatus_to_exitcode(estado)
+        pared = time.perf_counter() - inicio
+        salida.seek(0)
+        errores.seek(0)
+        if proceso.returncode:
+            lineas = errores.read().strip().splitlines()
+            return None, lineas[-1] if lineas else "error"
+        resultado = json.loads(salida.read().strip().splitlines()[-1])
+    resultado["pared"] = pared
+    resultado["rss_mb"] = uso.ru_maxrss / 1024
+    return resultado, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dias", type=int, default=180)
+    parser.add_argument("--categorias", type=int, default=20)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--variante", choices=VARIANTES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variante:
+        _ejecutar_variante(args.variante, args.dias, args.categorias, args.repeticiones)
+        return
+
+    print(f"{args.dias} días, {len(ESTADOS)} estados, {args.categorias} categorías")
+    for variante in VARIANTES:
+        resultado, error = _medir(variante, args)
+        if error:
+            print(f"  {variante:<10} no disponible: {error}")
+            continue
+        pdf = f"{resultado['pdf'] / 1024:.0f} KiB" if resultado["pdf"] else "sin WeasyPrint"
+        print(
+            f"  {variante:<10} gráficos {resultado['graficos'] * 1000:9.1f} ms  "
+            f"con PDF {resultado['total'] * 1000:9.1f} ms  "
+            f"proceso {resultado['pared']:6.2f} s  "
+            f"RSS máx. {resultado['rss_mb']:7.1f} MB  "
+            f"HTML {resultado['html'] / 1024:7.1f} KiB  PDF {pdf}"
+        )
+
+
+if __name__ == "__main__":
+    main()
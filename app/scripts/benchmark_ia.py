@@ -0,0 +1,106 @@
+"""
+Benchmark offline de la clasificación de links con IA.
+
+Compara el recorrido secuencial que hacía procesar_links_ia (descargar y
+consultar a la IA link por link) contra ClasificadorIAConcurrente, con una
+consulta por link y en lote, usando un servidor HTTP local como diario y un
+cliente OpenAI falso con latencia fija. Además de la duración se informa la
+cantidad de consultas y los tokens de entrada estimados.
+
+Uso:
+    python -m app.scripts.benchmark_ia --links 50 --latencia-http 0.2 --latencia-llm 1.0
+"""
+
+import argparse
+import time
+
+from app.scripts._bench import ClienteOpenAIFalso, ServidorArticulos, configurar_django
+
+
+def _secuencial(processor, items):
+    from app.services.ia import IAProcessingError
+
+    errores = 0
+    for _, url in items:
+        try:
+            texto = processor.extraer_texto(url)
+            processor.analizar(url, texto)
+        except IAProcessingError:
+            errores += 1
+    return errores
+
+
+def _concurrente(processor, items, max_descargas, max_consultas, en_lote):
+    from app.services.ia import ClasificadorIAConcurrente
+
+    clasificador = ClasificadorIAConcurrente(
+        processor=processor,
+        max_descargas=max_descargas,
+        max_consultas=max_consultas,
+        en_lote=en_lote,
+    )
+    resultados = clasificador.ejecutar(items)
+    return sum(1 for resultado in resultados.values() if resultado.error)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--links", type=int, default=50)
+    parser.add_argument("--latencia-http", type=float, default=0.2)
+    parser.add_argument("--latencia-llm", type=float, default=1.0)
+    parser.add_argument("--max-descargas", type=int, default=8)
+    parser.add_argument("--max-consultas", type=int, default=4)
+    args = parser.parse_args()
+
+    configurar_django()
+    from app.services.descargas import ClienteHTTP
+    from app.services.ia import LinkAIProcessor
+
+    with ServidorArticulos(latencia=args.latencia_http) as servidor:
+        items = [(i, servidor.url(f"noticia-{i}")) for i in range(args.links)]
+
+        corridas = [
+            ("secuencial", lambda p: _secuencial(p, items)),
+            (
+                f"concurrente ({args.max_descargas} descargas / {args.max_consultas} consultas)",
+                lambda p: _concurrente(
+                    p, items, args.max_descargas, args.max_consultas, en_lote=False
+                ),
+            ),
+            (
+                "concurrente en lote",
+                lambda p: _concurrente(
+                    p, items, args.max_descargas, args.max_consultas, en_lote=True
+                ),
+            ),
+        ]
+
+        print(
+            f"{args.links} links | latencia HTTP {args.latencia_http}s | "
+            f"latencia IA {args.latencia_llm}s"
+        )
+        tiempos = []
+        for nombre, corrida in corridas:
+            cliente = ClienteOpenAIFalso(latencia=args.latencia_llm)
+            processor = LinkAIProcessor(
+                client=cliente,
+                categorias=["General"],
+                usar_cache=False,
+                # Sin límites por dominio: todo el corpus sale del mismo host.
+                http=ClienteHTTP(limites={"127.0.0.1": (args.max_descargas, 0)}),
+            )
+            inicio = time.perf_counter()
+            errores = corrida(processor)
+            duracion = time.perf_counter() - inicio
+            tiempos.append(duracion)
+            print(
+                f"  {nombre:<45} {duracion:8.2f}s  "
+                f"{args.links / duracion:7.2f} links/s  consultas: {cliente.llamadas:4d}  "
+                f"tokens: {cliente.tokens_entrada:8d}  errores: {errores}"
+            )
+        print(f"  aceleración concurrente: x{tiempos[0] / tiempos[1]:.1f}")
+        print(f"  aceleración en lote: x{tiempos[0] / tiempos[2]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Benchmark de los índices sobre las columnas de filtro más usadas.
+
+Crea una base SQLite temporal, la migra hasta antes de los índices, carga
+`--links` links (por defecto un millón) y mide las consultas típicas de los
+paneles con los filtros `__date` anteriores y con rangos semiabiertos. Luego
+aplica la migración de índices y repite las mediciones. Para cada consulta se
+informa la mediana de tiempo y el plan (EXPLAIN QUERY PLAN).
+
+Uso:
+    python -m app.scripts.benchmark_indices --links 1000000
+    python -m app.scripts.benchmark_indices --links 200000 --repeticiones 3
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from pathlib import Path
+
+from app.scripts._bench import configurar_django
+
+MIGRACION_PREVIA = "0090_linkfeed"
+MIGRACION_INDICES = "0091_indices_filtros_frecuentes"
+
+
+def _cargar_links(cantidad, usuarios=50, diarios=20, lote=20000):
+    from django.contrib.auth.models import User
+    from django.db import connection, transaction
+
+    from app.models import DiarioDigital, EstadoLink
+
+    usuarios_ids = [
+        User.objects.create(username=f"bench{i}").pk for i in range(usuarios)
+    ]
+    diarios_ids = [
+        DiarioDigital.objects.create(
+            nombre=f"Diario {i}", url_principal=f"https://diario{i}.com.ar"
+        ).pk
+        for i in range(diarios)
+    ]
+    estados = [EstadoLink.APROBADO] * 7 + [EstadoLink.DESCARTADO] * 2 + [EstadoLink.PENDIENTE]
+    inicio = datetime(2023, 1, 1, tzinfo=dt_timezone.utc)
+    segundos = int(timedelta(days=730).total_seconds())
+    adaptar = connection.ops.adapt_datetimefield_value
+    sql = (
+        "INSERT INTO app_linkrelevante (url, fecha_carga, cargado_por_id, "
+        "diario_digital_id, estado, fecha_aprobacion, revisado_clasificador, "
+        "revisado_editor, revisado_redactor, clasificado_por_ia, "
+        "confianza_clasificacion, resumen_ia) "
+        "VALUES (%s, %s, %s, %s, %s, NULL, %s, 0, 0, %s, NULL, '')"
+    )
+    azar = random.Random(42)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for desde in range(0, cantidad, lote):
+            filas = []
+            for i in range(desde, min(desde + lote, cantidad)):
+                filas.append(
+                    (
+                        f"https://diario{i % diarios}.com.ar/nota-{i}",
+                        adaptar(inicio + timedelta(seconds=azar.randrange(segundos))),
+                        azar.choice(usuarios_ids),
+                        azar.choice(diarios_ids),
+                        azar.choice(estados),
+                        azar.random() < 0.6,
+                        azar.random() < 0.15,
+                    )
+                )
+            cursor.executemany(sql, filas)
+    return usuarios_ids
+
+
+def _consultas(usuario_id, con_rangos):
+    from app.models import EstadoLink, LinkRelevante
+    from app.utils.fechas import inicio_del_dia, inicio_del_dia_siguiente
+
+    desde, hasta = date(2024, 3, 1), date(2024, 3, 31)
+    if con_rangos:
+        rango = {
+            "fecha_carga__gte": inicio_del_dia(desde),
+            "fecha_carga__lt": inicio_del_dia_siguiente(hasta),
+        }
+    else:
+        rango = {"fecha_carga__date__gte": desde, "fecha_carga__date__lte": hasta}
+    links = LinkRelevante.objects.all()
+    return [
+        (
+            "pendientes del mes (panel)",
+            links.filter(estado=EstadoLink.PENDIENTE, **rango).order_by("-fecha_carga")[:10],
+        ),
+        (
+            "pendientes sin revisar (clasificador IA)",
+            links.filter(
+                estado=EstadoLink.PENDIENTE, revisado_clasificador=False, **rango
+            ).order_by("-fecha_carga")[:10],
+        ),
+        (
+            "links de un usuario en el mes",
+            links.filter(cargado_por_id=usuario_id, **rango).values("id"),
+        ),
+        (
+            "clasificados por IA en el mes",
+            links.filter(clasificado_por_ia=True, **rango).order_by("-fecha_carga")[:10],
+        ),
+        ("aprobados en el mes", links.filter(estado=EstadoLink.APROBADO, **rango).values("id")),
+    ]
+
+
+def _medir(usuario_id, con_rangos, repeticiones):
+    resultados = []
+    for nombre, qs in _consultas(usuario_id, con_rangos):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            list(qs.all())
+            tiempos.append(time.perf_counter() - inicio)
+        resultados.append((nombre, statistics.median(tiempos), qs.explain()))
+    return resultados
+
+
+def _imprimir(titulo, resultados):
+    print(f"\n== {titulo}")
+    for nombre, duracion, plan in resultados:
+        print(f"  {nombre:<42} {duracion * 1000:10.1f} ms")
+        for linea in plan.splitlines():
+            print(f"      {linea}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--links", type=int, default=1_000_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--db", help="Archivo SQLite a usar (se crea de cero).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporal:
+        ruta = Path(args.db or Path(temporal) / "benchmark_indices.sqlite3")
+        ruta.unlink(missing_ok=True)
+        configurar_django(base_de_datos=ruta)
+        from django.core.management import call_command
+
+        call_command("migrate", "app", MIGRACION_PREVIA, verbosity=0)
+        inicio = time.perf_counter()
+        usuarios_ids = _cargar_links(args.links)
+        print(f"{args.links} links cargados en {time.perf_counter() - inicio:.1f}s")
+
+        antes = _medir(usuarios_ids[0], con_rangos=False, repeticiones=args.repeticiones)
+        _imprimir("sin índices, filtros __date", antes)
+        _imprimir(
+            "sin índices, rangos semiabiertos",
+            _medir(usuarios_ids[0], con_rangos=True, repeticiones=args.repeticiones),
+        )
+
+        inicio = time.perf_counter()
+        call_command("migrate", "app", MIGRACION_INDICES, verbosity=0)
+        print(f"\nÍndices creados en {time.perf_counter() - inicio:.1f}s")
+        _imprimir(
+            "con índices, filtros __date",
+            _medir(usuarios_ids[0], con_rangos=False, repeticiones=args.repeticiones),
+        )
+        despues = _medir(usuarios_ids[0], con_rangos=True, repeticiones=args.repeticiones)
+        _imprimir("con índices, rangos semiabiertos", despues)
+
+        print("\n== resumen (antes: sin índices y __date / después: índices y rangos)")
+        for (nombre, t_antes, _), (_, t_despues, _) in zip(antes, despues):
+            print(
+                f"  {nombre:<42} {t_antes * 1000:9.1f} ms -> {t_despues * 1000:8.1f} ms "
+                f"(x{t_antes / max(t_despues, 1e-6):.0f})"
+            )
+
+
+if __name__ == "__main__":
+    main()
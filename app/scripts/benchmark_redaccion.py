@@ -0,0 +1,174 @@
+"""
+Benchmark de las estadísticas de redacción del panel de gerencia.
+
+Crea una base SQLite temporal con `--articulos` artículos (por defecto
+100.000), cada uno con algunos links aprobados, y compara el recorrido
+anterior en Python (cada artículo con sus `links_incluidos` precargados) con
+`_obtener_estadisticas_redaccion`, que agrega en la base sobre la tabla
+intermedia. Esta última se mide calculando en el momento y con los días ya
+volcados en EstadisticaDiaria. También verifica que los tres caminos den los
+mismos números.
+
+Uso:
+    python -m app.scripts.benchmark_redaccion
+    python -m app.scripts.benchmark_redaccion --articulos 20000 --repeticiones 3
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from pathlib import Path
+
+from app.scripts._bench import configurar_django
+
+
+def _cargar(articulos, links_por_articulo, redactores=10, lote=10000):
+    from django.contrib.auth.models import User
+    from django.db import connection, transaction
+
+    from app.models import Articulo, DiarioDigital, LinkRelevante, Roles, UserProfile
+
+    usuarios_ids = []
+    for i in range(redactores):
+        usuario = User.objects.create(username=f"redactor{i}")
+        UserProfile.objects.create(user=usuario, rol=Roles.REDACCION)
+        usuarios_ids.append(usuario.pk)
+    prensa = User.objects.create(username="prensa")
+    diario = DiarioDigital.objects.create(nombre="Diario", url_principal="https://diario.com.ar")
+
+    azar = random.Random(42)
+    fin = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+    segundos = int(timedelta(days=365).total_seconds())
+    adaptar = connection.ops.adapt_datetimefield_value
+    through = Articulo.links_incluidos.through
+    with transaction.atomic():
+        links_ids = [
+            link.pk
+            for link in LinkRelevante.objects.bulk_create(
+                [
+                    LinkRelevante(url=f"https://diario.com.ar/nota-{i}", cargado_por=prensa, diario_digital=diario)
+                    for i in range(articulos)
+                ],
+                batch_size=lote,
+            )
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                "UPDATE app_linkrelevante SET fecha_aprobacion = %s WHERE id = %s",
+                [
+                    (adaptar(fin - timedelta(seconds=azar.randrange(segundos))), link_id)
+                    for link_id in links_ids
+                ],
+            )
+        for desde in range(0, articulos, lote):
+            creados = Articulo.objects.bulk_create(
+                [
+                    Articulo(titulo=f"Nota {i}", descripcion="x", generado_por_id=azar.choice(usuarios_ids))
+                    for i in range(desde, min(desde + lote, articulos))
+                ]
+            )
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    "UPDATE app_articulo SET fecha_creacion = %s WHERE id = %s",
+                    [
+                        (adaptar(fin - timedelta(seconds=azar.randrange(segundos))), articulo.pk)
+                        for articulo in creados
+                    ],
+                )
+            through.objects.bulk_create(
+                [
+                    through(articulo_id=articulo.pk, linkrelevante_id=link_id)
+                    for articulo in creados
+                    for link_id in azar.sample(links_ids, links_por_articulo)
+                ]
+            )
+
+
+def _recorrido_anterior():
+    """Cálculo previo: recorre cada artículo y sus links en Python."""
+    from app.models import Articulo
+
+    datos = {}
+    for articulo in Articulo.objects.prefetch_related("links_incluidos"):
+        data = datos.setdefault(articulo.generado_por_id, [0, 0, 0.0, 0])
+        links = list(articulo.links_incluidos.all())
+        data[0] += 1
+        data[1] += len(links)
+        for link in links:
+            if link.fecha_aprobacion and articulo.fecha_creacion >= link.fecha_aprobacion:
+                data[2] += (articulo.fecha_creacion - link.fecha_aprobacion).total_seconds()
+                data[3] += 1
+    return {
+        usuario_id: (
+            articulos,
+            round(links / articulos, 2),
+            round(tiempo / medidos / 3600, 2) if medidos else 0,
+        )
+        for usuario_id, (articulos, links, tiempo, medidos) in datos.items()
+    }
+
+
+def _agregado():
+    from app.views import _obtener_estadisticas_redaccion
+
+    return {
+        fila["id"]: (fila["articulos"], fila["promedio_links"], fila["promedio_tiempo_horas"])
+        for fila in _obtener_estadisticas_redaccion()["usuarios"]
+        if fila["articulos"]
+    }
+
+
+def _medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--articulos", type=int, default=100_000)
+    parser.add_argument("--links-por-articulo", type=int, default=3)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporal:
+        configurar_django(base_de_datos=Path(temporal) / "benchmark_redaccion.sqlite3")
+        from django.core.management import call_command
+
+        from app.services.estadisticas import actualizar_estadisticas
+
+        # Importar las vistas lleva más de un segundo; no entra en la medición.
+        import app.views  # noqa: F401
+
+        call_command("migrate", verbosity=0)
+        inicio = time.perf_counter()
+        _cargar(args.articulos, args.links_por_articulo)
+        print(f"{args.articulos} artículos cargados en {time.perf_counter() - inicio:.1f}s")
+
+        anterior, esperado = _medir(_recorrido_anterior, args.repeticiones)
+        en_vivo, resultado_en_vivo = _medir(_agregado, args.repeticiones)
+        actualizar_estadisticas()
+        volcado, resultado_volcado = _medir(_agregado, args.repeticiones)
+
+        print(f"  {'recorrido en Python':<28} {anterior * 1000:10.1f} ms")
+        print(
+            f"  {'agregación SQL en vivo':<28} {en_vivo * 1000:10.1f} ms "
+            f"(x{anterior / max(en_vivo, 1e-6):.0f})"
+        )
+        print(
+            f"  {'agregación SQL volcada':<28} {volcado * 1000:10.1f} ms "
+            f"(x{anterior / max(volcado, 1e-6):.0f})"
+        )
+        iguales = esperado == resultado_en_vivo == resultado_volcado
+        print(f"  mismos números: {'sí' if iguales else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""
+Archivo de actividades viejas.
+
+`archivar_actividades` mueve las actividades anteriores a los últimos
+ACTIVIDAD_RETENCION_MESES meses a un archivo por mes en ACTIVIDAD_ARCHIVO_DIR
+(JSON Lines comprimido con gzip, de la más nueva a la más vieja) y las borra
+de la tabla, que queda con los meses recientes. ArchivoActividad registra cada
+mes y ResumenArchivoActividad cuántas actividades tiene por usuario y tipo y
+entre qué fechas, así se sabe qué archivos abrir y muchas veces se cuenta sin
+leerlos.
+
+`actividades_con_archivo` junta la tabla con los archivos cuando el rango
+pedido empieza antes del último mes archivado; sin `desde`, o con un `desde`
+posterior, los listados siguen usando sólo la tabla.
+
+Si vuelven a aparecer actividades de un mes archivado (por ejemplo, las que
+recupera el registro en lote), la próxima corrida las agrega al archivo de
+ese mes; mientras tanto se leen de la tabla junto con el archivo.
+"""
+
+import gzip
+import heapq
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import chain, islice
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Max, Min, Sum
+from django.utils import timezone
+
+from app.models import Actividad, ArchivoActividad, ResumenArchivoActividad
+from app.utils.fechas import inicio_del_dia
+
+CAMPOS = (
+    "id",
+    "usuario_id",
+    "tipo",
+    "descripcion",
+    "fecha_hora",
+    "objeto_tipo",
+    "objeto_id",
+    "estado_anterior",
+    "estado_nuevo",
+)
+
+# Actividades que se borran de la tabla por consulta.
+BORRADO_POR_LOTE = 500
+
+
+def _mes_siguiente(mes):
+    return (mes.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _ruta(nombre):
+    return Path(settings.ACTIVIDAD_ARCHIVO_DIR) / nombre
+
+
+def _fecha_texto(fecha_hora):
+    # Siempre en UTC y con microsegundos: así el orden del texto es el de las
+    # fechas y se pueden mezclar archivos y tabla sin convertir.
+    return fecha_hora.astimezone(dt_timezone.utc).isoformat(timespec="microseconds")
+
+
+def _clave(fila):
+    return (fila["fecha_hora"], fila["id"])
+
+
+def _leer(nombre):
+    with gzip.open(_ruta(nombre), "rt", encoding="utf-8") as entrada:
+        for linea in entrada:
+            yield json.loads(linea)
+
+
+def _actividad(fila):
+    return Actividad(**dict(fila, fecha_hora=datetime.fromisoformat(fila["fecha_hora"])))
+
+
+def frontera_archivo():
+    """Primer instante que no se archivó, o None si no hay archivos."""
+    ultimo = ArchivoActividad.objects.aggregate(mes=Max("mes"))["mes"]
+    return inicio_del_dia(_mes_siguiente(ultimo)) if ultimo else None
+
+
+def _archivar_mes(mes):
+    desde = inicio_del_dia(mes)
+    hasta = inicio_del_dia(_mes_siguiente(mes))
+    actividades = Actividad.objects.filter(fecha_hora__gte=desde, fecha_hora__lt=hasta)
+    if not actividades.exists():
+        return 0
+
+    nombre = f"actividades-{mes:%Y-%m}.jsonl.gz"
+    ruta = _ruta(nombre)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ids = []
+
+    def de_la_tabla():
+        for fila in actividades.order_by("-fecha_hora", "-id").values(*CAMPOS).iterator(chunk_size=2000):
+            ids.append(fila["id"])
+            fila["fecha_hora"] = _fecha_texto(fila["fecha_hora"])
+            yield fila
+
+    fuentes = [de_la_tabla()]
+    if ruta.exists():
+        fuentes.append(_leer(nombre))
+
+    resumen = defaultdict(lambda: [0, None, None])
+    filas = 0
+    anterior = None
+    temporal = ruta.with_name(ruta.name + ".tmp")
+    with gzip.open(temporal, "wt", encoding="utf-8") as salida:
+        for fila in heapq.merge(*fuentes, key=_clave, reverse=True):
+            if fila["id"] == anterior:
+                # Ya estaba en el archivo: una corrida anterior se cortó
+                # después de escribirlo y antes de borrar la tabla.
+                continue
+            anterior = fila["id"]
+            salida.write(json.dumps(fila, ensure_ascii=False) + "\n")
+            filas += 1
+            grupo = resumen[(fila["usuario_id"], fila["tipo"])]
+            grupo[0] += 1
+            # Las filas vienen de la más nueva a la más vieja.
+            grupo[1] = fila["fecha_hora"]
+            grupo[2] = grupo[2] or fila["fecha_hora"]
+    descriptor = os.open(temporal, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+    usuarios = set(User.objects.filter(pk__in={u for u, _ in resumen if u}).values_list("pk", flat=True))
+    try:
+        with transaction.atomic():
+            archivo, _ = ArchivoActividad.objects.update_or_create(
+                mes=mes,
+                defaults={
+                    "nombre": nombre,
+                    "filas": filas,
+                    "bytes": temporal.stat().st_size,
+                    "fecha_archivo": timezone.now(),
+                },
+            )
+            archivo.resumenes.all().delete()
+            ResumenArchivoActividad.objects.bulk_create(
+                [
+                    ResumenArchivoActividad(
+                        archivo=archivo,
+                        usuario_id=usuario_id if usuario_id in usuarios else None,
+                        tipo=tipo,
+                        cantidad=cantidad,
+                        primera=datetime.fromisoformat(primera),
+                        ultima=datetime.fromisoformat(ultima),
+                    )
+                    for (usuario_id, tipo), (cantidad, primera, ultima) in resumen.items()
+                ]
+            )
+            for inicio in range(0, len(ids), BORRADO_POR_LOTE):
+                Actividad.objects.filter(pk__in=ids[inicio : inicio + BORRADO_POR_LOTE]).delete()
+            # Último paso: si falla, la transacción se revierte y la tabla
+            # sigue intacta.
+            os.replace(temporal, ruta)
+    finally:
+        temporal.unlink(missing_ok=True)
+    return len(ids)
+
+
+def archivar_actividades(meses=None):
+    """
+    Archiva las actividades anteriores a los últimos `meses` meses (además del
+    actual); por defecto, ACTIVIDAD_RETENCION_MESES. Devuelve la cantidad de
+    meses y de actividades que se movieron.
+    """
+    meses = settings.ACTIVIDAD_RETENCION_MESES if meses is None else meses
+    if meses < 0:
+        raise ValueError("La cantidad de meses no puede ser negativa.")
+    limite = timezone.localdate().replace(day=1)
+    for _ in range(meses):
+        limite = (limite - timedelta(days=1)).replace(day=1)
+
+    primera = Actividad.objects.filter(fecha_hora__lt=inicio_del_dia(limite)).aggregate(
+        v=Min("fecha_hora")
+    )["v"]
+    if primera is None:
+        return 0, 0
+    archivados = movidas = 0
+    mes = timezone.localdate(primera).replace(day=1)
+    while mes < limite:
+        cantidad = _archivar_mes(mes)
+        if cantidad:
+            archivados += 1
+            movidas += cantidad
+        mes = _mes_siguiente(mes)
+    return archivados, movidas
+
+
+class _Filtro:
+    """Filtros de un listado de actividades aplicados a los archivos."""
+
+    def __init__(self, usuarios_ids=None, tipo=None, desde=None, hasta=None):
+        self.usuarios_ids = set(usuarios_ids) if usuarios_ids is not None else None
+        self.tipo = tipo
+        self.desde = _fecha_texto(desde) if desde else None
+        self.hasta = _fecha_texto(hasta) if hasta else None
+        self._desde, self._hasta = desde, hasta
+
+    def resumenes(self):
+        resumenes = ResumenArchivoActividad.objects.all()
+        if self.usuarios_ids is not None:
+            resumenes = resumenes.filter(usuario_id__in=self.usuarios_ids)
+        if self.tipo:
+            resumenes = resumenes.filter(tipo=self.tipo)
+        if self._desde:
+            resumenes = resumenes.filter(ultima__gte=self._desde)
+        if self._hasta:
+            resumenes = resumenes.filter(primera__lt=self._hasta)
+        return resumenes
+
+    def archivos(self):
+        """
+        Archivos con actividades que pueden cumplir el filtro, del más nuevo
+        al más viejo: (nombre, cantidad), con cantidad None si hay que leer el
+        archivo para saberla (el rango corta el mes).
+        """
+        grupos = (
+            self.resumenes()
+            .values("archivo__mes", "archivo__nombre")
+            .annotate(cantidad=Sum("cantidad"), primera=Min("primera"), ultima=Max("ultima"))
+            .order_by("-archivo__mes")
+        )
+        for grupo in grupos:
+            completo = (not self._desde or grupo["primera"] >= self._desde) and (
+                not self._hasta or grupo["ultima"] < self._hasta
+            )
+            yield grupo["archivo__nombre"], grupo["cantidad"] if completo else None
+
+    def cumple(self, fila):
+        return (
+            (self.usuarios_ids is None or fila["usuario_id"] in self.usuarios_ids)
+            and (not self.tipo or fila["tipo"] == self.tipo)
+            and (not self.desde or fila["fecha_hora"] >= self.desde)
+            and (not self.hasta or fila["fecha_hora"] < self.hasta)
+        )
+
+    def filas(self, nombre):
+        return (fila for fila in _leer(nombre) if self.cumple(fila))
+
+
+def filas_archivadas(usuarios_ids=None, tipo=None, desde=None, hasta=None):
+    """
+    Filas (diccionarios con CAMPOS; fecha_hora como texto ISO en UTC) de las
+    actividades archivadas que cumplen los filtros, de la más nueva a la más
+    vieja.
+    """
+    filtro = _Filtro(usuarios_ids, tipo, desde, hasta)
+    return chain.from_iterable(filtro.filas(nombre) for nombre, _ in filtro.archivos())
+
+
+def primera_fecha_archivada(**filtros):
+    """Fecha de la actividad archivada más vieja que cumple `filtros` (del índice)."""
+    return ResumenArchivoActividad.objects.filter(**filtros).aggregate(v=Min("primera"))["v"]
+
+
+class ActividadesConArchivo:
+    """
+    Actividades de la tabla y de los archivos, de la más nueva a la más vieja,
+    con lo que usan el paginador y las exportaciones: count(), len(), slices
+    e iteración. Las archivadas son instancias de Actividad sin guardar.
+    """
+
+    def __init__(self, actividades, frontera, filtro):
+        actividades = actividades.select_related("usuario").order_by("-fecha_hora", "-id")
+        self.recientes = actividades.filter(fecha_hora__gte=frontera)
+        # Actividades de meses archivados que llegaron después de archivarlos.
+        self.rezagadas = actividades.filter(fecha_hora__lt=frontera)
+        self.filtro = filtro
+        self._cantidades = {}
+        self._lista_archivos = None
+        self._usuarios = {}
+
+    def _cantidad_recientes(self):
+        if "recientes" not in self._cantidades:
+            self._cantidades["recientes"] = self.recientes.count()
+        return self._cantidades["recientes"]
+
+    def _cantidad_rezagadas(self):
+        if "rezagadas" not in self._cantidades:
+            self._cantidades["rezagadas"] = self.rezagadas.count()
+        return self._cantidades["rezagadas"]
+
+    def _archivos(self):
+        if self._lista_archivos is None:
+            self._lista_archivos = list(self.filtro.archivos())
+        return self._lista_archivos
+
+    def _cantidad_archivo(self, nombre, cantidad):
+        if cantidad is None:
+            clave = ("archivo", nombre)
+            if clave not in self._cantidades:
+                self._cantidades[clave] = sum(1 for _ in self.filtro.filas(nombre))
+            cantidad = self._cantidades[clave]
+        return cantidad
+
+    def count(self):
+        return (
+            self._cantidad_recientes()
+            + self._cantidad_rezagadas()
+            + sum(self._cantidad_archivo(nombre, cantidad) for nombre, cantidad in self._archivos())
+        )
+
+    def __len__(self):
+        return self.count()
+
+    def _viejas(self, saltear=0):
+        """Actividades anteriores a la frontera, salteando las primeras `saltear`."""
+        archivos = self._archivos()
+        if not self._cantidad_rezagadas():
+            # Sin rezagadas se pueden saltear archivos enteros con el índice.
+            while archivos and archivos[0][1] is not None and saltear >= archivos[0][1]:
+                saltear -= archivos[0][1]
+                archivos = archivos[1:]
+            archivadas = chain.from_iterable(self.filtro.filas(nombre) for nombre, _ in archivos)
+            return islice(map(_actividad, archivadas), saltear, None)
+
+        archivadas = map(
+            _actividad, chain.from_iterable(self.filtro.filas(nombre) for nombre, _ in archivos)
+        )
+        mezcla = heapq.merge(
+            self.rezagadas.iterator(chunk_size=2000),
+            archivadas,
+            key=lambda actividad: (actividad.fecha_hora, actividad.pk),
+            reverse=True,
+        )
+        return islice(mezcla, saltear, None)
+
+    def _con_usuarios(self, actividades):
+        faltan = {
+            a.usuario_id
+            for a in actividades
+            if a.usuario_id and a.usuario_id not in self._usuarios and a._state.adding
+        }
+        if faltan:
+            self._usuarios.update(User.objects.in_bulk(faltan))
+        for actividad in actividades:
+            if actividad._state.adding and actividad.usuario_id:
+                # Si el usuario se borró después de archivar, queda anónima
+                # como en la tabla.
+                actividad.usuario = self._usuarios.get(actividad.usuario_id)
+        return actividades
+
+    def __getitem__(self, indice):
+        if not isinstance(indice, slice):
+            resultado = self[indice : indice + 1]
+            if not resultado:
+                raise IndexError(indice)
+            return resultado[0]
+        if indice.step not in (None, 1) or (indice.start or 0) < 0 or (indice.stop or 0) < 0:
+            raise ValueError("Sólo se admiten slices positivos sin paso.")
+        inicio, fin = indice.start or 0, indice.stop
+        recientes = self._cantidad_recientes()
+        resultado = []
+        if inicio < recientes:
+            resultado = list(self.recientes[inicio : recientes if fin is None else min(fin, recientes)])
+        if fin is None or fin > recientes:
+            desde = max(inicio, recientes)
+            resultado.extend(islice(self._viejas(desde - recientes), None if fin is None else fin - desde))
+        return self._con_usuarios(resultado)
+
+    def iterator(self, chunk_size=2000):
+        yield from self.recientes.iterator(chunk_size=chunk_size)
+        viejas = self._viejas()
+        while lote := list(islice(viejas, chunk_size)):
+            yield from self._con_usuarios(lote)
+
+    def __iter__(self):
+        return self.iterator()
+
+
+def actividades_con_archivo(actividades, usuario=None, tipo=None, desde=None, hasta=None):
+    """
+    Agrega las actividades archivadas a `actividades` (la consulta de la tabla
+    ya filtrada por `usuario` (username), `tipo` y las fechas `desde`/`hasta`)
+    cuando `desde` es anterior a la frontera del archivo. Si no, devuelve la
+    consulta sin cambios.
+    """
+    if not desde:
+        return actividades
+    frontera = frontera_archivo()
+    if frontera is None or desde >= frontera:
+        return actividades
+    usuarios_ids = None
+    if usuario:
+        usuarios_ids = User.objects.filter(username=usuario).values_list("pk", flat=True)
+    return ActividadesConArchivo(actividades, frontera, _Filtro(usuarios_ids, tipo, desde, hasta))
@@ -0,0 +1,58 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+
+CLAVE_VERSION = "estadisticas:version"
+# Parámetros de /estadisticas/ y /api/estadisticas/ que cambian el resultado.
+PARAMETROS = (
+    "usuario",
+    "desde",
+    "hasta",
+    "clas_desde",
+    "clas_hasta",
+    "redac_desde",
+    "redac_hasta",
+    "info_desde",
+    "info_hasta",
+)
+
+
+def _cache():
+    return caches[settings.ESTADISTICAS_CACHE_ALIAS]
+
+
+def version_estadisticas():
+    cache = _cache()
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        cache.add(CLAVE_VERSION, time.time_ns(), None)
+        version = cache.get(CLAVE_VERSION)
+    return version
+
+
+def invalidar_estadisticas():
+    """Descarta todas las estadísticas guardadas (cambia la versión de las claves)."""
+    _cache().set(CLAVE_VERSION, time.time_ns(), None)
+
+
+def estadisticas_en_cache(parametros, calcular):
+    """
+    Devuelve (cuerpo JSON, ETag) de las estadísticas para los filtros de
+    `parametros`. Si no están guardadas para la versión vigente se arman con
+    `calcular()`.
+    """
+    filtros = json.dumps({nombre: parametros.get(nombre) or "" for nombre in PARAMETROS}, sort_keys=True)
+    clave = "estadisticas:{}:{}".format(
+        version_estadisticas(), hashlib.sha256(filtros.encode()).hexdigest()
+    )
+    cache = _cache()
+    entrada = cache.get(clave)
+    if entrada is None:
+        cuerpo = json.dumps(calcular(), cls=DjangoJSONEncoder)
+        entrada = (cuerpo, '"{}"'.format(hashlib.sha256(cuerpo.encode()).hexdigest()[:32]))
+        cache.set(clave, entrada, settings.ESTADISTICAS_CACHE_TTL)
+    return entrada
@@ -0,0 +1,184 @@
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from app.models import ItemTrabajoIA, LinkRelevante, TrabajoIA
+from app.services.ia import ClasificadorIAConcurrente, guardar_resultados
+
+logger = logging.getLogger(__name__)
+
+
+def encolar_links(link_ids, usuario=None):
+    """
+    Crea un TrabajoIA con un item por cada link existente.
+
+    Devuelve la tupla (trabajo, errores), donde errores mapea str(link_id) al
+    motivo por el que el ID no pudo encolarse.
+    """
+    errores = {}
+    ids_validos = []
+    for link_id in link_ids:
+        try:
+            pk = int(link_id)
+        except (TypeError, ValueError):
+            errores[str(link_id)] = "Link no encontrado."
+            continue
+        if pk not in ids_validos:
+            ids_validos.append(pk)
+
+    existentes = set(
+        LinkRelevante.objects.filter(pk__in=ids_validos).values_list("pk", flat=True)
+    )
+    for pk in ids_validos:
+        if pk not in existentes:
+            errores[str(pk)] = "Link no encontrado."
+
+    with transaction.atomic():
+        trabajo = TrabajoIA.objects.create(
+            creado_por=usuario if usuario and usuario.is_authenticated else None
+        )
+        ItemTrabajoIA.objects.bulk_create(
+            [
+                ItemTrabajoIA(trabajo=trabajo, link_id=pk)
+                for pk in ids_validos
+                if pk in existentes
+            ]
+        )
+    if not existentes:
+        _actualizar_trabajos([trabajo.pk])
+        trabajo.refresh_from_db()
+    return trabajo, errores
+
+
+def reservar_items(worker_id, limite):
+    """
+    Reserva hasta `limite` items para el worker indicado.
+
+    Se toman los items pendientes y los que quedaron en proceso con una
+    reserva vencida (por ejemplo, porque el worker se reinició). La reserva
+    es un UPDATE condicionado al estado, por lo que dos workers nunca toman
+    el mismo item.
+    """
+    ahora = timezone.now()
+    vencimiento = ahora - timedelta(seconds=settings.IA_COLA_TIEMPO_RESERVA)
+    reserva_vencida = Q(
+        estado=ItemTrabajoIA.Estado.EN_PROCESO, fecha_reserva__lt=vencimiento
+    )
+
+    agotados = ItemTrabajoIA.objects.filter(
+        reserva_vencida, intentos__gte=settings.IA_COLA_MAX_INTENTOS
+    )
+    trabajos_agotados = set(agotados.values_list("trabajo_id", flat=True))
+    if trabajos_agotados:
+        agotados.update(
+            estado=ItemTrabajoIA.Estado.ERROR,
+            mensaje="Se agotaron los reintentos para clasificar el link.",
+            fecha_procesado=ahora,
+        )
+        _actualizar_trabajos(trabajos_agotados)
+
+    disponibles = Q(estado=ItemTrabajoIA.Estado.PENDIENTE) | reserva_vencida
+    ids = list(
+        ItemTrabajoIA.objects.filter(disponibles)
+        .order_by("id")
+        .values_list("id", flat=True)[:limite]
+    )
+    if not ids:
+        return []
+
+    token = f"{worker_id}:{uuid.uuid4().hex[:12]}"[-64:]
+    ItemTrabajoIA.objects.filter(disponibles, pk__in=ids).update(
+        estado=ItemTrabajoIA.Estado.EN_PROCESO,
+        reservado_por=token,
+        fecha_reserva=ahora,
+        intentos=F("intentos") + 1,
+    )
+    items = list(
+        ItemTrabajoIA.objects.filter(
+            reservado_por=token, estado=ItemTrabajoIA.Estado.EN_PROCESO
+        ).select_related("link")
+    )
+    TrabajoIA.objects.filter(
+        pk__in={item.trabajo_id for item in items},
+        estado=TrabajoIA.Estado.PENDIENTE,
+    ).update(estado=TrabajoIA.Estado.EN_PROCESO, fecha_inicio=ahora)
+    return items
+
+
+def procesar_items(items, processor):
+    """Clasifica los items reservados y registra el resultado de cada uno."""
+    links = {item.link_id: item.link for item in items}
+    clasificador = ClasificadorIAConcurrente(processor=processor)
+    resultados = clasificador.ejecutar((pk, link.url) for pk, link in links.items())
+
+    ahora = timezone.now()
+    with transaction.atomic():
+        mensajes = guardar_resultados(links.values(), resultados)
+        for item in items:
+            resultado = resultados.get(item.link_id)
+            if resultado is None:
+                estado = ItemTrabajoIA.Estado.ERROR
+                mensaje = "No se obtuvo resultado de la IA."
+            else:
+                estado = (
+                    ItemTrabajoIA.Estado.ERROR
+                    if resultado.error
+                    else ItemTrabajoIA.Estado.PROCESADO
+                )
+                mensaje = mensajes.get(item.link_id, "")
+            actualizados = ItemTrabajoIA.objects.filter(
+                pk=item.pk, reservado_por=item.reservado_por
+            ).update(
+                estado=estado,
+                mensaje=mensaje,
+                fecha_procesado=ahora,
+            )
+            if not actualizados:
+                logger.warning(
+                    "El item %s fue reservado por otro worker antes de finalizar.",
+                    item.pk,
+                )
+        _actualizar_trabajos({item.trabajo_id for item in items})
+
+
+def _actualizar_trabajos(trabajo_ids):
+    en_curso = set(
+        ItemTrabajoIA.objects.filter(
+            trabajo_id__in=trabajo_ids,
+            estado__in=[ItemTrabajoIA.Estado.PENDIENTE, ItemTrabajoIA.Estado.EN_PROCESO],
+        ).values_list("trabajo_id", flat=True)
+    )
+    terminados = set(trabajo_ids) - en_curso
+    if terminados:
+        TrabajoIA.objects.filter(pk__in=terminados).exclude(
+            estado=TrabajoIA.Estado.COMPLETADO
+        ).update(estado=TrabajoIA.Estado.COMPLETADO, fecha_fin=timezone.now())
+
+
+def progreso_trabajo(trabajo):
+    """Resume el avance de un trabajo con el formato que consume el panel."""
+    procesados = []
+    errores = {}
+    pendientes = 0
+    items = trabajo.items.values_list("link_id", "estado", "mensaje")
+    for link_id, estado, mensaje in items:
+        if estado == ItemTrabajoIA.Estado.PROCESADO:
+            procesados.append(link_id)
+        elif estado in (ItemTrabajoIA.Estado.PENDIENTE, ItemTrabajoIA.Estado.EN_PROCESO):
+            pendientes += 1
+        if mensaje:
+            errores[str(link_id)] = mensaje
+    return {
+        "trabajo_id": trabajo.pk,
+        "estado": trabajo.estado,
+        "total": len(items),
+        "pendientes": pendientes,
+        "procesados": procesados,
+        "errores": errores,
+        "finalizado": trabajo.estado == TrabajoIA.Estado.COMPLETADO,
+    }
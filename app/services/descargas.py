@@ -0,0 +1,143 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.models import DiarioDigital
+from app.utils.dominios import dominio, sufijos_dominio
+
+
+class LimiteDominio:
+    """Concurrencia máxima y espaciado mínimo entre pedidos a un dominio."""
+
+    def __init__(self, simultaneas, por_minuto):
+        self.simultaneas = max(1, simultaneas)
+        self.por_minuto = por_minuto
+        self._semaforo = threading.BoundedSemaphore(self.simultaneas)
+        self._lock = threading.Lock()
+        self._proximo = 0.0
+
+    @contextmanager
+    def turno(self):
+        with self._semaforo:
+            if self.por_minuto:
+                with self._lock:
+                    ahora = time.monotonic()
+                    espera = self._proximo - ahora
+                    self._proximo = max(ahora, self._proximo) + 60.0 / self.por_minuto
+                if espera > 0:
+                    time.sleep(espera)
+            yield
+
+
+class ClienteHTTP:
+    """
+    Capa compartida para descargar artículos.
+
+    Reutiliza conexiones keep-alive por host con una única sesión de requests,
+    reintenta con backoff exponencial ante 429 y 5xx (respetando Retry-After)
+    y limita la concurrencia y el ritmo de pedidos por dominio. Los límites de
+    cada diario salen de DiarioDigital (dominio de url_principal); el resto de
+    los dominios usa los valores por defecto de settings.
+    """
+
+    def __init__(self, limites=None):
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = settings.IA_DESCARGA_USER_AGENT
+        reintentos = Retry(
+            total=settings.IA_DESCARGA_REINTENTOS,
+            backoff_factor=settings.IA_DESCARGA_BACKOFF,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adaptador = HTTPAdapter(
+            pool_connections=settings.IA_DESCARGA_HOSTS_EN_POOL,
+            pool_maxsize=settings.IA_MAX_DESCARGAS_CONCURRENTES,
+            max_retries=reintentos,
+        )
+        self.session.mount("http://", adaptador)
+        self.session.mount("https://", adaptador)
+
+        self._lock = threading.Lock()
+        self._limites = {}
+        self._limites_fijos = limites
+        self._configurados = {}
+        self._fecha_configuracion = None
+
+    def _configuracion(self):
+        """Límites por dominio definidos en los diarios, releídos cada tanto."""
+        if self._limites_fijos is not None:
+            return self._limites_fijos
+        ahora = time.monotonic()
+        if self._fecha_configuracion is None or ahora - self._fecha_configuracion > 300:
+            configurados = {}
+            diarios = DiarioDigital.objects.exclude(dominio="").values_list(
+                "dominio", "descargas_simultaneas", "descargas_por_minuto"
+            )
+            for dominio_diario, simultaneas, por_minuto in diarios:
+                if simultaneas is not None or por_minuto is not None:
+                    configurados[dominio_diario] = (simultaneas, por_minuto)
+            if configurados != self._configurados:
+                self._limites = {}
+            self._configurados = configurados
+            self._fecha_configuracion = ahora
+        return self._configurados
+
+    def limite(self, url: str) -> LimiteDominio:
+        host = dominio(url)
+        with self._lock:
+            configurados = self._configuracion()
+            # Los subdominios (m.diario.com, policiales.diario.com) comparten
+            # el límite del diario.
+            clave = next(
+                (candidato for candidato in sufijos_dominio(host)[:-1] if candidato in configurados),
+                host,
+            )
+            if clave not in self._limites:
+                simultaneas, por_minuto = configurados.get(clave, (None, None))
+                if simultaneas is None:
+                    simultaneas = settings.IA_DESCARGA_SIMULTANEAS_POR_DOMINIO
+                if por_minuto is None:
+                    por_minuto = settings.IA_DESCARGA_POR_MINUTO_POR_DOMINIO
+                self._limites[clave] = LimiteDominio(simultaneas, por_minuto)
+            return self._limites[clave]
+
+    @contextmanager
+    def get(self, url: str, etag: str = "", ultima_modificacion: str = ""):
+        """
+        GET en modo stream dentro del turno del dominio. Con `etag` o
+        `ultima_modificacion` el pedido es condicional y el servidor puede
+        responder 304 sin cuerpo.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if ultima_modificacion:
+            headers["If-Modified-Since"] = ultima_modificacion
+        with self.limite(url).turno():
+            with self.session.get(
+                url,
+                headers=headers,
+                timeout=settings.IA_DESCARGA_TIMEOUT,
+                stream=True,
+            ) as resp:
+                yield resp
+
+
+_cliente = None
+_cliente_lock = threading.Lock()
+
+
+def cliente_http() -> ClienteHTTP:
+    """Cliente compartido por todos los hilos del proceso."""
+    global _cliente
+    with _cliente_lock:
+        if _cliente is None:
+            _cliente = ClienteHTTP()
+        return _cliente
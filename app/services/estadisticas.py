@@ -0,0 +1,607 @@
+"""
+Estadísticas diarias del panel de gerencia.
+
+`calcular_estadisticas` agrupa por día, usuario y dimensión las tablas
+originales (links, actividades, artículos, solicitudes, hechos e informes).
+`actualizar_estadisticas` vuelca ese cálculo en EstadisticaDiaria para los
+días cerrados y `sumar_estadisticas` responde cualquier rango sumando esas
+filas; sólo los días que todavía no se volcaron (hoy, los marcados como
+pendientes y los huecos) se calculan en el momento.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import (
+    Count,
+    DateField,
+    DurationField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from app.models import (
+    Actividad,
+    Articulo,
+    DiaEstadisticas,
+    EstadisticaDiaria,
+    EstadoLink,
+    HechoDelictivo,
+    InformeIndividual,
+    LinkRedSocial,
+    LinkRelevante,
+    SolicitudInfo,
+    TipoActividad,
+)
+from app.services.archivo_actividad import filas_archivadas, primera_fecha_archivada
+from app.utils.fechas import inicio_del_dia, inicio_del_dia_siguiente
+
+Metrica = EstadisticaDiaria.Metrica
+
+# Días que se calculan y vuelcan juntos.
+DIAS_POR_TRAMO = 31
+
+
+def _rango(campo, desde, hasta):
+    filtros = {}
+    if desde:
+        filtros[f"{campo}__gte"] = inicio_del_dia(desde)
+    if hasta:
+        filtros[f"{campo}__lt"] = inicio_del_dia_siguiente(hasta)
+    return filtros
+
+
+def _dia(campo, por_dia=True):
+    # Sin `por_dia` todas las filas caen en el mismo grupo (fecha None): se
+    # evita truncar cada fecha cuando sólo interesa el total del rango.
+    if not por_dia:
+        return Value(None, output_field=DateField())
+    return TruncDate(campo, tzinfo=timezone.get_current_timezone())
+
+
+def _segundos(duracion):
+    return duracion.total_seconds() if duracion is not None else 0.0
+
+
+def _links_diarios(desde, hasta, por_dia=True):
+    links = (
+        LinkRelevante.objects.filter(**_rango("fecha_carga", desde, hasta))
+        .annotate(dia=_dia("fecha_carga", por_dia))
+        .order_by()
+    )
+    for fila in links.values("dia", "cargado_por_id", "diario_digital_id").annotate(
+        cantidad=Count("id")
+    ):
+        yield (
+            fila["dia"],
+            fila["cargado_por_id"],
+            Metrica.LINKS_DIARIO,
+            fila["diario_digital_id"],
+            fila["cantidad"],
+            0.0,
+        )
+    for fila in links.values("dia", "cargado_por_id").annotate(
+        aprobados=Count("id", filter=Q(estado=EstadoLink.APROBADO)),
+        rechazados=Count("id", filter=Q(estado=EstadoLink.DESCARTADO)),
+    ):
+        if fila["aprobados"]:
+            yield (
+                fila["dia"],
+                fila["cargado_por_id"],
+                Metrica.LINKS_APROBADOS,
+                None,
+                fila["aprobados"],
+                0.0,
+            )
+        if fila["rechazados"]:
+            yield (
+                fila["dia"],
+                fila["cargado_por_id"],
+                Metrica.LINKS_RECHAZADOS,
+                None,
+                fila["rechazados"],
+                0.0,
+            )
+
+
+def _links_redes(desde, hasta, por_dia=True):
+    redes = (
+        LinkRedSocial.objects.filter(**_rango("fecha_carga", desde, hasta))
+        .annotate(dia=_dia("fecha_carga", por_dia))
+        .order_by()
+    )
+    for fila in redes.values("dia", "cargado_por_id", "red_social_id").annotate(
+        cantidad=Count("id")
+    ):
+        yield (
+            fila["dia"],
+            fila["cargado_por_id"],
+            Metrica.LINKS_RED_SOCIAL,
+            fila["red_social_id"],
+            fila["cantidad"],
+            0.0,
+        )
+
+
+def _clasificacion(desde, hasta, por_dia=True):
+    # Decisiones (aprobado/descartado) sobre links de diarios que todavía existen.
+    # Siempre se agrupa por día: los links distintos se cuentan por día, igual
+    # que en EstadisticaDiaria.
+    link_evento = LinkRelevante.objects.filter(pk=OuterRef("objeto_id"))
+    decisiones = (
+        Actividad.objects.filter(
+            usuario__isnull=False,
+            tipo=TipoActividad.CAMBIO_ESTADO,
+            objeto_tipo=LinkRelevante._meta.model_name,
+            estado_nuevo__in=[EstadoLink.APROBADO, EstadoLink.DESCARTADO],
+            **_rango("fecha_hora", desde, hasta),
+        )
+        .filter(Exists(link_evento))
+        .annotate(dia=_dia("fecha_hora"))
+        .order_by()
+    )
+
+    metricas = {
+        EstadoLink.APROBADO: Metrica.DECISIONES_APROBADAS,
+        EstadoLink.DESCARTADO: Metrica.DECISIONES_RECHAZADAS,
+    }
+    por_estado = (
+        decisiones.annotate(
+            demora=ExpressionWrapper(
+                F("fecha_hora") - Subquery(link_evento.values("fecha_carga")[:1]),
+                output_field=DurationField(),
+            )
+        )
+        .values("dia", "usuario_id", "estado_nuevo")
+        .annotate(cantidad=Count("id"), demora_total=Sum("demora"))
+    )
+    for fila in por_estado:
+        yield (
+            fila["dia"],
+            fila["usuario_id"],
+            metricas[fila["estado_nuevo"]],
+            None,
+            fila["cantidad"],
+            _segundos(fila["demora_total"]),
+        )
+
+    for fila in decisiones.values("dia", "usuario_id").annotate(
+        cantidad=Count("objeto_id", distinct=True)
+    ):
+        yield (fila["dia"], fila["usuario_id"], Metrica.LINKS_CLASIFICADOS, None, fila["cantidad"], 0.0)
+
+    # Cada link distinto clasificado en el día suma una vez cada una de sus
+    # categorías.
+    links_del_dia = defaultdict(set)
+    for dia, usuario_id, link_id in decisiones.values_list("dia", "usuario_id", "objeto_id").distinct():
+        links_del_dia[link_id].add((dia, usuario_id))
+    if links_del_dia:
+        yield from _categorias_clasificadas(
+            links_del_dia,
+            LinkRelevante.categorias.through.objects.filter(
+                linkrelevante_id__in=decisiones.values("objeto_id")
+            ).values_list("linkrelevante_id", "categoria_id"),
+        )
+
+    yield from _clasificacion_archivada(desde, hasta, metricas)
+
+
+def _categorias_clasificadas(links_del_dia, categorias_de_links):
+    categorias = defaultdict(int)
+    for link_id, categoria_id in categorias_de_links:
+        for dia, usuario_id in links_del_dia.get(link_id, ()):
+            categorias[(dia, usuario_id, categoria_id)] += 1
+    for (dia, usuario_id, categoria_id), cantidad in categorias.items():
+        yield (dia, usuario_id, Metrica.CATEGORIAS_CLASIFICADAS, categoria_id, cantidad, 0.0)
+
+
+def _clasificacion_archivada(desde, hasta, metricas):
+    # Las decisiones de los meses archivados (services/archivo_actividad) se
+    # agrupan acá de a lotes, con los mismos criterios que la consulta sobre
+    # la tabla.
+    filas = filas_archivadas(
+        tipo=TipoActividad.CAMBIO_ESTADO,
+        desde=inicio_del_dia(desde) if desde else None,
+        hasta=inicio_del_dia_siguiente(hasta) if hasta else None,
+    )
+    decisiones = (
+        fila
+        for fila in filas
+        if fila["usuario_id"]
+        and fila["objeto_tipo"] == LinkRelevante._meta.model_name
+        and fila["estado_nuevo"] in metricas
+    )
+    por_estado = defaultdict(lambda: [0, 0.0])
+    links_del_dia = defaultdict(set)
+    categorias_de_links = []
+    while lote := list(islice(decisiones, 2000)):
+        links_ids = {fila["objeto_id"] for fila in lote}
+        cargas = dict(LinkRelevante.objects.filter(pk__in=links_ids).values_list("pk", "fecha_carga"))
+        links_nuevos = set(cargas) - set(links_del_dia)
+        categorias_de_links += LinkRelevante.categorias.through.objects.filter(
+            linkrelevante_id__in=links_nuevos
+        ).values_list("linkrelevante_id", "categoria_id")
+        for fila in lote:
+            carga = cargas.get(fila["objeto_id"])
+            if carga is None:
+                continue  # el link ya no existe
+            fecha_hora = datetime.fromisoformat(fila["fecha_hora"])
+            dia = timezone.localdate(fecha_hora)
+            total = por_estado[(dia, fila["usuario_id"], metricas[fila["estado_nuevo"]])]
+            total[0] += 1
+            total[1] += _segundos(fecha_hora - carga)
+            links_del_dia[fila["objeto_id"]].add((dia, fila["usuario_id"]))
+
+    for (dia, usuario_id, metrica), (cantidad, suma) in por_estado.items():
+        yield (dia, usuario_id, metrica, None, cantidad, suma)
+    clasificados = defaultdict(int)
+    for dias in links_del_dia.values():
+        for dia_usuario in dias:
+            clasificados[dia_usuario] += 1
+    for (dia, usuario_id), cantidad in clasificados.items():
+        yield (dia, usuario_id, Metrica.LINKS_CLASIFICADOS, None, cantidad, 0.0)
+    yield from _categorias_clasificadas(links_del_dia, categorias_de_links)
+
+
+def _articulos(desde, hasta, por_dia=True):
+    articulos = (
+        Articulo.objects.filter(**_rango("fecha_creacion", desde, hasta))
+        .annotate(dia=_dia("fecha_creacion", por_dia))
+        .order_by()
+    )
+    for fila in articulos.values("dia", "generado_por_id").annotate(cantidad=Count("id")):
+        yield (fila["dia"], fila["generado_por_id"], Metrica.ARTICULOS, None, fila["cantidad"], 0.0)
+
+    # Demora entre la aprobación de cada link y la creación del artículo que
+    # lo incluye; no cuentan los links sin aprobación o aprobados después.
+    con_demora = Q(linkrelevante__fecha_aprobacion__lte=F("articulo__fecha_creacion"))
+    incluidos = (
+        Articulo.links_incluidos.through.objects.filter(
+            **_rango("articulo__fecha_creacion", desde, hasta)
+        )
+        .annotate(
+            dia=_dia("articulo__fecha_creacion", por_dia),
+            demora=ExpressionWrapper(
+                F("articulo__fecha_creacion") - F("linkrelevante__fecha_aprobacion"),
+                output_field=DurationField(),
+            ),
+        )
+        .order_by()
+        .values("dia", "articulo__generado_por_id")
+        .annotate(
+            links=Count("id"),
+            medidos=Count("id", filter=con_demora),
+            demora_total=Sum("demora", filter=con_demora),
+        )
+    )
+    for fila in incluidos:
+        usuario_id = fila["articulo__generado_por_id"]
+        yield (fila["dia"], usuario_id, Metrica.LINKS_ARTICULOS, None, fila["links"], 0.0)
+        if fila["medidos"]:
+            yield (
+                fila["dia"],
+                usuario_id,
+                Metrica.DEMORA_ARTICULOS,
+                None,
+                fila["medidos"],
+                _segundos(fila["demora_total"]),
+            )
+
+
+def _solicitudes(desde, hasta, por_dia=True):
+    solicitudes = (
+        SolicitudInfo.objects.filter(**_rango("fecha_creacion", desde, hasta))
+        .annotate(dia=_dia("fecha_creacion", por_dia))
+        .order_by()
+        .values("dia", "usuario_creador_id")
+        .annotate(cantidad=Count("id"))
+    )
+    for fila in solicitudes:
+        yield (fila["dia"], fila["usuario_creador_id"], Metrica.SOLICITUDES, None, fila["cantidad"], 0.0)
+
+
+def _hechos(desde, hasta, por_dia=True):
+    # Los hechos se cuentan por la fecha en que ocurrieron.
+    hechos = HechoDelictivo.objects.filter(creado_por__isnull=False)
+    if desde:
+        hechos = hechos.filter(fecha__gte=desde)
+    if hasta:
+        hechos = hechos.filter(fecha__lte=hasta)
+    hechos = hechos.annotate(dia=F("fecha") if por_dia else _dia("fecha", False)).order_by()
+    for fila in hechos.values("dia", "creado_por_id").annotate(cantidad=Count("id")):
+        yield (fila["dia"], fila["creado_por_id"], Metrica.HECHOS, None, fila["cantidad"], 0.0)
+
+
+def _informes(desde, hasta, por_dia=True):
+    informes = (
+        InformeIndividual.objects.filter(
+            generado_por__isnull=False, **_rango("fecha_creacion", desde, hasta)
+        )
+        .annotate(dia=_dia("fecha_creacion", por_dia))
+        .order_by()
+    )
+    for fila in informes.values("dia", "generado_por_id").annotate(cantidad=Count("id")):
+        yield (fila["dia"], fila["generado_por_id"], Metrica.INFORMES, None, fila["cantidad"], 0.0)
+
+    vinculos = (
+        InformeIndividual.articulos.through.objects.filter(
+            informeindividual__generado_por__isnull=False,
+            **_rango("informeindividual__fecha_creacion", desde, hasta),
+        )
+        .annotate(dia=_dia("informeindividual__fecha_creacion", por_dia))
+        .order_by()
+    )
+    for fila in vinculos.values("dia", "informeindividual__generado_por_id").annotate(
+        cantidad=Count("id")
+    ):
+        yield (
+            fila["dia"],
+            fila["informeindividual__generado_por_id"],
+            Metrica.ARTICULOS_INFORMES,
+            None,
+            fila["cantidad"],
+            0.0,
+        )
+
+    # Cada informe cuenta una vez por categoría de sus artículos; los
+    # artículos sin categoría y los informes sin artículos van a "Sin
+    # categoría" (dimensión vacía).
+    for fila in vinculos.values(
+        "dia", "informeindividual__generado_por_id", "articulo__categoria_id"
+    ).annotate(cantidad=Count("informeindividual_id", distinct=True)):
+        yield (
+            fila["dia"],
+            fila["informeindividual__generado_por_id"],
+            Metrica.CATEGORIAS_INFORMES,
+            fila["articulo__categoria_id"],
+            fila["cantidad"],
+            0.0,
+        )
+    for fila in (
+        informes.filter(articulos__isnull=True)
+        .values("dia", "generado_por_id")
+        .annotate(cantidad=Count("id"))
+    ):
+        yield (
+            fila["dia"],
+            fila["generado_por_id"],
+            Metrica.CATEGORIAS_INFORMES,
+            None,
+            fila["cantidad"],
+            0.0,
+        )
+
+
+FUENTES = (
+    (_links_diarios, {Metrica.LINKS_DIARIO, Metrica.LINKS_APROBADOS, Metrica.LINKS_RECHAZADOS}),
+    (_links_redes, {Metrica.LINKS_RED_SOCIAL}),
+    (
+        _clasificacion,
+        {
+            Metrica.DECISIONES_APROBADAS,
+            Metrica.DECISIONES_RECHAZADAS,
+            Metrica.LINKS_CLASIFICADOS,
+            Metrica.CATEGORIAS_CLASIFICADAS,
+        },
+    ),
+    (_articulos, {Metrica.ARTICULOS, Metrica.LINKS_ARTICULOS, Metrica.DEMORA_ARTICULOS}),
+    (_solicitudes, {Metrica.SOLICITUDES}),
+    (_hechos, {Metrica.HECHOS}),
+    (
+        _informes,
+        {Metrica.INFORMES, Metrica.ARTICULOS_INFORMES, Metrica.CATEGORIAS_INFORMES},
+    ),
+)
+
+METRICAS_PRENSA = {
+    Metrica.LINKS_DIARIO,
+    Metrica.LINKS_APROBADOS,
+    Metrica.LINKS_RECHAZADOS,
+    Metrica.LINKS_RED_SOCIAL,
+}
+METRICAS_CLASIFICACION = FUENTES[2][1]
+METRICAS_REDACCION = FUENTES[3][1] | {Metrica.SOLICITUDES, Metrica.HECHOS}
+METRICAS_INFORMES = FUENTES[6][1]
+
+
+def calcular_estadisticas(desde=None, hasta=None, metricas=None, por_dia=True):
+    """
+    Totales por día de las tablas originales entre `desde` y `hasta`
+    (fechas incluidas; None deja el extremo abierto). Devuelve tuplas
+    (fecha, usuario_id, metrica, dimension_id, cantidad, suma). Con
+    `por_dia=False` las fuentes que lo admiten devuelven el total del rango
+    con fecha None.
+    """
+    for fuente, metricas_fuente in FUENTES:
+        if metricas is not None and not metricas_fuente & set(metricas):
+            continue
+        for fila in fuente(desde, hasta, por_dia):
+            if metricas is None or fila[2] in metricas:
+                yield fila
+
+
+def _tramos_sin_volcar(desde, hasta):
+    """Rangos de días entre `desde` y `hasta` que no están en EstadisticaDiaria."""
+    dias = DiaEstadisticas.objects.filter(pendiente=False)
+    if desde:
+        dias = dias.filter(fecha__gte=desde)
+    if hasta:
+        dias = dias.filter(fecha__lte=hasta)
+    tramos = []
+    inicio = desde
+    for dia in dias.order_by("fecha").values_list("fecha", flat=True):
+        if inicio is None or dia > inicio:
+            tramos.append((inicio, dia - timedelta(days=1)))
+        inicio = dia + timedelta(days=1)
+    if hasta is None or inicio is None or inicio <= hasta:
+        tramos.append((inicio, hasta))
+    return tramos
+
+
+def _totales_vacios():
+    return defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: [0, 0.0])))
+
+
+def sumar_estadisticas(metricas, desde=None, hasta=None, usuarios_ids=None):
+    """
+    Totales del rango por usuario, métrica y dimensión:
+    `totales[usuario_id][metrica][dimension_id] == [cantidad, suma]`.
+    """
+    metricas = set(metricas)
+    usuarios = set(usuarios_ids) if usuarios_ids is not None else None
+    totales = _totales_vacios()
+
+    volcadas = EstadisticaDiaria.objects.filter(metrica__in=metricas).exclude(
+        fecha__in=DiaEstadisticas.objects.filter(pendiente=True).values("fecha")
+    )
+    if desde:
+        volcadas = volcadas.filter(fecha__gte=desde)
+    if hasta:
+        volcadas = volcadas.filter(fecha__lte=hasta)
+    if usuarios is not None:
+        volcadas = volcadas.filter(usuario_id__in=usuarios)
+    for fila in volcadas.values("usuario_id", "metrica", "dimension_id").annotate(
+        total_cantidad=Sum("cantidad"), total_suma=Sum("suma")
+    ):
+        total = totales[fila["usuario_id"]][fila["metrica"]][fila["dimension_id"]]
+        total[0] += fila["total_cantidad"]
+        total[1] += fila["total_suma"]
+
+    for tramo_desde, tramo_hasta in _tramos_sin_volcar(desde, hasta):
+        for _, usuario_id, metrica, dimension_id, cantidad, suma in calcular_estadisticas(
+            tramo_desde, tramo_hasta, metricas, por_dia=False
+        ):
+            if usuarios is None or usuario_id in usuarios:
+                total = totales[usuario_id][metrica][dimension_id]
+                total[0] += cantidad
+                total[1] += suma
+    return totales
+
+
+def _primer_dia_con_datos():
+    candidatos = [
+        LinkRelevante.objects.aggregate(v=Min("fecha_carga"))["v"],
+        LinkRedSocial.objects.aggregate(v=Min("fecha_carga"))["v"],
+        Actividad.objects.filter(tipo=TipoActividad.CAMBIO_ESTADO).aggregate(v=Min("fecha_hora"))["v"],
+        primera_fecha_archivada(tipo=TipoActividad.CAMBIO_ESTADO),
+        Articulo.objects.aggregate(v=Min("fecha_creacion"))["v"],
+        SolicitudInfo.objects.aggregate(v=Min("fecha_creacion"))["v"],
+        InformeIndividual.objects.aggregate(v=Min("fecha_creacion"))["v"],
+    ]
+    dias = [timezone.localdate(valor) for valor in candidatos if valor]
+    primer_hecho = HechoDelictivo.objects.aggregate(v=Min("fecha"))["v"]
+    if primer_hecho:
+        dias.append(primer_hecho)
+    return min(dias) if dias else None
+
+
+def _dias_a_actualizar(desde, hasta):
+    if desde:
+        dias = set()
+        dia = desde
+        while dia <= hasta:
+            dias.add(dia)
+            dia += timedelta(days=1)
+        return dias
+
+    calculados = set(DiaEstadisticas.objects.values_list("fecha", flat=True))
+    dias = set(
+        DiaEstadisticas.objects.filter(pendiente=True, fecha__lte=hasta).values_list(
+            "fecha", flat=True
+        )
+    )
+    primero = _primer_dia_con_datos()
+    if primero is None:
+        return dias
+    if calculados:
+        primero = min(primero, min(calculados))
+    dia = primero
+    while dia <= hasta:
+        if dia not in calculados:
+            dias.add(dia)
+        dia += timedelta(days=1)
+    return dias
+
+
+def _volcar_tramo(desde, hasta):
+    filas = [
+        EstadisticaDiaria(
+            fecha=fecha,
+            usuario_id=usuario_id,
+            metrica=metrica,
+            dimension_id=dimension_id,
+            cantidad=cantidad,
+            suma=suma,
+        )
+        for fecha, usuario_id, metrica, dimension_id, cantidad, suma in calcular_estadisticas(
+            desde, hasta
+        )
+    ]
+    dias = []
+    dia = desde
+    while dia <= hasta:
+        dias.append(dia)
+        dia += timedelta(days=1)
+    ahora = timezone.now()
+    with transaction.atomic():
+        EstadisticaDiaria.objects.filter(fecha__gte=desde, fecha__lte=hasta).delete()
+        EstadisticaDiaria.objects.bulk_create(filas, batch_size=2000)
+        existentes = set(
+            DiaEstadisticas.objects.filter(fecha__in=dias).values_list("fecha", flat=True)
+        )
+        DiaEstadisticas.objects.filter(fecha__in=existentes).update(fecha_calculo=ahora)
+        DiaEstadisticas.objects.bulk_create(
+            [DiaEstadisticas(fecha=dia, fecha_calculo=ahora) for dia in dias if dia not in existentes]
+        )
+    return len(filas)
+
+
+def actualizar_estadisticas(desde=None, hasta=None):
+    """
+    Vuelca en EstadisticaDiaria los días cerrados (hasta ayer) que faltan o
+    quedaron pendientes. Con `desde` recalcula todos los días del rango.
+    Devuelve la cantidad de días y de filas escritas.
+    """
+    ayer = timezone.localdate() - timedelta(days=1)
+    hasta = min(hasta, ayer) if hasta else ayer
+    dias = sorted(_dias_a_actualizar(desde, hasta))
+    if not dias:
+        return 0, 0
+
+    # Se desmarcan antes de calcular: si algo cambia mientras tanto, el día
+    # vuelve a quedar pendiente para la próxima vuelta.
+    DiaEstadisticas.objects.filter(fecha__in=dias, pendiente=True).update(pendiente=False)
+
+    filas = 0
+    inicio = anterior = dias[0]
+    for dia in dias[1:] + [None]:
+        contiguo = dia is not None and dia - anterior == timedelta(days=1)
+        if contiguo and (dia - inicio).days < DIAS_POR_TRAMO:
+            anterior = dia
+            continue
+        filas += _volcar_tramo(inicio, anterior)
+        inicio = anterior = dia
+    return len(dias), filas
+
+
+def marcar_dias_pendientes(fechas):
+    """
+    Marca para recalcular los días ya volcados afectados por un cambio en las
+    tablas originales. Los días de hoy en adelante siempre se calculan en el
+    momento, así que no hace falta marcarlos.
+    """
+    hoy = timezone.localdate()
+    dias = {fecha for fecha in fechas if fecha and fecha < hoy}
+    if dias:
+        DiaEstadisticas.objects.filter(fecha__in=dias, pendiente=False).update(pendiente=True)
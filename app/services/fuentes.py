@@ -0,0 +1,106 @@
+"""
+Asignación de la fuente (diario, red social, TV o radio digital) de un link a
+partir del dominio de su URL.
+
+Cada modelo de fuente guarda el dominio normalizado de su `url_principal` en la
+columna `dominio`. Con esos valores se arma, una vez por proceso, un árbol de
+etiquetas invertidas (ar -> com -> lavoz) y cada URL se resuelve recorriendo
+las etiquetas de su host: el costo depende de la cantidad de etiquetas y no de
+la cantidad de fuentes. Si hay fuentes para un dominio y para un subdominio,
+gana la más específica.
+
+Las señales de guardado y borrado descartan el índice del proceso; los demás
+procesos lo vuelven a leer a los FUENTES_INDICE_TTL segundos.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+from app.utils.dominios import dominio
+
+_FUENTE = object()  # clave del nodo donde se guarda el id de la fuente
+
+
+class IndiceDominios:
+    def __init__(self, fuentes):
+        """`fuentes`: pares (id, dominio normalizado)."""
+        self._raiz = {}
+        for fuente_id, dominio_fuente in fuentes:
+            if not dominio_fuente:
+                continue
+            nodo = self._raiz
+            for etiqueta in reversed(dominio_fuente.split(".")):
+                nodo = nodo.setdefault(etiqueta, {})
+            # Ante dominios repetidos queda la primera fuente, como antes.
+            nodo.setdefault(_FUENTE, fuente_id)
+
+    def resolver_host(self, host):
+        """Id de la fuente más específica para `host`, o None."""
+        encontrada = None
+        nodo = self._raiz
+        for etiqueta in reversed(host.split(".")) if host else ():
+            nodo = nodo.get(etiqueta)
+            if nodo is None:
+                break
+            encontrada = nodo.get(_FUENTE, encontrada)
+        return encontrada
+
+
+_indices = {}
+_lock = threading.Lock()
+
+
+def _indice(modelo):
+    with _lock:
+        indice, fecha = _indices.get(modelo, (None, None))
+        if indice is None or time.monotonic() - fecha > settings.FUENTES_INDICE_TTL:
+            indice = IndiceDominios(
+                modelo.objects.exclude(dominio="").order_by(*modelo._meta.ordering, "pk").values_list(
+                    "pk", "dominio"
+                )
+            )
+            _indices[modelo] = (indice, time.monotonic())
+        return indice
+
+
+def _indice_dominios():
+    """Índice de todas las fuentes que devuelve el dominio registrado en lugar del id."""
+    from app.models import FuenteConDominio
+
+    with _lock:
+        indice, fecha = _indices.get(FuenteConDominio, (None, None))
+        if indice is None or time.monotonic() - fecha > settings.FUENTES_INDICE_TTL:
+            dominios = set()
+            for modelo in FuenteConDominio.__subclasses__():
+                dominios.update(modelo.objects.exclude(dominio="").values_list("dominio", flat=True))
+            indice = IndiceDominios((dominio_fuente, dominio_fuente) for dominio_fuente in sorted(dominios))
+            _indices[FuenteConDominio] = (indice, time.monotonic())
+        return indice
+
+
+def invalidar_indice(modelo):
+    from app.models import FuenteConDominio
+
+    with _lock:
+        _indices.pop(modelo, None)
+        _indices.pop(FuenteConDominio, None)
+
+
+def dominio_fuente(url):
+    """Dominio de la fuente (de cualquier tipo) que corresponde a `url`, o None."""
+    return _indice_dominios().resolver_host(dominio(url))
+
+
+def resolver_fuente_id(modelo, url):
+    """Id de la fuente de `modelo` que corresponde a `url`, o None."""
+    return _indice(modelo).resolver_host(dominio(url))
+
+
+def resolver_fuente(modelo, url):
+    """Instancia de `modelo` que corresponde a `url`, o None."""
+    fuente_id = resolver_fuente_id(modelo, url)
+    if fuente_id is None:
+        return None
+    return modelo.objects.filter(pk=fuente_id).first()
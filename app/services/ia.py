@@ -1,14 +1,29 @@
+import hashlib
 import json
 import logging
 import os
-from dataclasses import dataclass
-from typing import List
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import requests
-from bs4 import BeautifulSoup
 from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
 
-from app.models import Categoria
+from app.models import Categoria, EstadoLink
+from app.services.descargas import cliente_http
+from app.services.fuentes import dominio_fuente
+from app.services.metricas import (
+    IA_DESCARGA_SEGUNDOS,
+    IA_FALLOS,
+    IA_LLM_SEGUNDOS,
+    IA_PARSEO_SEGUNDOS,
+    IA_TOKENS,
+)
+from app.utils.html_texto import extraer_texto_html
 
 try:
     from openai import OpenAI
@@ -30,21 +45,84 @@ class AnalisisIA:
     confianza: float
 
 
+@dataclass
+class ResultadoIA:
+    """Resultado de procesar un link: el análisis o el motivo del fallo."""
+
+    link_id: int
+    analisis: Optional[AnalisisIA] = None
+    error: str = ""
+
+
+# Parámetros de seguimiento que no cambian el contenido de la nota.
+PARAMETROS_DESCARTABLES = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref"}
+
+
+def normalizar_url(url: str) -> str:
+    """
+    Lleva una URL a una forma canónica para usarla como clave de caché:
+    esquema y dominio en minúsculas, sin puerto por defecto, sin fragmento,
+    sin parámetros de seguimiento (utm_*, fbclid, ...) y con la query ordenada.
+    """
+    partes = urlsplit(url.strip())
+    esquema = partes.scheme.lower()
+    host = (partes.hostname or "").lower()
+    puerto = partes.port
+    if puerto and (esquema, puerto) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{puerto}"
+    ruta = partes.path or "/"
+    if len(ruta) > 1:
+        ruta = ruta.rstrip("/")
+    query = urlencode(
+        sorted(
+            (clave, valor)
+            for clave, valor in parse_qsl(partes.query, keep_blank_values=True)
+            if not clave.lower().startswith("utm_")
+            and clave.lower() not in PARAMETROS_DESCARTABLES
+        )
+    )
+    return urlunsplit((esquema, host, ruta, query, ""))
+
+
+def _hash(*partes: str) -> str:
+    digest = hashlib.sha256()
+    for parte in partes:
+        digest.update(parte.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
 class LinkAIProcessor:
-    """Orquesta la descarga del artículo y la consulta a la IA."""
+    """
+    Orquesta la descarga del artículo y la consulta a la IA.
 
-    def __init__(self):
-        api_key = settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise IAProcessingError(
-                "No se configuró la variable de entorno OPENAI_API_KEY."
-            )
-        if OpenAI is None:
-            raise IAProcessingError(
-                "La librería openai no está disponible en el entorno."
-            )
-        self.client = OpenAI(api_key=api_key)
-        self.categorias_prompt = self._obtener_categorias_disponibles()
+    El texto extraído se guarda en la caché "ia" por URL normalizada y cada
+    análisis por el hash del texto, el prompt y las categorías, de modo que
+    reclasificar un lote no vuelve a descargar las notas y repetir un lote sin
+    cambios no consume llamadas al modelo.
+    """
+
+    MODELO = "gpt-4o-mini"
+
+    def __init__(self, client=None, categorias=None, usar_cache=True, http=None):
+        if client is None:
+            api_key = settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise IAProcessingError(
+                    "No se configuró la variable de entorno OPENAI_API_KEY."
+                )
+            if OpenAI is None:
+                raise IAProcessingError(
+                    "La librería openai no está disponible en el entorno."
+                )
+            client = OpenAI(api_key=api_key)
+        self.client = client
+        if categorias is None:
+            self.categorias_prompt = self._obtener_categorias_disponibles()
+        else:
+            self.categorias_prompt = ", ".join(categorias) or "General"
+        self.cache = caches[settings.IA_CACHE_ALIAS] if usar_cache else None
+        self.http = http or cliente_http()
 
     def _obtener_categorias_disponibles(self) -> str:
         categorias = list(
@@ -55,35 +133,154 @@ class LinkAIProcessor:
         return ", ".join(categorias)
 
     def extraer_texto(self, url: str) -> str:
+        clave = f"texto:{_hash(normalizar_url(url))}"
+        guardado = self.cache.get(clave) if self.cache is not None else None
+        if not isinstance(guardado, dict):
+            guardado = None
+        if guardado and time.time() - guardado["fecha"] < settings.IA_CACHE_TTL_TEXTO:
+            return guardado["texto"]
+
+        entrada = self._descargar_texto(url, guardado)
+        if self.cache is not None:
+            # La entrada vencida se conserva para revalidarla con un pedido
+            # condicional (ETag / Last-Modified) en lugar de descargarla entera.
+            entrada["fecha"] = time.time()
+            self.cache.set(clave, entrada, settings.IA_CACHE_TTL_ANALISIS)
+        return entrada["texto"]
+
+    def _descargar_texto(self, url: str, anterior: Optional[dict] = None) -> dict:
+        anterior = anterior or {}
+        inicio = time.perf_counter()
         try:
-            resp = requests.get(url, timeout=15)
-            resp.raise_for_status()
+            with self.http.get(
+                url,
+                etag=anterior.get("etag", ""),
+                ultima_modificacion=anterior.get("ultima_modificacion", ""),
+            ) as resp:
+                encabezados = time.perf_counter() - inicio
+                if resp.status_code == 304 and anterior.get("texto"):
+                    IA_DESCARGA_SEGUNDOS.observar(encabezados, dominio=_dominio_metrica(url))
+                    return {
+                        "texto": anterior["texto"],
+                        "etag": resp.headers.get("ETag", anterior.get("etag", "")),
+                        "ultima_modificacion": resp.headers.get(
+                            "Last-Modified", anterior.get("ultima_modificacion", "")
+                        ),
+                    }
+                resp.raise_for_status()
+                # Sin charset explícito requests asume ISO-8859-1 para text/*;
+                # los diarios publican casi siempre en UTF-8.
+                tipo = resp.headers.get("Content-Type", "").lower()
+                encoding = resp.encoding if "charset" in tipo else None
+                # La lectura y el parseo se intercalan: se mide por separado
+                # lo que se espera a la red en cada bloque.
+                bloques = _LecturaMedida(resp.iter_content(chunk_size=16 * 1024))
+                inicio_parseo = time.perf_counter()
+                texto = extraer_texto_html(
+                    bloques,
+                    max_caracteres=5000,
+                    max_bytes=settings.IA_DESCARGA_MAX_BYTES,
+                    encoding=encoding,
+                )
+                parseo = time.perf_counter() - inicio_parseo - bloques.segundos
+                etag = resp.headers.get("ETag", "")
+                ultima_modificacion = resp.headers.get("Last-Modified", "")
         except requests.RequestException as exc:  # pragma: no cover
+            IA_FALLOS.incrementar(motivo="descarga")
             logger.error("No se pudo descargar el contenido de %s: %s", url, exc)
             raise IAProcessingError(
                 f"No se pudo descargar el contenido del link {url}"
             ) from exc
+        IA_DESCARGA_SEGUNDOS.observar(encabezados + bloques.segundos, dominio=_dominio_metrica(url))
+        IA_PARSEO_SEGUNDOS.observar(parseo)
 
-        soup = BeautifulSoup(resp.text, "html.parser")
-        for tag in soup(["script", "style", "noscript"]):
-            tag.decompose()
-        texto = " ".join(soup.stripped_strings)
         if not texto:
+            IA_FALLOS.incrementar(motivo="sin_contenido")
             raise IAProcessingError("No se pudo extraer contenido del link.")
-        return texto[:5000]
+        return {"texto": texto, "etag": etag, "ultima_modificacion": ultima_modificacion}
 
-    def analizar(self, url: str, texto: str) -> AnalisisIA:
-        prompt_base = settings.AI_CLASSIFICATION_PROMPT.replace(
+    def _prompt_base(self) -> str:
+        return settings.AI_CLASSIFICATION_PROMPT.replace(
             "{categorias}", self.categorias_prompt
         )
-        prompt = (
-            f"{prompt_base}"
-            f"URL: {url}\n\n"
-            f"Contenido completo:\n\"\"\"\n{texto}\n\"\"\""
-        )
+
+    def _clave_analisis(self, prompt_base: str, texto: str) -> str:
+        # El prompt ya incluye la lista de categorías, así que cualquier cambio
+        # en cualquiera de los dos invalida el análisis guardado.
+        return f"analisis:{_hash(self.MODELO, prompt_base, texto)}"
+
+    def _analisis_guardado(self, clave: str) -> Optional[AnalisisIA]:
+        if self.cache is None:
+            return None
+        guardado = self.cache.get(clave)
+        return AnalisisIA(**guardado) if guardado else None
+
+    def _guardar_analisis(self, clave: str, analisis: AnalisisIA) -> None:
+        if self.cache is not None:
+            self.cache.set(clave, asdict(analisis), settings.IA_CACHE_TTL_ANALISIS)
+
+    def analizar(self, url: str, texto: str) -> AnalisisIA:
+        prompt_base = self._prompt_base()
+        clave = self._clave_analisis(prompt_base, texto)
+        analisis = self._analisis_guardado(clave)
+        if analisis is None:
+            analisis = self._consultar_ia(url, texto, prompt_base)
+            self._guardar_analisis(clave, analisis)
+        return analisis
+
+    def analizar_lote(
+        self, items: Iterable[Tuple[int, str, str]]
+    ) -> Dict[int, ResultadoIA]:
+        """
+        Analiza varios artículos (link_id, url, texto) compartiendo el prompt.
+
+        Los textos se agrupan en consultas de hasta IA_LOTE_MAX_LINKS artículos
+        y IA_LOTE_MAX_TOKENS tokens estimados. Las entradas que la IA no
+        devuelve o que no pasan la validación se reintentan de a una con
+        analizar(), por lo que cada link termina con su análisis o su error.
+        """
+        prompt_base = self._prompt_base()
+        resultados: Dict[int, ResultadoIA] = {}
+        pendientes = []
+        for link_id, url, texto in items:
+            clave = self._clave_analisis(prompt_base, texto)
+            analisis = self._analisis_guardado(clave)
+            if analisis is not None:
+                resultados[link_id] = ResultadoIA(link_id, analisis=analisis)
+            else:
+                pendientes.append((link_id, url, texto, clave))
+
+        for lote in armar_lotes(pendientes, clave_texto=lambda item: item[2]):
+            analisis_por_id = {}
+            if len(lote) > 1:
+                try:
+                    analisis_por_id = self._consultar_lote(lote, prompt_base)
+                except IAProcessingError as exc:
+                    logger.warning(
+                        "Falló la consulta en lote de %s links, se reintenta de a uno: %s",
+                        len(lote),
+                        exc,
+                    )
+            for link_id, url, texto, clave in lote:
+                analisis = analisis_por_id.get(str(link_id))
+                if analisis is not None:
+                    self._guardar_analisis(clave, analisis)
+                    resultados[link_id] = ResultadoIA(link_id, analisis=analisis)
+                    continue
+                try:
+                    analisis = self._consultar_ia(url, texto, prompt_base)
+                except IAProcessingError as exc:
+                    resultados[link_id] = ResultadoIA(link_id, error=str(exc))
+                    continue
+                self._guardar_analisis(clave, analisis)
+                resultados[link_id] = ResultadoIA(link_id, analisis=analisis)
+        return resultados
+
+    def _completar(self, prompt: str, max_tokens: int, modo: str = "individual") -> dict:
+        inicio = time.perf_counter()
         try:
             response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=self.MODELO,
                 messages=[
                     {
                         "role": "system",
@@ -92,26 +289,336 @@ class LinkAIProcessor:
                     {"role": "user", "content": prompt},
                 ],
                 temperature=0.2,
-                max_tokens=500,
+                max_tokens=max_tokens,
             )
             contenido = response.choices[0].message.content  # type: ignore[attr-defined]
         except Exception as exc:  # pragma: no cover
+            IA_FALLOS.incrementar(motivo="consulta_ia")
             logger.error("Fallo consultando a OpenAI: %s", exc)
             raise IAProcessingError("No se pudo obtener la respuesta de la IA.") from exc
+        IA_LLM_SEGUNDOS.observar(time.perf_counter() - inicio, modo=modo)
+        uso = getattr(response, "usage", None)
+        if uso is not None:
+            IA_TOKENS.incrementar(getattr(uso, "prompt_tokens", 0) or 0, tipo="entrada")
+            IA_TOKENS.incrementar(getattr(uso, "completion_tokens", 0) or 0, tipo="salida")
 
         # Algunas respuestas incluyen bloques tipo ```json ... ```
         limpieza = contenido.replace("```json", "").replace("```", "").strip()
         try:
-            data = json.loads(limpieza)
+            return json.loads(limpieza)
         except json.JSONDecodeError as exc:
+            IA_FALLOS.incrementar(motivo="json_invalido")
             logger.error("La IA devolvió un JSON inválido: %s", contenido)
             raise IAProcessingError("La respuesta de la IA no pudo interpretarse.") from exc
 
-        categorias = [c.strip() for c in data.get("categorias", []) if c.strip()]
-        resumen = data.get("resumen", "").strip()
+    def _consultar_ia(self, url: str, texto: str, prompt_base: str) -> AnalisisIA:
+        prompt = (
+            f"{prompt_base}"
+            f"URL: {url}\n\n"
+            f"Contenido completo:\n\"\"\"\n{texto}\n\"\"\""
+        )
+        data = self._completar(prompt, max_tokens=500)
+        try:
+            return _validar_respuesta(data)
+        except IAProcessingError:
+            IA_FALLOS.incrementar(motivo="respuesta_invalida")
+            logger.error("La IA devolvió una respuesta con formato inválido: %s", data)
+            raise
+
+    def _consultar_lote(self, lote, prompt_base: str) -> Dict[str, AnalisisIA]:
+        articulos = "\n\n".join(
+            f"Artículo ID {link_id}\nURL: {url}\n"
+            f"Contenido completo:\n\"\"\"\n{texto}\n\"\"\""
+            for link_id, url, texto, _ in lote
+        )
+        prompt = (
+            f"{prompt_base}"
+            "Vas a recibir varios artículos, cada uno identificado por su ID. "
+            "Analizá cada uno por separado con las instrucciones anteriores y "
+            "devolvé únicamente un JSON válido con este formato: "
+            '{"resultados": [{"id": "ID del artículo", "categorias": ["categoria 1"], '
+            '"resumen": "...", "confianza": 0.0}]}, '
+            "con exactamente un elemento por artículo.\n\n"
+            f"{articulos}"
+        )
+        data = self._completar(
+            prompt,
+            max_tokens=min(500 * len(lote), settings.IA_LOTE_MAX_TOKENS_RESPUESTA),
+            modo="lote",
+        )
+        entradas = data.get("resultados") if isinstance(data, dict) else data
+        if not isinstance(entradas, list):
+            IA_FALLOS.incrementar(motivo="lote_sin_resultados")
+            raise IAProcessingError("La respuesta de la IA no trae la lista de resultados.")
+
+        ids = {str(link_id) for link_id, *_ in lote}
+        analisis_por_id = {}
+        for entrada in entradas:
+            try:
+                link_id, analisis = _validar_entrada_lote(entrada)
+            except IAProcessingError as exc:
+                IA_FALLOS.incrementar(motivo="entrada_lote_invalida")
+                logger.warning("Entrada descartada en la respuesta en lote: %s", exc)
+                continue
+            if link_id in ids and link_id not in analisis_por_id:
+                analisis_por_id[link_id] = analisis
+        return analisis_por_id
+
+
+def _dominio_metrica(url):
+    # Sólo los dominios de las fuentes cargadas: los links pegados de otros
+    # sitios van juntos, para que la métrica no tenga una serie por host.
+    return dominio_fuente(url) or "otros"
+
+
+class _LecturaMedida:
+    """Itera los bloques de una descarga sumando el tiempo de espera de cada uno."""
+
+    def __init__(self, bloques):
+        self._bloques = iter(bloques)
+        self.segundos = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        inicio = time.perf_counter()
+        try:
+            return next(self._bloques)
+        finally:
+            self.segundos += time.perf_counter() - inicio
+
+
+def estimar_tokens(texto: str) -> int:
+    """Aproximación de tokens sin depender del tokenizador (~4 caracteres)."""
+    return len(texto) // 4 + 1
+
+
+def armar_lotes(items, clave_texto, max_links=None, max_tokens=None):
+    """
+    Agrupa los items en lotes de hasta `max_links` elementos cuyos textos no
+    superen `max_tokens` tokens estimados en total. Un texto que por sí solo
+    excede el presupuesto queda en un lote propio.
+    """
+    max_links = max(1, max_links or settings.IA_LOTE_MAX_LINKS)
+    max_tokens = max_tokens or settings.IA_LOTE_MAX_TOKENS
+    lotes = []
+    lote, tokens = [], 0
+    for item in items:
+        tokens_item = estimar_tokens(clave_texto(item))
+        if lote and (len(lote) >= max_links or tokens + tokens_item > max_tokens):
+            lotes.append(lote)
+            lote, tokens = [], 0
+        lote.append(item)
+        tokens += tokens_item
+    if lote:
+        lotes.append(lote)
+    return lotes
+
+
+def _validar_respuesta(data) -> AnalisisIA:
+    """Análisis de una consulta individual; los campos que faltan quedan vacíos."""
+    if not isinstance(data, dict):
+        raise IAProcessingError("La respuesta de la IA no es un objeto JSON.")
+    categorias = data.get("categorias", [])
+    resumen = data.get("resumen", "")
+    if not isinstance(categorias, list) or not all(
+        isinstance(categoria, str) for categoria in categorias
+    ):
+        raise IAProcessingError("La respuesta de la IA trae categorías inválidas.")
+    if not isinstance(resumen, str):
+        raise IAProcessingError("La respuesta de la IA trae un resumen inválido.")
+    try:
         confianza = float(data.get("confianza", 0))
-        return AnalisisIA(
-            categorias=categorias,
-            resumen=resumen,
-            confianza=max(0, min(confianza, 1)),
+    except (TypeError, ValueError) as exc:
+        raise IAProcessingError("La respuesta de la IA trae una confianza inválida.") from exc
+    return AnalisisIA(
+        categorias=[c.strip() for c in categorias if c.strip()],
+        resumen=resumen.strip(),
+        confianza=max(0, min(confianza, 1)),
+    )
+
+
+def _validar_entrada_lote(entrada) -> Tuple[str, AnalisisIA]:
+    if not isinstance(entrada, dict) or entrada.get("id") in (None, ""):
+        raise IAProcessingError("Entrada sin ID.")
+    categorias = entrada.get("categorias")
+    resumen = entrada.get("resumen")
+    if not isinstance(categorias, list) or not all(
+        isinstance(categoria, str) for categoria in categorias
+    ):
+        raise IAProcessingError(f"Categorías inválidas para el ID {entrada['id']}.")
+    if not isinstance(resumen, str):
+        raise IAProcessingError(f"Resumen inválido para el ID {entrada['id']}.")
+    try:
+        confianza = float(entrada.get("confianza"))
+    except (TypeError, ValueError) as exc:
+        raise IAProcessingError(f"Confianza inválida para el ID {entrada['id']}.") from exc
+    return str(entrada["id"]), AnalisisIA(
+        categorias=[c.strip() for c in categorias if c.strip()],
+        resumen=resumen.strip(),
+        confianza=max(0, min(confianza, 1)),
+    )
+
+
+class ClasificadorIAConcurrente:
+    """
+    Procesa un lote de links en dos etapas encadenadas: la descarga del HTML y
+    la consulta a la IA corren en pools de hilos independientes, cada uno con
+    su propio límite de concurrencia. Apenas termina la descarga de un link se
+    encola su consulta, sin esperar al resto del lote.
+
+    En modo lote los textos descargados se acumulan hasta completar
+    IA_LOTE_MAX_LINKS artículos o IA_LOTE_MAX_TOKENS tokens y se envían juntos
+    con processor.analizar_lote().
+    """
+
+    def __init__(
+        self, processor=None, max_descargas=None, max_consultas=None, en_lote=None
+    ):
+        self.processor = processor or LinkAIProcessor()
+        self.max_descargas = max(
+            1, max_descargas or settings.IA_MAX_DESCARGAS_CONCURRENTES
         )
+        self.max_consultas = max(
+            1, max_consultas or settings.IA_MAX_CONSULTAS_CONCURRENTES
+        )
+        self.en_lote = settings.IA_LOTE_MAX_LINKS > 1 if en_lote is None else en_lote
+
+    def ejecutar(self, items: Iterable[Tuple[int, str]]) -> Dict[int, ResultadoIA]:
+        """Recibe pares (link_id, url) y devuelve un ResultadoIA por link."""
+        resultados: Dict[int, ResultadoIA] = {}
+        with ThreadPoolExecutor(
+            max_workers=self.max_descargas, thread_name_prefix="ia-descarga"
+        ) as pool_descargas, ThreadPoolExecutor(
+            max_workers=self.max_consultas, thread_name_prefix="ia-consulta"
+        ) as pool_consultas:
+            descargas = {
+                pool_descargas.submit(self.processor.extraer_texto, url): (link_id, url)
+                for link_id, url in items
+            }
+            consultas = {}
+            lote, tokens_lote = [], 0
+
+            def enviar_lote():
+                consultas[pool_consultas.submit(self.processor.analizar_lote, lote)] = [
+                    link_id for link_id, _, _ in lote
+                ]
+
+            for futuro in as_completed(descargas):
+                link_id, url = descargas[futuro]
+                try:
+                    texto = futuro.result()
+                except IAProcessingError as exc:
+                    resultados[link_id] = ResultadoIA(link_id, error=str(exc))
+                    continue
+                except Exception as exc:  # pragma: no cover
+                    IA_FALLOS.incrementar(motivo="inesperado")
+                    logger.exception("Error inesperado descargando %s", url)
+                    resultados[link_id] = ResultadoIA(link_id, error=str(exc))
+                    continue
+                if not self.en_lote:
+                    consultas[
+                        pool_consultas.submit(self.processor.analizar, url, texto)
+                    ] = [link_id]
+                    continue
+
+                tokens = estimar_tokens(texto)
+                if lote and (
+                    len(lote) >= settings.IA_LOTE_MAX_LINKS
+                    or tokens_lote + tokens > settings.IA_LOTE_MAX_TOKENS
+                ):
+                    enviar_lote()
+                    lote, tokens_lote = [], 0
+                lote.append((link_id, url, texto))
+                tokens_lote += tokens
+            if lote:
+                enviar_lote()
+
+            for futuro in as_completed(consultas):
+                link_ids = consultas[futuro]
+                try:
+                    respuesta = futuro.result()
+                except IAProcessingError as exc:
+                    for link_id in link_ids:
+                        resultados[link_id] = ResultadoIA(link_id, error=str(exc))
+                    continue
+                except Exception as exc:  # pragma: no cover
+                    IA_FALLOS.incrementar(motivo="inesperado")
+                    logger.exception("Error inesperado analizando los links %s", link_ids)
+                    for link_id in link_ids:
+                        resultados[link_id] = ResultadoIA(link_id, error=str(exc))
+                    continue
+                if isinstance(respuesta, AnalisisIA):
+                    resultados[link_ids[0]] = ResultadoIA(link_ids[0], analisis=respuesta)
+                else:
+                    resultados.update(respuesta)
+        return resultados
+
+
+def guardar_resultados(links, resultados: Dict[int, ResultadoIA]):
+    """
+    Aplica los análisis sobre los links en una única transacción.
+
+    Devuelve un diccionario link_id -> mensaje con las advertencias o errores
+    de cada link; los links sin entrada quedaron aprobados y clasificados.
+    """
+    categorias_por_nombre = {
+        categoria.nombre.lower(): categoria for categoria in Categoria.objects.all()
+    }
+    mensajes = {}
+
+    with transaction.atomic():
+        for link in links:
+            resultado = resultados.get(link.pk)
+            if resultado is None:
+                continue
+            if resultado.error:
+                mensajes[link.pk] = resultado.error
+                continue
+            analisis = resultado.analisis
+
+            categorias_objs = []
+            for nombre in (analisis.categorias or [])[:5]:
+                categoria = categorias_por_nombre.get(nombre.lower())
+                if categoria and categoria not in categorias_objs:
+                    categorias_objs.append(categoria)
+
+            if not categorias_objs:
+                link.estado = EstadoLink.DESCARTADO
+                link.clasificado_por_ia = False
+                link.revisado_clasificador = True
+                link.confianza_clasificacion = None
+                link.resumen_ia = analisis.resumen[:2000]
+                link.categorias.clear()
+                link.save(
+                    update_fields=[
+                        "estado",
+                        "clasificado_por_ia",
+                        "revisado_clasificador",
+                        "confianza_clasificacion",
+                        "resumen_ia",
+                    ]
+                )
+                mensajes[link.pk] = (
+                    "Descartado: la IA no devolvió categorías que existan en el sistema."
+                )
+                continue
+
+            link.categorias.set(categorias_objs)
+
+            link.estado = EstadoLink.APROBADO
+            link.clasificado_por_ia = True
+            link.confianza_clasificacion = analisis.confianza
+            link.resumen_ia = analisis.resumen[:2000]
+            link.revisado_clasificador = True
+            link.save(
+                update_fields=[
+                    "estado",
+                    "clasificado_por_ia",
+                    "confianza_clasificacion",
+                    "resumen_ia",
+                    "revisado_clasificador",
+                ]
+            )
+    return mensajes
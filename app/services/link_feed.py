@@ -0,0 +1,81 @@
+from django.db import transaction
+
+from app.models import (
+    DiarioDigital,
+    LinkFeed,
+    LinkRadioDigital,
+    LinkRedSocial,
+    LinkRelevante,
+    LinkTvDigital,
+    RadioDigital,
+    RedSocial,
+    TvDigital,
+)
+
+# tipo_fuente -> (modelo del link, FK al origen, modelo del origen)
+FUENTES_FEED = {
+    LinkFeed.TipoFuente.DIARIO: (LinkRelevante, "diario_digital", DiarioDigital),
+    LinkFeed.TipoFuente.RED_SOCIAL: (LinkRedSocial, "red_social", RedSocial),
+    LinkFeed.TipoFuente.TV_DIGITAL: (LinkTvDigital, "tv_digital", TvDigital),
+    LinkFeed.TipoFuente.RADIO_DIGITAL: (LinkRadioDigital, "radio_digital", RadioDigital),
+}
+
+TIPO_POR_MODELO = {modelo: tipo for tipo, (modelo, _, _) in FUENTES_FEED.items()}
+TIPO_POR_ORIGEN = {origen: tipo for tipo, (_, _, origen) in FUENTES_FEED.items()}
+
+
+def _valores_feed(link, fk):
+    return {
+        "url": link.url,
+        "fecha_carga": link.fecha_carga,
+        "estado": link.estado,
+        "cargado_por_id": link.cargado_por_id,
+        "origen_id": getattr(link, f"{fk}_id"),
+        "revisado_clasificador": link.revisado_clasificador,
+        "revisado_redactor": link.revisado_redactor,
+        "clasificado_por_ia": getattr(link, "clasificado_por_ia", False),
+        "confianza_clasificacion": getattr(link, "confianza_clasificacion", None),
+    }
+
+
+def sincronizar_link(link):
+    """Crea o actualiza la fila del feed de un link de cualquier fuente."""
+    tipo = TIPO_POR_MODELO[type(link)]
+    _, fk, _ = FUENTES_FEED[tipo]
+    LinkFeed.objects.update_or_create(
+        tipo_fuente=tipo, link_id=link.pk, defaults=_valores_feed(link, fk)
+    )
+
+
+def eliminar_link(link):
+    LinkFeed.objects.filter(
+        tipo_fuente=TIPO_POR_MODELO[type(link)], link_id=link.pk
+    ).delete()
+
+
+def desvincular_origen(origen):
+    """
+    Al borrar un diario, red, canal o radio los links quedan sin origen
+    (SET_NULL se resuelve con un UPDATE que no dispara señales).
+    """
+    LinkFeed.objects.filter(
+        tipo_fuente=TIPO_POR_ORIGEN[type(origen)], origen_id=origen.pk
+    ).update(origen_id=None)
+
+
+def reconstruir_feed(tamanio_lote=2000):
+    """Regenera el feed completo a partir de las cuatro tablas de links."""
+    total = 0
+    with transaction.atomic():
+        LinkFeed.objects.all().delete()
+        for tipo, (modelo, fk, _) in FUENTES_FEED.items():
+            lote = []
+            for link in modelo.objects.order_by("pk").iterator(chunk_size=tamanio_lote):
+                lote.append(LinkFeed(tipo_fuente=tipo, link_id=link.pk, **_valores_feed(link, fk)))
+                if len(lote) >= tamanio_lote:
+                    LinkFeed.objects.bulk_create(lote)
+                    total += len(lote)
+                    lote = []
+            LinkFeed.objects.bulk_create(lote)
+            total += len(lote)
+    return total
@@ -0,0 +1,428 @@
+"""
+Métricas de la aplicación en el formato de texto de Prometheus (/metrics).
+
+Cada proceso acumula en memoria sus contadores e histogramas: observar un
+valor cuesta un lock y un par de sumas. Un hilo del proceso los vuelca cada
+METRICAS_VOLCADO_SEGUNDOS a METRICAS_DIR/metricas-<pid>-<id>.json y /metrics
+suma los archivos de todos los procesos (workers de gunicorn, el pool de PDF,
+run_ia_worker), así que no importa qué worker atienda el pedido.
+
+Cada proceso mantiene bloqueado (flock) un archivo .lock propio. Los archivos
+de los procesos que terminaron se suman a metricas-acumuladas.json al leer las
+métricas, para que los contadores no retrocedan cuando se reinicia un worker.
+
+Al terminar normalmente, el proceso vuelca lo que le quedaba (atexit).
+
+Sin METRICAS_DIR, o en plataformas sin `fcntl`, /metrics informa sólo las
+métricas del proceso que atiende el pedido.
+"""
+
+import atexit
+import bisect
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = "metricas-"
+ACUMULADAS = "metricas-acumuladas.json"
+# Un .lock más nuevo que esto puede ser de un proceso que todavía no lo bloqueó.
+GRACIA_LOCK_SEGUNDOS = 60
+
+METRICAS = {}
+
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        METRICAS[nombre] = self
+
+    def _clave(self, etiquetas):
+        return tuple(str(etiquetas.get(etiqueta, "")) for etiqueta in self.etiquetas)
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def incrementar(self, cantidad=1, **etiquetas):
+        registro.sumar(self.nombre, self._clave(etiquetas), cantidad)
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), limites=LIMITES_SEGUNDOS):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.limites = tuple(limites)
+
+    def observar(self, valor, **etiquetas):
+        # El bucket `le` cuenta los valores <= límite; el último es +Inf.
+        registro.observar(
+            self.nombre,
+            self._clave(etiquetas),
+            bisect.bisect_left(self.limites, valor),
+            valor,
+            len(self.limites) + 1,
+        )
+
+
+class Medidor(_Metrica):
+    """Valor que se calcula en el momento de leer las métricas."""
+
+    tipo = "gauge"
+
+    def __init__(self, nombre, ayuda, calcular):
+        super().__init__(nombre, ayuda)
+        self.calcular = calcular
+
+
+def _vacias():
+    return {"contadores": {}, "histogramas": {}}
+
+
+def _sumar_en(destino, origen):
+    for clave, valor in origen["contadores"].items():
+        destino["contadores"][clave] = destino["contadores"].get(clave, 0) + valor
+    for clave, valores in origen["histogramas"].items():
+        actual = destino["histogramas"].get(clave)
+        if actual is None:
+            destino["histogramas"][clave] = list(valores)
+        elif len(actual) == len(valores):
+            destino["histogramas"][clave] = [a + b for a, b in zip(actual, valores)]
+
+
+def _serializar(datos):
+    return json.dumps(
+        {
+            grupo: [[nombre, list(clave), valor] for (nombre, clave), valor in datos[grupo].items()]
+            for grupo in ("contadores", "histogramas")
+        }
+    )
+
+
+def _leer(ruta):
+    try:
+        contenido = json.loads(Path(ruta).read_text())
+    except (FileNotFoundError, ValueError):
+        return _vacias()
+    return {
+        grupo: {(nombre, tuple(clave)): valor for nombre, clave, valor in contenido.get(grupo, [])}
+        for grupo in ("contadores", "histogramas")
+    }
+
+
+def _escribir(ruta, texto):
+    descriptor, temporal = tempfile.mkstemp(dir=ruta.parent, suffix=".tmp")
+    with os.fdopen(descriptor, "w") as archivo:
+        archivo.write(texto)
+    os.replace(temporal, ruta)
+
+
+class _Registro:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        # Lo contado desde el último volcado se perdería al reciclar el worker.
+        atexit.register(self._al_salir)
+
+    def _iniciar(self):
+        """Prepara el registro del proceso; se repite si el proceso se bifurcó."""
+        # Un proceso bifurcado empieza de cero: lo heredado lo informa el padre.
+        self._pid = os.getpid()
+        self._datos = _vacias()
+        self._cambios = False
+        self._archivo = None
+        if settings.METRICAS_DIR and fcntl is not None:
+            directorio = Path(settings.METRICAS_DIR)
+            directorio.mkdir(parents=True, exist_ok=True)
+            base = directorio / f"{PREFIJO}{self._pid}-{uuid.uuid4().hex[:8]}"
+            self._lock_archivo = os.open(base.with_suffix(".lock"), os.O_WRONLY | os.O_CREAT, 0o600)
+            fcntl.flock(self._lock_archivo, fcntl.LOCK_EX)
+            self._archivo = base.with_suffix(".json")
+            threading.Thread(target=self._ciclo, name="metricas", daemon=True).start()
+
+    def _proceso(self):
+        if self._pid != os.getpid():
+            self._iniciar()
+
+    def sumar(self, nombre, clave, cantidad):
+        with self._lock:
+            self._proceso()
+            contadores = self._datos["contadores"]
+            contadores[(nombre, clave)] = contadores.get((nombre, clave), 0) + cantidad
+            self._cambios = True
+
+    def observar(self, nombre, clave, bucket, valor, buckets):
+        with self._lock:
+            self._proceso()
+            valores = self._datos["histogramas"].get((nombre, clave))
+            if valores is None:
+                # Conteo por bucket y, al final, la suma de los valores.
+                valores = self._datos["histogramas"][(nombre, clave)] = [0] * buckets + [0.0]
+            valores[bucket] += 1
+            valores[-1] += valor
+            self._cambios = True
+
+    def copia(self):
+        with self._lock:
+            self._proceso()
+            copia = _vacias()
+            _sumar_en(copia, self._datos)
+            return copia
+
+    def volcar(self):
+        """Escribe el archivo del proceso, si hay cambios desde la última vez."""
+        with self._lock:
+            self._proceso()
+            if self._archivo is None or not self._cambios:
+                return
+            texto = _serializar(self._datos)
+            self._cambios = False
+        _escribir(self._archivo, texto)
+
+    def _al_salir(self):
+        # Un proceso bifurcado hereda el handler: sólo vuelca si ya registró algo.
+        if self._pid != os.getpid():
+            return
+        try:
+            self.volcar()
+        except Exception:
+            logger.exception("No se pudieron volcar las métricas al salir")
+
+    def _ciclo(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(settings.METRICAS_VOLCADO_SEGUNDOS)
+            try:
+                self.volcar()
+            except Exception:
+                logger.exception("No se pudieron volcar las métricas")
+
+
+registro = _Registro()
+
+
+def _recolectar_terminados(directorio):
+    """Suma a ACUMULADAS los archivos de procesos que ya no existen."""
+    with open(directorio / "acumuladas.lock", "a") as bloqueo:
+        fcntl.flock(bloqueo, fcntl.LOCK_EX)
+        acumuladas = None
+        for ruta_lock in directorio.glob(f"{PREFIJO}*.lock"):
+            try:
+                if time.time() - ruta_lock.stat().st_mtime < GRACIA_LOCK_SEGUNDOS:
+                    continue
+                descriptor = os.open(ruta_lock, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                try:
+                    fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # el proceso sigue vivo
+                if acumuladas is None:
+                    acumuladas = _leer(directorio / ACUMULADAS)
+                datos = ruta_lock.with_suffix(".json")
+                _sumar_en(acumuladas, _leer(datos))
+                _escribir(directorio / ACUMULADAS, _serializar(acumuladas))
+                datos.unlink(missing_ok=True)
+                ruta_lock.unlink(missing_ok=True)
+            finally:
+                os.close(descriptor)
+
+
+def _todas():
+    if not settings.METRICAS_DIR or fcntl is None:
+        return registro.copia()
+    registro.volcar()
+    directorio = Path(settings.METRICAS_DIR)
+    directorio.mkdir(parents=True, exist_ok=True)
+    _recolectar_terminados(directorio)
+    total = _vacias()
+    for ruta in directorio.glob(f"{PREFIJO}*.json"):
+        _sumar_en(total, _leer(ruta))
+    return total
+
+
+def _etiquetas(nombres, valores, extra=""):
+    partes = [
+        '{}="{}"'.format(nombre, valor.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"))
+        for nombre, valor in zip(nombres, valores)
+    ]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def exponer():
+    """Texto de /metrics con las métricas de todos los procesos."""
+    datos = _todas()
+    por_metrica = {}
+    for grupo in ("contadores", "histogramas"):
+        for (nombre, clave), valor in datos[grupo].items():
+            por_metrica.setdefault(nombre, []).append((clave, valor))
+
+    lineas = []
+    for nombre in sorted(METRICAS):
+        metrica = METRICAS[nombre]
+        lineas.append(f"# HELP {nombre} {metrica.ayuda}")
+        lineas.append(f"# TYPE {nombre} {metrica.tipo}")
+        if isinstance(metrica, Medidor):
+            try:
+                lineas.append(f"{nombre} {_numero(metrica.calcular())}")
+            except Exception:
+                logger.exception("No se pudo calcular %s", nombre)
+            continue
+        for clave, valor in sorted(por_metrica.get(nombre, [])):
+            if len(clave) != len(metrica.etiquetas):
+                continue  # de una versión anterior de la métrica
+            if isinstance(metrica, Contador):
+                lineas.append(f"{nombre}{_etiquetas(metrica.etiquetas, clave)} {_numero(valor)}")
+                continue
+            if len(valor) != len(metrica.limites) + 2:
+                continue
+            acumulado = 0
+            for limite, cantidad in zip(list(metrica.limites) + ["+Inf"], valor[:-1]):
+                acumulado += cantidad
+                le = 'le="{}"'.format(limite if limite == "+Inf" else _numero(float(limite)))
+                lineas.append(f"{nombre}_bucket{_etiquetas(metrica.etiquetas, clave, le)} {acumulado}")
+            lineas.append(f"{nombre}_sum{_etiquetas(metrica.etiquetas, clave)} {_numero(valor[-1])}")
+            lineas.append(f"{nombre}_count{_etiquetas(metrica.etiquetas, clave)} {acumulado}")
+    return "\n".join(lineas) + "\n"
+
+
+FORMATOS_EXPORTACION = {
+    "application/pdf": "pdf",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "text/csv": "csv",
+}
+
+
+def _estado(codigo):
+    return f"{codigo // 100}xx"
+
+
+def _medir_envio(contenido, inicio, formato, vista):
+    """Recorre el contenido en streaming y observa la exportación al terminar."""
+    enviados = 0
+    try:
+        for bloque in contenido:
+            enviados += len(bloque)
+            yield bloque
+    finally:
+        EXPORTACION_SEGUNDOS.observar(time.perf_counter() - inicio, formato=formato, vista=vista)
+        EXPORTACION_BYTES.observar(enviados, formato=formato, vista=vista)
+
+
+def registrar_request(request, response, inicio, consultas=None):
+    """Observa la duración de la request y, si es una exportación, su tamaño."""
+    resolver = getattr(request, "resolver_match", None)
+    vista = (resolver.url_name or resolver.view_name) if resolver else "sin_ruta"
+    segundos = time.perf_counter() - inicio
+    REQUEST_SEGUNDOS.observar(
+        segundos, vista=vista, metodo=request.method, estado=_estado(response.status_code)
+    )
+    if consultas is not None:
+        REQUEST_CONSULTAS.observar(consultas, vista=vista)
+
+    tipo = response.get("Content-Type", "").split(";")[0].strip()
+    formato = FORMATOS_EXPORTACION.get(tipo)
+    if formato is None or response.status_code != 200:
+        return
+    if not response.streaming:
+        EXPORTACION_SEGUNDOS.observar(segundos, formato=formato, vista=vista)
+        EXPORTACION_BYTES.observar(len(response.content), formato=formato, vista=vista)
+    elif getattr(response, "file_to_stream", None) is not None:
+        # FileResponse: el archivo ya está generado; se envía con sendfile.
+        EXPORTACION_SEGUNDOS.observar(segundos, formato=formato, vista=vista)
+        if response.has_header("Content-Length"):
+            EXPORTACION_BYTES.observar(int(response["Content-Length"]), formato=formato, vista=vista)
+    else:
+        # Se genera mientras se envía: se mide hasta el último byte.
+        response.streaming_content = _medir_envio(response.streaming_content, inicio, formato, vista)
+
+
+def _links_pendientes():
+    from app.models import EstadoLink, LinkRelevante
+
+    return LinkRelevante.objects.filter(estado=EstadoLink.PENDIENTE).count()
+
+
+REQUEST_SEGUNDOS = Histograma(
+    "minerva_request_segundos",
+    "Duración de las requests por vista (nombre de la URL).",
+    ("vista", "metodo", "estado"),
+)
+REQUEST_CONSULTAS = Histograma(
+    "minerva_request_consultas",
+    "Consultas SQL por request.",
+    ("vista",),
+    limites=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+EXPORTACION_SEGUNDOS = Histograma(
+    "minerva_exportacion_segundos",
+    "Duración de las exportaciones (hasta enviar el último byte en las que se generan al enviarse).",
+    ("formato", "vista"),
+)
+EXPORTACION_BYTES = Histograma(
+    "minerva_exportacion_bytes",
+    "Tamaño de los archivos exportados.",
+    ("formato", "vista"),
+    limites=(10_000, 100_000, 1_000_000, 10_000_000, 100_000_000, 1_000_000_000),
+)
+PDF_GENERACION_SEGUNDOS = Histograma(
+    "minerva_pdf_generacion_segundos",
+    "Duración de la generación de PDF con WeasyPrint en el pool de procesos.",
+)
+IA_DESCARGA_SEGUNDOS = Histograma(
+    "minerva_ia_descarga_segundos",
+    "Descarga de artículos para la IA (red, sin el parseo) por dominio.",
+    ("dominio",),
+)
+IA_PARSEO_SEGUNDOS = Histograma(
+    "minerva_ia_parseo_segundos",
+    "Extracción del texto del HTML descargado.",
+)
+IA_LLM_SEGUNDOS = Histograma(
+    "minerva_ia_llm_segundos",
+    "Latencia de las consultas al modelo de IA.",
+    ("modo",),
+)
+IA_TOKENS = Contador(
+    "minerva_ia_tokens_total",
+    "Tokens informados por el modelo de IA.",
+    ("tipo",),
+)
+IA_FALLOS = Contador(
+    "minerva_ia_fallos_total",
+    "Fallos del procesamiento con IA por motivo.",
+    ("motivo",),
+)
+LINKS_PENDIENTES = Medidor(
+    "minerva_links_pendientes",
+    "Links relevantes en estado pendiente.",
+    _links_pendientes,
+)
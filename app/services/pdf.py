@@ -0,0 +1,208 @@
+"""
+Generación de PDF con WeasyPrint fuera del ciclo de la request.
+
+Cada documento se identifica con una clave `<tipo>-<objeto>-<firma>`, donde la
+firma depende de la fecha de última modificación del objeto: mientras no
+cambie, el PDF ya generado se sirve directamente desde PDF_CACHE_DIR. Si falta,
+el HTML se arma en la request (es barato) y WeasyPrint corre en un pool de
+procesos. Junto a cada PDF quedan archivos auxiliares:
+
+- `<clave>.json`: nombre de descarga y si se envía como adjunto.
+- `<clave>.pendiente`: la generación está en curso (en cualquier proceso).
+- `<clave>.error`: la generación falló; contiene el detalle.
+
+Al estar todo en disco, cualquier worker de la aplicación puede informar el
+estado o entregar un PDF encolado por otro.
+"""
+
+import atexit
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.crypto import salted_hmac
+
+from app.services.metricas import PDF_GENERACION_SEGUNDOS
+from app.services.metricas import registro as registro_metricas
+
+logger = logging.getLogger(__name__)
+
+PENDIENTE = "pendiente"
+LISTO = "listo"
+ERROR = "error"
+
+_pool = None
+_pool_lock = threading.Lock()
+_en_curso = {}
+
+
+def clave_pdf(tipo, objeto_id, version):
+    """
+    Clave del PDF de `objeto_id` para la `version` indicada (normalmente su
+    fecha de modificación). La firma usa SECRET_KEY, así que no se puede
+    deducir la URL de descarga de un documento a partir de sus datos.
+    """
+    firma = salted_hmac("app.services.pdf", f"{tipo}:{objeto_id}:{version}").hexdigest()
+    return f"{tipo}-{objeto_id}-{firma[:32]}"
+
+
+def _directorio():
+    directorio = Path(settings.PDF_CACHE_DIR)
+    directorio.mkdir(parents=True, exist_ok=True)
+    return directorio
+
+
+def _ruta(clave, extension):
+    return _directorio() / f"{clave}.{extension}"
+
+
+def _vigente(ruta, segundos):
+    try:
+        return time.time() - ruta.stat().st_mtime < segundos
+    except FileNotFoundError:
+        return False
+
+
+def _generar_pdf(html, base_url):
+    from weasyprint import HTML
+
+    return HTML(string=html, base_url=base_url).write_pdf()
+
+
+def _escribir_pdf(html, base_url, ruta):
+    """Genera el PDF en `ruta`. Se ejecuta en un proceso del pool."""
+    destino = Path(ruta)
+    temporal = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    inicio = time.perf_counter()
+    try:
+        temporal.write_bytes(_generar_pdf(html, base_url))
+        os.replace(temporal, destino)
+    except Exception as exc:
+        temporal.unlink(missing_ok=True)
+        destino.with_suffix(".error").write_text(str(exc) or exc.__class__.__name__)
+        raise
+    finally:
+        destino.with_suffix(".pendiente").unlink(missing_ok=True)
+    PDF_GENERACION_SEGUNDOS.observar(time.perf_counter() - inicio)
+    # Los procesos del pool terminan sin correr atexit: se vuelca ya. Un error
+    # de las métricas no invalida el PDF ya generado.
+    try:
+        registro_metricas.volcar()
+    except Exception:
+        logger.exception("No se pudieron volcar las métricas del PDF %s", destino.name)
+
+
+def _obtener_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # "spawn" evita heredar hilos y conexiones abiertas del worker web.
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PDF_PROCESOS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def _descartar_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def _descartar_versiones_anteriores(clave):
+    prefijo = clave.rsplit("-", 1)[0]
+    for ruta in _directorio().glob(f"{prefijo}-*"):
+        if not ruta.name.startswith(f"{clave}."):
+            ruta.unlink(missing_ok=True)
+
+
+def pdf_disponible(clave):
+    return _vigente(_ruta(clave, "pdf"), settings.PDF_CACHE_TTL)
+
+
+def encolar_pdf(clave, html, base_url, nombre_archivo, adjunto=True):
+    """
+    Encola la generación del PDF de `clave` a partir de `html`. No hace nada
+    si ya está generado o si otro proceso lo está generando.
+    """
+    pendiente = _ruta(clave, "pendiente")
+    if pdf_disponible(clave) or _vigente(pendiente, settings.PDF_TIEMPO_MAXIMO):
+        return
+    _descartar_versiones_anteriores(clave)
+    _ruta(clave, "error").unlink(missing_ok=True)
+    _ruta(clave, "json").write_text(
+        json.dumps({"nombre_archivo": nombre_archivo, "adjunto": adjunto})
+    )
+    pendiente.touch()
+    ruta = str(_ruta(clave, "pdf"))
+    if settings.PDF_PROCESOS <= 0:
+        try:
+            _escribir_pdf(html, base_url, ruta)
+        except Exception:
+            logger.exception("Error al generar el PDF %s", clave)
+        return
+    try:
+        futuro = _obtener_pool().submit(_escribir_pdf, html, base_url, ruta)
+    except BrokenProcessPool:
+        _descartar_pool()
+        futuro = _obtener_pool().submit(_escribir_pdf, html, base_url, ruta)
+    _en_curso[clave] = futuro
+    futuro.add_done_callback(lambda futuro: _finalizar(clave, futuro))
+
+
+def _finalizar(clave, futuro):
+    _en_curso.pop(clave, None)
+    if isinstance(futuro.exception(), BrokenProcessPool):
+        # El proceso murió sin poder registrar el error (por ejemplo, por falta
+        # de memoria); se deja constancia para no quedar pendiente.
+        _descartar_pool()
+        _ruta(clave, "error").write_text("El proceso que generaba el PDF terminó inesperadamente.")
+        _ruta(clave, "pendiente").unlink(missing_ok=True)
+
+
+def estado_pdf(clave):
+    """Devuelve (estado, detalle del error o None)."""
+    if pdf_disponible(clave):
+        return LISTO, None
+    error = _ruta(clave, "error")
+    if error.exists():
+        return ERROR, error.read_text()
+    if _vigente(_ruta(clave, "pendiente"), settings.PDF_TIEMPO_MAXIMO):
+        return PENDIENTE, None
+    return ERROR, "La generación del PDF no terminó."
+
+
+def esperar_pdf(clave, segundos):
+    """Espera hasta `segundos` a que termine el PDF y devuelve su estado."""
+    futuro = _en_curso.get(clave)
+    if futuro is not None and segundos > 0:
+        wait([futuro], timeout=segundos)
+    return estado_pdf(clave)
+
+
+def respuesta_pdf(clave):
+    """FileResponse con el PDF de `clave`, o None si no está generado."""
+    if not pdf_disponible(clave):
+        return None
+    try:
+        datos = json.loads(_ruta(clave, "json").read_text())
+    except (FileNotFoundError, ValueError):
+        datos = {}
+    return FileResponse(
+        _ruta(clave, "pdf").open("rb"),
+        content_type="application/pdf",
+        as_attachment=datos.get("adjunto", True),
+        filename=datos.get("nombre_archivo") or f"{clave}.pdf",
+    )
@@ -0,0 +1,220 @@
+"""
+Registro de actividades en lote, fuera del camino de la request.
+
+`registrar_actividad` no inserta en la base: agrega la actividad a una cola
+del proceso y a un archivo de respaldo (una línea JSON por actividad). Un hilo
+la vuelca con un único `bulk_create` cuando junta ACTIVIDAD_LOTE_TAMANIO
+actividades o pasan ACTIVIDAD_LOTE_SEGUNDOS, así que en SQLite hay una
+escritura por lote en lugar de una por request.
+
+Cada proceso escribe su propio archivo en ACTIVIDAD_SPOOL_DIR y lo mantiene
+bloqueado (flock) mientras lo usa. Al volcar un lote el archivo se reemplaza
+por uno nuevo y, si la inserción salió bien, se borra. Los archivos que
+quedan sin dueño (el proceso terminó de golpe o la inserción falló) los
+recupera cualquier proceso en el siguiente ciclo. La entrega es "al menos
+una vez": si el proceso muere justo entre el `bulk_create` y el borrado del
+archivo, ese lote se vuelve a insertar.
+
+Con ACTIVIDAD_REGISTRO_SINCRONICO (activado en los tests) o en plataformas sin
+`fcntl` cada actividad se inserta en el momento, como antes.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from itertools import count
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from app.models import Actividad, TipoActividad
+from app.services.cache_estadisticas import invalidar_estadisticas
+from app.services.estadisticas import marcar_dias_pendientes
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = "actividades-"
+
+
+def _guardar(filas):
+    """
+    Inserta las actividades de `filas` (diccionarios con los campos de
+    Actividad). Como `bulk_create` no emite post_save, hace lo mismo que las
+    señales para los cambios de estado.
+    """
+    actividades = [Actividad(**fila) for fila in filas]
+    with transaction.atomic():
+        Actividad.objects.bulk_create(actividades, batch_size=500)
+    cambios = [a.fecha_hora for a in actividades if a.tipo == TipoActividad.CAMBIO_ESTADO]
+    if cambios:
+        marcar_dias_pendientes({timezone.localdate(fecha) for fecha in cambios})
+        invalidar_estadisticas()
+
+
+def _serializar(fila):
+    return json.dumps(dict(fila, fecha_hora=fila["fecha_hora"].isoformat()), ensure_ascii=False) + "\n"
+
+
+def _leer(ruta):
+    filas = []
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            try:
+                fila = json.loads(linea)
+            except ValueError:
+                # Línea incompleta: el proceso murió mientras la escribía.
+                continue
+            fila["fecha_hora"] = datetime.fromisoformat(fila["fecha_hora"])
+            filas.append(fila)
+    return filas
+
+
+class _Segmento:
+    """Archivo de respaldo abierto en modo append y bloqueado por este proceso."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.fd = os.open(ruta, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def escribir(self, texto):
+        os.write(self.fd, texto.encode("utf-8"))
+
+    def cerrar(self, borrar):
+        if borrar:
+            self.ruta.unlink(missing_ok=True)
+        os.close(self.fd)
+
+
+class RegistroActividades:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hay_trabajo = threading.Condition(self._lock)
+        self._pid = None
+
+    def _iniciar(self):
+        """Prepara la cola del proceso; se repite si el proceso se bifurcó."""
+        self._pid = os.getpid()
+        # El identificador evita reutilizar el archivo de un proceso anterior
+        # con el mismo pid (pasa seguido en contenedores).
+        self._prefijo = f"{PREFIJO}{self._pid}-{uuid.uuid4().hex[:8]}"
+        self._pendientes = []
+        self._numeros = count()
+        self._directorio = Path(settings.ACTIVIDAD_SPOOL_DIR)
+        self._directorio.mkdir(parents=True, exist_ok=True)
+        self._segmento = self._nuevo_segmento()
+        hilo = threading.Thread(target=self._ciclo, name="registro-actividades", daemon=True)
+        hilo.start()
+        atexit.register(self.vaciar)
+
+    def _nuevo_segmento(self):
+        return _Segmento(self._directorio / f"{self._prefijo}-{next(self._numeros)}.jsonl")
+
+    def registrar(self, *filas):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._iniciar()
+            self._segmento.escribir("".join(_serializar(fila) for fila in filas))
+            self._pendientes.extend(filas)
+            if len(self._pendientes) >= settings.ACTIVIDAD_LOTE_TAMANIO:
+                self._hay_trabajo.notify()
+
+    def vaciar(self):
+        """Inserta ya las actividades en cola. Devuelve cuántas insertó."""
+        with self._lock:
+            if self._pid != os.getpid() or not self._pendientes:
+                return 0
+            filas, self._pendientes = self._pendientes, []
+            segmento, self._segmento = self._segmento, self._nuevo_segmento()
+        try:
+            _guardar(filas)
+        except Exception:
+            # El archivo queda sin bloquear y se reintenta como recuperación.
+            logger.exception("No se pudieron guardar %s actividades", len(filas))
+            segmento.cerrar(borrar=False)
+            return 0
+        segmento.cerrar(borrar=True)
+        return len(filas)
+
+    def recuperar(self):
+        """Inserta las actividades de archivos de respaldo sin dueño."""
+        recuperadas = 0
+        for ruta in sorted(Path(settings.ACTIVIDAD_SPOOL_DIR).glob(f"{PREFIJO}*.jsonl")):
+            try:
+                fd = os.open(ruta, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # lo está usando otro proceso (o este)
+                if not ruta.exists():
+                    continue  # otro proceso lo recuperó mientras esperábamos
+                filas = _leer(ruta)
+                if filas:
+                    _guardar(filas)
+                ruta.unlink()
+                recuperadas += len(filas)
+            except Exception:
+                logger.exception("No se pudo recuperar %s", ruta)
+            finally:
+                os.close(fd)
+        return recuperadas
+
+    def _ciclo(self):
+        pid = os.getpid()
+        while True:
+            with self._lock:
+                if self._pid != pid:
+                    return
+                self._hay_trabajo.wait_for(
+                    lambda: len(self._pendientes) >= settings.ACTIVIDAD_LOTE_TAMANIO,
+                    timeout=settings.ACTIVIDAD_LOTE_SEGUNDOS,
+                )
+            close_old_connections()
+            try:
+                self.vaciar()
+                self.recuperar()
+            except Exception:
+                logger.exception("Error en el registro de actividades")
+
+
+registro = RegistroActividades()
+
+
+def registrar_actividad(**campos):
+    """
+    Registra una actividad con los `campos` de Actividad. La fecha se toma en
+    el momento de la llamada aunque la inserción ocurra después.
+    """
+    campos.setdefault("fecha_hora", timezone.now())
+    if settings.ACTIVIDAD_REGISTRO_SINCRONICO or fcntl is None:
+        Actividad.objects.create(**campos)
+    else:
+        registro.registrar(campos)
+
+
+def registrar_actividades(filas):
+    """
+    Registra juntas varias actividades (diccionarios con los campos de
+    Actividad, incluida `fecha_hora`). En modo sincrónico hace un único
+    `bulk_create`.
+    """
+    if not filas:
+        return
+    if settings.ACTIVIDAD_REGISTRO_SINCRONICO or fcntl is None:
+        _guardar(filas)
+    else:
+        registro.registrar(*filas)
@@ -0,0 +1,344 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.utils import timezone
+
+from .models import (
+    Actividad,
+    Alias,
+    Articulo,
+    BandaCriminal,
+    Categoria,
+    DiarioDigital,
+    Domicilio,
+    Empleador,
+    HechoDelictivo,
+    InformeIndividual,
+    LinkRadioDigital,
+    LinkRedSocial,
+    LinkRelevante,
+    LinkTvDigital,
+    RadioDigital,
+    RedSocial,
+    SolicitudInfo,
+    Telefono,
+    TipoActividad,
+    TvDigital,
+    UserProfile,
+    Vehiculo,
+    Vinculo,
+)
+from .services.cache_estadisticas import invalidar_estadisticas
+from .services.estadisticas import marcar_dias_pendientes
+from .services.fuentes import invalidar_indice
+from .services.link_feed import desvincular_origen, eliminar_link, sincronizar_link
+
+
+def actualizar_link_feed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sincronizar_link(instance)
+
+
+def borrar_de_link_feed(sender, instance, **kwargs):
+    eliminar_link(instance)
+
+
+def desvincular_origen_del_feed(sender, instance, **kwargs):
+    desvincular_origen(instance)
+
+
+for modelo in (LinkRelevante, LinkRedSocial, LinkTvDigital, LinkRadioDigital):
+    post_save.connect(
+        actualizar_link_feed, sender=modelo, dispatch_uid=f"link_feed_{modelo.__name__}"
+    )
+    post_delete.connect(
+        borrar_de_link_feed, sender=modelo, dispatch_uid=f"link_feed_{modelo.__name__}"
+    )
+
+for modelo in (DiarioDigital, RedSocial, TvDigital, RadioDigital):
+    post_delete.connect(
+        desvincular_origen_del_feed,
+        sender=modelo,
+        dispatch_uid=f"link_feed_{modelo.__name__}",
+    )
+
+
+# Índice de dominios de las fuentes (services/fuentes.py): se descarta al
+# crear, modificar o borrar una fuente y se rearma en la próxima consulta.
+
+
+def invalidar_indice_fuentes(sender, **kwargs):
+    invalidar_indice(sender)
+
+
+for modelo in (DiarioDigital, RedSocial, TvDigital, RadioDigital):
+    for evento in (post_save, post_delete):
+        evento.connect(
+            invalidar_indice_fuentes,
+            sender=modelo,
+            dispatch_uid=f"indice_fuentes_{modelo.__name__}",
+        )
+
+
+
+# Estadísticas diarias: los cambios sobre días ya volcados los marcan como
+# pendientes para que se recalculen.
+
+
+def _dias(fechas_hora):
+    return {timezone.localdate(valor) for valor in fechas_hora if valor}
+
+
+def _dias_de_decisiones(links_ids):
+    return _dias(
+        Actividad.objects.filter(
+            tipo=TipoActividad.CAMBIO_ESTADO,
+            objeto_tipo=LinkRelevante._meta.model_name,
+            objeto_id__in=links_ids,
+        ).values_list("fecha_hora", flat=True)
+    )
+
+
+def _dias_de_articulos(**filtros):
+    return _dias(Articulo.objects.filter(**filtros).values_list("fecha_creacion", flat=True))
+
+
+def _dias_de_informes(**filtros):
+    return _dias(
+        InformeIndividual.objects.filter(**filtros).values_list("fecha_creacion", flat=True)
+    )
+
+
+def estadisticas_link_guardado(sender, instance, raw=False, **kwargs):
+    if not raw:
+        marcar_dias_pendientes(
+            _dias([instance.fecha_carga]) | _dias_de_articulos(links_incluidos=instance)
+        )
+
+
+def estadisticas_link_borrado(sender, instance, **kwargs):
+    marcar_dias_pendientes(
+        _dias([instance.fecha_carga])
+        | _dias_de_articulos(links_incluidos=instance)
+        | _dias_de_decisiones([instance.pk])
+    )
+
+
+def estadisticas_categorias_link(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear", "pre_clear"):
+        return
+    if reverse:
+        links_ids = pk_set or []
+    else:
+        links_ids = [instance.pk]
+    marcar_dias_pendientes(_dias_de_decisiones(links_ids))
+
+
+def estadisticas_fecha_creacion(sender, instance, raw=False, **kwargs):
+    if not raw:
+        marcar_dias_pendientes(_dias([instance.fecha_creacion]))
+
+
+def estadisticas_fecha_carga(sender, instance, raw=False, **kwargs):
+    if not raw:
+        marcar_dias_pendientes(_dias([instance.fecha_carga]))
+
+
+def estadisticas_articulo(sender, instance, raw=False, **kwargs):
+    # La categoría del artículo cuenta en los informes que lo incluyen.
+    if not raw:
+        marcar_dias_pendientes(
+            _dias([instance.fecha_creacion]) | _dias_de_informes(articulos=instance)
+        )
+
+
+def estadisticas_links_de_articulo(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear", "pre_clear"):
+        return
+    if reverse:
+        marcar_dias_pendientes(_dias_de_articulos(links_incluidos=instance))
+        if pk_set:
+            marcar_dias_pendientes(_dias_de_articulos(pk__in=pk_set))
+    else:
+        marcar_dias_pendientes(_dias([instance.fecha_creacion]))
+
+
+def estadisticas_articulos_de_informe(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear", "pre_clear"):
+        return
+    if reverse:
+        marcar_dias_pendientes(_dias_de_informes(articulos=instance))
+        if pk_set:
+            marcar_dias_pendientes(_dias_de_informes(pk__in=pk_set))
+    else:
+        marcar_dias_pendientes(_dias([instance.fecha_creacion]))
+
+
+def estadisticas_hecho_previo(sender, instance, raw=False, **kwargs):
+    # Si cambia la fecha del hecho también hay que recalcular la anterior.
+    if not raw and instance.pk:
+        anterior = HechoDelictivo.objects.filter(pk=instance.pk).values_list("fecha", flat=True).first()
+        if anterior and anterior != instance.fecha:
+            marcar_dias_pendientes([anterior])
+
+
+def estadisticas_hecho(sender, instance, raw=False, **kwargs):
+    if not raw:
+        marcar_dias_pendientes([instance.fecha])
+
+
+post_save.connect(estadisticas_link_guardado, sender=LinkRelevante, dispatch_uid="estadisticas_link")
+pre_delete.connect(estadisticas_link_borrado, sender=LinkRelevante, dispatch_uid="estadisticas_link")
+m2m_changed.connect(
+    estadisticas_categorias_link,
+    sender=LinkRelevante.categorias.through,
+    dispatch_uid="estadisticas_categorias_link",
+)
+for evento in (post_save, post_delete):
+    evento.connect(estadisticas_fecha_carga, sender=LinkRedSocial, dispatch_uid="estadisticas_red")
+    evento.connect(
+        estadisticas_fecha_creacion, sender=SolicitudInfo, dispatch_uid="estadisticas_solicitud"
+    )
+    evento.connect(
+        estadisticas_fecha_creacion, sender=InformeIndividual, dispatch_uid="estadisticas_informe"
+    )
+    evento.connect(estadisticas_hecho, sender=HechoDelictivo, dispatch_uid="estadisticas_hecho")
+post_save.connect(estadisticas_articulo, sender=Articulo, dispatch_uid="estadisticas_articulo")
+pre_delete.connect(estadisticas_articulo, sender=Articulo, dispatch_uid="estadisticas_articulo")
+pre_save.connect(estadisticas_hecho_previo, sender=HechoDelictivo, dispatch_uid="estadisticas_hecho")
+m2m_changed.connect(
+    estadisticas_links_de_articulo,
+    sender=Articulo.links_incluidos.through,
+    dispatch_uid="estadisticas_links_de_articulo",
+)
+m2m_changed.connect(
+    estadisticas_articulos_de_informe,
+    sender=InformeIndividual.articulos.through,
+    dispatch_uid="estadisticas_articulos_de_informe",
+)
+
+
+# Caché del panel de estadísticas: cualquier cambio en los datos que muestra
+# descarta las respuestas guardadas.
+
+
+def invalidar_cache_estadisticas(sender, raw=False, **kwargs):
+    if not raw:
+        invalidar_estadisticas()
+
+
+def invalidar_cache_por_actividad(sender, instance, raw=False, **kwargs):
+    # Las decisiones de clasificación salen de los cambios de estado.
+    if not raw and instance.tipo == TipoActividad.CAMBIO_ESTADO:
+        invalidar_estadisticas()
+
+
+def invalidar_cache_por_relacion(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidar_estadisticas()
+
+
+for modelo in (
+    LinkRelevante,
+    LinkRedSocial,
+    Articulo,
+    SolicitudInfo,
+    HechoDelictivo,
+    InformeIndividual,
+    UserProfile,
+    Categoria,
+    DiarioDigital,
+    RedSocial,
+):
+    for evento in (post_save, post_delete):
+        evento.connect(
+            invalidar_cache_estadisticas,
+            sender=modelo,
+            dispatch_uid=f"cache_estadisticas_{modelo.__name__}",
+        )
+post_save.connect(
+    invalidar_cache_por_actividad, sender=Actividad, dispatch_uid="cache_estadisticas_Actividad"
+)
+for relacion in (
+    LinkRelevante.categorias.through,
+    Articulo.links_incluidos.through,
+    InformeIndividual.articulos.through,
+):
+    m2m_changed.connect(
+        invalidar_cache_por_relacion,
+        sender=relacion,
+        dispatch_uid=f"cache_estadisticas_{relacion.__name__}",
+    )
+
+
+# Exportaciones PDF: los documentos guardados se identifican por la fecha de
+# modificación del objeto, que también cambia al agregar o quitar relaciones
+# (de los dos lados, cuando ambos la tienen).
+
+MODELOS_CON_FECHA_MODIFICACION = (Articulo, InformeIndividual, HechoDelictivo, BandaCriminal)
+
+
+def actualizar_fecha_modificacion(sender, instance, action, model, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    ahora = timezone.now()
+    if isinstance(instance, MODELOS_CON_FECHA_MODIFICACION):
+        type(instance).objects.filter(pk=instance.pk).update(fecha_modificacion=ahora)
+    if pk_set and model in MODELOS_CON_FECHA_MODIFICACION:
+        model.objects.filter(pk__in=pk_set).update(fecha_modificacion=ahora)
+
+
+for modelo in MODELOS_CON_FECHA_MODIFICACION:
+    for campo in modelo._meta.local_many_to_many:
+        m2m_changed.connect(
+            actualizar_fecha_modificacion,
+            sender=campo.remote_field.through,
+            dispatch_uid=f"fecha_modificacion_{modelo.__name__}_{campo.name}",
+        )
+
+
+# Filas sin fecha propia que se muestran en los PDF: al editarlas o borrarlas
+# se toca la fecha de los informes y hechos que las incluyen.
+CAMPOS_INFORME = {
+    Alias: "alias",
+    Telefono: "telefono",
+    Domicilio: "domicilio",
+    Vehiculo: "vehiculos",
+    Empleador: "empleadores",
+    Vinculo: "vinculos",
+}
+
+
+def tocar_informes(sender, instance, **kwargs):
+    InformeIndividual.objects.filter(**{CAMPOS_INFORME[sender]: instance}).update(
+        fecha_modificacion=timezone.now()
+    )
+
+
+def tocar_hechos_de_noticia(sender, instance, update_fields=None, **kwargs):
+    # Del link, el PDF del hecho sólo muestra la URL.
+    if update_fields is not None and "url" not in update_fields:
+        return
+    HechoDelictivo.objects.filter(noticias=instance).update(fecha_modificacion=timezone.now())
+
+
+for modelo in CAMPOS_INFORME:
+    for evento in (post_save, pre_delete):
+        evento.connect(tocar_informes, sender=modelo, dispatch_uid=f"fecha_informes_{modelo.__name__}")
+post_save.connect(tocar_hechos_de_noticia, sender=LinkRelevante, dispatch_uid="fecha_hechos_noticia")
+pre_delete.connect(tocar_hechos_de_noticia, sender=LinkRelevante, dispatch_uid="fecha_hechos_noticia")
+
+
+def configurar_sqlite(sender, connection, **kwargs):
+    """
+    Con DB_SQLITE_WAL, en SQLite usa el journal WAL: las lecturas ya no
+    bloquean las escrituras y se reducen los "database is locked" con varios
+    usuarios a la vez.
+    """
+    if connection.vendor == "sqlite" and settings.DB_SQLITE_WAL:
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+
+
+connection_created.connect(configurar_sqlite, dispatch_uid="configurar_sqlite")
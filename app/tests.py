@@ -1,11 +1,117 @@
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from io import StringIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+import openpyxl
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
-from .models import DiarioDigital
+from .models import (
+    Actividad,
+    Alias,
+    ArchivoActividad,
+    Articulo,
+    BandaCriminal,
+    Categoria,
+    DiaEstadisticas,
+    DiarioDigital,
+    EstadisticaDiaria,
+    EstadoLink,
+    HechoDelictivo,
+    InformeIndividual,
+    ItemTrabajoIA,
+    LinkFeed,
+    LinkRedSocial,
+    LinkRelevante,
+    RedSocial,
+    ResumenArchivoActividad,
+    Roles,
+    TipoActividad,
+    TrabajoIA,
+    UserProfile,
+)
+from .middleware import Medicion, huella_sql
+from .services import metricas
+from .services import pdf as servicio_pdf
+from .services.descargas import ClienteHTTP
+from .services.fuentes import IndiceDominios, resolver_fuente
+from .services.archivo_actividad import archivar_actividades
+from .services.registro_actividad import RegistroActividades
+from .services.estadisticas import actualizar_estadisticas, calcular_estadisticas
+from .utils.actividad import completar_actividades, log_actividad
+from .utils.graficos_svg import grafico_barras_svg, grafico_torta_svg
+from .utils.html_texto import extraer_texto_html
+from .utils.pdf_tablas import escribir_tabla_pdf
+from .services.cola_ia import encolar_links, procesar_items, progreso_trabajo, reservar_items
+from .services.ia import (
+    AnalisisIA,
+    IAProcessingError,
+    LinkAIProcessor,
+    ResultadoIA,
+    _dominio_metrica,
+    normalizar_url,
+)
+from .views import (
+    _obtener_estadisticas_clasificacion,
+    _obtener_estadisticas_prensa,
+    _obtener_estadisticas_redaccion,
+)
+
+# Las páginas que extienden base.html usan {% static %}; sin collectstatic no
+# existe el manifiesto de whitenoise.
+STATIC_SIN_MANIFIESTO = "django.contrib.staticfiles.storage.StaticFilesStorage"
+
+# Las actividades se insertan en el momento, con cualquier runner: los tests
+# consultan Actividad apenas termina la request. Los cachés quedan en memoria
+# para no escribir en cache/ ni arrastrar datos de corridas anteriores.
+CACHES_EN_MEMORIA = {
+    alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": alias}
+    for alias in ("default", "ia", "estadisticas")
+}
+entorno_de_pruebas = override_settings(ACTIVIDAD_REGISTRO_SINCRONICO=True, CACHES=CACHES_EN_MEMORIA)
+
+
+class _CachesLimpios:
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for alias in CACHES_EN_MEMORIA:
+            caches[alias].clear()
+
+
+@entorno_de_pruebas
+class MinervaTestCase(_CachesLimpios, TestCase):
+    pass
 
 
-class TokenAuthenticationAPITest(APITestCase):
+@entorno_de_pruebas
+class MinervaTransactionTestCase(_CachesLimpios, TransactionTestCase):
+    pass
+
+
+@entorno_de_pruebas
+class MinervaAPITestCase(_CachesLimpios, APITestCase):
+    pass
+
+
+class TokenAuthenticationAPITest(MinervaAPITestCase):
     def setUp(self):
         self.user = User.objects.create_user(
             username="tester", email="tester@example.com", password="strong-pass-123"
@@ -25,3 +131,1215 @@ class TokenAuthenticationAPITest(APITestCase):
         self.assertEqual(response.status_code, 200)
         payload = response.json()
         self.assertTrue(any(item["nombre"] == self.diario.nombre for item in payload))
+
+
+class ProcesarLinksIATest(MinervaTestCase):
+    class ProcessorFalso:
+        def __init__(self, categorias_por_url):
+            self.categorias_por_url = categorias_por_url
+
+        def extraer_texto(self, url):
+            if url.endswith("caido"):
+                raise IAProcessingError(f"No se pudo descargar el contenido del link {url}")
+            return "Contenido de prueba"
+
+        def analizar(self, url, texto):
+            return AnalisisIA(
+                categorias=self.categorias_por_url.get(url, []),
+                resumen="Resumen",
+                confianza=0.8,
+            )
+
+        def analizar_lote(self, items):
+            return {
+                link_id: ResultadoIA(link_id, analisis=self.analizar(url, texto))
+                for link_id, url, texto in items
+            }
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="prensa", password="x")
+        self.categoria = Categoria.objects.create(nombre="Homicidios")
+        self.aprobable = LinkRelevante.objects.create(
+            url="https://example.com/a", cargado_por=self.user
+        )
+        self.descartable = LinkRelevante.objects.create(
+            url="https://example.com/b", cargado_por=self.user
+        )
+        self.caido = LinkRelevante.objects.create(
+            url="https://example.com/caido", cargado_por=self.user
+        )
+        self.processor = self.ProcessorFalso(
+            {
+                self.aprobable.url: ["homicidios"],
+                self.descartable.url: ["Inexistente"],
+            }
+        )
+
+    def test_procesa_lote_y_reporta_errores_por_link(self):
+        ids = [self.aprobable.pk, self.descartable.pk, self.caido.pk, 999999]
+        trabajo, no_encolados = encolar_links(ids)
+        procesar_items(reservar_items("worker-test", 10), self.processor)
+        trabajo.refresh_from_db()
+        progreso = progreso_trabajo(trabajo)
+
+        self.assertEqual(no_encolados, {"999999": "Link no encontrado."})
+        self.assertEqual(sorted(progreso["procesados"]), [self.aprobable.pk, self.descartable.pk])
+        self.assertEqual(set(progreso["errores"]), {str(self.descartable.pk), str(self.caido.pk)})
+
+        self.aprobable.refresh_from_db()
+        self.assertEqual(self.aprobable.estado, EstadoLink.APROBADO)
+        self.assertTrue(self.aprobable.clasificado_por_ia)
+        self.assertEqual(list(self.aprobable.categorias.all()), [self.categoria])
+
+        self.descartable.refresh_from_db()
+        self.assertEqual(self.descartable.estado, EstadoLink.DESCARTADO)
+
+        self.caido.refresh_from_db()
+        self.assertEqual(self.caido.estado, EstadoLink.PENDIENTE)
+
+
+class ColaIATest(MinervaTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="clasificador", password="x")
+        Categoria.objects.create(nombre="Homicidios")
+        self.link = LinkRelevante.objects.create(
+            url="https://example.com/a", cargado_por=self.user
+        )
+        self.otro = LinkRelevante.objects.create(
+            url="https://example.com/b", cargado_por=self.user
+        )
+        self.processor = ProcesarLinksIATest.ProcessorFalso(
+            {self.link.url: ["Homicidios"], self.otro.url: ["Homicidios"]}
+        )
+
+    def test_worker_procesa_trabajo_y_reporta_progreso(self):
+        trabajo, errores = encolar_links([self.link.pk, "x"], usuario=self.user)
+        self.assertEqual(errores, {"x": "Link no encontrado."})
+        self.assertFalse(progreso_trabajo(trabajo)["finalizado"])
+
+        items = reservar_items("worker-test", 10)
+        self.assertEqual([item.link_id for item in items], [self.link.pk])
+        self.assertEqual(reservar_items("otro-worker", 10), [])
+
+        procesar_items(items, self.processor)
+        trabajo.refresh_from_db()
+        progreso = progreso_trabajo(trabajo)
+        self.assertTrue(progreso["finalizado"])
+        self.assertEqual(progreso["procesados"], [self.link.pk])
+
+    def test_retoma_reservas_vencidas_sin_repetir_completados(self):
+        trabajo, _ = encolar_links([self.link.pk, self.otro.pk])
+        items = reservar_items("worker-caido", 10)
+        procesar_items([items[0]], self.processor)
+
+        vencida = timezone.now() - timedelta(seconds=settings.IA_COLA_TIEMPO_RESERVA + 1)
+        ItemTrabajoIA.objects.filter(pk=items[1].pk).update(fecha_reserva=vencida)
+
+        retomados = reservar_items("worker-nuevo", 10)
+        self.assertEqual([item.link_id for item in retomados], [self.otro.pk])
+        procesar_items(retomados, self.processor)
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, TrabajoIA.Estado.COMPLETADO)
+
+
+class CacheIATest(MinervaTestCase):
+    class ProcessorContado(LinkAIProcessor):
+        def __init__(self, categorias):
+            self.llamadas = 0
+            client = SimpleNamespace(
+                chat=SimpleNamespace(completions=SimpleNamespace(create=self._create))
+            )
+            super().__init__(client=client, categorias=categorias)
+            self.descargas = 0
+
+        def _descargar_texto(self, url, anterior=None):
+            self.descargas += 1
+            return {"texto": "Detuvieron a un hombre en barrio Alberdi."}
+
+        def _create(self, **kwargs):
+            self.llamadas += 1
+            contenido = json.dumps(
+                {"categorias": ["Homicidios"], "resumen": "Resumen.", "confianza": 0.8}
+            )
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=contenido))]
+            )
+
+    def test_normaliza_urls_equivalentes(self):
+        self.assertEqual(
+            normalizar_url("HTTPS://Diario.com:443/nota/?utm_source=x&b=2&a=1#comentarios"),
+            normalizar_url("https://diario.com/nota?a=1&b=2&fbclid=abc"),
+        )
+
+    def test_reutiliza_texto_y_analisis(self):
+        url = "https://diario.com/nota?utm_medium=social"
+        processor = self.ProcessorContado(["Homicidios"])
+        for _ in range(2):
+            processor.analizar(url, processor.extraer_texto(url))
+        self.assertEqual((processor.descargas, processor.llamadas), (1, 1))
+
+        # Con otras categorías el prompt cambia: se consulta a la IA, pero el
+        # texto sigue saliendo de la caché.
+        otro = self.ProcessorContado(["Homicidios", "Robos"])
+        otro.analizar(url, otro.extraer_texto("https://diario.com/nota"))
+        self.assertEqual((otro.descargas, otro.llamadas), (0, 1))
+
+
+class AnalisisEnLoteIATest(MinervaTestCase):
+    def test_valida_entradas_y_reintenta_de_a_uno(self):
+        respuestas = [
+            {
+                "resultados": [
+                    {"id": "1", "categorias": ["Homicidios"], "resumen": "A", "confianza": 0.9},
+                    {"id": "2", "categorias": "Robos", "resumen": "B", "confianza": 0.5},
+                ]
+            },
+            {"categorias": ["Robos"], "resumen": "B", "confianza": 0.7},
+        ]
+        prompts = []
+
+        def create(**kwargs):
+            prompts.append(kwargs["messages"][1]["content"])
+            contenido = json.dumps(respuestas[len(prompts) - 1])
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=contenido))]
+            )
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        processor = LinkAIProcessor(client=client, categorias=["Homicidios", "Robos"])
+        resultados = processor.analizar_lote(
+            [(1, "https://diario.com/1", "Texto uno"), (2, "https://diario.com/2", "Texto dos")]
+        )
+
+        self.assertEqual(len(prompts), 2)
+        self.assertIn("Artículo ID 2", prompts[0])
+        self.assertNotIn("Texto uno", prompts[1])
+        self.assertEqual(resultados[1].analisis.categorias, ["Homicidios"])
+        self.assertEqual(resultados[2].analisis.categorias, ["Robos"])
+
+    def test_respuesta_individual_con_formato_invalido_falla_solo_ese_link(self):
+        respuestas = {
+            "Texto uno": ["Robos"],
+            "Texto dos": {"categorias": ["Robos"], "resumen": "B", "confianza": "alta"},
+            "Texto tres": {"categorias": ["Homicidios"], "resumen": "C", "confianza": 0.6},
+        }
+
+        def create(**kwargs):
+            prompt = kwargs["messages"][1]["content"]
+            # La consulta en lote falla y cada link se reintenta de a uno.
+            if "Artículo ID" in prompt:
+                contenido = "[]"
+            else:
+                contenido = json.dumps(next(r for texto, r in respuestas.items() if texto in prompt))
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=contenido))]
+            )
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        processor = LinkAIProcessor(client=client, categorias=["Homicidios", "Robos"])
+        with self.assertLogs("app.services.ia", "ERROR"):
+            resultados = processor.analizar_lote(
+                [(i, f"https://diario.com/{i}", texto) for i, texto in enumerate(respuestas, 1)]
+            )
+
+        self.assertIn("objeto JSON", resultados[1].error)
+        self.assertIn("confianza", resultados[2].error)
+        self.assertEqual(resultados[3].analisis.categorias, ["Homicidios"])
+
+
+class ExtraerTextoHTMLTest(MinervaTestCase):
+    def test_prioriza_article_e_ignora_scripts(self):
+        parrafo = "<p>El hecho ocurrió en barrio Alberdi según la policía.</p>"
+        html = (
+            "<html><head><script>var x = '<p>no</p>';</script><style>p {}</style></head>"
+            "<body><nav>Inicio Policiales</nav><noscript>Activá JS</noscript>"
+            f"<article><h1>Robo en Córdoba</h1>{parrafo * 10}</article>"
+            "<footer>Derechos reservados</footer></body></html>"
+        ).encode("utf-8")
+        # Fragmentos chicos para cortar también caracteres multibyte.
+        fragmentos = [html[i : i + 7] for i in range(0, len(html), 7)]
+
+        texto = extraer_texto_html(fragmentos, max_caracteres=5000)
+        self.assertTrue(texto.startswith("Robo en Córdoba El hecho ocurrió"))
+        for ausente in ("var x", "Inicio", "Activá", "Derechos"):
+            self.assertNotIn(ausente, texto)
+
+        self.assertEqual(len(extraer_texto_html(fragmentos, max_caracteres=50)), 50)
+        self.assertEqual(
+            extraer_texto_html([b"<p>sin region</p>", b"<p>resto</p>"], max_bytes=17),
+            "sin region",
+        )
+
+    def test_sin_region_deja_de_leer_al_llenar_el_texto(self):
+        parrafo = "<p>" + "Texto de la nota sin article ni main. " * 10 + "</p>"
+        fragmentos = iter([b"<html><body>"] + [parrafo.encode()] * 100 + [b"</body></html>"])
+
+        texto = extraer_texto_html(fragmentos, max_caracteres=1000)
+
+        self.assertEqual(len(texto), 1000)
+        self.assertGreater(len(list(fragmentos)), 90)
+
+
+@override_settings(
+    IA_CACHE_TTL_TEXTO=0,
+    IA_DESCARGA_BACKOFF=0,
+)
+class DescargaArticulosTest(MinervaTestCase):
+    def test_reintenta_errores_y_revalida_con_etag(self):
+        estados = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if not estados:
+                    estado, cuerpo = 503, b""
+                elif self.headers.get("If-None-Match") == '"v1"':
+                    estado, cuerpo = 304, b""
+                else:
+                    estado, cuerpo = 200, "<article>Nota de policiales en Córdoba</article>".encode()
+                estados.append(estado)
+                self.send_response(estado)
+                self.send_header("ETag", '"v1"')
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, format, *args):
+                pass
+
+        servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        self.addCleanup(servidor.server_close)
+        self.addCleanup(servidor.shutdown)
+        url = f"http://127.0.0.1:{servidor.server_address[1]}/nota"
+
+        processor = LinkAIProcessor(
+            client=object(), categorias=["General"], http=ClienteHTTP(limites={"127.0.0.1": (4, 0)})
+        )
+        for _ in range(2):
+            self.assertEqual(
+                processor.extraer_texto(url), "Nota de policiales en Córdoba"
+            )
+        self.assertEqual(estados, [503, 200, 304])
+
+
+class ApiLinksListTest(MinervaTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="clasif", password="x")
+        self.client.force_login(self.user)
+        self.categoria = Categoria.objects.create(nombre="Robos")
+        diario = DiarioDigital.objects.create(nombre="La Voz", url_principal="https://lavoz.com.ar")
+        self.links = [
+            LinkRelevante.objects.create(
+                url=f"https://lavoz.com.ar/nota-{i}", cargado_por=self.user, diario_digital=diario
+            )
+            for i in range(5)
+        ]
+        # Dos links con la misma fecha para ejercitar el desempate por id.
+        LinkRelevante.objects.filter(pk__in=[self.links[1].pk, self.links[2].pk]).update(
+            fecha_carga=self.links[1].fecha_carga
+        )
+        self.links[0].categorias.add(self.categoria)
+
+    def test_pagina_por_cursor_sin_repetir_links(self):
+        vistos = []
+        cursor = None
+        while True:
+            params = {"limite": 2, "fields": "url,categorias_info"}
+            if cursor:
+                params.update(cursor=cursor, total=0)
+            data = self.client.get("/api/links_list/", params).json()
+            vistos += data["resultados"]
+            cursor = data["siguiente"]
+            if not cursor:
+                break
+
+        esperados = LinkRelevante.objects.order_by("-fecha_carga", "-id")
+        self.assertEqual([fila["id"] for fila in vistos], [link.pk for link in esperados])
+        self.assertEqual(set(vistos[0]), {"id", "url", "categorias_info"})
+        con_categoria = next(fila for fila in vistos if fila["id"] == self.links[0].pk)
+        self.assertEqual(con_categoria["categorias_info"], [{"id": self.categoria.pk, "nombre": "Robos"}])
+
+    def test_sin_limite_devuelve_el_array_completo(self):
+        data = self.client.get("/api/links_list/").json()
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data[0]["diario_nombre"], "La Voz")
+        self.assertEqual(data[0]["tipo_fuente"], "diario")
+
+    def test_feed_unificado_sigue_a_los_links(self):
+        red = RedSocial.objects.create(nombre="X", url_principal="https://x.com")
+        posteo = LinkRedSocial.objects.create(
+            url="https://x.com/post/1", cargado_por=self.user, red_social=red
+        )
+        data = self.client.get(
+            "/api/links_list/", {"fuente": "todas", "limite": 3, "fields": "tipo_fuente,red_social_nombre"}
+        ).json()
+        self.assertEqual(data["total"], 6)
+        self.assertEqual(
+            data["resultados"][0],
+            {"id": posteo.pk, "tipo_fuente": "red_social", "red_social_nombre": "X"},
+        )
+
+        posteo.estado = EstadoLink.APROBADO
+        posteo.save()
+        self.assertEqual(LinkFeed.objects.get(tipo_fuente="red_social").estado, EstadoLink.APROBADO)
+        red.delete()
+        self.assertIsNone(LinkFeed.objects.get(tipo_fuente="red_social").origen_id)
+        self.links[0].delete()
+        self.assertEqual(LinkFeed.objects.filter(tipo_fuente="diario").count(), 4)
+
+
+class MigrarDesdeSQLiteTest(MinervaTransactionTestCase):
+    def test_copia_los_datos_conservando_ids(self):
+        usuario = User.objects.create_user(username="prensa", password="x")
+        diario = DiarioDigital.objects.create(nombre="La Voz", url_principal="https://lavoz.com.ar")
+        categoria = Categoria.objects.create(nombre="Robos")
+        link = LinkRelevante.objects.create(
+            url="https://lavoz.com.ar/nota", cargado_por=usuario, diario_digital=diario
+        )
+        link.categorias.add(categoria)
+        articulo = Articulo.objects.create(titulo="Nota", descripcion="x", generado_por=usuario)
+        antes = timezone.now() - timedelta(days=400)
+        LinkRelevante.objects.filter(pk=link.pk).update(fecha_carga=antes)
+        Articulo.objects.filter(pk=articulo.pk).update(fecha_creacion=antes, fecha_modificacion=antes)
+
+        with tempfile.TemporaryDirectory() as temporal:
+            origen = Path(temporal) / "origen.sqlite3"
+            with connection.cursor() as cursor:
+                cursor.execute("VACUUM INTO %s", [str(origen)])
+            Articulo.objects.all().delete()
+            LinkRelevante.objects.all().delete()
+            User.objects.all().delete()
+
+            call_command("migrar_desde_sqlite", origen=str(origen), interactive=False, stdout=StringIO())
+
+        copiado = LinkRelevante.objects.get()
+        self.assertEqual(copiado.pk, link.pk)
+        self.assertEqual(copiado.cargado_por.username, "prensa")
+        self.assertEqual(list(copiado.categorias.all()), [categoria])
+        self.assertEqual(copiado.fecha_carga, antes)
+        articulo = Articulo.objects.get()
+        self.assertEqual((articulo.fecha_creacion, articulo.fecha_modificacion), (antes, antes))
+        self.assertTrue(Articulo._meta.get_field("fecha_creacion").auto_now_add)
+        nuevo = LinkRelevante.objects.create(url="https://lavoz.com.ar/otra", cargado_por=usuario)
+        self.assertGreater(nuevo.pk, link.pk)
+
+
+class ActividadEstructuradaTest(MinervaTestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user(username="clasif", password="x")
+        UserProfile.objects.create(user=self.usuario, rol=Roles.CLASIFICACION)
+        self.robos = Categoria.objects.create(nombre="Robos")
+        self.links = [
+            LinkRelevante.objects.create(url=f"https://lavoz.com.ar/nota-{i}", cargado_por=self.usuario)
+            for i in range(2)
+        ]
+        self.links[0].categorias.add(self.robos)
+        self.ahora = timezone.now()
+        for horas, link in zip((2, 3), self.links):
+            LinkRelevante.objects.filter(pk=link.pk).update(
+                fecha_carga=self.ahora - timedelta(hours=horas)
+            )
+
+    def _registrar(self, descripcion):
+        actividad = Actividad.objects.create(
+            usuario=self.usuario, tipo=TipoActividad.CAMBIO_ESTADO, descripcion=descripcion
+        )
+        Actividad.objects.filter(pk=actividad.pk).update(fecha_hora=self.ahora)
+
+    def test_log_actividad_guarda_objeto_y_estados(self):
+        request = SimpleNamespace(user=self.usuario)
+        log_actividad(
+            request,
+            TipoActividad.CAMBIO_ESTADO,
+            "Cambio",
+            objeto=self.links[0],
+            estado_anterior=EstadoLink.PENDIENTE,
+            estado_nuevo=EstadoLink.APROBADO,
+        )
+        actividad = Actividad.objects.get()
+        self.assertEqual(
+            (actividad.objeto_tipo, actividad.objeto_id, actividad.estado_anterior, actividad.estado_nuevo),
+            ("linkrelevante", self.links[0].pk, "pendiente", "aprobado"),
+        )
+
+    def test_completa_historicas_y_calcula_estadisticas(self):
+        aprobado, descartado = self.links
+        self._registrar(f"Se cambió el estado del link ID {aprobado.pk} de 'pendiente' a 'aprobado'. URL: x")
+        self._registrar(f"Se cambió el estado del link ID {descartado.pk} de 'pendiente' a 'descartado'. URL: x")
+        self._registrar(f"Se cambió el estado del link de red social ID {aprobado.pk} de 'pendiente' a 'aprobado'. URL: x")
+        self._registrar("Se cambió el estado del link ID 999999 de 'pendiente' a 'aprobado'. URL: x")
+
+        self.assertEqual(completar_actividades(), 4)
+        self.assertEqual(completar_actividades(), 0)
+        red = Actividad.objects.get(descripcion__contains="red social")
+        self.assertEqual((red.objeto_tipo, red.objeto_id), ("linkredsocial", aprobado.pk))
+
+        stats = _obtener_estadisticas_clasificacion()
+        usuario = stats["usuarios"][0]
+        self.assertEqual(usuario["aprobados"], 1)
+        self.assertEqual(usuario["rechazados"], 1)
+        self.assertEqual(usuario["links_clasificados"], 2)
+        self.assertEqual(usuario["promedio_horas"], 2.5)
+        self.assertEqual(usuario["categorias"], [{"nombre": "Robos", "cantidad": 1, "porcentaje": 100.0}])
+        self.assertEqual(stats["global"]["total_clasificados"], 2)
+
+
+class EstadisticasDiariasTest(MinervaTestCase):
+    def setUp(self):
+        self.prensa = User.objects.create_user(username="prensa", password="x")
+        UserProfile.objects.create(user=self.prensa, rol=Roles.PRENSA)
+        self.redactor = User.objects.create_user(username="redactor", password="x")
+        UserProfile.objects.create(user=self.redactor, rol=Roles.REDACCION)
+        diario = DiarioDigital.objects.create(nombre="La Voz", url_principal="https://lavoz.com.ar")
+        ahora = timezone.now()
+        self.links = []
+        for dias in (3, 2, 0):
+            link = LinkRelevante.objects.create(
+                url=f"https://lavoz.com.ar/nota-{dias}", cargado_por=self.prensa, diario_digital=diario
+            )
+            LinkRelevante.objects.filter(pk=link.pk).update(fecha_carga=ahora - timedelta(days=dias))
+            self.links.append(link)
+        LinkRelevante.objects.filter(pk=self.links[0].pk).update(
+            estado=EstadoLink.APROBADO, fecha_aprobacion=ahora - timedelta(days=3)
+        )
+        articulo = Articulo.objects.create(titulo="Nota", descripcion="x", generado_por=self.redactor)
+        articulo.links_incluidos.add(self.links[0])
+        Articulo.objects.filter(pk=articulo.pk).update(fecha_creacion=ahora - timedelta(days=2))
+
+    def _estadisticas(self, **rango):
+        return _obtener_estadisticas_prensa(**rango), _obtener_estadisticas_redaccion(**rango)
+
+    def test_volcado_da_los_mismos_totales(self):
+        hoy = timezone.localdate()
+        rango = {"desde": str(hoy - timedelta(days=2)), "hasta": str(hoy)}
+        en_vivo = self._estadisticas()
+        en_vivo_rango = self._estadisticas(**rango)
+        self.assertEqual(en_vivo[0][1]["total_links"], 3)
+        self.assertEqual(en_vivo_rango[0][1]["total_links"], 2)
+        self.assertEqual(en_vivo[1]["usuarios"][0]["promedio_tiempo_horas"], 24.0)
+
+        dias, filas = actualizar_estadisticas()
+        self.assertEqual(dias, 3)
+        self.assertTrue(EstadisticaDiaria.objects.filter(metrica=EstadisticaDiaria.Metrica.ARTICULOS).exists())
+        self.assertEqual(self._estadisticas(), en_vivo)
+        self.assertEqual(self._estadisticas(**rango), en_vivo_rango)
+        self.assertEqual(actualizar_estadisticas(), (0, 0))
+
+    def test_cambio_en_un_dia_volcado_lo_marca_pendiente(self):
+        actualizar_estadisticas()
+        link = LinkRelevante.objects.get(pk=self.links[1].pk)
+        link.estado = EstadoLink.DESCARTADO
+        link.save()
+
+        dia = timezone.localdate(link.fecha_carga)
+        self.assertTrue(DiaEstadisticas.objects.get(fecha=dia).pendiente)
+        self.assertEqual(self._estadisticas()[0][1]["total_rechazados"], 1)
+        self.assertEqual(actualizar_estadisticas()[0], 1)
+        self.assertFalse(DiaEstadisticas.objects.get(fecha=dia).pendiente)
+        self.assertEqual(self._estadisticas()[0][1]["total_rechazados"], 1)
+
+
+class CacheEstadisticasTest(MinervaTestCase):
+    def setUp(self):
+        gerente = User.objects.create_user(username="gerente", password="x")
+        UserProfile.objects.create(user=gerente, rol=Roles.GERENCIA)
+        self.prensa = User.objects.create_user(username="prensa", password="x")
+        UserProfile.objects.create(user=self.prensa, rol=Roles.PRENSA)
+        self.diario = DiarioDigital.objects.create(nombre="La Voz", url_principal="https://lavoz.com.ar")
+        self.client.force_login(gerente)
+
+    def test_etag_y_invalidacion(self):
+        respuesta = self.client.get("/api/estadisticas/")
+        self.assertEqual(respuesta.status_code, 200)
+        etag = respuesta["ETag"]
+        self.assertEqual(respuesta.json()["resumen_global"]["total_links"], 0)
+
+        repetida = self.client.get("/api/estadisticas/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(repetida.status_code, 304)
+        self.assertEqual(repetida["ETag"], etag)
+
+        LinkRelevante.objects.create(
+            url="https://lavoz.com.ar/nota", cargado_por=self.prensa, diario_digital=self.diario
+        )
+        nueva = self.client.get("/api/estadisticas/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(nueva.status_code, 200)
+        self.assertNotEqual(nueva["ETag"], etag)
+        self.assertEqual(nueva.json()["resumen_global"]["total_links"], 1)
+
+
+class EstadisticasRedaccionTest(MinervaTestCase):
+    """Compara la agregación en SQL con el recorrido en Python que reemplazó."""
+
+    def setUp(self):
+        azar = random.Random(7)
+        redactores = []
+        for i in range(3):
+            usuario = User.objects.create_user(username=f"redactor{i}", password="x")
+            UserProfile.objects.create(user=usuario, rol=Roles.REDACCION)
+            redactores.append(usuario)
+        prensa = User.objects.create_user(username="prensa", password="x")
+        diario = DiarioDigital.objects.create(nombre="La Voz", url_principal="https://lavoz.com.ar")
+        ahora = timezone.now().replace(microsecond=0)
+        links = []
+        for i in range(30):
+            link = LinkRelevante.objects.create(
+                url=f"https://lavoz.com.ar/nota-{i}", cargado_por=prensa, diario_digital=diario
+            )
+            # Sin aprobación, aprobados antes o después de los artículos.
+            aprobacion = None if i % 5 == 0 else ahora - timedelta(minutes=azar.randrange(15 * 24 * 60))
+            LinkRelevante.objects.filter(pk=link.pk).update(fecha_aprobacion=aprobacion)
+            links.append(link)
+        for i in range(40):
+            articulo = Articulo.objects.create(
+                titulo=f"Nota {i}", descripcion="x", generado_por=azar.choice(redactores)
+            )
+            articulo.links_incluidos.set(azar.sample(links, azar.randrange(5)))
+            Articulo.objects.filter(pk=articulo.pk).update(
+                fecha_creacion=ahora - timedelta(minutes=azar.randrange(10 * 24 * 60))
+            )
+
+    def _recorrido_anterior(self, desde=None, hasta=None):
+        articulos = Articulo.objects.prefetch_related("links_incluidos")
+        if desde:
+            articulos = articulos.filter(fecha_creacion__date__gte=desde)
+        if hasta:
+            articulos = articulos.filter(fecha_creacion__date__lte=hasta)
+        datos = {}
+        for articulo in articulos:
+            data = datos.setdefault(articulo.generado_por_id, [0, 0, 0.0, 0])
+            links = list(articulo.links_incluidos.all())
+            data[0] += 1
+            data[1] += len(links)
+            for link in links:
+                if link.fecha_aprobacion and articulo.fecha_creacion >= link.fecha_aprobacion:
+                    data[2] += (articulo.fecha_creacion - link.fecha_aprobacion).total_seconds()
+                    data[3] += 1
+        return {
+            usuario_id: (
+                articulos_total,
+                round(links_total / articulos_total, 2),
+                round(tiempo_total / tiempo_count / 3600, 2) if tiempo_count else 0,
+            )
+            for usuario_id, (articulos_total, links_total, tiempo_total, tiempo_count) in datos.items()
+        }
+
+    def _agregado(self, **rango):
+        return {
+            fila["id"]: (fila["articulos"], fila["promedio_links"], fila["promedio_tiempo_horas"])
+            for fila in _obtener_estadisticas_redaccion(**rango)["usuarios"]
+            if fila["articulos"]
+        }
+
+    def test_mismos_numeros_que_el_recorrido_en_python(self):
+        hoy = timezone.localdate()
+        rangos = [{}, {"desde": hoy - timedelta(days=6), "hasta": hoy - timedelta(days=2)}]
+        for rango in rangos:
+            esperado = self._recorrido_anterior(**rango)
+            self.assertTrue(esperado)
+            parametros = {clave: str(valor) for clave, valor in rango.items()}
+            self.assertEqual(self._agregado(**parametros), esperado)
+            actualizar_estadisticas()
+            self.assertEqual(self._agregado(**parametros), esperado)
+
+
+class ExportacionPDFTest(MinervaTestCase):
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal.cleanup)
+        self.directorio = Path(temporal.name)
+        ajustes = override_settings(
+            PDF_CACHE_DIR=temporal.name, PDF_PROCESOS=0, STATICFILES_STORAGE=STATIC_SIN_MANIFIESTO
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        for destino, valor in (("app.views.HTML", object()), ("app.services.pdf._generar_pdf", self._generar)):
+            parche = mock.patch(destino, valor)
+            parche.start()
+            self.addCleanup(parche.stop)
+        self.generados = 0
+
+        self.redactor = User.objects.create_user(username="redactor", password="x")
+        UserProfile.objects.create(user=self.redactor, rol=Roles.REDACCION)
+        self.articulo = Articulo.objects.create(titulo="Nota", descripcion="x", generado_por=self.redactor)
+        self.client.force_login(self.redactor)
+
+    def _generar(self, html, base_url):
+        self.generados += 1
+        self.html = html
+        return b"%PDF-1.7 " + str(self.generados).encode()
+
+    def _pedir(self):
+        return self.client.get(f"/articulos/{self.articulo.pk}/exportar_pdf/")
+
+    def test_reutiliza_el_pdf_hasta_que_cambia_el_articulo(self):
+        primera = self._pedir()
+        self.assertEqual(primera.status_code, 200)
+        self.assertEqual(primera["Content-Type"], "application/pdf")
+        self.assertTrue(primera["Content-Disposition"].startswith("inline"))
+        self.assertEqual(b"".join(primera.streaming_content), b"%PDF-1.7 1")
+
+        self.assertEqual(b"".join(self._pedir().streaming_content), b"%PDF-1.7 1")
+        self.assertEqual(self.generados, 1)
+
+        link = LinkRelevante.objects.create(url="https://example.com/a", cargado_por=self.redactor)
+        self.articulo.links_incluidos.add(link)
+        self.assertEqual(b"".join(self._pedir().streaming_content), b"%PDF-1.7 2")
+        self.assertEqual(len(list(self.directorio.glob("articulo-*.pdf"))), 1)
+
+    def test_descarga_cuando_termina(self):
+        self.articulo.refresh_from_db()
+        clave = servicio_pdf.clave_pdf(
+            "articulo", self.articulo.pk, self.articulo.fecha_modificacion.isoformat()
+        )
+        (self.directorio / f"{clave}.pendiente").touch()
+
+        respuesta = self._pedir()
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTemplateUsed(respuesta, "pdf_en_preparacion.html")
+        estado = self.client.get(f"/exportar/pdf/{clave}/estado/").json()
+        self.assertEqual(estado, {"estado": "pendiente"})
+        self.assertEqual(self.client.get(f"/exportar/pdf/{clave}/").status_code, 404)
+
+        (self.directorio / f"{clave}.pendiente").unlink()
+        servicio_pdf.encolar_pdf(clave, "<html></html>", "http://testserver/", "Nota.pdf")
+        estado = self.client.get(f"/exportar/pdf/{clave}/estado/").json()
+        self.assertEqual(estado["estado"], "listo")
+        descarga = self.client.get(estado["url"])
+        self.assertEqual(descarga.status_code, 200)
+        self.assertIn("Nota.pdf", descarga["Content-Disposition"])
+
+    def test_regenera_al_cambiar_filas_relacionadas(self):
+        gerente = User.objects.create_user(username="gerencia", password="x")
+        UserProfile.objects.create(user=gerente, rol=Roles.GERENCIA)
+        informe = InformeIndividual.objects.create(apellido="Pérez", nombre="Juan")
+        alias = Alias.objects.create(nombre="El Viejo")
+        informe.alias.add(alias)
+        informe.articulos.add(self.articulo)
+        hecho = HechoDelictivo.objects.create(
+            fecha=timezone.localdate(), descripcion="Robo", creado_por=self.redactor, articulo=self.articulo
+        )
+        hecho.autor.add(informe)
+        banda = BandaCriminal.objects.create(nombre="Los del Sur")
+        hecho.bandas.add(banda)
+
+        def generados(usuario, url):
+            self.client.force_login(usuario)
+            self.assertEqual(self.client.get(url).status_code, 200)
+            return self.generados
+
+        pedidos = (
+            (gerente, f"/informes/{informe.pk}/exportar/"),
+            (self.redactor, f"/hechos/delictivos/{hecho.pk}/exportar_pdf/"),
+            (gerente, f"/exportar/banda/{banda.pk}/pdf/"),
+        )
+        for usuario, url in pedidos:
+            antes = generados(usuario, url)
+            self.assertEqual(generados(usuario, url), antes)
+
+        alias.nombre = "El Nuevo"
+        alias.save()
+        antes = self.generados
+        self.assertEqual(generados(gerente, pedidos[0][1]), antes + 1)
+        self.assertIn("El Nuevo", self.html)
+        # El autor del hecho es el informe, que cambió.
+        self.assertEqual(generados(self.redactor, pedidos[1][1]), antes + 2)
+
+        self.articulo.titulo = "Nota corregida"
+        self.articulo.save()
+        self.assertEqual(generados(gerente, pedidos[0][1]), antes + 3)
+        self.assertEqual(generados(self.redactor, pedidos[1][1]), antes + 4)
+
+        hecho.descripcion = "Robo calificado"
+        hecho.save()
+        self.assertEqual(generados(gerente, pedidos[2][1]), antes + 5)
+        self.assertIn("Robo calificado", self.html)
+
+    @override_settings(ESTADISTICAS_PDF_MAX_FILAS=2)
+    def test_estadisticas_agrupa_categorias_y_limita_el_detalle(self):
+        gerente = User.objects.create_user(username="gerencia", password="x")
+        UserProfile.objects.create(user=gerente, rol=Roles.GERENCIA)
+        robos = Categoria.objects.create(nombre="Robos")
+        hurtos = Categoria.objects.create(nombre="Hurtos")
+        for i in range(3):
+            link = LinkRelevante.objects.create(url=f"https://example.com/{i}", cargado_por=gerente)
+            link.categorias.set([robos, hurtos][: i + 1] if i < 2 else [robos])
+        self.client.force_login(gerente)
+
+        self.client.get("/estadisticas/exportar_pdf/")
+        self.assertIn("Robos", self.html)
+        self.assertIn("Hurtos", self.html)
+        self.assertIn("Se muestran los 2 links más recientes de un total de 3.", self.html)
+        self.assertIn("https://example.com/2", self.html)
+        self.assertNotIn("https://example.com/0", self.html)
+
+        self.client.get("/estadisticas/exportar_pdf/?detalle=0")
+        self.assertEqual(self.generados, 2)
+        self.assertNotIn("Detalle de Links", self.html)
+
+
+class GraficosSVGTest(MinervaTestCase):
+    def test_barras_escapa_etiquetas_y_gradua_el_eje(self):
+        svg = grafico_barras_svg(["<Robos>", "Hurtos"], [3, 7], titulo="Links & más")
+        self.assertTrue(svg.startswith("<svg"))
+        self.assertEqual(svg.count("<rect"), 2)
+        self.assertIn("&lt;Robos&gt;", svg)
+        self.assertIn("Links &amp; más", svg)
+        self.assertIn(">8</text>", svg)
+
+    def test_torta_con_una_sola_porcion_y_sin_datos(self):
+        svg = grafico_torta_svg(["aprobado", "descartado"], [5, 0])
+        self.assertEqual(svg.count("<circle"), 1)
+        self.assertIn("aprobado: 5 (100.0%)", svg)
+        self.assertIn("descartado: 0 (0.0%)", svg)
+        self.assertNotIn("<path", grafico_torta_svg([], []))
+
+
+@override_settings(EXPORTACION_TAMANIO_TRAMO=2)
+class ExportacionPlanillasTest(MinervaTestCase):
+    def setUp(self):
+        self.gerente = User.objects.create_user(username="gerente", password="x")
+        UserProfile.objects.create(user=self.gerente, rol=Roles.GERENTE_PRODUCCION)
+        diario = DiarioDigital.objects.create(nombre="La Voz", url_principal="https://lavoz.com.ar")
+        robos = Categoria.objects.create(nombre="Robos")
+        hurtos = Categoria.objects.create(nombre="Hurtos")
+        for i in range(5):
+            link = LinkRelevante.objects.create(
+                url=f"https://lavoz.com.ar/nota-{i}",
+                cargado_por=self.gerente,
+                diario_digital=diario if i % 2 else None,
+                estado=EstadoLink.APROBADO,
+                revisado_clasificador=True,
+            )
+            link.categorias.set([robos, hurtos][: i % 3])
+            Actividad.objects.create(usuario=self.gerente if i else None, tipo=TipoActividad.LOGIN, descripcion=f"Ingreso {i}")
+        self.client.force_login(self.gerente)
+
+    def _csv(self, respuesta):
+        contenido = b"".join(respuesta.streaming_content).decode("utf-8-sig")
+        return list(csv.reader(io.StringIO(contenido)))
+
+    def test_actividades_en_excel_y_csv(self):
+        respuesta = self.client.get("/actividades/exportar_excel/")
+        self.assertIn("actividades.xlsx", respuesta["Content-Disposition"])
+        hoja = openpyxl.load_workbook(io.BytesIO(b"".join(respuesta.streaming_content))).active
+        filas = list(hoja.values)
+        self.assertEqual(filas[0], ("Fecha", "Usuario", "Tipo", "Descripción"))
+        self.assertEqual(len(filas), 6)
+        self.assertEqual(filas[-1][1:], ("(anónimo)", TipoActividad.LOGIN.label, "Ingreso 0"))
+
+        filas_csv = self._csv(self.client.get("/actividades/exportar_excel/?formato=csv"))
+        self.assertEqual([list(fila) for fila in filas], filas_csv)
+
+    def test_actividades_en_pdf_por_paginas(self):
+        Actividad.objects.create(usuario=self.gerente, tipo=TipoActividad.LOGIN, descripcion="<script> & más")
+        respuesta = self.client.get("/actividades/exportar_pdf/?usuario=gerente")
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn("actividades.pdf", respuesta["Content-Disposition"])
+        self.assertTrue(b"".join(respuesta.streaming_content).startswith(b"%PDF"))
+
+        paginas = escribir_tabla_pdf(
+            io.BytesIO(), "Prueba", [], ["A", "B"], ([str(i), "x"] for i in range(200)), [100, 100]
+        )
+        self.assertGreater(paginas, 1)
+
+    @override_settings(ACTIVIDADES_PDF_MAX_FILAS=3, STATICFILES_STORAGE=STATIC_SIN_MANIFIESTO)
+    def test_actividades_pdf_demasiado_grande_ofrece_planillas(self):
+        respuesta = self.client.get("/actividades/exportar_pdf/?tipo=login")
+        self.assertEqual(respuesta.status_code, 413)
+        self.assertTemplateUsed(respuesta, "exportacion_demasiado_grande.html")
+        self.assertContains(respuesta, "/actividades/exportar_excel/?tipo=login&amp;formato=csv", status_code=413)
+
+    def test_links_relevantes_con_categorias_por_tramo(self):
+        filas = self._csv(self.client.get("/links/exportar/?formato=csv"))
+        self.assertEqual(len(filas), 6)
+        por_url = {fila[1]: fila for fila in filas[1:]}
+        self.assertEqual(por_url["https://lavoz.com.ar/nota-0"][3:5], ["Sin diario", "-"])
+        self.assertEqual(por_url["https://lavoz.com.ar/nota-1"][3:5], ["La Voz", "Robos"])
+        self.assertEqual(por_url["https://lavoz.com.ar/nota-2"][4], "Robos, Hurtos")
+        self.assertEqual(por_url["https://lavoz.com.ar/nota-4"][4], "Robos")
+
+
+class IndiceFuentesTest(MinervaTestCase):
+    def test_elige_el_dominio_mas_especifico(self):
+        indice = IndiceDominios([(1, "lavoz.com.ar"), (2, "policiales.lavoz.com.ar"), (3, "")])
+        self.assertEqual(indice.resolver_host("lavoz.com.ar"), 1)
+        self.assertEqual(indice.resolver_host("m.lavoz.com.ar"), 1)
+        self.assertEqual(indice.resolver_host("policiales.lavoz.com.ar"), 2)
+        self.assertIsNone(indice.resolver_host("otralavoz.com.ar"))
+        self.assertIsNone(indice.resolver_host("com.ar"))
+        self.assertIsNone(indice.resolver_host(""))
+
+    def test_se_actualiza_al_guardar_y_borrar_fuentes(self):
+        diario = DiarioDigital.objects.create(nombre="La Voz", url_principal="https://WWW.LaVoz.com.ar/")
+        self.assertEqual(diario.dominio, "lavoz.com.ar")
+        self.assertEqual(resolver_fuente(DiarioDigital, "https://www.lavoz.com.ar/nota"), diario)
+        self.assertIsNone(resolver_fuente(RedSocial, "https://www.lavoz.com.ar/nota"))
+
+        diario.url_principal = "https://lavozdelinterior.com.ar"
+        diario.save(update_fields=["url_principal"])
+        self.assertIsNone(resolver_fuente(DiarioDigital, "https://lavoz.com.ar/nota"))
+        self.assertEqual(resolver_fuente(DiarioDigital, "https://m.lavozdelinterior.com.ar/x"), diario)
+
+        diario.delete()
+        self.assertIsNone(resolver_fuente(DiarioDigital, "https://lavozdelinterior.com.ar/x"))
+
+    def test_dominio_de_la_fuente_para_las_metricas(self):
+        RedSocial.objects.create(nombre="X", url_principal="https://x.com")
+        DiarioDigital.objects.create(nombre="La Voz", url_principal="https://lavoz.com.ar")
+        self.assertEqual(_dominio_metrica("https://www.lavoz.com.ar/nota"), "lavoz.com.ar")
+        self.assertEqual(_dominio_metrica("https://x.com/usuario/status/1"), "x.com")
+        self.assertEqual(_dominio_metrica("https://blog-cualquiera.net/p"), "otros")
+
+
+class RegistroActividadesTest(MinervaTestCase):
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal.cleanup)
+        self.directorio = Path(temporal.name)
+        ajustes = override_settings(ACTIVIDAD_SPOOL_DIR=temporal.name, ACTIVIDAD_LOTE_TAMANIO=100)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        # Sin el hilo de fondo: los lotes se vuelcan a mano.
+        for destino in ("app.services.registro_actividad.threading.Thread", "app.services.registro_actividad.atexit"):
+            parche = mock.patch(destino)
+            parche.start()
+            self.addCleanup(parche.stop)
+        self.registro = RegistroActividades()
+        self.usuario = User.objects.create_user(username="prensa", password="x")
+
+    def _fila(self, descripcion, **campos):
+        return dict(
+            usuario_id=self.usuario.pk,
+            tipo=TipoActividad.CARGA_LINK,
+            descripcion=descripcion,
+            fecha_hora=timezone.now() - timedelta(minutes=5),
+            **campos,
+        )
+
+    def test_vuelca_en_lote_con_la_fecha_original(self):
+        fila = self._fila("Carga 1")
+        self.registro.registrar(fila)
+        self.registro.registrar(self._fila("Carga 2"))
+        self.assertFalse(Actividad.objects.exists())
+        self.assertEqual(len(list(self.directorio.glob("*.jsonl"))), 1)
+
+        self.assertEqual(self.registro.vaciar(), 2)
+        self.assertEqual(Actividad.objects.count(), 2)
+        self.assertEqual(Actividad.objects.get(descripcion="Carga 1").fecha_hora, fila["fecha_hora"])
+        # Sólo queda el archivo nuevo, vacío y en uso.
+        archivos = list(self.directorio.glob("*.jsonl"))
+        self.assertEqual([archivo.stat().st_size for archivo in archivos], [0])
+        self.assertEqual(self.registro.recuperar(), 0)
+
+    def test_recupera_archivos_de_procesos_terminados(self):
+        fila = self._fila("Antes de la caída")
+        contenido = json.dumps(dict(fila, fecha_hora=fila["fecha_hora"].isoformat()))
+        (self.directorio / "actividades-999-abc-0.jsonl").write_text(contenido + '\n{"incompleta', encoding="utf-8")
+
+        self.assertEqual(self.registro.recuperar(), 1)
+        self.assertEqual(Actividad.objects.get().descripcion, "Antes de la caída")
+        self.assertFalse(list(self.directorio.glob("*.jsonl")))
+
+
+@override_settings(STATICFILES_STORAGE=STATIC_SIN_MANIFIESTO)
+class ClicsEnLoteTest(MinervaTestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user(username="clasificador", password="x")
+        UserProfile.objects.create(user=self.usuario, rol=Roles.CLASIFICACION)
+        self.client = Client(enforce_csrf_checks=True)
+        self.client.force_login(self.usuario)
+        self.token = "a" * 32
+        self.client.cookies["csrftoken"] = self.token
+
+    def test_registra_todos_los_clics_de_un_envio(self):
+        hace_un_rato = timezone.now() - timedelta(minutes=3)
+        eventos = [
+            {"url": f"https://lavoz.com.ar/nota-{i}", "fecha": hace_un_rato.timestamp() * 1000, "panel": "clasificacion"}
+            for i in range(30)
+        ]
+        eventos.append({"url": "https://lavoz.com.ar/futuro", "fecha": 32503680000000})
+        # Sesión, usuario y un único INSERT (más el savepoint del atomic).
+        with self.assertNumQueries(5):
+            respuesta = self.client.post(
+                "/api/actividad/clics/", {"csrfmiddlewaretoken": self.token, "eventos": json.dumps(eventos)}
+            )
+        self.assertEqual(respuesta.json(), {"status": "ok", "registrados": 31})
+
+        clics = Actividad.objects.filter(tipo=TipoActividad.CLIC_LINK, usuario=self.usuario)
+        self.assertEqual(clics.count(), 31)
+        primera = clics.get(descripcion="Click en link: https://lavoz.com.ar/nota-0 (panel: clasificacion)")
+        self.assertAlmostEqual(primera.fecha_hora.timestamp(), hace_un_rato.timestamp(), places=2)
+        self.assertLess(timezone.now() - clics.get(descripcion__contains="futuro").fecha_hora, timedelta(minutes=1))
+
+    def test_rechaza_sin_token_o_con_datos_invalidos(self):
+        sin_token = self.client.post("/api/actividad/clics/", {"eventos": "[]"})
+        self.assertEqual(sin_token.status_code, 403)
+
+        invalido = self.client.post(
+            "/api/actividad/clics/", '{"eventos": 3}', content_type="application/json", HTTP_X_CSRFTOKEN=self.token
+        )
+        self.assertEqual(invalido.status_code, 400)
+        with override_settings(CLICS_MAX_EVENTOS=2):
+            demasiados = self.client.post(
+                "/api/actividad/clics/",
+                json.dumps([{"url": "a"}] * 3),
+                content_type="application/json",
+                HTTP_X_CSRFTOKEN=self.token,
+            )
+        self.assertEqual(demasiados.status_code, 400)
+        self.assertFalse(Actividad.objects.filter(tipo=TipoActividad.CLIC_LINK).exists())
+
+
+class ArchivoActividadesTest(MinervaTestCase):
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal.cleanup)
+        self.directorio = Path(temporal.name)
+        ajustes = override_settings(ACTIVIDAD_ARCHIVO_DIR=temporal.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.usuario = User.objects.create_user(username="clasif", password="x")
+        self.client.force_login(self.usuario)
+        mes = timezone.localdate().replace(day=1)
+        self.meses = []
+        for _ in range(3):
+            mes = (mes - timedelta(days=1)).replace(day=1)
+            self.meses.append(mes)
+        # Hace 3 meses: una decisión y 5 ingresos; hace 2: 3 ingresos; hoy: 2.
+        self.decision = self._fecha(self.meses[2], 10)
+        self.link = LinkRelevante.objects.create(url="https://lavoz.com.ar/nota", cargado_por=self.usuario)
+        LinkRelevante.objects.filter(pk=self.link.pk).update(fecha_carga=self.decision - timedelta(hours=1))
+        self.link.categorias.add(Categoria.objects.create(nombre="Robos"))
+        Actividad.objects.create(
+            usuario=self.usuario,
+            tipo=TipoActividad.CAMBIO_ESTADO,
+            descripcion="Aprobó un link",
+            fecha_hora=self.decision,
+            objeto_tipo="linkrelevante",
+            objeto_id=self.link.pk,
+            estado_anterior=EstadoLink.PENDIENTE,
+            estado_nuevo=EstadoLink.APROBADO,
+        )
+        for mes, dias in ((self.meses[2], range(11, 16)), (self.meses[1], range(1, 4))):
+            for dia in dias:
+                self._ingreso(self._fecha(mes, dia))
+        for minutos in (1, 2):
+            self._ingreso(timezone.now() - timedelta(minutes=minutos))
+
+    def _fecha(self, mes, dia):
+        return timezone.make_aware(datetime(mes.year, mes.month, dia, 12))
+
+    def _ingreso(self, fecha_hora):
+        return Actividad.objects.create(
+            usuario=self.usuario, tipo=TipoActividad.LOGIN, descripcion=f"Ingreso {fecha_hora:%Y-%m-%d %H:%M}", fecha_hora=fecha_hora
+        )
+
+    def _listado(self, consulta):
+        descripciones, url = [], f"/api/actividades/?page_size=4&{consulta}"
+        while url:
+            pagina = self.client.get(url).json()
+            descripciones += [actividad["descripcion"] for actividad in pagina["results"]]
+            url = pagina["next"]
+        return descripciones
+
+    def test_mueve_los_meses_viejos_y_los_lee_con_la_tabla(self):
+        esperado = list(Actividad.objects.order_by("-fecha_hora").values_list("descripcion", flat=True))
+        self.assertEqual(archivar_actividades(meses=1), (2, 9))
+
+        self.assertEqual(Actividad.objects.count(), 2)
+        self.assertEqual(sorted(p.name for p in self.directorio.iterdir()), [
+            f"actividades-{self.meses[2]:%Y-%m}.jsonl.gz",
+            f"actividades-{self.meses[1]:%Y-%m}.jsonl.gz",
+        ])
+        resumen = ResumenArchivoActividad.objects.get(archivo__mes=self.meses[2], tipo=TipoActividad.LOGIN)
+        self.assertEqual((resumen.usuario, resumen.cantidad), (self.usuario, 5))
+
+        # Sin un rango que llegue al archivo sólo se lee la tabla.
+        self.assertEqual(self._listado(""), esperado[:2])
+        desde = f"desde={self.meses[2]:%Y-%m-%d}"
+        self.assertEqual(self._listado(desde), esperado)
+        self.assertEqual(self._listado(f"{desde}&tipo=cambio_estado&usuario=clasif"), ["Aprobó un link"])
+        hasta = self.meses[1].replace(day=2)
+        self.assertEqual(self._listado(f"desde={self.meses[1]:%Y-%m-%d}&hasta={hasta:%Y-%m-%d}"), esperado[3:5])
+
+        filas = list(csv.reader(io.StringIO(b"".join(
+            self.client.get(f"/actividades/exportar_excel/?formato=csv&{desde}").streaming_content
+        ).decode("utf-8-sig"))))
+        self.assertEqual([fila[3] for fila in filas[1:]], esperado)
+        self.assertEqual(filas[-1][1], "clasif")
+
+    def test_actividades_que_llegan_tarde_se_agregan_al_archivo(self):
+        archivar_actividades(meses=1)
+        tarde = self._ingreso(self._fecha(self.meses[2], 12) + timedelta(minutes=5))
+        desde = f"desde={self.meses[2]:%Y-%m-%d}"
+        listado = self._listado(desde)
+        self.assertEqual(len(listado), 12)
+        self.assertEqual(listado[-4], tarde.descripcion)
+
+        self.assertEqual(archivar_actividades(meses=1), (1, 1))
+        self.assertEqual(ArchivoActividad.objects.get(mes=self.meses[2]).filas, 7)
+        self.assertEqual(self._listado(desde), listado)
+
+    def test_las_estadisticas_incluyen_las_decisiones_archivadas(self):
+        Metrica = EstadisticaDiaria.Metrica
+        metricas = [Metrica.DECISIONES_APROBADAS, Metrica.LINKS_CLASIFICADOS, Metrica.CATEGORIAS_CLASIFICADAS]
+        en_vivo = sorted(calcular_estadisticas(metricas=metricas), key=str)
+        self.assertEqual(len(en_vivo), 3)
+        archivar_actividades(meses=1)
+        self.assertEqual(sorted(calcular_estadisticas(metricas=metricas), key=str), en_vivo)
+        demora = next(fila for fila in en_vivo if fila[2] == Metrica.DECISIONES_APROBADAS)
+        self.assertEqual(demora[4:], (1, 3600.0))
+
+
+@override_settings(STATICFILES_STORAGE=STATIC_SIN_MANIFIESTO)
+class InstrumentacionTest(MinervaTestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user(username="clasif", password="x")
+        UserProfile.objects.create(user=self.usuario, rol=Roles.CLASIFICACION)
+        self.client.force_login(self.usuario)
+
+    def test_huella_agrupa_la_misma_consulta_con_otros_valores(self):
+        self.assertEqual(
+            huella_sql("SELECT * FROM app_link WHERE id IN (%s, %s, %s) AND estado = 'aprobado' LIMIT 21"),
+            huella_sql("SELECT * FROM app_link WHERE id IN (%s, %s) AND estado = 'descartado' LIMIT 5"),
+        )
+        medicion = Medicion()
+        medicion.consultas = [(f"SELECT * FROM app_categoria WHERE id = {i}", 0.001) for i in range(4)]
+        medicion.consultas.append(("SELECT COUNT(*) FROM app_link", 0.002))
+        self.assertEqual(medicion.repetidas(), [("SELECT * FROM app_categoria WHERE id = ?", 4)])
+
+    def test_encabezado_y_linea_de_log_por_request(self):
+        User.objects.filter(pk=self.usuario.pk).update(is_staff=True)
+        with tempfile.TemporaryDirectory() as temporal, override_settings(
+            INSTRUMENTACION_LENTAS_DIR=temporal, INSTRUMENTACION_LENTAS_MUESTREO=1
+        ):
+            with self.assertLogs("app.instrumentacion", "INFO") as registro:
+                respuesta = self.client.get("/clasificacion/")
+            lentas = json.loads(next(Path(temporal).glob("lentas-*.json")).read_text())
+
+        self.assertEqual(respuesta.status_code, 200)
+        nombres = {parte.split(";")[0] for parte in respuesta["Server-Timing"].split(", ")}
+        self.assertEqual(nombres, {"sql", "plantillas", "total"})
+        linea = json.loads(registro.records[-1].getMessage())
+        self.assertEqual((linea["vista"], linea["estado"]), ("clasificacion", 200))
+        self.assertGreater(linea["consultas"], 0)
+        self.assertGreater(linea["plantillas_ms"], 0)
+        self.assertIn(f'desc="{linea["consultas"]} consultas"', respuesta["Server-Timing"])
+        self.assertEqual(lentas[0]["ruta"], "/clasificacion/")
+        self.assertEqual(len(lentas[0]["consultas_sql"]), linea["consultas"])
+
+    def test_sin_encabezado_para_usuarios_comunes_y_anonimos(self):
+        with self.assertLogs("app.instrumentacion", "INFO") as registro:
+            self.assertNotIn("Server-Timing", self.client.get("/clasificacion/"))
+            self.client.logout()
+            self.assertNotIn("Server-Timing", self.client.get("/login/"))
+        self.assertEqual(len(registro.records), 2)
+
+
+class MetricasTest(MinervaTestCase):
+    def _valor(self, linea):
+        """Valor de la muestra `linea` (nombre con etiquetas) en /metrics, 0 si no está."""
+        for muestra in metricas.exponer().splitlines():
+            if muestra.rsplit(" ", 1)[0] == linea:
+                return float(muestra.rsplit(" ", 1)[1])
+        return 0
+
+    def test_histograma_y_contador_en_formato_prometheus(self):
+        histograma = metricas.Histograma("minerva_prueba_segundos", "Prueba.", ("vista",), limites=(0.1, 1))
+        contador = metricas.Contador("minerva_prueba_total", "Prueba.", ("motivo",))
+        for valor in (0.05, 0.1, 0.5, 5):
+            histograma.observar(valor, vista="inicio")
+        contador.incrementar(motivo='con "comillas"')
+        contador.incrementar(2, motivo='con "comillas"')
+
+        texto = metricas.exponer()
+        self.assertIn("# TYPE minerva_prueba_segundos histogram", texto)
+        self.assertIn('minerva_prueba_segundos_bucket{vista="inicio",le="0.1"} 2', texto)
+        self.assertIn('minerva_prueba_segundos_bucket{vista="inicio",le="1.0"} 3', texto)
+        self.assertIn('minerva_prueba_segundos_bucket{vista="inicio",le="+Inf"} 4', texto)
+        self.assertIn('minerva_prueba_segundos_count{vista="inicio"} 4', texto)
+        self.assertIn('minerva_prueba_segundos_sum{vista="inicio"} 5.65', texto)
+        self.assertIn('minerva_prueba_total{motivo="con \\"comillas\\""} 3', texto)
+
+    def test_acceso_con_token_o_staff(self):
+        usuario = User.objects.create_user(username="prensa", password="x")
+        LinkRelevante.objects.create(url="https://example.com/pendiente", cargado_por=usuario)
+        with override_settings(METRICAS_TOKEN="secreto"):
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+            self.assertEqual(
+                self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer otro").status_code, 403
+            )
+            respuesta = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secreto")
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn("minerva_links_pendientes 1\n", respuesta.content.decode())
+
+        self.client.force_login(usuario)
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        User.objects.filter(pk=usuario.pk).update(is_staff=True)
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    def test_requests_y_exportaciones_por_vista(self):
+        gerente = User.objects.create_user(username="gerente", password="x")
+        UserProfile.objects.create(user=gerente, rol=Roles.GERENTE_PRODUCCION)
+        Actividad.objects.create(usuario=gerente, tipo=TipoActividad.LOGIN, descripcion="Ingreso")
+        self.client.force_login(gerente)
+        vista = "exportar_actividades_excel"
+        requests = f'minerva_request_segundos_count{{vista="{vista}",metodo="GET",estado="2xx"}}'
+        csv_bytes = f'minerva_exportacion_bytes_sum{{formato="csv",vista="{vista}"}}'
+        xlsx = f'minerva_exportacion_segundos_count{{formato="xlsx",vista="{vista}"}}'
+        antes = [self._valor(requests), self._valor(csv_bytes), self._valor(xlsx)]
+
+        respuesta = self.client.get("/actividades/exportar_excel/?formato=csv")
+        contenido = b"".join(respuesta.streaming_content)
+        self.client.get("/actividades/exportar_excel/")
+
+        self.assertEqual(self._valor(requests), antes[0] + 2)
+        self.assertEqual(self._valor(csv_bytes), antes[1] + len(contenido))
+        self.assertEqual(self._valor(xlsx), antes[2] + 1)
+
+    def test_un_error_al_volcar_no_invalida_el_pdf(self):
+        with tempfile.TemporaryDirectory() as temporal, mock.patch(
+            "app.services.pdf._generar_pdf", return_value=b"%PDF-1.7"
+        ), mock.patch.object(metricas.registro, "volcar", side_effect=OSError("disco lleno")):
+            destino = Path(temporal) / "informe.pdf"
+            with self.assertLogs("app.services.pdf", "ERROR"):
+                servicio_pdf._escribir_pdf("<p>x</p>", None, str(destino))
+            self.assertEqual(destino.read_bytes(), b"%PDF-1.7")
+            self.assertFalse(destino.with_suffix(".error").exists())
+
+    def test_vuelca_al_terminar_el_proceso(self):
+        with tempfile.TemporaryDirectory() as temporal, override_settings(METRICAS_DIR=temporal), mock.patch(
+            "app.services.metricas.atexit"
+        ) as salida, mock.patch("app.services.metricas.threading.Thread"):
+            registro = metricas._Registro()
+            salida.register.assert_called_once_with(registro._al_salir)
+            registro.sumar("minerva_ia_fallos_total", ("al_salir",), 2)
+            self.assertFalse(list(Path(temporal).glob("metricas-*.json")))
+
+            registro._al_salir()
+            archivo = next(Path(temporal).glob("metricas-*.json"))
+            self.assertEqual(
+                metricas._leer(archivo)["contadores"], {("minerva_ia_fallos_total", ("al_salir",)): 2}
+            )
+            os.close(registro._lock_archivo)
+
+    def test_suma_los_archivos_de_procesos_terminados(self):
+        with tempfile.TemporaryDirectory() as temporal, override_settings(METRICAS_DIR=temporal):
+            directorio = Path(temporal)
+            base = directorio / "metricas-999999-terminado"
+            base.with_suffix(".lock").touch()
+            viejo = timezone.now().timestamp() - 2 * metricas.GRACIA_LOCK_SEGUNDOS
+            os.utime(base.with_suffix(".lock"), (viejo, viejo))
+            base.with_suffix(".json").write_text(
+                json.dumps({"contadores": [["minerva_ia_fallos_total", ["proceso_muerto"], 4]]})
+            )
+            linea = 'minerva_ia_fallos_total{motivo="proceso_muerto"}'
+
+            self.assertEqual(self._valor(linea), 4)
+            self.assertFalse(base.with_suffix(".json").exists())
+            self.assertTrue((directorio / metricas.ACUMULADAS).exists())
+            self.assertEqual(self._valor(linea), 4)
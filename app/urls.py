@@ -32,6 +32,8 @@ from .views import (
     exportar_actividades_pdf,
     actividad_debug_view,
     registrar_clic_link,
+    registrar_clics_links,
+    metricas_view,
     exportar_articulo_pdf,
     InformeIndividualViewSet,
     api_buscar_individualizacion,
@@ -55,6 +57,8 @@ from .views import (
     configuraciones,
     exportar_informe_pdf,
     exportar_banda_pdf,
+    estado_exportacion_pdf,
+    descargar_exportacion_pdf,
     lista_links,
     api_links,
     hechos_delictivos_view,
@@ -97,6 +101,7 @@ from .views import (
     api_categorias,
     api_link_detail,
     procesar_links_ia,
+    progreso_trabajo_ia,
 )
 
 router = DefaultRouter()
@@ -280,9 +285,16 @@ urlpatterns = [
     path("api/categorias/", api_categorias, name="api_categorias"),
     path("api/links/<int:link_id>/", api_link_detail, name="api_link_detail"),
     path("api/procesar_links_ia/", procesar_links_ia, name="procesar_links_ia"),
+    path(
+        "api/procesar_links_ia/<int:trabajo_id>/",
+        progreso_trabajo_ia,
+        name="progreso_trabajo_ia",
+    ),
     # =================================================================================
     
     path("api/actividad/clic_link/", registrar_clic_link, name="registrar_clic_link"),
+    path("api/actividad/clics/", registrar_clics_links, name="registrar_clics_links"),
+    path("metrics", metricas_view, name="metricas"),
     path("api/links_list_old/", api_links, name="api_links"),  # Mantener por compatibilidad
     path("api/lista_links/", lista_links, name="lista_links"),
     path(
@@ -408,4 +420,14 @@ urlpatterns = [
         exportar_banda_pdf,
         name="exportar_banda_pdf",
     ),
+    path(
+        "exportar/pdf/<slug:clave>/",
+        descargar_exportacion_pdf,
+        name="descargar_exportacion_pdf",
+    ),
+    path(
+        "exportar/pdf/<slug:clave>/estado/",
+        estado_exportacion_pdf,
+        name="estado_exportacion_pdf",
+    ),
 ]
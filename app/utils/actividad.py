@@ -1,6 +1,89 @@
-from ..models import Actividad
+import re
 
+from django.utils import timezone
 
-def log_actividad(request, tipo, descripcion):
+from ..models import Actividad, TipoActividad
+from ..services.estadisticas import marcar_dias_pendientes
+from ..services.registro_actividad import registrar_actividad
+
+# Descripciones históricas de las actividades sobre links, para completar los
+# campos estructurados de las filas anteriores a que existieran.
+_MODELO_POR_FUENTE = {
+    None: "linkrelevante",
+    "red social": "linkredsocial",
+    "tv digital": "linktvdigital",
+    "radio digital": "linkradiodigital",
+}
+_LINK_PATTERN = re.compile(
+    r"link(?: de (?P<fuente>red social|tv digital|radio digital))? ID (?P<id>\d+)",
+    re.IGNORECASE,
+)
+_CAMBIO_ESTADO_PATTERN = re.compile(r"de '(?P<anterior>[^']*)' a '(?P<nuevo>[^']+)'")
+
+
+def log_actividad(request, tipo, descripcion, objeto=None, estado_anterior="", estado_nuevo=""):
     usuario = request.user if request.user.is_authenticated else None
-    Actividad.objects.create(usuario=usuario, tipo=tipo, descripcion=descripcion)
+    registrar_actividad(
+        usuario_id=usuario.pk if usuario else None,
+        tipo=tipo,
+        descripcion=descripcion,
+        objeto_tipo=objeto._meta.model_name if objeto is not None else "",
+        objeto_id=objeto.pk if objeto is not None else None,
+        estado_anterior=estado_anterior or "",
+        estado_nuevo=estado_nuevo or "",
+    )
+
+
+def extraer_datos_actividad(tipo, descripcion):
+    """
+    Recupera de la descripción de una actividad sobre un link el objeto
+    afectado y, si es un cambio de estado, los estados. Devuelve None si la
+    descripción no menciona un link.
+    """
+    match = _LINK_PATTERN.search(descripcion or "")
+    if not match:
+        return None
+    fuente = match.group("fuente")
+    datos = {
+        "objeto_tipo": _MODELO_POR_FUENTE[fuente.lower() if fuente else None],
+        "objeto_id": int(match.group("id")),
+        "estado_anterior": "",
+        "estado_nuevo": "",
+    }
+    if tipo == TipoActividad.CAMBIO_ESTADO:
+        estados = _CAMBIO_ESTADO_PATTERN.search(descripcion, match.end())
+        if estados:
+            datos["estado_anterior"] = estados.group("anterior").strip().lower()
+            datos["estado_nuevo"] = estados.group("nuevo").strip().lower()
+    return datos
+
+
+def completar_actividades(tamanio_lote=2000):
+    """
+    Completa los campos estructurados de las actividades sobre links
+    registradas antes de que existieran. Sólo toca las filas sin objeto, así
+    que se puede correr más de una vez.
+    """
+    pendientes = Actividad.objects.filter(
+        objeto_tipo="",
+        tipo__in=[TipoActividad.CAMBIO_ESTADO, TipoActividad.CLASIFICACION_LINK],
+    ).only("id", "tipo", "descripcion", "fecha_hora").order_by("pk")
+    campos = ["objeto_tipo", "objeto_id", "estado_anterior", "estado_nuevo"]
+    completadas = 0
+    ultimo_id = 0
+    while True:
+        actividades = list(pendientes.filter(pk__gt=ultimo_id)[:tamanio_lote])
+        if not actividades:
+            return completadas
+        ultimo_id = actividades[-1].pk
+        lote = []
+        for actividad in actividades:
+            datos = extraer_datos_actividad(actividad.tipo, actividad.descripcion)
+            if datos:
+                for campo, valor in datos.items():
+                    setattr(actividad, campo, valor)
+                lote.append(actividad)
+        Actividad.objects.bulk_update(lote, campos)
+        # Las estadísticas ya volcadas de esos días no incluían estas filas.
+        marcar_dias_pendientes({timezone.localdate(a.fecha_hora) for a in lote})
+        completadas += len(lote)
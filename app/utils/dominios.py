@@ -0,0 +1,16 @@
+from urllib.parse import urlsplit
+
+
+def dominio(url: str) -> str:
+    """Dominio de una URL en minúsculas y sin el prefijo www."""
+    host = (urlsplit((url or "").strip()).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def sufijos_dominio(host: str) -> list:
+    """
+    Dominios que contienen a `host`, del más específico al más general:
+    policiales.lavoz.com.ar -> [policiales.lavoz.com.ar, lavoz.com.ar, com.ar, ar].
+    """
+    partes = host.split(".") if host else []
+    return [".".join(partes[inicio:]) for inicio in range(len(partes))]
@@ -0,0 +1,30 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+
+def inicio_del_dia(fecha):
+    """
+    Primer instante de `fecha` (date o 'AAAA-MM-DD') en la zona horaria
+    activa. Filtrar con `campo__gte=inicio_del_dia(d)` equivale a
+    `campo__date__gte=d`, pero compara la columna sin convertirla, por lo que
+    puede usar los índices sobre fechas.
+    """
+    if isinstance(fecha, str):
+        fecha = parse_date(fecha)
+    if fecha is None:
+        raise ValueError("Fecha inválida.")
+    return timezone.make_aware(datetime.combine(fecha, time.min))
+
+
+def inicio_del_dia_siguiente(fecha):
+    """
+    Límite superior exclusivo para incluir todo el día `fecha`:
+    `campo__lt=inicio_del_dia_siguiente(d)` equivale a `campo__date__lte=d`.
+    """
+    if isinstance(fecha, str):
+        fecha = parse_date(fecha)
+    if fecha is None:
+        raise ValueError("Fecha inválida.")
+    return inicio_del_dia(fecha + timedelta(days=1))
@@ -0,0 +1,149 @@
+"""
+Gráficos de barras y de torta como SVG en línea para los PDF de WeasyPrint.
+
+No dependen de Plotly, Kaleido ni pandas: el marcado se arma con cadenas y
+WeasyPrint lo dibuja directamente, sin rasterizar ni lanzar procesos.
+"""
+
+import math
+
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+# Paleta por defecto de Plotly, para que los gráficos se vean como antes.
+COLORES = (
+    "#636efa",
+    "#ef553b",
+    "#00cc96",
+    "#ab63fa",
+    "#ffa15a",
+    "#19d3f3",
+    "#ff6692",
+    "#b6e880",
+    "#ff97ff",
+    "#fecb52",
+)
+FUENTE = "font-family: Arial, sans-serif"
+# Como máximo se rotulan estas barras; con más, se rotula una de cada tantas.
+MAX_ETIQUETAS_X = 16
+
+
+def _numero(valor):
+    return f"{valor:.2f}".rstrip("0").rstrip(".")
+
+
+def _paso_eje(maximo, divisiones=5):
+    """Paso "redondo" (1, 2 o 5 por una potencia de 10) para el eje Y."""
+    if maximo <= 0:
+        return 1
+    bruto = maximo / divisiones
+    potencia = 10 ** math.floor(math.log10(bruto))
+    for factor in (1, 2, 5, 10):
+        if bruto <= factor * potencia:
+            return max(factor * potencia, 1)
+    return 10 * potencia
+
+
+def _svg(ancho, alto, titulo, contenido):
+    return mark_safe(
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{ancho}" height="{alto}" '
+        f'viewBox="0 0 {ancho} {alto}" style="{FUENTE}">'
+        f'<text x="{ancho / 2}" y="22" font-size="16" text-anchor="middle">{escape(titulo)}</text>'
+        f'{"".join(contenido)}</svg>'
+    )
+
+
+def grafico_barras_svg(etiquetas, valores, titulo="", etiqueta_x="", etiqueta_y="", ancho=700, alto=360):
+    """Gráfico de barras verticales con eje Y graduado."""
+    etiquetas = [str(etiqueta) for etiqueta in etiquetas]
+    valores = list(valores)
+    izquierda, derecha, arriba, abajo = 60, 20, 40, 80
+    area_ancho = ancho - izquierda - derecha
+    area_alto = alto - arriba - abajo
+    base = arriba + area_alto
+
+    paso = _paso_eje(max(valores, default=0))
+    tope = max(paso * math.ceil(max(valores, default=0) / paso), paso)
+    contenido = []
+    marca = 0
+    while marca <= tope:
+        y = base - area_alto * marca / tope
+        contenido.append(
+            f'<line x1="{izquierda}" y1="{y:.1f}" x2="{ancho - derecha}" y2="{y:.1f}" '
+            f'stroke="#e5ecf6" stroke-width="1"/>'
+            f'<text x="{izquierda - 6}" y="{y + 4:.1f}" font-size="11" text-anchor="end">'
+            f"{_numero(marca)}</text>"
+        )
+        marca += paso
+
+    if valores:
+        franja = area_ancho / len(valores)
+        cada = math.ceil(len(valores) / MAX_ETIQUETAS_X)
+        for i, (etiqueta, valor) in enumerate(zip(etiquetas, valores)):
+            alto_barra = area_alto * valor / tope
+            x = izquierda + franja * i
+            contenido.append(
+                f'<rect x="{x + franja * 0.1:.1f}" y="{base - alto_barra:.1f}" '
+                f'width="{franja * 0.8:.1f}" height="{alto_barra:.1f}" fill="{COLORES[0]}"/>'
+            )
+            if i % cada == 0:
+                centro = x + franja / 2
+                contenido.append(
+                    f'<text x="{centro:.1f}" y="{base + 14}" font-size="10" text-anchor="end" '
+                    f'transform="rotate(-35 {centro:.1f} {base + 14})">{escape(etiqueta)}</text>'
+                )
+    contenido.append(
+        f'<line x1="{izquierda}" y1="{base}" x2="{ancho - derecha}" y2="{base}" stroke="#444"/>'
+    )
+    if etiqueta_x:
+        contenido.append(
+            f'<text x="{izquierda + area_ancho / 2}" y="{alto - 6}" font-size="12" '
+            f'text-anchor="middle">{escape(etiqueta_x)}</text>'
+        )
+    if etiqueta_y:
+        contenido.append(
+            f'<text x="14" y="{arriba + area_alto / 2}" font-size="12" text-anchor="middle" '
+            f'transform="rotate(-90 14 {arriba + area_alto / 2})">{escape(etiqueta_y)}</text>'
+        )
+    return _svg(ancho, alto, titulo, contenido)
+
+
+def grafico_torta_svg(etiquetas, valores, titulo="", ancho=600, alto=340):
+    """Gráfico de torta con leyenda y porcentajes."""
+    etiquetas = [str(etiqueta) for etiqueta in etiquetas]
+    valores = list(valores)
+    total = sum(valores)
+    radio = min(alto - 70, ancho * 0.55) / 2
+    cx, cy = 20 + radio, 40 + (alto - 40) / 2
+
+    contenido = []
+    angulo = -math.pi / 2
+    for i, valor in enumerate(valores):
+        if not total or not valor:
+            continue
+        color = COLORES[i % len(COLORES)]
+        if valor == total:
+            contenido.append(f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="{radio:.1f}" fill="{color}"/>')
+            continue
+        fin = angulo + 2 * math.pi * valor / total
+        grande = 1 if fin - angulo > math.pi else 0
+        x1, y1 = cx + radio * math.cos(angulo), cy + radio * math.sin(angulo)
+        x2, y2 = cx + radio * math.cos(fin), cy + radio * math.sin(fin)
+        contenido.append(
+            f'<path d="M{cx:.1f},{cy:.1f} L{x1:.1f},{y1:.1f} '
+            f'A{radio:.1f},{radio:.1f} 0 {grande} 1 {x2:.1f},{y2:.1f} Z" '
+            f'fill="{color}" stroke="#fff" stroke-width="1"/>'
+        )
+        angulo = fin
+
+    leyenda_x = cx + radio + 30
+    for i, (etiqueta, valor) in enumerate(zip(etiquetas, valores)):
+        y = 60 + i * 20
+        porcentaje = 100 * valor / total if total else 0
+        contenido.append(
+            f'<rect x="{leyenda_x:.1f}" y="{y - 10}" width="12" height="12" '
+            f'fill="{COLORES[i % len(COLORES)]}"/>'
+            f'<text x="{leyenda_x + 18:.1f}" y="{y}" font-size="12">'
+            f"{escape(etiqueta)}: {valor} ({porcentaje:.1f}%)</text>"
+        )
+    return _svg(ancho, alto, titulo, contenido)
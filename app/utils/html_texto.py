@@ -0,0 +1,119 @@
+import codecs
+from html.parser import HTMLParser
+
+# Etiquetas cuyo contenido nunca es texto de la nota.
+ETIQUETAS_IGNORADAS = {"script", "style", "noscript"}
+# Regiones donde suele estar el cuerpo del artículo.
+ETIQUETAS_REGION = {"article", "main"}
+# Por debajo de este largo la región encontrada no se considera el artículo
+# (por ejemplo, un <article> que solo envuelve un titular relacionado).
+MIN_CARACTERES_REGION = 200
+
+
+class _ExtractorTexto(HTMLParser):
+    def __init__(self, max_caracteres):
+        super().__init__(convert_charrefs=True)
+        self.max_caracteres = max_caracteres
+        self.profundidad_ignorada = 0
+        self.profundidad_region = 0
+        self.hubo_region = False
+        self.fin_documento = False
+        self.region = []
+        self.largo_region = 0
+        self.general = []
+        self.largo_general = 0
+        # HTMLParser puede entregar un mismo nodo de texto en varias partes
+        # cuando cae entre dos fragmentos; se junta hasta la próxima etiqueta.
+        self.pendiente = []
+
+    @property
+    def region_completa(self):
+        return self.largo_region >= self.max_caracteres
+
+    @property
+    def completo(self):
+        """Ya no hace falta seguir leyendo el documento."""
+        if self.region_completa or self.fin_documento:
+            return True
+        # Sin una región abierta hasta acá se usa el texto general: si ya está
+        # lleno, lo que sigue no cambia el resultado.
+        return not self.hubo_region and self.largo_general >= self.max_caracteres
+
+    def handle_starttag(self, tag, attrs):
+        self._volcar()
+        if tag in ETIQUETAS_IGNORADAS:
+            self.profundidad_ignorada += 1
+        elif tag in ETIQUETAS_REGION:
+            self.profundidad_region += 1
+            self.hubo_region = True
+
+    def handle_endtag(self, tag):
+        self._volcar()
+        if tag in ETIQUETAS_IGNORADAS:
+            self.profundidad_ignorada = max(0, self.profundidad_ignorada - 1)
+        elif tag in ETIQUETAS_REGION:
+            self.profundidad_region = max(0, self.profundidad_region - 1)
+        elif tag in ("body", "html"):
+            self.fin_documento = True
+
+    def handle_comment(self, data):
+        self._volcar()
+
+    def handle_data(self, data):
+        if not self.profundidad_ignorada:
+            self.pendiente.append(data)
+
+    def _volcar(self):
+        if not self.pendiente:
+            return
+        texto = "".join(self.pendiente).strip()
+        self.pendiente = []
+        if not texto:
+            return
+        if self.largo_general < self.max_caracteres:
+            self.general.append(texto)
+            self.largo_general += len(texto) + 1
+        if self.profundidad_region and not self.region_completa:
+            self.region.append(texto)
+            self.largo_region += len(texto) + 1
+
+    def texto(self):
+        self._volcar()
+        partes = self.region if self.largo_region >= MIN_CARACTERES_REGION else self.general
+        return " ".join(partes)[: self.max_caracteres]
+
+
+def extraer_texto_html(fragmentos, max_caracteres=5000, max_bytes=None, encoding=None):
+    """
+    Extrae el texto visible de un HTML que llega en fragmentos (bytes o str)
+    sin construir el árbol del documento.
+
+    Ignora el contenido de script, style y noscript, y prioriza el texto que
+    está dentro de <article> o <main>; si la página no tiene esas regiones se
+    usa el texto de todo el documento. La lectura se corta apenas la región
+    llena `max_caracteres`, cuando el texto general los llena sin que haya
+    aparecido una región, al cerrar </body> o cuando se consumieron
+    `max_bytes` bytes.
+    """
+    extractor = _ExtractorTexto(max_caracteres)
+    decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    leidos = 0
+    for fragmento in fragmentos:
+        if not fragmento:
+            continue
+        if max_bytes is not None and leidos >= max_bytes:
+            break
+        if isinstance(fragmento, bytes):
+            if max_bytes is not None:
+                fragmento = fragmento[: max_bytes - leidos]
+            leidos += len(fragmento)
+            fragmento = decoder.decode(fragmento)
+        else:
+            leidos += len(fragmento)
+        extractor.feed(fragmento)
+        if extractor.completo:
+            break
+    else:
+        extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+    return extractor.texto()
@@ -0,0 +1,99 @@
+"""
+Tablas largas en PDF con ReportLab, página por página.
+
+Armar una única Table con todas las filas y pasarla a `doc.build` obliga a
+tener todo en memoria y a que ReportLab la parta una y otra vez, midiendo cada
+fila en cada intento. Acá las filas se consumen de un iterable y cada una se
+mide una sola vez: cuando la siguiente ya no entra, se dibuja en el canvas la
+tabla de la página (con las alturas ya calculadas) y se empieza otra.
+"""
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph, Table, TableStyle
+
+MARGEN = 2 * cm
+
+ESTILO_TABLA = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+    ]
+)
+
+
+def estilo_celda():
+    """Estilo para los Paragraph de celdas con texto largo."""
+    return ParagraphStyle("celda", parent=getSampleStyleSheet()["Normal"], fontSize=8, leading=10)
+
+
+def escribir_tabla_pdf(destino, titulo, lineas, encabezados, filas, anchos):
+    """
+    Escribe en `destino` (ruta o archivo) un PDF A4 con `titulo`, los párrafos
+    de `lineas` y una tabla con `encabezados` y las `filas` del iterable.
+    Devuelve la cantidad de páginas.
+    """
+    estilos = getSampleStyleSheet()
+    ancho_pagina, alto_pagina = A4
+    ancho_util = ancho_pagina - 2 * MARGEN
+    tope = alto_pagina - MARGEN
+    pdf = canvas.Canvas(destino, pagesize=A4, pageCompression=1)
+
+    y = tope
+    for parrafo in [Paragraph(titulo, estilos["Heading1"])] + [
+        Paragraph(linea, estilos["Normal"]) for linea in lineas
+    ]:
+        _, alto = parrafo.wrapOn(pdf, ancho_util, y - MARGEN)
+        parrafo.drawOn(pdf, MARGEN, y - alto)
+        y -= alto + 6
+
+    def medir(fila):
+        return Table([fila], colWidths=anchos, style=ESTILO_TABLA).wrap(ancho_util, tope)[1]
+
+    def dibujar(y):
+        tabla = Table(
+            [encabezados, *pagina_filas],
+            colWidths=anchos,
+            rowHeights=[alto_encabezado, *pagina_altos],
+            style=ESTILO_TABLA,
+        )
+        _, alto = tabla.wrapOn(pdf, ancho_util, y - MARGEN)
+        tabla.drawOn(pdf, MARGEN, y - alto)
+
+    alto_encabezado = medir(encabezados)
+    pagina = 1
+    pagina_filas, pagina_altos = [], []
+    disponible = y - MARGEN - alto_encabezado
+    for fila in filas:
+        alto = medir(fila)
+        if alto > disponible and (pagina_filas or y < tope):
+            # No entra: se cierra la página. Una fila más alta que una página
+            # vacía se dibuja igual, sola, aunque se corte.
+            if pagina_filas:
+                dibujar(y)
+            _pie(pdf, pagina)
+            pdf.showPage()
+            pagina += 1
+            y = tope
+            pagina_filas, pagina_altos = [], []
+            disponible = y - MARGEN - alto_encabezado
+        pagina_filas.append(fila)
+        pagina_altos.append(alto)
+        disponible -= alto
+
+    if pagina_filas:
+        dibujar(y)
+    _pie(pdf, pagina)
+    pdf.save()
+    return pagina
+
+
+def _pie(pdf, pagina):
+    pdf.setFont("Helvetica", 8)
+    pdf.drawRightString(A4[0] - MARGEN, MARGEN / 2, f"Página {pagina}")
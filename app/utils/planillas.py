@@ -0,0 +1,68 @@
+"""
+Respuestas de exportación (Excel y CSV) con memoria constante.
+
+Las filas llegan como iterables, normalmente de `.values_list(...).iterator()`,
+y nunca se juntan en memoria: el Excel se arma con una hoja write-only de
+openpyxl en un archivo temporal que después se envía por partes, y el CSV se
+escribe fila por fila en un StreamingHttpResponse.
+"""
+
+import csv
+import tempfile
+from itertools import islice
+
+import openpyxl
+from django.http import FileResponse, StreamingHttpResponse
+
+CONTENT_TYPE_EXCEL = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def en_tramos(filas, tamanio):
+    """Agrupa `filas` en listas de hasta `tamanio` elementos."""
+    filas = iter(filas)
+    while tramo := list(islice(filas, tamanio)):
+        yield tramo
+
+
+def respuesta_excel(nombre_archivo, hojas):
+    """
+    Devuelve un .xlsx con una hoja por cada (título, encabezados, filas) de
+    `hojas`.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    for titulo, encabezados, filas in hojas:
+        ws = wb.create_sheet(titulo)
+        ws.append(encabezados)
+        for fila in filas:
+            ws.append(fila)
+    archivo = tempfile.TemporaryFile()
+    wb.save(archivo)
+    archivo.seek(0)
+    return FileResponse(
+        archivo,
+        as_attachment=True,
+        filename=nombre_archivo,
+        content_type=CONTENT_TYPE_EXCEL,
+    )
+
+
+class _Eco:
+    """Objeto con `write` que devuelve lo escrito, para usar csv.writer como generador."""
+
+    def write(self, valor):
+        return valor
+
+
+def respuesta_csv(nombre_archivo, encabezados, filas):
+    """Devuelve un CSV que se genera a medida que se envía."""
+    escritor = csv.writer(_Eco())
+
+    def contenido():
+        # BOM para que Excel detecte UTF-8 al abrir el archivo.
+        yield "\ufeff" + escritor.writerow(encabezados)
+        for fila in filas:
+            yield escritor.writerow(fila)
+
+    response = StreamingHttpResponse(contenido(), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{nombre_archivo}"'
+    return response
@@ -1,26 +1,26 @@
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, JsonResponse
 from django.http import QueryDict
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_GET
+from django.views.decorators.http import require_GET, require_POST
 from django.utils.dateparse import parse_date
-from django.db.models import Count, F, ExpressionWrapper, DurationField, Avg, Prefetch, Q
+from django.db.models import Count, F, ExpressionWrapper, DurationField, Avg, Max, Prefetch, Q
+from django.db.models import prefetch_related_objects
+from django.db.models.functions import TruncDate
 from django.conf import settings
+from django.core.files.storage import default_storage
 from django.template.loader import render_to_string
+import hashlib
+import hmac
 import json
 import io
 import os
 import base64
-import re
-from datetime import datetime
-import openpyxl
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
+import tempfile
+from datetime import datetime, timedelta
+from reportlab.platypus import Paragraph
 from reportlab.lib.units import cm
 try:
     from docx import Document
@@ -32,11 +32,10 @@ try:
     from weasyprint import HTML
 except Exception:
     HTML = None
-import pandas as pd
-import plotly.express as px
 from collections import defaultdict
+from django.utils.html import escape
 from django.utils.text import slugify
-from django.utils.timezone import localtime, now
+from django.utils.timezone import get_current_timezone, localtime, now
 from django.urls import reverse
 
 from rest_framework import viewsets
@@ -77,9 +76,11 @@ from .models import (
     EstadoLink,
     LinkTvDigital,
     LinkRadioDigital,
+    LinkFeed,
     InformeBandaCriminal,
     JerarquiaPrincipal,
     ConfiguracionSistema,
+    TrabajoIA,
 )
 from .serializers import (
     UserProfileSerializer,
@@ -104,7 +105,26 @@ from .serializers import (
     LinkTvDigitalSerializer,
     LinkRadioDigitalSerializer,
 )
-from .services.ia import LinkAIProcessor, IAProcessingError
+from .services.cola_ia import encolar_links, progreso_trabajo
+from .services.link_feed import FUENTES_FEED
+from .services.cache_estadisticas import estadisticas_en_cache, version_estadisticas
+from .services import pdf as servicio_pdf
+from .services.fuentes import resolver_fuente
+from .services.registro_actividad import registrar_actividades
+from .services.archivo_actividad import ActividadesConArchivo, actividades_con_archivo
+from .services.metricas import exponer as exponer_metricas
+from .services.estadisticas import (
+    METRICAS_CLASIFICACION,
+    METRICAS_INFORMES,
+    METRICAS_PRENSA,
+    METRICAS_REDACCION,
+    Metrica,
+    sumar_estadisticas,
+)
+from .utils.fechas import inicio_del_dia, inicio_del_dia_siguiente
+from .utils.graficos_svg import grafico_barras_svg, grafico_torta_svg
+from .utils.pdf_tablas import escribir_tabla_pdf, estilo_celda
+from .utils.planillas import en_tramos, respuesta_csv, respuesta_excel
 
 from .forms import (
     InformeIndividualForm,
@@ -128,7 +148,6 @@ from .forms import (
 from app.utils.actividad import log_actividad
 
 
-from urllib.parse import urlparse
 
 from django.contrib import messages
 
@@ -147,6 +166,60 @@ def _weasyprint_unavailable_response(request, fallback_url=None):
         return redirect(fallback_url)
     return HttpResponse(WEASYPRINT_ERROR_MESSAGE, status=503)
 
+
+def _version_pdf(*fechas):
+    """Versión del PDF: la última modificación del objeto y de lo que muestra."""
+    return max(filter(None, fechas)).isoformat()
+
+
+def _responder_pdf(request, clave, generar_html, nombre_archivo, adjunto=True, fallback_url=None):
+    """
+    Entrega el PDF de `clave`. Si no está guardado se encola con el HTML de
+    `generar_html()` y se espera hasta PDF_ESPERA_SEGUNDOS; si todavía no
+    terminó, se muestra una página que lo descarga cuando esté listo.
+    """
+    if not servicio_pdf.pdf_disponible(clave):
+        servicio_pdf.encolar_pdf(
+            clave, generar_html(), request.build_absolute_uri(), nombre_archivo, adjunto
+        )
+    estado, detalle = servicio_pdf.esperar_pdf(clave, settings.PDF_ESPERA_SEGUNDOS)
+    if estado == servicio_pdf.LISTO:
+        return servicio_pdf.respuesta_pdf(clave)
+    if estado == servicio_pdf.ERROR:
+        logger.error(f"Error al generar el PDF {clave}: {detalle}")
+        messages.error(request, "Error al generar el PDF.")
+        if fallback_url:
+            return redirect(fallback_url)
+        return HttpResponse("Error al generar el PDF.", status=500)
+    return render(
+        request,
+        "pdf_en_preparacion.html",
+        {"clave": clave, "nombre_archivo": nombre_archivo, "volver": fallback_url},
+    )
+
+
+@login_required
+@require_GET
+def estado_exportacion_pdf(request, clave):
+    estado, detalle = servicio_pdf.estado_pdf(clave)
+    data = {"estado": estado}
+    if estado == servicio_pdf.LISTO:
+        data["url"] = reverse("descargar_exportacion_pdf", args=[clave])
+    elif estado == servicio_pdf.ERROR:
+        logger.error(f"Error al generar el PDF {clave}: {detalle}")
+        data["error"] = "Error al generar el PDF."
+    return JsonResponse(data)
+
+
+@login_required
+@require_GET
+def descargar_exportacion_pdf(request, clave):
+    # La clave está firmada con SECRET_KEY: sólo la conoce quien pidió el PDF.
+    response = servicio_pdf.respuesta_pdf(clave)
+    if response is None:
+        return HttpResponse("El PDF no está disponible.", status=404)
+    return response
+
 # -------------------------- AUTENTICACIÓN --------------------------
 
 
@@ -1538,113 +1611,101 @@ def actividad_debug_view(request):
 # -------------------------- EXPORTACIONES --------------------------
 
 
-def exportar_actividades_excel(request):
-    actividades = Actividad.objects.select_related("usuario").order_by("-fecha_hora")
+def _actividades_filtradas(request):
+    actividades = Actividad.objects.order_by("-fecha_hora")
     usuario = request.GET.get("usuario")
     tipo = request.GET.get("tipo")
     desde = request.GET.get("desde")
     hasta = request.GET.get("hasta")
 
+    desde = inicio_del_dia(desde) if desde else None
+    hasta = inicio_del_dia_siguiente(hasta) if hasta else None
+
     if usuario:
         actividades = actividades.filter(usuario__username=usuario)
     if tipo:
         actividades = actividades.filter(tipo=tipo)
     if desde:
-        actividades = actividades.filter(fecha_hora__date__gte=parse_date(desde))
+        actividades = actividades.filter(fecha_hora__gte=desde)
     if hasta:
-        actividades = actividades.filter(fecha_hora__date__lte=parse_date(hasta))
-
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Actividades"
-    ws.append(["Fecha", "Usuario", "Tipo", "Descripción"])
-
-    for act in actividades:
-        ws.append(
-            [
-                act.fecha_hora.strftime("%Y-%m-%d %H:%M:%S"),
-                act.usuario.username if act.usuario else "(anónimo)",
-                act.get_tipo_display(),
-                act.descripcion,
-            ]
-        )
+        actividades = actividades.filter(fecha_hora__lt=hasta)
+    return actividades_con_archivo(actividades, usuario, tipo, desde, hasta)
 
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    response["Content-Disposition"] = "attachment; filename=actividades.xlsx"
-    wb.save(response)
-    return response
+
+def exportar_actividades_excel(request):
+    actividades = _actividades_filtradas(request)
+    encabezados = ["Fecha", "Usuario", "Tipo", "Descripción"]
+    filas = _filas_actividades(actividades)
+    if request.GET.get("formato") == "csv":
+        return respuesta_csv("actividades.csv", encabezados, filas)
+    return respuesta_excel("actividades.xlsx", [("Actividades", encabezados, filas)])
+
+
+def _filas_actividades(actividades):
+    tipos = dict(TipoActividad.choices)
+    if isinstance(actividades, ActividadesConArchivo):
+        filas = (
+            (a.fecha_hora, a.usuario.username if a.usuario else None, a.tipo, a.descripcion)
+            for a in actividades.iterator(chunk_size=settings.EXPORTACION_TAMANIO_TRAMO)
+        )
+    else:
+        filas = actividades.values_list(
+            "fecha_hora", "usuario__username", "tipo", "descripcion"
+        ).iterator(chunk_size=settings.EXPORTACION_TAMANIO_TRAMO)
+    for fecha_hora, username, tipo, descripcion in filas:
+        yield [
+            fecha_hora.strftime("%Y-%m-%d %H:%M:%S"),
+            username or "(anónimo)",
+            tipos.get(tipo, tipo),
+            descripcion,
+        ]
 
 
 @login_required
 def exportar_actividades_pdf(request):
-    actividades = Actividad.objects.select_related("usuario").order_by("-fecha_hora")
-    usuario = request.GET.get("usuario")
-    tipo = request.GET.get("tipo")
-    desde = request.GET.get("desde")
-    hasta = request.GET.get("hasta")
-
-    if usuario:
-        actividades = actividades.filter(usuario__username=usuario)
-    if tipo:
-        actividades = actividades.filter(tipo=tipo)
-    if desde:
-        actividades = actividades.filter(fecha_hora__date__gte=parse_date(desde))
-    if hasta:
-        actividades = actividades.filter(fecha_hora__date__lte=parse_date(hasta))
-
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = "attachment; filename=actividades.pdf"
-
-    doc = SimpleDocTemplate(response, pagesize=A4, leftMargin=2*cm, rightMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
-    elements = []
-    styles = getSampleStyleSheet()
+    actividades = _actividades_filtradas(request)
+    total = actividades.count()
+    if total > settings.ACTIVIDADES_PDF_MAX_FILAS:
+        # Un PDF de este tamaño no se puede leer ni imprimir; se ofrece la
+        # misma selección en Excel o CSV, que se generan en streaming.
+        consulta = request.GET.copy()
+        consulta.pop("formato", None)
+        return render(
+            request,
+            "exportacion_demasiado_grande.html",
+            {
+                "total": total,
+                "maximo": settings.ACTIVIDADES_PDF_MAX_FILAS,
+                "consulta": consulta.urlencode(),
+            },
+            status=413,
+        )
 
-    # Título y filtros
-    elements.append(Paragraph("<b>Registro de Actividades</b>", styles['Heading1']))
-    
     filtros = []
-    if usuario:
-        filtros.append(f"Usuario: <b>{usuario}</b>")
-    if tipo:
-        # Aquí, 'tipo' es el valor de la opción, no el display. Podrías buscar el display si fuera necesario.
-        filtros.append(f"Tipo: <b>{tipo}</b>") 
-    if desde:
-        filtros.append(f"Desde: <b>{desde}</b>")
-    if hasta:
-        filtros.append(f"Hasta: <b>{hasta}</b>")
-
-    if filtros:
-        filtros_str = " | ".join(filtros)
-        elements.append(Paragraph(f"Filtros aplicados: {filtros_str}", styles['Normal']))
-        elements.append(Spacer(1, 12))
-
-    # Tabla
-    data = [["Fecha", "Usuario", "Tipo", "Descripción"]]
-
-    for act in actividades:
-        # Usa el estilo 'Normal' para que el texto de la descripción se ajuste a la celda
-        data.append([
-            act.fecha_hora.strftime('%Y-%m-%d %H:%M:%S'),
-            act.usuario.username if act.usuario else '(anónimo)',
-            act.get_tipo_display(),
-            Paragraph(act.descripcion, styles['Normal'])
-        ])
-
-    table = Table(data, colWidths=[4*cm, 4*cm, 3*cm, 7.5*cm])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8), # Reducir fuente para que quepa más
-    ]))
-
-    elements.append(table)
-    doc.build(elements)
-
-    return response
+    for etiqueta, parametro in (("Usuario", "usuario"), ("Tipo", "tipo"), ("Desde", "desde"), ("Hasta", "hasta")):
+        valor = request.GET.get(parametro)
+        if parametro == "tipo" and valor:
+            valor = dict(TipoActividad.choices).get(valor, valor)
+        if valor:
+            filtros.append(f"{etiqueta}: <b>{escape(valor)}</b>")
+    lineas = [f"Filtros aplicados: {' | '.join(filtros)}"] if filtros else []
+
+    estilo = estilo_celda()
+    filas = (
+        [fecha, usuario, tipo, Paragraph(escape(descripcion), estilo)]
+        for fecha, usuario, tipo, descripcion in _filas_actividades(actividades)
+    )
+    archivo = tempfile.TemporaryFile()
+    escribir_tabla_pdf(
+        archivo,
+        "<b>Registro de Actividades</b>",
+        lineas,
+        ["Fecha", "Usuario", "Tipo", "Descripción"],
+        filas,
+        [4 * cm, 4 * cm, 3 * cm, 7.5 * cm],
+    )
+    archivo.seek(0)
+    return FileResponse(archivo, as_attachment=True, filename="actividades.pdf", content_type="application/pdf")
 
 
 @login_required
@@ -1652,39 +1713,37 @@ def exportar_articulo_pdf(request, id):
     if HTML is None:
         return _weasyprint_unavailable_response(request, "redaccion")
     articulo = get_object_or_404(
-        Articulo.objects.select_related("generado_por", "categoria").prefetch_related(
-            "links_incluidos"
-        ),
-        pk=id,
+        Articulo.objects.select_related("generado_por", "categoria"), pk=id
     )
 
-    context = {
-        "titulo": articulo.titulo,
-        "descripcion": articulo.descripcion,
-        "categoria": (
-            articulo.categoria.nombre if articulo.categoria else "Sin categoría"
-        ),
-        "fecha": articulo.fecha_creacion,
-        "autor": (
-            articulo.generado_por.username if articulo.generado_por else "Desconocido"
-        ),
-        "links": articulo.links_incluidos.all(),
-    }
-
-    # Asumiendo que "articulo_pdf.html" existe y es válido
-    html = render_to_string("articulo_pdf.html", context)
-    
-    # Manejo de la URL base para recursos (CSS, imágenes)
-    pdf_file = HTML(string=html, base_url=request.build_absolute_uri()).write_pdf()
+    def generar_html():
+        context = {
+            "titulo": articulo.titulo,
+            "descripcion": articulo.descripcion,
+            "categoria": (
+                articulo.categoria.nombre if articulo.categoria else "Sin categoría"
+            ),
+            "fecha": articulo.fecha_creacion,
+            "autor": (
+                articulo.generado_por.username if articulo.generado_por else "Desconocido"
+            ),
+            "links": articulo.links_incluidos.all(),
+        }
+        return render_to_string("articulo_pdf.html", context)
 
     # Armado del nombre dinámico
     fecha_str = localtime(articulo.fecha_creacion).strftime("%Y-%m-%d")
     titulo_slug = slugify(articulo.titulo)[:50] or "articulo"
     nombre_archivo = f"Articulo_{titulo_slug}_{fecha_str}.pdf"
 
-    response = HttpResponse(pdf_file, content_type="application/pdf")
-    response["Content-Disposition"] = f'inline; filename="{nombre_archivo}"'
-    return response
+    return _responder_pdf(
+        request,
+        servicio_pdf.clave_pdf("articulo", articulo.pk, articulo.fecha_modificacion.isoformat()),
+        generar_html,
+        nombre_archivo,
+        adjunto=False,
+        fallback_url="redaccion",
+    )
 
 
 @csrf_exempt
@@ -1703,6 +1762,75 @@ def registrar_clic_link(request):
     return JsonResponse({"status": "método no permitido"}, status=405)
 
 
+@require_GET
+def metricas_view(request):
+    """
+    Métricas en el formato de texto de Prometheus. Con METRICAS_TOKEN el
+    scraper se identifica con "Authorization: Bearer <token>"; sin él, sólo
+    pueden verlas los usuarios staff.
+    """
+    if settings.METRICAS_TOKEN:
+        esperado = f"Bearer {settings.METRICAS_TOKEN}".encode()
+        permitido = hmac.compare_digest(request.headers.get("Authorization", "").encode(), esperado)
+    else:
+        permitido = request.user.is_authenticated and request.user.is_staff
+    if not permitido:
+        return HttpResponse(status=403)
+    return HttpResponse(exponer_metricas(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@require_POST
+def registrar_clics_links(request):
+    """
+    Recibe en lote los clics en links que junta static/js/clics.js: una lista
+    JSON de {url, fecha (ms desde epoch), panel} en el campo `eventos` del
+    formulario (navigator.sendBeacon) o como cuerpo JSON. A diferencia de
+    registrar_clic_link, valida el token CSRF.
+    """
+    if request.content_type in ("multipart/form-data", "application/x-www-form-urlencoded"):
+        crudo = request.POST.get("eventos") or "[]"
+    else:
+        crudo = request.body or "[]"
+    try:
+        eventos = json.loads(crudo)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({"status": "error", "mensaje": "Datos JSON inválidos"}, status=400)
+    if isinstance(eventos, dict):
+        eventos = eventos.get("eventos")
+    if not isinstance(eventos, list) or not all(isinstance(evento, dict) for evento in eventos):
+        return JsonResponse({"status": "error", "mensaje": "Se esperaba una lista de eventos"}, status=400)
+    if len(eventos) > settings.CLICS_MAX_EVENTOS:
+        return JsonResponse(
+            {"status": "error", "mensaje": f"Se admiten hasta {settings.CLICS_MAX_EVENTOS} eventos por envío"},
+            status=400,
+        )
+
+    usuario_id = request.user.pk if request.user.is_authenticated else None
+    ahora = now()
+    filas = []
+    for evento in eventos:
+        url = str(evento.get("url") or "URL desconocida")[:2000]
+        panel = str(evento.get("panel") or "")[:30]
+        # La fecha la pone el navegador: se descarta si es inválida, futura o
+        # demasiado vieja.
+        try:
+            fecha = datetime.fromtimestamp(float(evento["fecha"]) / 1000, tz=get_current_timezone())
+        except (KeyError, TypeError, ValueError, OverflowError, OSError):
+            fecha = ahora
+        if not ahora - timedelta(seconds=settings.CLICS_ANTIGUEDAD_MAXIMA) <= fecha <= ahora:
+            fecha = ahora
+        filas.append(
+            {
+                "usuario_id": usuario_id,
+                "tipo": TipoActividad.CLIC_LINK,
+                "descripcion": f"Click en link: {url}" + (f" (panel: {panel})" if panel else ""),
+                "fecha_hora": fecha,
+            }
+        )
+    registrar_actividades(filas)
+    return JsonResponse({"status": "ok", "registrados": len(filas)})
+
+
 # -------------------------- API VIEWSETS --------------------------
 
 
@@ -1804,30 +1932,17 @@ class LinkRelevanteViewSet(viewsets.ModelViewSet):
         if estado:
             queryset = queryset.filter(estado=estado)
         if fecha_inicio:
-            queryset = queryset.filter(fecha_carga__date__gte=parse_date(fecha_inicio))
+            queryset = queryset.filter(fecha_carga__gte=inicio_del_dia(fecha_inicio))
         if fecha_fin:
-            queryset = queryset.filter(fecha_carga__date__lte=parse_date(fecha_fin))
+            queryset = queryset.filter(fecha_carga__lt=inicio_del_dia_siguiente(fecha_fin))
         if categoria_id:
             queryset = queryset.filter(categorias__id=categoria_id)
 
         return queryset.distinct()
 
-    def _resolver_fuentes(self, url):
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc.lower().replace("www.", "")
-
-        diario = None
-        for d in DiarioDigital.objects.all():
-            diario_domain = urlparse(d.url_principal).netloc.lower().replace("www.", "")
-            if diario_domain == domain or domain.endswith(f".{diario_domain}"):
-                diario = d
-                break
-
-        return diario
-
     def perform_create(self, serializer):
         url = serializer.validated_data.get("url", "")
-        diario = self._resolver_fuentes(url)
+        diario = resolver_fuente(DiarioDigital, url)
 
         link = serializer.save(
             cargado_por=self.request.user,
@@ -1844,6 +1959,7 @@ class LinkRelevanteViewSet(viewsets.ModelViewSet):
                     else "Ninguna"
                 ),
             ),
+            objeto=link,
         )
 
     def perform_update(self, serializer):
@@ -1854,7 +1970,7 @@ class LinkRelevanteViewSet(viewsets.ModelViewSet):
         link_instance = serializer.save()
 
         if "url" in serializer.validated_data and "diario_digital" not in serializer.validated_data:
-            diario = self._resolver_fuentes(link_instance.url)
+            diario = resolver_fuente(DiarioDigital, link_instance.url)
             update_required = False
             update_fields = []
             if link_instance.diario_digital != diario:
@@ -1870,6 +1986,9 @@ class LinkRelevanteViewSet(viewsets.ModelViewSet):
                 self.request,
                 TipoActividad.CAMBIO_ESTADO,
                 f"Se cambió el estado del link ID {link_instance.id} de '{original_estado}' a '{link_instance.estado}'. URL: {link_instance.url}",
+                objeto=link_instance,
+                estado_anterior=original_estado,
+                estado_nuevo=link_instance.estado,
             )
             
         # Actualizar fecha de aprobación si pasa a 'aprobado'
@@ -1890,6 +2009,7 @@ class LinkRelevanteViewSet(viewsets.ModelViewSet):
                 self.request,
                 TipoActividad.CLASIFICACION_LINK,
                 f"Se actualizaron las categorías del link ID {link_instance.id}. Nuevas categorías: [{nuevas_categorias_nombres}]. URL: {link_instance.url}",
+                objeto=link_instance,
             )
 
     def create(self, request, *args, **kwargs):
@@ -1932,9 +2052,9 @@ class LinkRedSocialViewSet(viewsets.ModelViewSet):
         if estado:
             queryset = queryset.filter(estado=estado)
         if fecha_inicio:
-            queryset = queryset.filter(fecha_carga__date__gte=parse_date(fecha_inicio))
+            queryset = queryset.filter(fecha_carga__gte=inicio_del_dia(fecha_inicio))
         if fecha_fin:
-            queryset = queryset.filter(fecha_carga__date__lte=parse_date(fecha_fin))
+            queryset = queryset.filter(fecha_carga__lt=inicio_del_dia_siguiente(fecha_fin))
         if categoria_id:
             queryset = queryset.filter(categorias__id=categoria_id)
         if red_social_id:
@@ -1944,19 +2064,9 @@ class LinkRedSocialViewSet(viewsets.ModelViewSet):
 
         return queryset.distinct()
 
-    def _resolver_red_social(self, url):
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc.lower().replace("www.", "")
-
-        for red in RedSocial.objects.all():
-            red_domain = urlparse(red.url_principal).netloc.lower().replace("www.", "")
-            if red_domain == domain or domain.endswith(f".{red_domain}"):
-                return red
-        return None
-
     def perform_create(self, serializer):
         url = serializer.validated_data.get("url", "")
-        red_social = serializer.validated_data.get("red_social") or self._resolver_red_social(url)
+        red_social = serializer.validated_data.get("red_social") or resolver_fuente(RedSocial, url)
 
         link = serializer.save(
             cargado_por=self.request.user,
@@ -1969,6 +2079,7 @@ class LinkRedSocialViewSet(viewsets.ModelViewSet):
                 url=link.url,
                 red=link.red_social.nombre if link.red_social else "Ninguna",
             ),
+            objeto=link,
         )
 
     def perform_update(self, serializer):
@@ -1979,7 +2090,7 @@ class LinkRedSocialViewSet(viewsets.ModelViewSet):
         link_instance = serializer.save()
 
         if "url" in serializer.validated_data and "red_social" not in serializer.validated_data:
-            red_social = self._resolver_red_social(link_instance.url)
+            red_social = resolver_fuente(RedSocial, link_instance.url)
             if link_instance.red_social != red_social:
                 link_instance.red_social = red_social
                 link_instance.save(update_fields=["red_social"])
@@ -1989,6 +2100,9 @@ class LinkRedSocialViewSet(viewsets.ModelViewSet):
                 self.request,
                 TipoActividad.CAMBIO_ESTADO,
                 f"Se cambió el estado del link de red social ID {link_instance.id} de '{original_estado}' a '{link_instance.estado}'. URL: {link_instance.url}",
+                objeto=link_instance,
+                estado_anterior=original_estado,
+                estado_nuevo=link_instance.estado,
             )
 
         if original_estado != EstadoLink.APROBADO and link_instance.estado == EstadoLink.APROBADO:
@@ -2006,6 +2120,7 @@ class LinkRedSocialViewSet(viewsets.ModelViewSet):
                 self.request,
                 TipoActividad.CLASIFICACION_LINK,
                 f"Se actualizaron las categorías del link de red social ID {link_instance.id}. Nuevas categorías: [{nuevas_categorias_nombres}]. URL: {link_instance.url}",
+                objeto=link_instance,
             )
 
     def create(self, request, *args, **kwargs):
@@ -2048,9 +2163,9 @@ class LinkTvDigitalViewSet(viewsets.ModelViewSet):
         if estado:
             queryset = queryset.filter(estado=estado)
         if fecha_inicio:
-            queryset = queryset.filter(fecha_carga__date__gte=parse_date(fecha_inicio))
+            queryset = queryset.filter(fecha_carga__gte=inicio_del_dia(fecha_inicio))
         if fecha_fin:
-            queryset = queryset.filter(fecha_carga__date__lte=parse_date(fecha_fin))
+            queryset = queryset.filter(fecha_carga__lt=inicio_del_dia_siguiente(fecha_fin))
         if categoria_id:
             queryset = queryset.filter(categorias__id=categoria_id)
         if tv_digital_id:
@@ -2060,19 +2175,9 @@ class LinkTvDigitalViewSet(viewsets.ModelViewSet):
 
         return queryset.distinct()
 
-    def _resolver_tv_digital(self, url):
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc.lower().replace("www.", "")
-
-        for tv in TvDigital.objects.all():
-            tv_domain = urlparse(tv.url_principal).netloc.lower().replace("www.", "")
-            if tv_domain == domain or domain.endswith(f".{tv_domain}"):
-                return tv
-        return None
-
     def perform_create(self, serializer):
         url = serializer.validated_data.get("url", "")
-        tv_digital = serializer.validated_data.get("tv_digital") or self._resolver_tv_digital(url)
+        tv_digital = serializer.validated_data.get("tv_digital") or resolver_fuente(TvDigital, url)
 
         link = serializer.save(
             cargado_por=self.request.user,
@@ -2085,6 +2190,7 @@ class LinkTvDigitalViewSet(viewsets.ModelViewSet):
                 url=link.url,
                 tv=link.tv_digital.nombre if link.tv_digital else "Ninguna",
             ),
+            objeto=link,
         )
 
     def perform_update(self, serializer):
@@ -2095,7 +2201,7 @@ class LinkTvDigitalViewSet(viewsets.ModelViewSet):
         link_instance = serializer.save()
 
         if "url" in serializer.validated_data and "tv_digital" not in serializer.validated_data:
-            tv_digital = self._resolver_tv_digital(link_instance.url)
+            tv_digital = resolver_fuente(TvDigital, link_instance.url)
             if link_instance.tv_digital != tv_digital:
                 link_instance.tv_digital = tv_digital
                 link_instance.save(update_fields=["tv_digital"])
@@ -2105,6 +2211,9 @@ class LinkTvDigitalViewSet(viewsets.ModelViewSet):
                 self.request,
                 TipoActividad.CAMBIO_ESTADO,
                 f"Se cambió el estado del link de TV digital ID {link_instance.id} de '{original_estado}' a '{link_instance.estado}'. URL: {link_instance.url}",
+                objeto=link_instance,
+                estado_anterior=original_estado,
+                estado_nuevo=link_instance.estado,
             )
 
         if original_estado != EstadoLink.APROBADO and link_instance.estado == EstadoLink.APROBADO:
@@ -2122,6 +2231,7 @@ class LinkTvDigitalViewSet(viewsets.ModelViewSet):
                 self.request,
                 TipoActividad.CLASIFICACION_LINK,
                 f"Se actualizaron las categorías del link de TV digital ID {link_instance.id}. Nuevas categorías: [{nuevas_categorias_nombres}]. URL: {link_instance.url}",
+                objeto=link_instance,
             )
 
     def create(self, request, *args, **kwargs):
@@ -2164,9 +2274,9 @@ class LinkRadioDigitalViewSet(viewsets.ModelViewSet):
         if estado:
             queryset = queryset.filter(estado=estado)
         if fecha_inicio:
-            queryset = queryset.filter(fecha_carga__date__gte=parse_date(fecha_inicio))
+            queryset = queryset.filter(fecha_carga__gte=inicio_del_dia(fecha_inicio))
         if fecha_fin:
-            queryset = queryset.filter(fecha_carga__date__lte=parse_date(fecha_fin))
+            queryset = queryset.filter(fecha_carga__lt=inicio_del_dia_siguiente(fecha_fin))
         if categoria_id:
             queryset = queryset.filter(categorias__id=categoria_id)
         if radio_digital_id:
@@ -2176,19 +2286,9 @@ class LinkRadioDigitalViewSet(viewsets.ModelViewSet):
 
         return queryset.distinct()
 
-    def _resolver_radio_digital(self, url):
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc.lower().replace("www.", "")
-
-        for radio in RadioDigital.objects.all():
-            radio_domain = urlparse(radio.url_principal).netloc.lower().replace("www.", "")
-            if radio_domain == domain or domain.endswith(f".{radio_domain}"):
-                return radio
-        return None
-
     def perform_create(self, serializer):
         url = serializer.validated_data.get("url", "")
-        radio_digital = serializer.validated_data.get("radio_digital") or self._resolver_radio_digital(url)
+        radio_digital = serializer.validated_data.get("radio_digital") or resolver_fuente(RadioDigital, url)
 
         link = serializer.save(
             cargado_por=self.request.user,
@@ -2201,6 +2301,7 @@ class LinkRadioDigitalViewSet(viewsets.ModelViewSet):
                 url=link.url,
                 radio=link.radio_digital.nombre if link.radio_digital else "Ninguna",
             ),
+            objeto=link,
         )
 
     def perform_update(self, serializer):
@@ -2211,7 +2312,7 @@ class LinkRadioDigitalViewSet(viewsets.ModelViewSet):
         link_instance = serializer.save()
 
         if "url" in serializer.validated_data and "radio_digital" not in serializer.validated_data:
-            radio_digital = self._resolver_radio_digital(link_instance.url)
+            radio_digital = resolver_fuente(RadioDigital, link_instance.url)
             if link_instance.radio_digital != radio_digital:
                 link_instance.radio_digital = radio_digital
                 link_instance.save(update_fields=["radio_digital"])
@@ -2221,6 +2322,9 @@ class LinkRadioDigitalViewSet(viewsets.ModelViewSet):
                 self.request,
                 TipoActividad.CAMBIO_ESTADO,
                 f"Se cambió el estado del link de Radio digital ID {link_instance.id} de '{original_estado}' a '{link_instance.estado}'. URL: {link_instance.url}",
+                objeto=link_instance,
+                estado_anterior=original_estado,
+                estado_nuevo=link_instance.estado,
             )
 
         if original_estado != EstadoLink.APROBADO and link_instance.estado == EstadoLink.APROBADO:
@@ -2238,6 +2342,7 @@ class LinkRadioDigitalViewSet(viewsets.ModelViewSet):
                 self.request,
                 TipoActividad.CLASIFICACION_LINK,
                 f"Se actualizaron las categorías del link de Radio digital ID {link_instance.id}. Nuevas categorías: [{nuevas_categorias_nombres}]. URL: {link_instance.url}",
+                objeto=link_instance,
             )
 
     def create(self, request, *args, **kwargs):
@@ -2279,11 +2384,11 @@ class ArticuloViewSet(viewsets.ModelViewSet):
 
         if fecha_inicio:
             queryset = queryset.filter(
-                fecha_creacion__date__gte=parse_date(fecha_inicio)
+                fecha_creacion__gte=inicio_del_dia(fecha_inicio)
             )
         if fecha_fin:
             queryset = queryset.filter(
-                fecha_creacion__date__lte=parse_date(fecha_fin)
+                fecha_creacion__lt=inicio_del_dia_siguiente(fecha_fin)
             )
         if categoria_id:
             queryset = queryset.filter(categoria__id=categoria_id)
@@ -2336,14 +2441,19 @@ class ActividadViewSet(viewsets.ReadOnlyModelViewSet):
         tipo = self.request.query_params.get("tipo")
         desde = self.request.query_params.get("desde")
         hasta = self.request.query_params.get("hasta")
+        desde = inicio_del_dia(desde) if desde else None
+        hasta = inicio_del_dia_siguiente(hasta) if hasta else None
         if usuario:
             qs = qs.filter(usuario__username=usuario)
         if tipo:
             qs = qs.filter(tipo=tipo)
         if desde:
-            qs = qs.filter(fecha_hora__date__gte=parse_date(desde))
+            qs = qs.filter(fecha_hora__gte=desde)
         if hasta:
-            qs = qs.filter(fecha_hora__date__lte=parse_date(hasta))
+            qs = qs.filter(fecha_hora__lt=hasta)
+        if self.action == "list":
+            # Los rangos que llegan a los meses archivados también los leen.
+            return actividades_con_archivo(qs, usuario, tipo, desde, hasta)
         return qs
 
 
@@ -2394,23 +2504,169 @@ class HechoDestacadoViewSet(viewsets.ModelViewSet):
 
 # -------------------- FUNCTION-BASED API PARA PANEL DE CLASIFICACIÓN --------------------
 
+# Para cada tipo de fuente: clave con el ID del origen en la respuesta, prefijo
+# usado para su nombre/logo, nombre cuando no tiene origen y parámetro GET que
+# filtra por origen.
+_ORIGENES_API_LINKS = {
+    "diario": ("diario_digital", "diario", "Sin diario", "diario_id"),
+    "red_social": ("red_social", "red_social", "Sin asignar", "red_social_id"),
+    "tv_digital": ("tv_digital", "tv_digital", "Sin asignar", "tv_digital_id"),
+    "radio_digital": ("radio_digital", "radio_digital", "Sin asignar", "radio_digital_id"),
+}
+
+_CAMPOS_API_LINKS = (
+    "id",
+    "tipo_fuente",
+    "url",
+    "estado",
+    "fecha_carga",
+    "revisado_clasificador",
+    "revisado_redactor",
+    "diario_logo_url",
+    "diario_nombre",
+    "diario_digital",
+    "red_social",
+    "red_social_nombre",
+    "red_social_logo_url",
+    "tv_digital",
+    "tv_digital_nombre",
+    "tv_digital_logo_url",
+    "radio_digital",
+    "radio_digital_nombre",
+    "radio_digital_logo_url",
+    "categorias_info",
+    "resumen_ia",
+    "confianza_clasificacion",
+    "clasificado_por_ia",
+    "asociados",
+)
+
+LINKS_LIMITE_MAXIMO = 500
+
+
+def _codificar_cursor(fecha_carga, pk):
+    valor = f"{fecha_carga.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(valor.encode()).decode().rstrip("=")
+
+
+def _decodificar_cursor(cursor):
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        fecha, pk = base64.urlsafe_b64decode(cursor + relleno).decode().split("|")
+        return datetime.fromisoformat(fecha), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _filas_api_links(filas, campos):
+    """
+    Arma la respuesta de api_links_list a partir de filas de LinkFeed
+    (.values()). Los datos que no están en el feed (origen, categorías,
+    artículos asociados y resumen de la IA) se traen con una consulta por
+    tipo de fuente presente en la página.
+    """
+    por_tipo = defaultdict(list)
+    for fila in filas:
+        por_tipo[fila["tipo_fuente"]].append(fila)
+
+    origenes = {}
+    categorias = defaultdict(list)
+    asociados = defaultdict(list)
+    resumenes = {}
+    for tipo, filas_tipo in por_tipo.items():
+        modelo, _, modelo_origen = FUENTES_FEED[tipo]
+        ids = [fila["link_id"] for fila in filas_tipo]
+
+        ids_origen = {fila["origen_id"] for fila in filas_tipo if fila["origen_id"]}
+        for origen_id, nombre, logo in modelo_origen.objects.filter(
+            pk__in=ids_origen
+        ).values_list("id", "nombre", "logo"):
+            origenes[(tipo, origen_id)] = (nombre, default_storage.url(logo) if logo else None)
+
+        if "categorias_info" in campos:
+            through = modelo.categorias.through
+            columna = f"{modelo.categorias.field.m2m_field_name()}_id"
+            for link_id, cat_id, cat_nombre in through.objects.filter(
+                **{f"{columna}__in": ids}
+            ).values_list(columna, "categoria_id", "categoria__nombre"):
+                categorias[(tipo, link_id)].append({"id": cat_id, "nombre": cat_nombre})
+
+        if tipo == LinkFeed.TipoFuente.DIARIO:
+            if "asociados" in campos:
+                through = Articulo.links_incluidos.through
+                for link_id, art_id, titulo in through.objects.filter(
+                    linkrelevante_id__in=ids
+                ).values_list("linkrelevante_id", "articulo_id", "articulo__titulo"):
+                    asociados[link_id].append({"id": art_id, "titulo": titulo})
+            if "resumen_ia" in campos:
+                resumenes = dict(
+                    LinkRelevante.objects.filter(pk__in=ids).values_list("id", "resumen_ia")
+                )
+
+    data = []
+    for fila in filas:
+        tipo = fila["tipo_fuente"]
+        clave_origen, prefijo, sin_origen, _ = _ORIGENES_API_LINKS[tipo]
+        origen = origenes.get((tipo, fila["origen_id"]))
+        es_diario = tipo == LinkFeed.TipoFuente.DIARIO
+        completa = {
+            "id": fila["link_id"],
+            "tipo_fuente": tipo,
+            "url": fila["url"],
+            "estado": fila["estado"],
+            "fecha_carga": fila["fecha_carga"].isoformat() if fila["fecha_carga"] else None,
+            "revisado_clasificador": fila["revisado_clasificador"],
+            "revisado_redactor": fila["revisado_redactor"],
+            "diario_logo_url": None,
+            "diario_nombre": None,
+            "diario_digital": None,
+            "red_social": None,
+            "red_social_nombre": None,
+            "red_social_logo_url": None,
+            "tv_digital": None,
+            "tv_digital_nombre": None,
+            "tv_digital_logo_url": None,
+            "radio_digital": None,
+            "radio_digital_nombre": None,
+            "radio_digital_logo_url": None,
+            "categorias_info": categorias.get((tipo, fila["link_id"]), []),
+            "resumen_ia": resumenes.get(fila["link_id"], "") if es_diario else "",
+            "confianza_clasificacion": fila["confianza_clasificacion"],
+            "clasificado_por_ia": fila["clasificado_por_ia"],
+            "asociados": asociados.get(fila["link_id"], []) if es_diario else [],
+        }
+        completa[clave_origen] = fila["origen_id"] if origen else None
+        completa[f"{prefijo}_nombre"] = origen[0] if origen else sin_origen
+        completa[f"{prefijo}_logo_url"] = origen[1] if origen else None
+        data.append({campo: completa[campo] for campo in campos})
+    return data
+
+
 @csrf_exempt
 @login_required
 def api_links_list(request):
+    """
+    Lista links para los paneles a partir del feed unificado (LinkFeed).
+
+    `fuente` acepta un tipo (diario, red_social, tv_digital, radio_digital),
+    varios separados por coma o "todas"; por defecto se listan diarios.
+    Sin `limite` devuelve todos los links en un array, como siempre. Con
+    `limite` pagina por cursor sobre (fecha_carga, id), de más nuevo a más
+    viejo, y devuelve {"resultados", "siguiente", "total"}; `siguiente` se
+    pasa como `cursor` para pedir la página que sigue y `total=0` evita el
+    COUNT. `fields` limita las columnas de cada link (separadas por coma).
+    """
     try:
         # Obtener parámetros de filtro
         fecha_inicio = request.GET.get('fecha_inicio')
         fecha_fin = request.GET.get('fecha_fin')
-        diario_id = request.GET.get('diario_id')
         estado = request.GET.get('estado')
+        estado_excluido = request.GET.get('estado!')
         categoria_id = request.GET.get('categoria_id')
         solo_propios = request.GET.get('solo_propios')
         solo_no_revisados = request.GET.get('solo_no_revisados')
         solo_ia = request.GET.get('clasificado_por_ia')
-        fuente = request.GET.get('fuente')
-        red_social_id = request.GET.get('red_social_id')
-        tv_digital_id = request.GET.get('tv_digital_id')
-        radio_digital_id = request.GET.get('radio_digital_id')
+        fuente = request.GET.get('fuente') or ''
         solo_prensa = request.GET.get('solo_prensa')
         rol_usuario = getattr(getattr(request.user, "userprofile", None), "rol", None)
         filtrar_prensa = (
@@ -2418,227 +2674,106 @@ def api_links_list(request):
             or rol_usuario == Roles.CLASIFICADOR_IA
         )
 
-        data = []
+        if fuente == 'todas':
+            fuentes = list(_ORIGENES_API_LINKS)
+        else:
+            fuentes = [f for f in fuente.split(',') if f in _ORIGENES_API_LINKS]
+        fuentes = fuentes or [LinkFeed.TipoFuente.DIARIO]
+
+        campos = _CAMPOS_API_LINKS
+        if request.GET.get('fields'):
+            pedidos = [c.strip() for c in request.GET['fields'].split(',') if c.strip()]
+            desconocidos = [c for c in pedidos if c not in _CAMPOS_API_LINKS]
+            if desconocidos:
+                return JsonResponse(
+                    {'error': f"Campos desconocidos: {', '.join(desconocidos)}"}, status=400
+                )
+            campos = tuple(dict.fromkeys(["id", *pedidos]))
 
-        if fuente == 'red_social':
-            links = LinkRedSocial.objects.select_related('red_social').prefetch_related('categorias').all()
+        links = LinkFeed.objects.filter(tipo_fuente__in=fuentes)
+        if fecha_inicio:
+            links = links.filter(fecha_carga__gte=inicio_del_dia(fecha_inicio))
+        if fecha_fin:
+            links = links.filter(fecha_carga__lt=inicio_del_dia_siguiente(fecha_fin))
+        for tipo in fuentes:
+            origen_id = request.GET.get(_ORIGENES_API_LINKS[tipo][3])
+            if origen_id:
+                links = links.filter(~Q(tipo_fuente=tipo) | Q(origen_id=origen_id))
+        if estado:
+            if estado.startswith('estado!='):
+                estado_excluido = estado.split('!=')[1]
+            else:
+                links = links.filter(estado=estado)
+        if estado_excluido:
+            links = links.exclude(estado=estado_excluido)
+        if categoria_id:
+            con_categoria = Q()
+            for tipo in fuentes:
+                modelo = FUENTES_FEED[tipo][0]
+                through = modelo.categorias.through
+                columna = f"{modelo.categorias.field.m2m_field_name()}_id"
+                con_categoria |= Q(
+                    tipo_fuente=tipo,
+                    link_id__in=through.objects.filter(categoria_id=categoria_id).values(columna),
+                )
+            links = links.filter(con_categoria)
+        if solo_propios:
+            links = links.filter(cargado_por=request.user)
+        if filtrar_prensa:
+            links = links.filter(cargado_por__userprofile__rol=Roles.PRENSA)
+        if solo_no_revisados:
+            links = links.filter(revisado_clasificador=False)
+        if solo_ia:
+            links = links.filter(clasificado_por_ia=True)
+
+        filas = links.order_by("-fecha_carga", "-id").values(
+            "id",
+            "tipo_fuente",
+            "link_id",
+            "url",
+            "estado",
+            "fecha_carga",
+            "revisado_clasificador",
+            "revisado_redactor",
+            "origen_id",
+            "clasificado_por_ia",
+            "confianza_clasificacion",
+        )
 
-            if fecha_inicio:
-                links = links.filter(fecha_carga__date__gte=parse_date(fecha_inicio))
-            if fecha_fin:
-                links = links.filter(fecha_carga__date__lte=parse_date(fecha_fin))
-            if estado:
-                if estado.startswith('estado!='):
-                    exclude_estado = estado.split('!=')[1]
-                    links = links.exclude(estado=exclude_estado)
-                else:
-                    links = links.filter(estado=estado)
-            if categoria_id:
-                links = links.filter(categorias__id=categoria_id)
-            if red_social_id:
-                links = links.filter(red_social__id=red_social_id)
-            if solo_propios:
-                links = links.filter(cargado_por=request.user)
-            if filtrar_prensa:
-                links = links.filter(cargado_por__userprofile__rol=Roles.PRENSA)
-            if solo_no_revisados:
-                links = links.filter(revisado_clasificador=False)
-            if solo_ia:
-                links = links.filter(clasificado_por_ia=True)
-
-            for link in links:
-                data.append({
-                    'id': link.id,
-                    'tipo_fuente': 'red_social',
-                    'url': link.url,
-                    'estado': getattr(link, 'estado', EstadoLink.PENDIENTE),
-                    'fecha_carga': link.fecha_carga.isoformat() if link.fecha_carga else None,
-                    'revisado_clasificador': getattr(link, 'revisado_clasificador', False),
-                    'revisado_redactor': getattr(link, 'revisado_redactor', False),
-                    'diario_logo_url': None,
-                    'diario_nombre': None,
-                    'diario_digital': None,
-                    'red_social': link.red_social.id if link.red_social else None,
-                    'red_social_nombre': link.red_social.nombre if link.red_social else 'Sin asignar',
-                    'red_social_logo_url': link.red_social.logo.url if link.red_social and getattr(link.red_social, 'logo', None) else None,
-                    'tv_digital': None,
-                    'tv_digital_nombre': None,
-                    'tv_digital_logo_url': None,
-                    'categorias_info': [{'id': cat.id, 'nombre': cat.nombre} for cat in link.categorias.all()],
-                    'resumen_ia': getattr(link, 'resumen_ia', ""),
-                    'confianza_clasificacion': getattr(link, 'confianza_clasificacion', None),
-                    'clasificado_por_ia': getattr(link, 'clasificado_por_ia', False),
-                    'asociados': [],
-                })
-        elif fuente == 'tv_digital':
-            links = LinkTvDigital.objects.select_related('tv_digital').prefetch_related('categorias').all()
-
-            if fecha_inicio:
-                links = links.filter(fecha_carga__date__gte=parse_date(fecha_inicio))
-            if fecha_fin:
-                links = links.filter(fecha_carga__date__lte=parse_date(fecha_fin))
-            if estado:
-                if estado.startswith('estado!='):
-                    exclude_estado = estado.split('!=')[1]
-                    links = links.exclude(estado=exclude_estado)
-                else:
-                    links = links.filter(estado=estado)
-            if categoria_id:
-                links = links.filter(categorias__id=categoria_id)
-            if tv_digital_id:
-                links = links.filter(tv_digital__id=tv_digital_id)
-            if solo_propios:
-                links = links.filter(cargado_por=request.user)
-            if filtrar_prensa:
-                links = links.filter(cargado_por__userprofile__rol=Roles.PRENSA)
-            if solo_no_revisados:
-                links = links.filter(revisado_clasificador=False)
-            if solo_ia:
-                links = links.filter(clasificado_por_ia=True)
-
-            for link in links:
-                data.append({
-                    'id': link.id,
-                    'tipo_fuente': 'tv_digital',
-                    'url': link.url,
-                    'estado': getattr(link, 'estado', EstadoLink.PENDIENTE),
-                    'fecha_carga': link.fecha_carga.isoformat() if link.fecha_carga else None,
-                    'revisado_clasificador': getattr(link, 'revisado_clasificador', False),
-                    'revisado_redactor': getattr(link, 'revisado_redactor', False),
-                    'diario_logo_url': None,
-                    'diario_nombre': None,
-                    'diario_digital': None,
-                    'red_social': None,
-                    'red_social_nombre': None,
-                    'red_social_logo_url': None,
-                    'tv_digital': link.tv_digital.id if link.tv_digital else None,
-                    'tv_digital_nombre': link.tv_digital.nombre if link.tv_digital else 'Sin asignar',
-                    'tv_digital_logo_url': link.tv_digital.logo.url if link.tv_digital and getattr(link.tv_digital, 'logo', None) else None,
-                    'radio_digital': None,
-                    'radio_digital_nombre': None,
-                    'radio_digital_logo_url': None,
-                    'categorias_info': [{'id': cat.id, 'nombre': cat.nombre} for cat in link.categorias.all()],
-                    'resumen_ia': getattr(link, 'resumen_ia', ""),
-                    'confianza_clasificacion': getattr(link, 'confianza_clasificacion', None),
-                    'asociados': [],
-                })
-        elif fuente == 'radio_digital':
-            links = LinkRadioDigital.objects.select_related('radio_digital').prefetch_related('categorias').all()
-
-            if fecha_inicio:
-                links = links.filter(fecha_carga__date__gte=parse_date(fecha_inicio))
-            if fecha_fin:
-                links = links.filter(fecha_carga__date__lte=parse_date(fecha_fin))
-            if estado:
-                if estado.startswith('estado!='):
-                    exclude_estado = estado.split('!=')[1]
-                    links = links.exclude(estado=exclude_estado)
-                else:
-                    links = links.filter(estado=estado)
-            if categoria_id:
-                links = links.filter(categorias__id=categoria_id)
-            if radio_digital_id:
-                links = links.filter(radio_digital__id=radio_digital_id)
-            if solo_propios:
-                links = links.filter(cargado_por=request.user)
-            if filtrar_prensa:
-                links = links.filter(cargado_por__userprofile__rol=Roles.PRENSA)
-            if solo_no_revisados:
-                links = links.filter(revisado_clasificador=False)
-            if solo_ia:
-                links = links.filter(clasificado_por_ia=True)
-
-            for link in links:
-                data.append({
-                    'id': link.id,
-                    'tipo_fuente': 'radio_digital',
-                    'url': link.url,
-                    'estado': getattr(link, 'estado', EstadoLink.PENDIENTE),
-                    'fecha_carga': link.fecha_carga.isoformat() if link.fecha_carga else None,
-                    'revisado_clasificador': getattr(link, 'revisado_clasificador', False),
-                    'revisado_redactor': getattr(link, 'revisado_redactor', False),
-                    'diario_logo_url': None,
-                    'diario_nombre': None,
-                    'diario_digital': None,
-                    'red_social': None,
-                    'red_social_nombre': None,
-                    'red_social_logo_url': None,
-                    'tv_digital': None,
-                    'tv_digital_nombre': None,
-                    'tv_digital_logo_url': None,
-                    'radio_digital': link.radio_digital.id if link.radio_digital else None,
-                    'radio_digital_nombre': link.radio_digital.nombre if link.radio_digital else 'Sin asignar',
-                    'radio_digital_logo_url': link.radio_digital.logo.url if link.radio_digital and getattr(link.radio_digital, 'logo', None) else None,
-                    'categorias_info': [{'id': cat.id, 'nombre': cat.nombre} for cat in link.categorias.all()],
-                    'resumen_ia': getattr(link, 'resumen_ia', ""),
-                    'confianza_clasificacion': getattr(link, 'confianza_clasificacion', None),
-                    'clasificado_por_ia': getattr(link, 'clasificado_por_ia', False),
-                    'asociados': [],
-                })
-        else:
-            # Filtrar links de diarios digitales
-            links = LinkRelevante.objects.select_related('diario_digital').prefetch_related('categorias', 'articulos').all()
-
-            if fecha_inicio:
-                links = links.filter(fecha_carga__date__gte=parse_date(fecha_inicio))
-            if fecha_fin:
-                links = links.filter(fecha_carga__date__lte=parse_date(fecha_fin))
-            if diario_id:
-                links = links.filter(diario_digital__id=diario_id)
-            if estado:
-                if estado.startswith('estado!='):
-                    exclude_estado = estado.split('!=')[1]
-                    links = links.exclude(estado=exclude_estado)
-                else:
-                    links = links.filter(estado=estado)
-            if categoria_id:
-                links = links.filter(categorias__id=categoria_id)
-            if solo_propios:
-                links = links.filter(cargado_por=request.user)
-            if filtrar_prensa:
-                links = links.filter(cargado_por__userprofile__rol=Roles.PRENSA)
-            if solo_no_revisados:
-                links = links.filter(revisado_clasificador=False)
-            if solo_ia:
-                links = links.filter(clasificado_por_ia=True)
-
-            for link in links:
-                asociados = [
-                    {
-                        "id": articulo.id,
-                        "titulo": articulo.titulo,
-                    }
-                    for articulo in getattr(link, "articulos", []).all()
-                ] if hasattr(link, "articulos") else []
-                data.append({
-                    'id': link.id,
-                    'tipo_fuente': 'diario',
-                    'url': link.url,
-                    'estado': getattr(link, 'estado', EstadoLink.PENDIENTE),
-                    'fecha_carga': link.fecha_carga.isoformat() if link.fecha_carga else None,
-                    'revisado_clasificador': getattr(link, 'revisado_clasificador', False),
-                    'revisado_redactor': getattr(link, 'revisado_redactor', False),
-                    'diario_logo_url': link.diario_digital.logo.url if hasattr(link.diario_digital, 'logo') and link.diario_digital and link.diario_digital.logo else None,
-                    'diario_nombre': link.diario_digital.nombre if link.diario_digital else 'Sin diario',
-                    'diario_digital': link.diario_digital.id if link.diario_digital else None,
-                    'red_social': None,
-                    'red_social_nombre': None,
-                    'red_social_logo_url': None,
-                    'tv_digital': None,
-                    'tv_digital_nombre': None,
-                    'tv_digital_logo_url': None,
-                    'radio_digital': None,
-                    'radio_digital_nombre': None,
-                    'radio_digital_logo_url': None,
-                    'categorias_info': [{'id': cat.id, 'nombre': cat.nombre} for cat in link.categorias.all()],
-                    'resumen_ia': getattr(link, 'resumen_ia', ""),
-                    'confianza_clasificacion': getattr(link, 'confianza_clasificacion', None),
-                    'clasificado_por_ia': getattr(link, 'clasificado_por_ia', False),
-                    'asociados': asociados,
-                })
+        limite = request.GET.get('limite')
+        if not limite:
+            return JsonResponse(_filas_api_links(list(filas), campos), safe=False)
+
+        try:
+            limite = max(1, min(int(limite), LINKS_LIMITE_MAXIMO))
+        except ValueError:
+            return JsonResponse({'error': 'El parámetro limite debe ser un número.'}, status=400)
+        total = None
+        if request.GET.get('total', '1') not in ('0', 'false', 'False'):
+            total = links.count()
+
+        cursor = request.GET.get('cursor')
+        if cursor:
+            posicion = _decodificar_cursor(cursor)
+            if posicion is None:
+                return JsonResponse({'error': 'Cursor inválido.'}, status=400)
+            fecha, pk = posicion
+            filas = filas.filter(
+                Q(fecha_carga__lt=fecha) | Q(fecha_carga=fecha, id__lt=pk)
+            )
+
+        pagina = list(filas[: limite + 1])
+        siguiente = None
+        if len(pagina) > limite:
+            pagina = pagina[:limite]
+            siguiente = _codificar_cursor(pagina[-1]["fecha_carga"], pagina[-1]["id"])
+
+        return JsonResponse({
+            'resultados': _filas_api_links(pagina, campos),
+            'siguiente': siguiente,
+            'total': total,
+        })
 
-        return JsonResponse(data, safe=False)
-    
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -2721,79 +2856,24 @@ def procesar_links_ia(request):
     if not isinstance(link_ids, list) or not link_ids:
         return JsonResponse({"error": "Debés enviar una lista de IDs."}, status=400)
 
-    try:
-        processor = LinkAIProcessor()
-    except IAProcessingError as exc:
-        return JsonResponse({"error": str(exc)}, status=500)
-
-    procesados = []
-    errores = {}
+    trabajo, errores = encolar_links(link_ids, usuario=request.user)
+    progreso = progreso_trabajo(trabajo)
+    progreso["errores"].update(errores)
+    return JsonResponse(progreso, status=202)
 
-    for link_id in link_ids:
-        try:
-            link = LinkRelevante.objects.get(pk=link_id)
-        except LinkRelevante.DoesNotExist:
-            errores[str(link_id)] = "Link no encontrado."
-            continue
 
-        try:
-            texto = processor.extraer_texto(link.url)
-            analisis = processor.analizar(link.url, texto)
-        except IAProcessingError as exc:
-            errores[str(link_id)] = str(exc)
-            continue
-
-        categorias_objs = []
-        for nombre in (analisis.categorias or [])[:5]:
-            categoria = Categoria.objects.filter(nombre__iexact=nombre).first()
-            if categoria:
-                categorias_objs.append(categoria)
-
-        if not categorias_objs:
-            link.estado = EstadoLink.DESCARTADO
-            link.clasificado_por_ia = False
-            link.revisado_clasificador = True
-            link.confianza_clasificacion = None
-            link.resumen_ia = analisis.resumen[:2000]
-            link.categorias.clear()
-            link.save(
-                update_fields=[
-                    "estado",
-                    "clasificado_por_ia",
-                    "revisado_clasificador",
-                    "confianza_clasificacion",
-                    "resumen_ia",
-                ]
-            )
-            procesados.append(link_id)
-            errores[str(link_id)] = (
-                "Descartado: la IA no devolvió categorías que existan en el sistema."
-            )
-            continue
-
-        link.categorias.set(categorias_objs)
-
-        link.estado = EstadoLink.APROBADO
-        link.clasificado_por_ia = True
-        link.confianza_clasificacion = analisis.confianza
-        link.resumen_ia = analisis.resumen[:2000]
-        link.revisado_clasificador = True
-        link.save(
-            update_fields=[
-                "estado",
-                "clasificado_por_ia",
-                "confianza_clasificacion",
-                "resumen_ia",
-                "revisado_clasificador",
-            ]
-        )
-        procesados.append(link_id)
+@login_required
+@require_GET
+def progreso_trabajo_ia(request, trabajo_id):
+    rol_usuario = request.user.userprofile.rol
+    if rol_usuario not in [Roles.CLASIFICADOR_IA, Roles.CLASIFICACION, Roles.ADMIN]:
+        return JsonResponse({"error": "No autorizado"}, status=403)
 
-    status_code = 200 if procesados or errores else 400
-    return JsonResponse(
-        {"procesados": procesados, "errores": errores},
-        status=status_code,
-    )
+    try:
+        trabajo = TrabajoIA.objects.get(pk=trabajo_id)
+    except TrabajoIA.DoesNotExist:
+        return JsonResponse({"error": "Trabajo no encontrado"}, status=404)
+    return JsonResponse(progreso_trabajo(trabajo))
 
 # -------------------- FUNCTION-BASED API --------------------
 
@@ -2823,9 +2903,9 @@ def api_links(request):
     if estado:
         qs = qs.filter(estado=estado)
     if fecha_inicio:
-        qs = qs.filter(fecha_carga__date__gte=parse_date(fecha_inicio))
+        qs = qs.filter(fecha_carga__gte=inicio_del_dia(fecha_inicio))
     if fecha_fin:
-        qs = qs.filter(fecha_carga__date__lte=parse_date(fecha_fin))
+        qs = qs.filter(fecha_carga__lt=inicio_del_dia_siguiente(fecha_fin))
     if categoria_id:
         qs = qs.filter(categorias__id=categoria_id)
     if diario_id and diario_id.isdigit():
@@ -2853,9 +2933,9 @@ def lista_links(request):
     if estado:
         qs = qs.filter(estado=estado)
     if fecha_inicio:
-        qs = qs.filter(fecha_carga__date__gte=parse_date(fecha_inicio))
+        qs = qs.filter(fecha_carga__gte=inicio_del_dia(fecha_inicio))
     if fecha_fin:
-        qs = qs.filter(fecha_carga__date__lte=parse_date(fecha_fin))
+        qs = qs.filter(fecha_carga__lt=inicio_del_dia_siguiente(fecha_fin))
     if categoria_id:
         qs = qs.filter(categorias__id=categoria_id)
     if diario_id and diario_id.isdigit():
@@ -2921,9 +3001,9 @@ def informes_view(request):
 
     # Aplicar filtros si existen
     if fecha_desde:
-        articulos = articulos.filter(fecha_creacion__date__gte=parse_date(fecha_desde))
+        articulos = articulos.filter(fecha_creacion__gte=inicio_del_dia(fecha_desde))
     if fecha_hasta:
-        articulos = articulos.filter(fecha_creacion__date__lte=parse_date(fecha_hasta))
+        articulos = articulos.filter(fecha_creacion__lt=inicio_del_dia_siguiente(fecha_hasta))
     if categoria_id:
         articulos = articulos.filter(categoria__id=categoria_id)
     if generado_por_id:
@@ -2986,9 +3066,9 @@ def informes_crear_view(request):
     usuario_id = request.GET.get("usuario")
 
     if fecha_inicio:
-        articulos = articulos.filter(fecha_creacion__date__gte=parse_date(fecha_inicio))
+        articulos = articulos.filter(fecha_creacion__gte=inicio_del_dia(fecha_inicio))
     if fecha_fin:
-        articulos = articulos.filter(fecha_creacion__date__lte=parse_date(fecha_fin))
+        articulos = articulos.filter(fecha_creacion__lt=inicio_del_dia_siguiente(fecha_fin))
     if categoria_id and categoria_id != "0":
         articulos = articulos.filter(categoria__id=categoria_id)
     if usuario_id and usuario_id != "0":
@@ -3431,39 +3511,6 @@ def editar_individuo_view(request, id):
     )
 
 
-_LINK_ID_PATTERN = re.compile(
-    r"link(?: de)?(?: red social| tv digital| radio digital)? ID (\d+)", re.IGNORECASE
-)
-_ESTADO_PATTERN = re.compile(r"a '([^']+)'", re.IGNORECASE)
-
-
-def _extraer_link_id(descripcion):
-    if not descripcion:
-        return None
-    descripcion_lower = descripcion.lower()
-    if any(
-        tipo in descripcion_lower
-        for tipo in ["link de red social", "link de tv digital", "link de radio digital"]
-    ):
-        return None
-    match = _LINK_ID_PATTERN.search(descripcion)
-    if match:
-        try:
-            return int(match.group(1))
-        except (ValueError, TypeError):
-            return None
-    return None
-
-
-def _extraer_estado_nuevo(descripcion):
-    if not descripcion:
-        return None
-    match = _ESTADO_PATTERN.search(descripcion)
-    if match:
-        return match.group(1).strip().lower()
-    return None
-
-
 def _obtener_estadisticas_prensa(desde=None, hasta=None, username=None):
     """Construye las estadísticas solicitadas para usuarios con rol de prensa."""
 
@@ -3503,57 +3550,20 @@ def _obtener_estadisticas_prensa(desde=None, hasta=None, username=None):
             "redes_sociales": defaultdict(int),
         }
 
-    links_qs = LinkRelevante.objects.filter(cargado_por__in=usuarios_ids)
-    if fecha_desde:
-        links_qs = links_qs.filter(fecha_carga__date__gte=fecha_desde)
-    if fecha_hasta:
-        links_qs = links_qs.filter(fecha_carga__date__lte=fecha_hasta)
-
-    conteos_por_usuario = (
-        links_qs.values("cargado_por_id")
-        .annotate(
-            total=Count("id"),
-            aprobados=Count("id", filter=Q(estado=EstadoLink.APROBADO)),
-            rechazados=Count("id", filter=Q(estado=EstadoLink.DESCARTADO)),
-        )
-    )
-    for item in conteos_por_usuario:
-        data = stats_map.get(item["cargado_por_id"])
-        if not data:
-            continue
-        data["total_links"] = item["total"]
-        data["aprobados"] = item["aprobados"]
-        data["rechazados"] = item["rechazados"]
-
-    diarios_por_usuario = (
-        links_qs.values("cargado_por_id", "diario_digital__nombre")
-        .annotate(total=Count("id"))
-        .order_by()
-    )
-    for item in diarios_por_usuario:
-        data = stats_map.get(item["cargado_por_id"])
-        if not data:
-            continue
-        nombre_diario = item["diario_digital__nombre"] or "Sin diario digital"
-        data["diarios"][nombre_diario] += item["total"]
-
-    redes_qs = LinkRedSocial.objects.filter(cargado_por__in=usuarios_ids)
-    if fecha_desde:
-        redes_qs = redes_qs.filter(fecha_carga__date__gte=fecha_desde)
-    if fecha_hasta:
-        redes_qs = redes_qs.filter(fecha_carga__date__lte=fecha_hasta)
-
-    redes_por_usuario = (
-        redes_qs.values("cargado_por_id", "red_social__nombre")
-        .annotate(total=Count("id"))
-        .order_by()
-    )
-    for item in redes_por_usuario:
-        data = stats_map.get(item["cargado_por_id"])
-        if not data:
-            continue
-        nombre_red = item["red_social__nombre"] or "Sin red social"
-        data["redes_sociales"][nombre_red] += item["total"]
+    totales = sumar_estadisticas(METRICAS_PRENSA, fecha_desde, fecha_hasta, usuarios_ids)
+    nombres_diarios = dict(DiarioDigital.objects.values_list("id", "nombre"))
+    nombres_redes = dict(RedSocial.objects.values_list("id", "nombre"))
+    for user_id, data in stats_map.items():
+        totales_usuario = totales[user_id]
+        for diario_id, (cantidad, _) in totales_usuario[Metrica.LINKS_DIARIO].items():
+            nombre_diario = nombres_diarios.get(diario_id) or "Sin diario digital"
+            data["diarios"][nombre_diario] += cantidad
+            data["total_links"] += cantidad
+        data["aprobados"] = totales_usuario[Metrica.LINKS_APROBADOS][None][0]
+        data["rechazados"] = totales_usuario[Metrica.LINKS_RECHAZADOS][None][0]
+        for red_id, (cantidad, _) in totales_usuario[Metrica.LINKS_RED_SOCIAL].items():
+            nombre_red = nombres_redes.get(red_id) or "Sin red social"
+            data["redes_sociales"][nombre_red] += cantidad
 
     stats_list = []
     diarios_totales = defaultdict(int)
@@ -3630,9 +3640,9 @@ def _obtener_estadisticas_clasificacion(desde=None, hasta=None):
 
     pendientes_qs = LinkRelevante.objects.filter(estado=EstadoLink.PENDIENTE)
     if fecha_desde:
-        pendientes_qs = pendientes_qs.filter(fecha_carga__date__gte=fecha_desde)
+        pendientes_qs = pendientes_qs.filter(fecha_carga__gte=inicio_del_dia(fecha_desde))
     if fecha_hasta:
-        pendientes_qs = pendientes_qs.filter(fecha_carga__date__lte=fecha_hasta)
+        pendientes_qs = pendientes_qs.filter(fecha_carga__lt=inicio_del_dia_siguiente(fecha_hasta))
     pendientes_totales = pendientes_qs.count()
 
     if not usuarios:
@@ -3648,73 +3658,33 @@ def _obtener_estadisticas_clasificacion(desde=None, hasta=None):
         }
 
     usuarios_ids = [u.id for u in usuarios]
+
+    totales = sumar_estadisticas(METRICAS_CLASIFICACION, fecha_desde, fecha_hasta, usuarios_ids)
+    nombres_categorias = dict(Categoria.objects.values_list("id", "nombre"))
     stats_map = {}
     for user in usuarios:
+        totales_usuario = totales[user.id]
+        aprobados, demora_aprobados = totales_usuario[Metrica.DECISIONES_APROBADAS][None]
+        rechazados, demora_rechazados = totales_usuario[Metrica.DECISIONES_RECHAZADAS][None]
+        categorias = defaultdict(int)
+        for categoria_id, (cantidad, _) in totales_usuario[Metrica.CATEGORIAS_CLASIFICADAS].items():
+            if categoria_id in nombres_categorias:
+                categorias[nombres_categorias[categoria_id]] += cantidad
         stats_map[user.id] = {
             "id": user.id,
             "username": user.username,
             "nombre": user.get_full_name() or user.username,
-            "links_ids": set(),
-            "links_categorias": set(),
-            "categorias": defaultdict(int),
-            "aprobados": 0,
-            "rechazados": 0,
-            "duracion_total": 0.0,
-            "duracion_count": 0,
+            "links_clasificados": totales_usuario[Metrica.LINKS_CLASIFICADOS][None][0],
+            "categorias": categorias,
+            "aprobados": aprobados,
+            "rechazados": rechazados,
+            "promedio_segundos": (
+                (demora_aprobados + demora_rechazados) / (aprobados + rechazados)
+                if aprobados + rechazados
+                else None
+            ),
         }
 
-    actividades = Actividad.objects.filter(
-        usuario_id__in=usuarios_ids,
-        tipo=TipoActividad.CAMBIO_ESTADO,
-    ).select_related("usuario")
-
-    if fecha_desde:
-        actividades = actividades.filter(fecha_hora__date__gte=fecha_desde)
-    if fecha_hasta:
-        actividades = actividades.filter(fecha_hora__date__lte=fecha_hasta)
-
-    eventos = []
-    link_ids = set()
-    for actividad in actividades:
-        link_id = _extraer_link_id(actividad.descripcion)
-        if not link_id:
-            continue
-        eventos.append((actividad, link_id))
-        link_ids.add(link_id)
-
-    links_map = {
-        link.id: link
-        for link in LinkRelevante.objects.filter(id__in=link_ids)
-        .prefetch_related("categorias")
-    }
-
-    for actividad, link_id in eventos:
-        link = links_map.get(link_id)
-        if not link:
-            continue
-        estado_nuevo = _extraer_estado_nuevo(actividad.descripcion)
-        if estado_nuevo not in {EstadoLink.APROBADO, EstadoLink.DESCARTADO}:
-            continue
-        data = stats_map.get(actividad.usuario_id)
-        if not data:
-            continue
-        if estado_nuevo == EstadoLink.APROBADO:
-            data["aprobados"] += 1
-        else:
-            data["rechazados"] += 1
-
-        data["links_ids"].add(link_id)
-
-        if link.fecha_carga:
-            delta = actividad.fecha_hora - link.fecha_carga
-            data["duracion_total"] += delta.total_seconds()
-            data["duracion_count"] += 1
-
-        if link_id not in data["links_categorias"]:
-            for categoria in link.categorias.all():
-                data["categorias"][categoria.nombre] += 1
-            data["links_categorias"].add(link_id)
-
     usuarios_stats = []
     categorias_global_counter = defaultdict(int)
     total_aprobados_global = 0
@@ -3725,8 +3695,8 @@ def _obtener_estadisticas_clasificacion(desde=None, hasta=None):
         data = stats_map[user.id]
         decisiones = data["aprobados"] + data["rechazados"]
         promedio_horas = (
-            round(data["duracion_total"] / data["duracion_count"] / 3600, 2)
-            if data["duracion_count"]
+            round(data["promedio_segundos"] / 3600, 2)
+            if data["promedio_segundos"] is not None
             else 0
         )
         aprobados_pct = (
@@ -3754,14 +3724,14 @@ def _obtener_estadisticas_clasificacion(desde=None, hasta=None):
 
         total_aprobados_global += data["aprobados"]
         total_rechazados_global += data["rechazados"]
-        total_clasificados_global += len(data["links_ids"])
+        total_clasificados_global += data["links_clasificados"]
 
         usuarios_stats.append(
             {
                 "id": data["id"],
                 "username": data["username"],
                 "nombre": data["nombre"],
-                "links_clasificados": len(data["links_ids"]),
+                "links_clasificados": data["links_clasificados"],
                 "aprobados": data["aprobados"],
                 "rechazados": data["rechazados"],
                 "aprobados_pct": aprobados_pct,
@@ -3832,54 +3802,14 @@ def _obtener_estadisticas_redaccion(desde=None, hasta=None):
         for user in usuarios
     }
 
-    articulos_qs = (
-        Articulo.objects.filter(generado_por__in=usuarios_ids)
-        .select_related("generado_por")
-        .prefetch_related("links_incluidos")
-    )
-    if fecha_desde:
-        articulos_qs = articulos_qs.filter(fecha_creacion__date__gte=fecha_desde)
-    if fecha_hasta:
-        articulos_qs = articulos_qs.filter(fecha_creacion__date__lte=fecha_hasta)
-
-    for articulo in articulos_qs:
-        data = stats_map.get(articulo.generado_por_id)
-        if not data:
-            continue
-        data["articulos"] += 1
-        links = list(articulo.links_incluidos.all())
-        data["links_total"] += len(links)
-        for link in links:
-            if not link.fecha_aprobacion:
-                continue
-            delta = articulo.fecha_creacion - link.fecha_aprobacion
-            segundos = delta.total_seconds()
-            if segundos < 0:
-                continue
-            data["tiempo_total"] += segundos
-            data["tiempo_count"] += 1
-
-    busquedas_qs = SolicitudInfo.objects.filter(usuario_creador__in=usuarios_ids)
-    if fecha_desde:
-        busquedas_qs = busquedas_qs.filter(fecha_creacion__date__gte=fecha_desde)
-    if fecha_hasta:
-        busquedas_qs = busquedas_qs.filter(fecha_creacion__date__lte=fecha_hasta)
-
-    for item in busquedas_qs.values("usuario_creador").annotate(total=Count("id")):
-        data = stats_map.get(item["usuario_creador"])
-        if data:
-            data["ordenes_busqueda"] = item["total"]
-
-    hechos_qs = HechoDelictivo.objects.filter(creado_por__in=usuarios_ids)
-    if fecha_desde:
-        hechos_qs = hechos_qs.filter(fecha__gte=fecha_desde)
-    if fecha_hasta:
-        hechos_qs = hechos_qs.filter(fecha__lte=fecha_hasta)
-
-    for item in hechos_qs.values("creado_por").annotate(total=Count("id")):
-        data = stats_map.get(item["creado_por"])
-        if data:
-            data["hechos_delictivos"] = item["total"]
+    totales = sumar_estadisticas(METRICAS_REDACCION, fecha_desde, fecha_hasta, usuarios_ids)
+    for user_id, data in stats_map.items():
+        totales_usuario = totales[user_id]
+        data["articulos"] = totales_usuario[Metrica.ARTICULOS][None][0]
+        data["links_total"] = totales_usuario[Metrica.LINKS_ARTICULOS][None][0]
+        data["tiempo_count"], data["tiempo_total"] = totales_usuario[Metrica.DEMORA_ARTICULOS][None]
+        data["ordenes_busqueda"] = totales_usuario[Metrica.SOLICITUDES][None][0]
+        data["hechos_delictivos"] = totales_usuario[Metrica.HECHOS][None][0]
 
     usuarios_stats = []
     articulos_global = []
@@ -3981,42 +3911,22 @@ def _obtener_estadisticas_informes(desde=None, hasta=None):
         for user in usuarios
     }
 
-    informes_qs = (
-        InformeIndividual.objects.filter(generado_por__in=usuarios_ids)
-        .select_related("generado_por")
-        .prefetch_related("articulos__categoria")
-    )
-    if fecha_desde:
-        informes_qs = informes_qs.filter(fecha_creacion__date__gte=fecha_desde)
-    if fecha_hasta:
-        informes_qs = informes_qs.filter(fecha_creacion__date__lte=fecha_hasta)
-
+    totales = sumar_estadisticas(METRICAS_INFORMES, fecha_desde, fecha_hasta, usuarios_ids)
+    nombres_categorias = dict(Categoria.objects.values_list("id", "nombre"))
     categorias_global_counter = defaultdict(int)
     total_informes = 0
     articulos_total_global = 0
 
-    for informe in informes_qs:
-        data = stats_map.get(informe.generado_por_id)
-        if not data:
-            continue
-        data["informes"] += 1
-        total_informes += 1
-        articulos = list(informe.articulos.all())
-        data["articulos_total"] += len(articulos)
-        articulos_total_global += len(articulos)
-        categorias_informe = set()
-        for articulo in articulos:
-            categoria = (
-                articulo.categoria.nombre
-                if getattr(articulo, "categoria", None)
-                else "Sin categoría"
-            )
-            categorias_informe.add(categoria)
-        if not categorias_informe:
-            categorias_informe.add("Sin categoría")
-        for categoria in categorias_informe:
-            data["categorias"][categoria] += 1
-            categorias_global_counter[categoria] += 1
+    for user_id, data in stats_map.items():
+        totales_usuario = totales[user_id]
+        data["informes"] = totales_usuario[Metrica.INFORMES][None][0]
+        data["articulos_total"] = totales_usuario[Metrica.ARTICULOS_INFORMES][None][0]
+        total_informes += data["informes"]
+        articulos_total_global += data["articulos_total"]
+        for categoria_id, (cantidad, _) in totales_usuario[Metrica.CATEGORIAS_INFORMES].items():
+            categoria = nombres_categorias.get(categoria_id, "Sin categoría")
+            data["categorias"][categoria] += cantidad
+            categorias_global_counter[categoria] += cantidad
 
     usuarios_stats = []
     informes_global = []
@@ -4088,24 +3998,21 @@ def _obtener_estadisticas_informes(desde=None, hasta=None):
     }
 
 
-@login_required
-def estadisticas_view(request):
-    if not _user_has_panel_access(request.user, [Roles.GERENCIA]):
-        return render(request, "403.html", status=403)
-
-    desde = request.GET.get("desde")
-    hasta = request.GET.get("hasta")
-    usuario = request.GET.get("usuario")
-    clas_desde_param = request.GET.get("clas_desde")
-    clas_hasta_param = request.GET.get("clas_hasta")
+def _datos_estadisticas(parametros):
+    """Estadísticas del panel de gerencia para los filtros de la consulta."""
+    usuario = parametros.get("usuario")
+    desde = parametros.get("desde")
+    hasta = parametros.get("hasta")
+    clas_desde_param = parametros.get("clas_desde")
+    clas_hasta_param = parametros.get("clas_hasta")
     clas_desde = clas_desde_param or desde
     clas_hasta = clas_hasta_param or hasta
-    redac_desde_param = request.GET.get("redac_desde")
-    redac_hasta_param = request.GET.get("redac_hasta")
+    redac_desde_param = parametros.get("redac_desde")
+    redac_hasta_param = parametros.get("redac_hasta")
     redac_desde = redac_desde_param or desde
     redac_hasta = redac_hasta_param or hasta
-    info_desde_param = request.GET.get("info_desde")
-    info_hasta_param = request.GET.get("info_hasta")
+    info_desde_param = parametros.get("info_desde")
+    info_hasta_param = parametros.get("info_hasta")
     info_desde = info_desde_param or desde
     info_hasta = info_hasta_param or hasta
 
@@ -4122,31 +4029,36 @@ def estadisticas_view(request):
         desde=info_desde, hasta=info_hasta
     )
 
-    return render(
-        request,
-        "estadisticas.html",
-        {
-            "estadisticas": estadisticas,
-            "resumen_global": resumen_global,
-            "datos_globales": datos_globales,
-            "clasificacion": clasificacion,
-            "redaccion": redaccion,
-            "informes": informes,
-            "filtros": {"usuario": usuario, "desde": desde, "hasta": hasta},
-            "clas_filtros": {
-                "desde": clas_desde_param or desde,
-                "hasta": clas_hasta_param or hasta,
-            },
-            "redac_filtros": {
-                "desde": redac_desde_param or desde,
-                "hasta": redac_hasta_param or hasta,
-            },
-            "info_filtros": {
-                "desde": info_desde_param or desde,
-                "hasta": info_hasta_param or hasta,
-            },
+    return {
+        "estadisticas": estadisticas,
+        "resumen_global": resumen_global,
+        "datos_globales": datos_globales,
+        "clasificacion": clasificacion,
+        "redaccion": redaccion,
+        "informes": informes,
+        "filtros": {"usuario": usuario, "desde": desde, "hasta": hasta},
+        "clas_filtros": {
+            "desde": clas_desde_param or desde,
+            "hasta": clas_hasta_param or hasta,
         },
-    )
+        "redac_filtros": {
+            "desde": redac_desde_param or desde,
+            "hasta": redac_hasta_param or hasta,
+        },
+        "info_filtros": {
+            "desde": info_desde_param or desde,
+            "hasta": info_hasta_param or hasta,
+        },
+    }
+
+
+@login_required
+def estadisticas_view(request):
+    if not _user_has_panel_access(request.user, [Roles.GERENCIA]):
+        return render(request, "403.html", status=403)
+
+    cuerpo, _ = estadisticas_en_cache(request.GET, lambda: _datos_estadisticas(request.GET))
+    return render(request, "estadisticas.html", json.loads(cuerpo))
 
 
 @login_required
@@ -4159,195 +4071,140 @@ def exportar_estadisticas_pdf(request):
     usuario = request.GET.get("usuario")
     desde = request.GET.get("desde")
     hasta = request.GET.get("hasta")
+    # ?detalle=0 omite la tabla de links y deja sólo los gráficos.
+    con_detalle = request.GET.get("detalle") != "0"
 
-    links = LinkRelevante.objects.select_related("cargado_por", "diario_digital").prefetch_related(
-        "categorias"
+    filtros = json.dumps(
+        {"usuario": usuario or "", "desde": desde or "", "hasta": hasta or "", "detalle": con_detalle},
+        sort_keys=True,
     )
-    if usuario:
-        links = links.filter(cargado_por__username=usuario)
-    if desde:
-        links = links.filter(fecha_carga__date__gte=parse_date(desde))
-    if hasta:
-        links = links.filter(fecha_carga__date__lte=parse_date(hasta))
-
-    # ----------------------------
-    # Gráficos Plotly
-    # ----------------------------
-
-    # Gráfico de barras (Links por Día)
-    data_barras = (
-        links.extra(select={"day": "date(fecha_carga)"})
-        .values("day")
-        .order_by("day")
-        .annotate(count=Count("id"))
+    clave = servicio_pdf.clave_pdf(
+        "estadisticas",
+        hashlib.sha256(filtros.encode()).hexdigest()[:16],
+        version_estadisticas(),
     )
-    df_barras = pd.DataFrame(data_barras)
-    fig_barras = px.bar(
-        df_barras,
-        x="day",
-        y="count",
-        labels={"day": "Fecha", "count": "Cantidad"},
-        title="Links por Día",
-    )
-    buf_barras = io.BytesIO()
-    # ⚠️ REQUiere KALEIDO instalado para exportar a PNG ⚠️
-    try:
-        fig_barras.write_image(buf_barras, format="png")
-    except ValueError as e:
-        logger.error(f"Error al generar gráfico de barras (Plotly/Kaleido): {e}")
-        # Manejo de error para evitar 500
-        barra_img = None 
-    else:
-        buf_barras.seek(0)
-        barra_img = base64.b64encode(buf_barras.read()).decode("utf-8")
 
+    def generar_html():
+        links = LinkRelevante.objects.all()
+        if usuario:
+            links = links.filter(cargado_por__username=usuario)
+        if desde:
+            links = links.filter(fecha_carga__gte=inicio_del_dia(desde))
+        if hasta:
+            links = links.filter(fecha_carga__lt=inicio_del_dia_siguiente(hasta))
+
+        # ----------------------------
+        # Gráficos SVG (WeasyPrint los dibuja sin rasterizar). Los tres salen
+        # de consultas agrupadas: no se carga ningún link en memoria.
+        # ----------------------------
+
+        # Gráfico de barras (Links por Día)
+        data_barras = list(
+            links.annotate(day=TruncDate("fecha_carga", tzinfo=get_current_timezone()))
+            .values("day")
+            .order_by("day")
+            .annotate(count=Count("id"))
+        )
+        grafico_barras = grafico_barras_svg(
+            [fila["day"] for fila in data_barras],
+            [fila["count"] for fila in data_barras],
+            titulo="Links por Día",
+            etiqueta_x="Fecha",
+            etiqueta_y="Cantidad",
+        )
 
-    # Gráfico de torta (Distribución por Estado)
-    estado_data = links.values("estado").annotate(count=Count("id"))
-    df_torta = pd.DataFrame(estado_data)
-    fig_torta = px.pie(
-        df_torta, names="estado", values="count", title="Distribución por Estado"
-    )
-    buf_torta = io.BytesIO()
-    try:
-        fig_torta.write_image(buf_torta, format="png")
-    except ValueError as e:
-        logger.error(f"Error al generar gráfico de torta (Plotly/Kaleido): {e}")
-        torta_img = None 
-    else:
-        buf_torta.seek(0)
-        torta_img = base64.b64encode(buf_torta.read()).decode("utf-8")
+        # Gráfico de torta (Distribución por Estado)
+        estado_data = list(links.values("estado").annotate(count=Count("id")).order_by("estado"))
+        grafico_torta = grafico_torta_svg(
+            [fila["estado"] for fila in estado_data],
+            [fila["count"] for fila in estado_data],
+            titulo="Distribución por Estado",
+        )
 
+        # Gráfico de categorías, contado sobre la tabla intermedia
+        categoria_data = list(
+            LinkRelevante.categorias.through.objects.filter(linkrelevante_id__in=links.values("id"))
+            .values("categoria__nombre")
+            .annotate(cantidad=Count("id"))
+            .order_by("-cantidad", "categoria__nombre")
+        )
+        grafico_categorias = grafico_barras_svg(
+            [fila["categoria__nombre"] for fila in categoria_data],
+            [fila["cantidad"] for fila in categoria_data],
+            titulo="Links por Categoría",
+        )
 
-    # Gráfico de categorías
-    categoria_counter = defaultdict(int)
-    for link in links:
-        for cat in link.categorias.all():
-            categoria_counter[cat.nombre] += 1
-            
-    df_cats = pd.DataFrame(
-        {
-            "categoria": list(categoria_counter.keys()),
-            "cantidad": list(categoria_counter.values()),
-        }
-    )
-    fig_cats = px.bar(df_cats, x="categoria", y="cantidad", title="Links por Categoría")
-    buf_cats = io.BytesIO()
-    try:
-        fig_cats.write_image(buf_cats, format="png")
-    except ValueError as e:
-        logger.error(f"Error al generar gráfico de categorías (Plotly/Kaleido): {e}")
-        cats_img = None
-    else:
-        buf_cats.seek(0)
-        cats_img = base64.b64encode(buf_cats.read()).decode("utf-8")
-        
-    # ----------------------------
-    # Logo en PDF
-    # ----------------------------
-    logo_path = os.path.join(settings.BASE_DIR, "static", "img", "logo.png")
-    logo_b64 = None
-    try:
-        with open(logo_path, "rb") as img_f:
-            logo_b64 = base64.b64encode(img_f.read()).decode("utf-8")
-    except FileNotFoundError:
-        logger.error(f"No se encontró el archivo de logo en: {logo_path}")
-        # Si no se encuentra el logo, se pasa None y el template debe manejarlo
-    except Exception as e:
-        logger.error(f"Error al codificar el logo en base64: {e}")
-        
-        
-    # ----------------------------
-    # Renderizado y Exportación
-    # ----------------------------
+        # Detalle: sólo los links más recientes, hasta ESTADISTICAS_PDF_MAX_FILAS.
+        total_links = sum(fila["count"] for fila in estado_data)
+        tabla = []
+        if con_detalle:
+            tabla = list(
+                links.order_by("-fecha_carga").values(
+                    "fecha_carga", "url", "estado", "cargado_por__username"
+                )[: settings.ESTADISTICAS_PDF_MAX_FILAS]
+            )
 
-    html = render_to_string(
-        "estadisticas_pdf.html",
-        {
-            "tabla": links.order_by("-fecha_carga"),
-            "barra_img": barra_img,
-            "torta_img": torta_img,
-            "cats_img": cats_img,
-            "usuario": usuario,
-            "desde": desde,
-            "hasta": hasta,
-            "generado": datetime.now(),
-            "logo_b64": logo_b64,
-        },
-    )
-    
-    try:
-        # Asegurarse que WeasyPrint tenga una URL base para resolver recursos
-        pdf = HTML(string=html, base_url=request.build_absolute_uri()).write_pdf()
-    except Exception as e:
-        logger.error(f"Error al generar el PDF con WeasyPrint: {e}")
-        messages.error(request, f"Error al generar PDF. Verifique dependencias (WeasyPrint, Kaleido). Detalle: {e}")
-        return redirect('estadisticas') # Redirigir de vuelta para evitar el 500
+        # ----------------------------
+        # Logo en PDF
+        # ----------------------------
+        logo_path = os.path.join(settings.BASE_DIR, "static", "img", "logo.png")
+        logo_b64 = None
+        try:
+            with open(logo_path, "rb") as img_f:
+                logo_b64 = base64.b64encode(img_f.read()).decode("utf-8")
+        except FileNotFoundError:
+            logger.error(f"No se encontró el archivo de logo en: {logo_path}")
+            # Si no se encuentra el logo, se pasa None y el template debe manejarlo
+        except Exception as e:
+            logger.error(f"Error al codificar el logo en base64: {e}")
 
-    response = HttpResponse(pdf, content_type="application/pdf")
-    response["Content-Disposition"] = 'attachment; filename="estadisticas_links.pdf"'
-    return response
+
+        # ----------------------------
+        # Renderizado y Exportación
+        # ----------------------------
+
+        return render_to_string(
+            "estadisticas_pdf.html",
+            {
+                "tabla": tabla,
+                "con_detalle": con_detalle,
+                "total_links": total_links,
+                "grafico_barras": grafico_barras,
+                "grafico_torta": grafico_torta,
+                "grafico_categorias": grafico_categorias,
+                "usuario": usuario,
+                "desde": desde,
+                "hasta": hasta,
+                "generado": datetime.now(),
+                "logo_b64": logo_b64,
+            },
+        )
+
+    return _responder_pdf(
+        request, clave, generar_html, "estadisticas_links.pdf", fallback_url="estadisticas"
+    )
 
 
 @login_required
 @require_GET
 def estadisticas_api_view(request):
-    """EndPoint JSON para las nuevas estadísticas de usuarios de prensa."""
+    """
+    EndPoint JSON para las nuevas estadísticas de usuarios de prensa. Las
+    respuestas salen de caché y llevan ETag: si el cliente ya tiene la
+    versión vigente se responde 304 sin cuerpo.
+    """
     if not _user_has_panel_access(request.user, [Roles.GERENCIA]):
         return JsonResponse({"error": "Acceso denegado"}, status=403)
 
-    usuario = request.GET.get("usuario")
-    desde = request.GET.get("desde")
-    hasta = request.GET.get("hasta")
-    clas_desde_param = request.GET.get("clas_desde")
-    clas_hasta_param = request.GET.get("clas_hasta")
-    clas_desde = clas_desde_param or desde
-    clas_hasta = clas_hasta_param or hasta
-    redac_desde_param = request.GET.get("redac_desde")
-    redac_hasta_param = request.GET.get("redac_hasta")
-    redac_desde = redac_desde_param or desde
-    redac_hasta = redac_hasta_param or hasta
-    info_desde_param = request.GET.get("info_desde")
-    info_hasta_param = request.GET.get("info_hasta")
-    info_desde = info_desde_param or desde
-    info_hasta = info_hasta_param or hasta
-
-    estadisticas, resumen_global, datos_globales = _obtener_estadisticas_prensa(
-        desde=desde, hasta=hasta, username=usuario
-    )
-    clasificacion = _obtener_estadisticas_clasificacion(
-        desde=clas_desde, hasta=clas_hasta
-    )
-    redaccion = _obtener_estadisticas_redaccion(
-        desde=redac_desde, hasta=redac_hasta
-    )
-    informes = _obtener_estadisticas_informes(
-        desde=info_desde, hasta=info_hasta
-    )
-
-    return JsonResponse(
-        {
-            "estadisticas": estadisticas,
-            "resumen_global": resumen_global,
-            "datos_globales": datos_globales,
-            "clasificacion": clasificacion,
-            "redaccion": redaccion,
-            "informes": informes,
-            "filtros": {"usuario": usuario, "desde": desde, "hasta": hasta},
-            "clas_filtros": {
-                "desde": clas_desde_param or desde,
-                "hasta": clas_hasta_param or hasta,
-            },
-            "redac_filtros": {
-                "desde": redac_desde_param or desde,
-                "hasta": redac_hasta_param or hasta,
-            },
-            "info_filtros": {
-                "desde": info_desde_param or desde,
-                "hasta": info_hasta_param or hasta,
-            },
-        }
-    )
+    cuerpo, etag = estadisticas_en_cache(request.GET, lambda: _datos_estadisticas(request.GET))
+    enviados = request.headers.get("If-None-Match", "")
+    if etag in {valor.strip().removeprefix("W/") for valor in enviados.split(",")}:
+        respuesta = HttpResponseNotModified()
+    else:
+        respuesta = HttpResponse(cuerpo, content_type="application/json")
+    respuesta["ETag"] = etag
+    respuesta["Cache-Control"] = "private, no-cache"
+    return respuesta
 
 
 @login_required
@@ -4529,41 +4386,46 @@ def exportar_fuentes_osint(request):
     if request.user.userprofile.rol != Roles.GERENTE_PRODUCCION:
         return render(request, "403.html", status=403)
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Herramientas OSINT"
-    ws.append(["Nombre", "URL", "Tipo", "Descripción"])
-
-    for herramienta in HerramientaOSINT.objects.all().order_by("nombre"):
-        ws.append(
-            [
-                herramienta.nombre,
-                herramienta.url,
-                herramienta.get_tipo_display(),
-                herramienta.descripcion or "",
-            ]
-        )
-
-    def _agregar_fuentes(titulo, queryset):
-        hoja = wb.create_sheet(titulo)
-        hoja.append(["Nombre", "URL principal"])
-        for fuente in queryset:
-            hoja.append([fuente.nombre, fuente.url_principal])
+    tramo = settings.EXPORTACION_TAMANIO_TRAMO
+    tipos = dict(HerramientaOSINT.Tipo.choices)
+    herramientas = (
+        [nombre, url, tipos.get(tipo, tipo), descripcion or ""]
+        for nombre, url, tipo, descripcion in HerramientaOSINT.objects.order_by("nombre")
+        .values_list("nombre", "url", "tipo", "descripcion")
+        .iterator(chunk_size=tramo)
+    )
+    fuentes = [
+        ("Diarios digitales", DiarioDigital),
+        ("Redes sociales", RedSocial),
+        ("TV digital", TvDigital),
+        ("Radios digitales", RadioDigital),
+    ]
 
-    _agregar_fuentes("Diarios digitales", DiarioDigital.objects.all().order_by("nombre"))
-    _agregar_fuentes("Redes sociales", RedSocial.objects.all().order_by("nombre"))
-    _agregar_fuentes("TV digital", TvDigital.objects.all().order_by("nombre"))
-    _agregar_fuentes("Radios digitales", RadioDigital.objects.all().order_by("nombre"))
+    def _filas_fuente(modelo):
+        return modelo.objects.order_by("nombre").values_list("nombre", "url_principal").iterator(
+            chunk_size=tramo
+        )
 
     ahora = localtime(now()).strftime("%Y%m%d_%H%M%S")
-    nombre_archivo = f"fuentes_osint_{ahora}.xlsx"
+    if request.GET.get("formato") == "csv":
+        def filas():
+            for fila in herramientas:
+                yield ["Herramienta OSINT", *fila]
+            for titulo, modelo in fuentes:
+                for nombre, url in _filas_fuente(modelo):
+                    yield [titulo, nombre, url, "", ""]
+
+        return respuesta_csv(
+            f"fuentes_osint_{ahora}.csv",
+            ["Fuente", "Nombre", "URL", "Tipo", "Descripción"],
+            filas(),
+        )
 
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    response["Content-Disposition"] = f'attachment; filename="{nombre_archivo}"'
-    wb.save(response)
-    return response
+    hojas = [("Herramientas OSINT", ["Nombre", "URL", "Tipo", "Descripción"], herramientas)]
+    hojas += [
+        (titulo, ["Nombre", "URL principal"], _filas_fuente(modelo)) for titulo, modelo in fuentes
+    ]
+    return respuesta_excel(f"fuentes_osint_{ahora}.xlsx", hojas)
 
 
 # ========================
@@ -4581,64 +4443,65 @@ def exportar_links_relevantes(request):
     diario_id = request.GET.get("diario")
     categoria_id = request.GET.get("categoria")
 
-    links = (
-        LinkRelevante.objects.filter(
-            estado=EstadoLink.APROBADO, revisado_clasificador=True
-        )
-        .select_related("diario_digital", "cargado_por")
-        .prefetch_related("categorias")
-        .order_by("-fecha_carga")
-    )
+    links = LinkRelevante.objects.filter(
+        estado=EstadoLink.APROBADO, revisado_clasificador=True
+    ).order_by("-fecha_carga")
 
     if fecha_desde:
-        links = links.filter(fecha_carga__date__gte=parse_date(fecha_desde))
+        links = links.filter(fecha_carga__gte=inicio_del_dia(fecha_desde))
     if fecha_hasta:
-        links = links.filter(fecha_carga__date__lte=parse_date(fecha_hasta))
+        links = links.filter(fecha_carga__lt=inicio_del_dia_siguiente(fecha_hasta))
     if diario_id:
         links = links.filter(diario_digital_id=diario_id)
     if categoria_id:
         links = links.filter(categorias__id=categoria_id)
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Links Relevantes"
-    ws.append(
-        [
-            "Fecha de carga",
-            "URL",
-            "Estado",
-            "Diario digital",
-            "Categorías",
-            "Cargado por",
-        ]
-    )
-    for link in links:
-        categorias = ", ".join(cat.nombre for cat in link.categorias.all()) or "-"
-        ws.append(
-            [
-                link.fecha_carga.strftime("%Y-%m-%d %H:%M") if link.fecha_carga else "-",
-                link.url,
-                link.get_estado_display(),
-                link.diario_digital.nombre if link.diario_digital else "Sin diario",
-                categorias,
-                link.cargado_por.username if link.cargado_por else "Desconocido",
-            ]
-        )
+    encabezados = [
+        "Fecha de carga",
+        "URL",
+        "Estado",
+        "Diario digital",
+        "Categorías",
+        "Cargado por",
+    ]
+    filas = _filas_links_relevantes(links)
 
-    nombre_archivo = "links_relevantes.xlsx"
+    nombre_archivo = "links_relevantes"
     if fecha_desde or fecha_hasta:
-        nombre_archivo = f"links_{fecha_desde or 'inicio'}_{fecha_hasta or 'hoy'}.xlsx"
+        nombre_archivo = f"links_{fecha_desde or 'inicio'}_{fecha_hasta or 'hoy'}"
     elif diario_id:
-        nombre_archivo = f"links_diario_{diario_id}.xlsx"
+        nombre_archivo = f"links_diario_{diario_id}"
     elif categoria_id:
-        nombre_archivo = f"links_categoria_{categoria_id}.xlsx"
-
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    response["Content-Disposition"] = f'attachment; filename="{nombre_archivo}"'
-    wb.save(response)
-    return response
+        nombre_archivo = f"links_categoria_{categoria_id}"
+
+    if request.GET.get("formato") == "csv":
+        return respuesta_csv(f"{nombre_archivo}.csv", encabezados, filas)
+    return respuesta_excel(f"{nombre_archivo}.xlsx", [("Links Relevantes", encabezados, filas)])
+
+
+def _filas_links_relevantes(links):
+    # Las categorías se buscan por tramo de links, no con prefetch_related,
+    # para no cargar todo el resultado en memoria.
+    estados = dict(EstadoLink.choices)
+    categorias_de_link = LinkRelevante.categorias.through.objects.order_by("id")
+    filas = links.values_list(
+        "id", "fecha_carga", "url", "estado", "diario_digital__nombre", "cargado_por__username"
+    ).iterator(chunk_size=settings.EXPORTACION_TAMANIO_TRAMO)
+    for tramo in en_tramos(filas, settings.EXPORTACION_TAMANIO_TRAMO):
+        categorias = defaultdict(list)
+        for link_id, nombre in categorias_de_link.filter(
+            linkrelevante_id__in=[fila[0] for fila in tramo]
+        ).values_list("linkrelevante_id", "categoria__nombre"):
+            categorias[link_id].append(nombre)
+        for link_id, fecha_carga, url, estado, diario, usuario in tramo:
+            yield [
+                fecha_carga.strftime("%Y-%m-%d %H:%M") if fecha_carga else "-",
+                url,
+                estados.get(estado, estado),
+                diario or "Sin diario",
+                ", ".join(categorias[link_id]) or "-",
+                usuario or "Desconocido",
+            ]
 
 
 # ========================
@@ -4986,10 +4849,7 @@ def eliminar_hecho_delictivo(request, id):
 @login_required
 def hecho_delictivo_detalle_view(request, id):
     hecho = get_object_or_404(
-        HechoDelictivo.objects.select_related("creado_por", "articulo").prefetch_related(
-            "autor", "noticias"
-        ),
-        id=id,
+        HechoDelictivo.objects.select_related("creado_por", "articulo"), id=id
     )
     if not _user_has_panel_access(request.user, [Roles.REDACCION, Roles.EDITOR, Roles.REDACTOR_IA]):
         return render(request, "403.html", status=403)
@@ -5026,26 +4886,37 @@ def exportar_hecho_delictivo_pdf(request, id):
     ):
         return render(request, "403.html", status=403)
 
-    context = {
-        "hecho": hecho,
-        "autores": hecho.autor.all(),
-        "noticias": hecho.noticias.all(),
-        "creado_por": hecho.creado_por.username if hecho.creado_por else "No registrado",
-        "fecha_registro": hecho.fecha.strftime("%d/%m/%Y"),
-        "generado_en": localtime(now()).strftime("%d/%m/%Y %H:%M"),
-        "articulo": hecho.articulo,
-    }
-
-    html = render_to_string("hecho_delictivo_pdf.html", context)
-    pdf_file = HTML(string=html, base_url=request.build_absolute_uri()).write_pdf()
+    def generar_html():
+        context = {
+            "hecho": hecho,
+            "autores": hecho.autor.all(),
+            "noticias": hecho.noticias.all(),
+            "creado_por": hecho.creado_por.username if hecho.creado_por else "No registrado",
+            "fecha_registro": hecho.fecha.strftime("%d/%m/%Y"),
+            "generado_en": localtime(now()).strftime("%d/%m/%Y %H:%M"),
+            "articulo": hecho.articulo,
+        }
+        return render_to_string("hecho_delictivo_pdf.html", context)
 
     fecha_str = hecho.fecha.strftime("%Y-%m-%d")
     categoria = slugify(hecho.get_categoria_display() or "hecho")
     nombre_archivo = f"HechoDelictivo_{categoria}_{fecha_str}.pdf"
 
-    response = HttpResponse(pdf_file, content_type="application/pdf")
-    response["Content-Disposition"] = f'inline; filename="{nombre_archivo}"'
-    return response
+    # El PDF muestra también los autores (informes) y el artículo; la URL de
+    # las noticias y los datos de los informes tocan la fecha al cambiar.
+    version = _version_pdf(
+        hecho.fecha_modificacion,
+        hecho.autor.aggregate(ultima=Max("fecha_modificacion"))["ultima"],
+        hecho.articulo.fecha_modificacion if hecho.articulo else None,
+    )
+    return _responder_pdf(
+        request,
+        servicio_pdf.clave_pdf("hecho", hecho.pk, version),
+        generar_html,
+        nombre_archivo,
+        adjunto=False,
+        fallback_url="hechos_delictivos",
+    )
 
 
 # -------------------- API ADICIONAL (No REST Framework) --------------------
@@ -5064,9 +4935,9 @@ def links_list(request):
     fuente = request.GET.get("fuente")
 
     if fecha_inicio:
-        queryset = queryset.filter(fecha_carga__date__gte=parse_date(fecha_inicio))
+        queryset = queryset.filter(fecha_carga__gte=inicio_del_dia(fecha_inicio))
     if fecha_fin:
-        queryset = queryset.filter(fecha_carga__date__lte=parse_date(fecha_fin))
+        queryset = queryset.filter(fecha_carga__lt=inicio_del_dia_siguiente(fecha_fin))
     if diario_id and diario_id.isdigit():
         queryset = queryset.filter(diario_digital_id=int(diario_id))
     if estado:
@@ -5102,24 +4973,27 @@ def exportar_informe_pdf(request, informe_id):
     ):
         return render(request, "403.html", status=403)
 
-    # El prefetch lo hacemos aquí si el objeto no está cargado completamente:
-    informe_completo = InformeIndividual.objects.select_related("generado_por").prefetch_related(
-        "alias", "telefono", "domicilio", "vehiculos", "empleadores", "vinculos", "articulos"
-    ).get(id=informe_id)
-    
-    html_string = render_to_string("informes/informe_pdf.html", {"informe": informe_completo})
-    
-    try:
-        pdf = HTML(string=html_string, base_url=request.build_absolute_uri()).write_pdf()
-    except Exception as e:
-        logger.error(f"Error al generar PDF del informe ID {informe_id}: {e}")
-        messages.error(request, "Error al generar el PDF del informe.")
-        return redirect('informes') # Redirigir a una página segura
+    def generar_html():
+        # El prefetch lo hacemos aquí si el objeto no está cargado completamente:
+        informe_completo = InformeIndividual.objects.select_related("generado_por").prefetch_related(
+            "alias", "telefono", "domicilio", "vehiculos", "empleadores", "vinculos", "articulos"
+        ).get(id=informe_id)
+        return render_to_string("informes/informe_pdf.html", {"informe": informe_completo})
 
     nombre_archivo = f"Informe_{informe.apellido}_{informe.nombre}_{datetime.now().strftime('%Y%m%d')}.pdf".replace(" ", "_")
-    response = HttpResponse(pdf, content_type="application/pdf")
-    response["Content-Disposition"] = f"attachment; filename={nombre_archivo}"
-    return response
+    # Alias, teléfonos, domicilios y demás filas tocan la fecha del informe
+    # al cambiar (signals.py); los artículos tienen su propia fecha.
+    version = _version_pdf(
+        informe.fecha_modificacion,
+        informe.articulos.aggregate(ultima=Max("fecha_modificacion"))["ultima"],
+    )
+    return _responder_pdf(
+        request,
+        servicio_pdf.clave_pdf("informe", informe.pk, version),
+        generar_html,
+        nombre_archivo,
+        fallback_url="informes",
+    )
 
 # ========================
 # CONSULTA DE BANDAS PARA CLIENTE1
@@ -5333,44 +5207,55 @@ def exportar_banda_pdf(request, banda_id):
         return render(request, "403.html", status=403)
 
     try:
-        banda = get_object_or_404(
-            BandaCriminal.objects.prefetch_related(
-                "lideres__alias",
-                "lideres__telefono", 
-                "miembros__alias",
-                "miembros__telefono",
-                "bandas_aliadas",
-                "bandas_rivales",
-                "hechos_delictivos"
-            ),
-            id=banda_id
-        )
+        banda = get_object_or_404(BandaCriminal, id=banda_id)
     except Exception as e:
         logger.error(f"Error al obtener banda para PDF ID {banda_id}: {e}")
         messages.error(request, "Error al generar el PDF de la banda.")
         return redirect('consulta_bandas')
 
-    # Preparar datos para el template
-    context = {
-        "banda": banda,
-        "lideres": banda.lideres.all(),
-        "miembros": banda.miembros.all(),
-        "bandas_aliadas": banda.bandas_aliadas.all(),
-        "bandas_rivales": banda.bandas_rivales.all(),
-        "hechos_delictivos": banda.hechos_delictivos.all(),
-        "fecha_generacion": localtime(now()).strftime("%d/%m/%Y %H:%M")
-    }
-
-    html_string = render_to_string("banda_pdf.html", context)
-    
-    try:
-        pdf = HTML(string=html_string, base_url=request.build_absolute_uri()).write_pdf()
-    except Exception as e:
-        logger.error(f"Error al generar PDF de banda ID {banda_id}: {e}")
-        messages.error(request, "Error al generar el PDF de la banda.")
-        return redirect('consulta_bandas')
+    def generar_html():
+        prefetch_related_objects(
+            [banda],
+            "lideres__alias",
+            "lideres__telefono",
+            "miembros__alias",
+            "miembros__telefono",
+            "bandas_aliadas",
+            "bandas_rivales",
+            "hechos_delictivos",
+        )
+        # Preparar datos para el template
+        context = {
+            "banda": banda,
+            "lideres": banda.lideres.all(),
+            "miembros": banda.miembros.all(),
+            "bandas_aliadas": banda.bandas_aliadas.all(),
+            "bandas_rivales": banda.bandas_rivales.all(),
+            "hechos_delictivos": banda.hechos_delictivos.all(),
+            "fecha_generacion": localtime(now()).strftime("%d/%m/%Y %H:%M")
+        }
+        return render_to_string("banda_pdf.html", context)
+
+    # El PDF incluye alias y teléfonos de líderes y miembros: también cuenta
+    # la última modificación de sus informes.
+    # Lo mismo con los hechos y las bandas aliadas y rivales que lista.
+    integrantes = InformeIndividual.objects.filter(
+        Q(bandas_lideradas=banda) | Q(bandas_miembro=banda)
+    ).aggregate(ultima=Max("fecha_modificacion"))["ultima"]
+    version = _version_pdf(
+        banda.fecha_modificacion,
+        integrantes,
+        banda.hechos_delictivos.aggregate(ultima=Max("fecha_modificacion"))["ultima"],
+        BandaCriminal.objects.filter(
+            Q(bandas_aliadas_de=banda) | Q(bandas_rivales_de=banda)
+        ).aggregate(ultima=Max("fecha_modificacion"))["ultima"],
+    )
 
     nombre_archivo = f"Banda_{slugify(banda.nombre_principal or 'banda')}_{datetime.now().strftime('%Y%m%d')}.pdf"
-    response = HttpResponse(pdf, content_type="application/pdf")
-    response["Content-Disposition"] = f"attachment; filename={nombre_archivo}"
-    return response
+    return _responder_pdf(
+        request,
+        servicio_pdf.clave_pdf("banda", banda.pk, version),
+        generar_html,
+        nombre_archivo,
+        fallback_url="consulta_bandas",
+    )
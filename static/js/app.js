@@ -295,19 +295,11 @@ async function actualizarEstadoLink(estado) {
     }
 }
 
-// Función para registrar actividad (opcional)
+// Función para registrar actividad (opcional): se encola y se envía en lote
+// con el resto de los clics (static/js/clics.js).
 async function registrarAccion(tipo, id_link) {
-    try {
-        await fetch('/api/actividad/clic_link/', { 
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-                'X-CSRFToken': getCookie('csrftoken')
-            },
-            body: JSON.stringify({ url: `Acción ${tipo} en link ${id_link}` })
-        });
-    } catch (error) {
-        console.warn('Advertencia: No se pudo registrar la acción de actividad:', error);
+    if (window.registrarClic) {
+        window.registrarClic(`Acción ${tipo} en link ${id_link}`, 'app');
     }
 }
 
@@ -32,7 +32,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
             row.innerHTML = `
                 <td>
-                    <a href="${link.url}" target="_blank" class="link-clic" data-url="${link.url}">
+                    <a href="${link.url}" target="_blank" class="link-clic" data-url="${link.url}" data-clic-panel="clasificacion">
                         ${link.url}
                     </a>
                 </td>
@@ -54,24 +54,6 @@ document.addEventListener("DOMContentLoaded", () => {
             tablaBody.appendChild(row);
         });
 
-        // Clic en links: registrar actividad
-        setTimeout(() => {
-            document.querySelectorAll(".link-clic").forEach(enlace => {
-                enlace.addEventListener("click", e => {
-                    const url = e.currentTarget.dataset.url;
-
-                    fetch("http://127.0.0.1:8000/api/actividad/clic_link/", {
-                        method: "POST",
-                        headers: {
-                            "Content-Type": "application/json",
-                            "X-CSRFToken": getCookie("csrftoken")
-                        },
-                        body: JSON.stringify({ url })
-                    });
-                });
-            });
-        }, 100);
-
         // Evento de actualización
         document.querySelectorAll(".actualizar-btn").forEach(button => {
             button.addEventListener("click", async function () {
@@ -0,0 +1,82 @@
+// Registro de clics en links en lote.
+//
+// Los clics se acumulan en sessionStorage y se envían juntos a
+// /api/actividad/clics/ con navigator.sendBeacon: al juntar CLICS_POR_ENVIO,
+// cada CLICS_INTERVALO_MS y cuando la página se oculta o se cierra. Cualquier
+// <a data-clic-panel="..."> se registra solo; desde otro código se puede
+// llamar a registrarClic(url, panel).
+(function () {
+    const URL_CLICS = "/api/actividad/clics/";
+    const CLAVE = "minerva:clics";
+    const CLICS_POR_ENVIO = 25;
+    const CLICS_INTERVALO_MS = 60000;
+
+    function leerCola() {
+        try {
+            return JSON.parse(sessionStorage.getItem(CLAVE)) || [];
+        } catch (error) {
+            return [];
+        }
+    }
+
+    function guardarCola(cola) {
+        try {
+            sessionStorage.setItem(CLAVE, JSON.stringify(cola));
+        } catch (error) {
+            // Sin sessionStorage (modo privado, cuota llena): se envía ya.
+            enviar(cola);
+        }
+    }
+
+    function csrfToken() {
+        const cookie = document.cookie.split("; ").find((valor) => valor.startsWith("csrftoken="));
+        return cookie ? decodeURIComponent(cookie.split("=")[1]) : "";
+    }
+
+    function enviar(eventos) {
+        if (!eventos.length) return true;
+        // FormData permite mandar el token CSRF, porque sendBeacon no acepta
+        // encabezados propios.
+        const datos = new FormData();
+        datos.append("csrfmiddlewaretoken", csrfToken());
+        datos.append("eventos", JSON.stringify(eventos));
+        if (navigator.sendBeacon && navigator.sendBeacon(URL_CLICS, datos)) {
+            return true;
+        }
+        fetch(URL_CLICS, { method: "POST", body: datos, credentials: "same-origin", keepalive: true })
+            .catch(() => {});
+        return true;
+    }
+
+    function vaciar() {
+        const cola = leerCola();
+        if (!cola.length) return;
+        sessionStorage.removeItem(CLAVE);
+        enviar(cola);
+    }
+
+    function registrarClic(url, panel) {
+        if (!url) return;
+        const cola = leerCola();
+        cola.push({ url: String(url), fecha: Date.now(), panel: panel || "" });
+        guardarCola(cola);
+        if (cola.length >= CLICS_POR_ENVIO) vaciar();
+    }
+
+    function alHacerClic(evento) {
+        // También el botón del medio, que abre el link en otra pestaña.
+        if (evento.type === "auxclick" && evento.button !== 1) return;
+        const enlace = evento.target.closest && evento.target.closest("a[data-clic-panel]");
+        if (enlace) registrarClic(enlace.href, enlace.dataset.clicPanel);
+    }
+
+    document.addEventListener("click", alHacerClic, true);
+    document.addEventListener("auxclick", alHacerClic, true);
+    document.addEventListener("visibilitychange", () => {
+        if (document.visibilityState === "hidden") vaciar();
+    });
+    window.addEventListener("pagehide", vaciar);
+    setInterval(vaciar, CLICS_INTERVALO_MS);
+
+    window.registrarClic = registrarClic;
+})();